@@ -22,6 +22,33 @@ except ImportError:
     PERFORMANCE_SERVICES_AVAILABLE = False
     logger.warning("Performance services not available")
 
+try:
+    from services.gemini_embedding_service import get_embedding_cache_metrics
+except ImportError:
+    def get_embedding_cache_metrics() -> Dict[str, Any]:
+        return {}
+
+try:
+    from services.semantic_response_cache import get_response_cache_metrics, get_semantic_response_cache
+except ImportError:
+    def get_response_cache_metrics() -> Dict[str, Any]:
+        return {}
+
+    def get_semantic_response_cache():
+        return None
+
+try:
+    from services.single_flight import get_single_flight_metrics
+except ImportError:
+    def get_single_flight_metrics() -> Dict[str, Any]:
+        return {}
+
+try:
+    from services.cosmos_query import get_cosmos_query_metrics
+except ImportError:
+    def get_cosmos_query_metrics() -> Dict[str, Any]:
+        return {}
+
 async def get_cache_metrics(req: func.HttpRequest) -> func.HttpResponse:
     """
     Get cache performance metrics.
@@ -48,6 +75,10 @@ async def get_cache_metrics(req: func.HttpRequest) -> func.HttpResponse:
         return func.HttpResponse(
             json.dumps({
                 "cache_metrics": cache_metrics,
+                "embedding_cache": get_embedding_cache_metrics(),
+                "response_cache": get_response_cache_metrics(),
+                "request_coalescing": get_single_flight_metrics(),
+                "cosmos_queries": get_cosmos_query_metrics(),
                 "timestamp": datetime.now().isoformat()
             }, default=str),
             mimetype="application/json",
@@ -467,6 +498,11 @@ async def invalidate_cache(req: func.HttpRequest) -> func.HttpResponse:
             cache_type=cache_type
         )
         
+        # Cached guidance answers live in the semantic response cache
+        response_cache = get_semantic_response_cache()
+        if response_cache is not None and key is None and cache_type in (None, CacheType.RESPONSE_CACHE):
+            response_cache.invalidate(personality_id)
+        
         if success:
             return func.HttpResponse(
                 json.dumps({
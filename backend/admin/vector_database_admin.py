@@ -66,6 +66,9 @@ class VectorDatabaseAdminAPI:
         elif route == 'health':
             return await self._check_database_health()
         
+        elif route == 'duplicates':
+            return await self._duplicate_report(req)
+        
         else:
             return HttpResponse(
                 json.dumps({"error": f"Unknown GET route: {route}"}),
@@ -88,6 +91,9 @@ class VectorDatabaseAdminAPI:
         elif route == 'reindex':
             return await self._reindex_database()
         
+        elif route == 'reconcile-stats':
+            return await self._reconcile_stats(req)
+        
         elif route == 'bulk-import':
             return await self._bulk_import_documents(req)
         
@@ -135,6 +141,7 @@ class VectorDatabaseAdminAPI:
                         "storage_size_mb": stats.storage_size_mb,
                         "total_embeddings_generated": stats.total_embeddings_generated,
                         "failed_embeddings": stats.failed_embeddings,
+                        "reconciled_at": stats.reconciled_at,
                         "embedding_coverage": (
                             stats.total_embeddings_generated / stats.total_documents * 100
                             if stats.total_documents > 0 else 0
@@ -152,6 +159,29 @@ class VectorDatabaseAdminAPI:
                 headers={"Content-Type": "application/json"}
             )
     
+    async def _reconcile_stats(self, req: HttpRequest) -> HttpResponse:
+        """Re-aggregate the materialized statistics (one personality or all)"""
+        try:
+            personality = req.params.get('personality')
+            reconciled = self.vector_db.reconcile_stats(personality.lower() if personality else None)
+            
+            return HttpResponse(
+                json.dumps({
+                    "success": True,
+                    "reconciled": {p: stats.documents for p, stats in reconciled.items()},
+                    "timestamp": datetime.utcnow().isoformat()
+                }),
+                headers={"Content-Type": "application/json"}
+            )
+            
+        except Exception as e:
+            logger.error(f"❌ Statistics reconciliation failed: {e}")
+            return HttpResponse(
+                json.dumps({"success": False, "error": str(e)}),
+                status_code=500,
+                headers={"Content-Type": "application/json"}
+            )
+    
     async def _search_vectors(self, req: HttpRequest) -> HttpResponse:
         """Perform semantic search with admin-level details"""
         try:
@@ -420,6 +450,35 @@ class VectorDatabaseAdminAPI:
                 headers={"Content-Type": "application/json"}
             )
     
+    async def _duplicate_report(self, req: HttpRequest) -> HttpResponse:
+        """Dry run of duplicate removal: list near-duplicates without deleting them"""
+        try:
+            threshold = float(req.params.get('threshold', 0.95))
+            embedding_threshold = req.params.get('embedding_threshold')
+            matches = await self.vector_db.find_duplicates(
+                threshold=threshold,
+                embedding_threshold=float(embedding_threshold) if embedding_threshold else None
+            )
+            
+            return HttpResponse(
+                json.dumps({
+                    "success": True,
+                    "dry_run": True,
+                    "duplicates_found": len(matches),
+                    "duplicates": [match.to_dict() for match in matches],
+                    "timestamp": datetime.utcnow().isoformat()
+                }),
+                headers={"Content-Type": "application/json"}
+            )
+            
+        except Exception as e:
+            logger.error(f"❌ Duplicate report failed: {e}")
+            return HttpResponse(
+                json.dumps({"success": False, "error": str(e)}),
+                status_code=500,
+                headers={"Content-Type": "application/json"}
+            )
+    
     async def _remove_duplicates(self) -> HttpResponse:
         """Remove duplicate documents from the database"""
         try:
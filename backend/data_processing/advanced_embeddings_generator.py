@@ -34,6 +34,10 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv('../../.env')
 
+# Shared bulk write path from the backend services package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.bulk_writer import BulkUpsertPipeline
+
 def safe_log(logger_func, message: str):
     """Safe logging function that handles Unicode encoding issues on Windows."""
     try:
@@ -355,20 +359,11 @@ async def _update_database_batch(container, entries: List[Dict[str, Any]]):
     """Update database entries with new embeddings in batch."""
     safe_log(logger.info, f"💾 Updating {len(entries)} entries in database...")
     
-    successful_updates = 0
-    failed_updates = 0
-    
-    for entry in entries:
-        try:
-            # Update the entry in Cosmos DB
-            container.upsert_item(entry)
-            successful_updates += 1
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to update entry {entry.get('id', 'unknown')}: {str(e)}")
-            failed_updates += 1
+    # Concurrent upserts batched by personality, retried when throttled
+    result = await BulkUpsertPipeline.from_env(container).upsert(entries)
     
-    safe_log(logger.info, f"💾 Database update complete: {successful_updates} successful, {failed_updates} failed")
+    safe_log(logger.info, f"💾 Database update complete: {result.succeeded} successful, {result.failed} failed "
+                          f"({result.throttled_retries} throttled retries)")
 
 def main():
     """Main execution function with interactive options."""
@@ -19,8 +19,10 @@ load_dotenv('../../.env')
 try:
     from azure.cosmos import CosmosClient
     
+    from services.vector_backup import export_container
+    
     def export_container_data(container_name, output_dir):
-        """Export all data from a container to JSON file"""
+        """Stream all data from a container to a gzip-compressed JSONL file"""
         print(f"📦 Exporting {container_name}...")
         
         # Get connection string
@@ -32,27 +34,18 @@ try:
         database = client.get_database_client(database_name)
         container = database.get_container_client(container_name)
         
-        # Query all documents
-        query = "SELECT * FROM c"
-        documents = []
-        
-        for doc in container.query_items(query=query, enable_cross_partition_query=True):
-            # Remove Cosmos DB system fields for cleaner export
-            clean_doc = {k: v for k, v in doc.items() if not k.startswith('_')}
-            documents.append(clean_doc)
-        
-        # Save to file
-        output_file = os.path.join(output_dir, f"{container_name}.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(documents, f, indent=2, ensure_ascii=False, default=str)
+        # Page through the container; Cosmos DB system fields are dropped for a cleaner export
+        output_file = os.path.join(output_dir, f"{container_name}.jsonl.gz")
+        result = export_container(container, output_file)
         
-        print(f"✅ Exported {len(documents)} documents from {container_name} to {output_file}")
-        return len(documents)
+        print(f"✅ Exported {result.documents} documents from {container_name} to {output_file}")
+        return result.documents
     
     def main():
         """Main backup function"""
+        # Pass an existing backup directory to resume an interrupted backup
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = f"/tmp/vimarsh-migration-backup/{timestamp}"
+        backup_dir = sys.argv[1] if len(sys.argv) > 1 else f"/tmp/vimarsh-migration-backup/{timestamp}"
         
         # Create backup directory
         os.makedirs(backup_dir, exist_ok=True)
@@ -76,6 +69,7 @@ try:
             "containers_backed_up": containers_to_backup,
             "total_documents": total_documents,
             "database_name": os.getenv('AZURE_COSMOS_DATABASE_NAME', 'vimarsh-multi-personality'),
+            "format": "jsonl.gz",
             "backup_purpose": "Pre-migration data preservation"
         }
         
@@ -7,8 +7,11 @@ Enhanced with better error handling, retry logic, and quality validation.
 
 import asyncio
 import aiohttp
+import io
 import logging
-from typing import Dict, List, Optional
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 import hashlib
@@ -16,6 +19,9 @@ import PyPDF2
 from bs4 import BeautifulSoup
 import json
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.staged_pipeline import CPU_STAGE, IO_STAGE, PipelineStage, StagedPipeline
+
 # Import existing components with fallback
 try:
     from metadata_manager import MetadataManager, EnhancedContentProcessor
@@ -61,6 +67,70 @@ class ContentSource:
                            if c.isalnum() or c in (' ', '-', '_')).rstrip()
         return f"{safe_name.replace(' ', '_')}.{self.format_type}"
 
+
+def extract_pdf_text(pdf_content: bytes) -> str:
+    """Text of every non-empty PDF page, with page markers"""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+    text = ""
+    for page_num, page in enumerate(reader.pages):
+        try:
+            page_text = page.extract_text()
+            if page_text.strip():  # Only add non-empty pages
+                text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to extract text from page {page_num + 1}: {str(e)}")
+            continue
+    return text
+
+
+def extract_html_text(html_content: str) -> str:
+    """Main text of an HTML page, without scripts and navigation"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # Remove unwanted elements
+    for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
+        script.decompose()
+    
+    # Try to find main content area
+    main_content = soup.find('main') or soup.find('article') or soup.find('div', {'class': 'content'})
+    if main_content:
+        text = main_content.get_text()
+    else:
+        text = soup.get_text()
+    
+    # Clean up text
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def extract_source_text(download: Tuple[ContentSource, Any]) -> Optional[str]:
+    """CPU stage of process_priority_sources: text from a downloaded PDF, HTML page or text file"""
+    source, payload = download
+    if payload is None:
+        return None
+    
+    if source.format_type == "pdf":
+        try:
+            text = extract_pdf_text(payload)
+        except Exception as e:
+            logger.error(f"❌ PDF processing failed for {source.personality}: {str(e)}")
+            return None
+        if not text.strip():
+            logger.error(f"❌ No text extracted from PDF: {source.work_title}")
+            return None
+    elif source.format_type == "html":
+        text = extract_html_text(payload)
+        if len(text) <= 1000:  # Minimum length check
+            logger.warning(f"⚠️ Extracted text too short for {source.work_title}: {len(text)} chars")
+            return None
+    else:
+        text = payload
+    
+    logger.info(f"✅ Successfully extracted {len(text)} characters from {source.work_title}")
+    return text
+
+
 class EnhancedContentSourcingPipeline:
     """Enhanced pipeline for downloading and processing content from research report sources."""
     
@@ -340,45 +410,38 @@ class EnhancedContentSourcingPipeline:
 
     async def _download_pdf(self, source: ContentSource) -> Optional[str]:
         """Download and extract text from PDF with enhanced error handling."""
+        pdf_content = await self._fetch(source)
+        text = extract_source_text((source, pdf_content))
+        if text:
+            self.processing_stats['downloaded'] += 1
+        return text
+
+    async def _download_html(self, source: ContentSource) -> Optional[str]:
+        """Download and extract text from HTML with enhanced processing."""
+        html_content = await self._fetch(source)
+        text = extract_source_text((source, html_content))
+        if text:
+            self.processing_stats['downloaded'] += 1
+        return text
+
+    async def _fetch(self, source: ContentSource) -> Optional[Any]:
+        """Raw download: PDF bytes (also saved under base_path), or the page/file text"""
         async with aiohttp.ClientSession(timeout=self.session_timeout) as session:
             try:
                 async with session.get(source.download_url) as response:
-                    if response.status == 200:
-                        pdf_content = await response.read()
-                        
-                        # Save PDF locally
-                        pdf_path = self.base_path / source.filename
-                        with open(pdf_path, 'wb') as f:
-                            f.write(pdf_content)
-                        
-                        # Extract text with better error handling
-                        try:
-                            with open(pdf_path, 'rb') as f:
-                                reader = PyPDF2.PdfReader(f)
-                                text = ""
-                                for page_num, page in enumerate(reader.pages):
-                                    try:
-                                        page_text = page.extract_text()
-                                        if page_text.strip():  # Only add non-empty pages
-                                            text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                                    except Exception as e:
-                                        logger.warning(f"⚠️ Failed to extract text from page {page_num + 1}: {str(e)}")
-                                        continue
-                            
-                            if text.strip():
-                                self.processing_stats['downloaded'] += 1
-                                logger.info(f"✅ Successfully extracted {len(text)} characters from {source.work_title}")
-                                return text
-                            else:
-                                logger.error(f"❌ No text extracted from PDF: {source.work_title}")
-                                return None
-                                
-                        except Exception as e:
-                            logger.error(f"❌ PDF processing failed for {source.personality}: {str(e)}")
-                            return None
-                    else:
+                    if response.status != 200:
                         logger.error(f"❌ HTTP {response.status} for {source.download_url}")
                         return None
+                    if source.format_type != "pdf":
+                        return await response.text()
+                    
+                    pdf_content = await response.read()
+                    
+                    # Save PDF locally
+                    pdf_path = self.base_path / source.filename
+                    with open(pdf_path, 'wb') as f:
+                        f.write(pdf_content)
+                    return pdf_content
             except asyncio.TimeoutError:
                 logger.error(f"❌ Timeout downloading {source.download_url}")
                 return None
@@ -386,47 +449,18 @@ class EnhancedContentSourcingPipeline:
                 logger.error(f"❌ Network error downloading {source.download_url}: {str(e)}")
                 return None
 
-    async def _download_html(self, source: ContentSource) -> Optional[str]:
-        """Download and extract text from HTML with enhanced processing."""
-        async with aiohttp.ClientSession(timeout=self.session_timeout) as session:
-            try:
-                async with session.get(source.download_url) as response:
-                    if response.status == 200:
-                        html_content = await response.text()
-                        
-                        # Parse HTML and extract text
-                        soup = BeautifulSoup(html_content, 'html.parser')
-                        
-                        # Remove unwanted elements
-                        for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
-                            script.decompose()
-                        
-                        # Try to find main content area
-                        main_content = soup.find('main') or soup.find('article') or soup.find('div', {'class': 'content'})
-                        if main_content:
-                            text = main_content.get_text()
-                        else:
-                            text = soup.get_text()
-                        
-                        # Clean up text
-                        lines = (line.strip() for line in text.splitlines())
-                        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                        text = ' '.join(chunk for chunk in chunks if chunk)
-                        
-                        # Basic quality check
-                        if len(text) > 1000:  # Minimum length check
-                            self.processing_stats['downloaded'] += 1
-                            logger.info(f"✅ Successfully extracted {len(text)} characters from {source.work_title}")
-                            return text
-                        else:
-                            logger.warning(f"⚠️ Extracted text too short for {source.work_title}: {len(text)} chars")
-                            return None
-                    else:
-                        logger.error(f"❌ HTTP {response.status} for {source.download_url}")
-                        return None
-            except Exception as e:
-                logger.error(f"❌ Error downloading HTML {source.download_url}: {str(e)}")
-                return None
+    async def fetch_with_retry(self, source: ContentSource) -> Optional[Any]:
+        """I/O stage of process_priority_sources: download a source (extraction happens separately)."""
+        for attempt in range(self.max_retries):
+            logger.info(f"🕉️ Downloading {source.personality}: {source.work_title} (attempt {attempt + 1})")
+            payload = await self._fetch(source)
+            if payload:
+                return payload
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.delay_between_requests * (attempt + 1))
+        
+        self.processing_stats['failed'] += 1
+        return None
 
     async def _download_text(self, source: ContentSource) -> Optional[str]:
         """Download plain text content."""
@@ -517,47 +551,50 @@ class EnhancedContentSourcingPipeline:
         
         logger.info(f"🚀 Processing {len(sources)} priority content sources")
         
-        # Process in batches to avoid overwhelming servers
+        # Downloads (at most batch_size in flight, to avoid overwhelming servers) feed
+        # PDF/HTML extraction in the process pool through a bounded queue
         batch_size = 3
         processed_content = {}
         
-        for i in range(0, len(sources), batch_size):
-            batch = sources[i:i + batch_size]
-            logger.info(f"📦 Processing batch {i//batch_size + 1}: {[s.personality for s in batch]}")
-            
-            # Add delay between batches
-            if i > 0:
-                await asyncio.sleep(self.delay_between_requests * 2)
+        async def download(source: ContentSource) -> Tuple[ContentSource, Any]:
+            return source, await self.fetch_with_retry(source)
+        
+        pipeline = StagedPipeline.from_env([
+            PipelineStage("download", download, IO_STAGE, concurrency=batch_size),
+            PipelineStage("extract", extract_source_text, CPU_STAGE)
+        ])
+        run = await pipeline.run(sources)
+        
+        for item in run.items:
+            source, result = item.item, item.value
+            if not item.ok:
+                logger.error(f"❌ Exception processing {source.personality}: {item.error}")
+                continue
             
-            tasks = [self.download_content_with_retry(source) for source in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            if result:
+                self.processing_stats['downloaded'] += 1
             
-            for source, result in zip(batch, results):
-                if isinstance(result, Exception):
-                    logger.error(f"❌ Exception processing {source.personality}: {str(result)}")
-                    continue
-                    
-                if result and len(result.strip()) > 500:  # Quality check
-                    processed_content[source.source_id] = {
-                        'personality': source.personality,
-                        'domain': source.domain,
-                        'work_title': source.work_title,
-                        'content': result,
-                        'source_metadata': {
-                            'edition_translation': source.edition_translation,
-                            'repository': source.repository,
-                            'authenticity_notes': source.authenticity_notes,
-                            'public_domain': source.public_domain,
-                            'priority': source.priority,
-                            'content_quality': source.content_quality,
-                            'estimated_chunks': source.estimated_chunks
-                        }
+            if result and len(result.strip()) > 500:  # Quality check
+                processed_content[source.source_id] = {
+                    'personality': source.personality,
+                    'domain': source.domain,
+                    'work_title': source.work_title,
+                    'content': result,
+                    'source_metadata': {
+                        'edition_translation': source.edition_translation,
+                        'repository': source.repository,
+                        'authenticity_notes': source.authenticity_notes,
+                        'public_domain': source.public_domain,
+                        'priority': source.priority,
+                        'content_quality': source.content_quality,
+                        'estimated_chunks': source.estimated_chunks
                     }
-                    self.processing_stats['processed'] += 1
-                    logger.info(f"✅ Successfully processed {source.personality}: {source.work_title}")
-                else:
-                    self.processing_stats['skipped'] += 1
-                    logger.warning(f"⚠️ Skipped {source.personality}: {source.work_title} - insufficient content")
+                }
+                self.processing_stats['processed'] += 1
+                logger.info(f"✅ Successfully processed {source.personality}: {source.work_title}")
+            else:
+                self.processing_stats['skipped'] += 1
+                logger.warning(f"⚠️ Skipped {source.personality}: {source.work_title} - insufficient content")
         
         logger.info(f"🎉 Content sourcing complete: {self.processing_stats}")
         return processed_content
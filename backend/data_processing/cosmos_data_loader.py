@@ -22,6 +22,7 @@ from text_ingestion import DataIngestionPipeline, ProcessedDocument
 from backend.rag.storage_factory import get_vector_storage, VectorStorageInterface
 from backend.rag.text_processor import AdvancedSpiritualTextProcessor, EnhancedTextChunk
 from backend.rag.cosmos_vector_search import SpiritualTextChunk
+from backend.services.bulk_writer import BulkUpsertPipeline
 
 # Optional dependency for vector embeddings (heavy package, only for production)
 try:
@@ -332,12 +333,19 @@ class CosmosDataLoader:
         logger.info(f"Processed {len(spiritual_chunks)} chunks from source {source_id}")
         return spiritual_chunks
     
-    async def load_chunks_to_cosmos(self, chunks: List[SpiritualTextChunk]) -> Tuple[int, int]:
+    async def load_chunks_to_cosmos(self, chunks: List[SpiritualTextChunk],
+                                    checkpoint_path: Optional[str] = None) -> Tuple[int, int]:
         """
         Load chunks into Cosmos DB vector storage.
         
+        Chunks are written through the shared bulk upsert pipeline: concurrent
+        writes batched by partition, retried after the service's retry-after
+        delay when throttled, with progress reported to self.progress.
+        
         Args:
             chunks: List of chunks to load
+            checkpoint_path: Optional file recording loaded chunk ids, so an
+                interrupted load can be rerun without reloading them
             
         Returns:
             Tuple of (successful_loads, failed_loads)
@@ -347,43 +355,16 @@ class CosmosDataLoader:
         
         logger.info(f"Loading {len(chunks)} chunks to Cosmos DB...")
         
-        successful_loads = 0
-        failed_loads = 0
-        
-        # Load in batches for better performance
-        batch_size = 10
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            batch_start = i + 1
-            batch_end = min(i + batch_size, len(chunks))
-            
-            logger.info(f"Loading batch {batch_start}-{batch_end} of {len(chunks)}")
-            
-            try:
-                # Convert to storage format and load
-                for chunk in batch:
-                    try:
-                        await self.storage.add_chunk(chunk)
-                        successful_loads += 1
-                        self.progress.loaded_chunks += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to load chunk {chunk.id}: {str(e)}")
-                        failed_loads += 1
-                        self.progress.failed_chunks += 1
-                        self.progress.errors.append(f"Chunk load failed: {chunk.id} - {str(e)}")
-                
-                # Small delay between batches to avoid overwhelming the service
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Batch load failed for chunks {batch_start}-{batch_end}: {str(e)}")
-                failed_loads += len(batch)
-                self.progress.failed_chunks += len(batch)
-                self.progress.errors.append(f"Batch load failed: {batch_start}-{batch_end} - {str(e)}")
+        pipeline = BulkUpsertPipeline.from_env(
+            upsert_fn=self.storage.add_chunk,
+            checkpoint_path=checkpoint_path,
+            progress=self.progress
+        )
+        result = await pipeline.upsert(chunks)
         
-        logger.info(f"Chunk loading complete: {successful_loads} successful, {failed_loads} failed")
-        return successful_loads, failed_loads
+        logger.info(f"Chunk loading complete: {result.succeeded} successful, {result.failed} failed, "
+                    f"{result.skipped} already loaded")
+        return result.succeeded, result.failed
     
     async def load_all_sources(self, validate_first: bool = True) -> Dict[str, Any]:
         """
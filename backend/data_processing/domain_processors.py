@@ -9,7 +9,9 @@ This module provides specialized text processing for different personality domai
 - Philosophical: Philosophical works, treatises, meditations
 """
 
+import os
 import re
+import sys
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
@@ -17,6 +19,12 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 import unicodedata
 
+try:
+    from utils.text_matcher import compile_patterns, compile_terms
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.text_matcher import compile_patterns, compile_terms
+
 logger = logging.getLogger(__name__)
 
 
@@ -162,15 +170,8 @@ class SpiritualProcessor(DomainProcessor):
     
     def extract_key_terms(self, text: str) -> List[str]:
         """Extract spiritual key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for tradition, terms in self.sacred_terms.items():
-            for term in terms:
-                if re.search(r'\b' + re.escape(term) + r'\b', text_lower):
-                    found_terms.append(term)
-        
-        return found_terms
+        found = set(compile_terms(self.sacred_terms, whole_words=True).found(text))
+        return [term for terms in self.sacred_terms.values() for term in terms if term in found]
     
     def calculate_quality_score(self, text: str) -> float:
         """Calculate quality score based on spiritual content indicators"""
@@ -234,25 +235,17 @@ class SpiritualProcessor(DomainProcessor):
     
     def _determine_chunk_type(self, text: str) -> str:
         """Determine the type of spiritual chunk"""
-        if any(re.search(pattern, text) for pattern in self.verse_patterns):
+        if compile_patterns(self.verse_patterns).contains(text):
             return "verse"
-        elif re.search(r'prayer|invocation|mantra', text.lower()):
-            return "prayer"
-        elif re.search(r'commentary|explanation|meaning', text.lower()):
-            return "commentary"
-        else:
-            return "teaching"
+        chunk_types = compile_patterns({
+            "prayer": r'prayer|invocation|mantra',
+            "commentary": r'commentary|explanation|meaning'
+        }).found(text.lower())
+        return chunk_types[0] if chunk_types else "teaching"
     
     def _detect_traditions(self, text: str) -> List[str]:
         """Detect spiritual traditions in text"""
-        text_lower = text.lower()
-        traditions = []
-        
-        for tradition, terms in self.sacred_terms.items():
-            if any(re.search(r'\b' + re.escape(term) + r'\b', text_lower) for term in terms):
-                traditions.append(tradition)
-        
-        return traditions
+        return compile_terms(self.sacred_terms, whole_words=True).found_labels(text)
     
     def _has_coherent_structure(self, text: str) -> bool:
         """Check if text has coherent structure"""
@@ -335,14 +328,7 @@ class ScientificProcessor(DomainProcessor):
     
     def extract_key_terms(self, text: str) -> List[str]:
         """Extract scientific key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.scientific_terms:
-            if re.search(r'\b' + re.escape(term) + r'\b', text_lower):
-                found_terms.append(term)
-        
-        return found_terms
+        return compile_terms(self.scientific_terms, whole_words=True).found(text)
     
     def calculate_quality_score(self, text: str) -> float:
         """Calculate quality score for scientific content"""
@@ -397,20 +383,14 @@ class ScientificProcessor(DomainProcessor):
     
     def _determine_chunk_type(self, text: str) -> str:
         """Determine the type of scientific chunk"""
-        text_lower = text.lower()
-        
-        if re.search(r'abstract', text_lower):
-            return "abstract"
-        elif re.search(r'method|procedure|experiment', text_lower):
-            return "methodology"
-        elif re.search(r'result|finding|data', text_lower):
-            return "results"
-        elif re.search(r'discussion|analysis|interpretation', text_lower):
-            return "discussion"
-        elif re.search(r'conclusion|summary', text_lower):
-            return "conclusion"
-        else:
-            return "content"
+        chunk_types = compile_patterns({
+            "abstract": r'abstract',
+            "methodology": r'method|procedure|experiment',
+            "results": r'result|finding|data',
+            "discussion": r'discussion|analysis|interpretation',
+            "conclusion": r'conclusion|summary'
+        }).found(text.lower())
+        return chunk_types[0] if chunk_types else "content"
     
     def _detect_fields(self, text: str) -> List[str]:
         """Detect scientific fields"""
@@ -421,14 +401,7 @@ class ScientificProcessor(DomainProcessor):
             'psychology': ['behavior', 'cognitive', 'mental', 'brain', 'mind']
         }
         
-        text_lower = text.lower()
-        detected_fields = []
-        
-        for field, terms in fields.items():
-            if any(re.search(r'\b' + re.escape(term) + r'\b', text_lower) for term in terms):
-                detected_fields.append(field)
-        
-        return detected_fields
+        return compile_terms(fields, whole_words=True).found_labels(text)
     
     def _has_technical_language(self, text: str) -> bool:
         """Check for technical language indicators"""
@@ -439,7 +412,7 @@ class ScientificProcessor(DomainProcessor):
             r'\b\w+\s*=\s*\d+',  # Equations
         ]
         
-        return any(re.search(pattern, text) for pattern in technical_indicators)
+        return compile_patterns(technical_indicators).contains(text)
     
     def _calculate_overall_quality(self, chunks: List[ProcessedChunk]) -> Dict[str, float]:
         """Calculate overall quality metrics"""
@@ -653,12 +626,7 @@ class SpiritualTextProcessor(BaseDomainProcessor):
     
     def identify_key_terms(self, text: str) -> List[str]:
         """Identify spiritual key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.sacred_terms:
-            if term.lower() in text_lower:
-                found_terms.append(term)
+        found_terms = compile_terms(self.sacred_terms).found(text)
         
         # Sanskrit terms (basic detection)
         sanskrit_pattern = r'\b[a-zA-Z]*(?:dharma|karma|yoga|moksha|atman|brahman)[a-zA-Z]*\b'
@@ -673,7 +641,8 @@ class SpiritualTextProcessor(BaseDomainProcessor):
         if not words:
             return 0.0
         
-        sacred_count = sum(1 for word in words if word.lower() in [term.lower() for term in self.sacred_terms])
+        vocabulary = {term.lower() for term in self.sacred_terms}
+        sacred_count = sum(1 for word in words if word.lower() in vocabulary)
         return (sacred_count / len(words)) * 100
 
 
@@ -784,12 +753,7 @@ class ScientificTextProcessor(BaseDomainProcessor):
     
     def identify_key_terms(self, text: str) -> List[str]:
         """Identify scientific key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.scientific_terms:
-            if term.lower() in text_lower:
-                found_terms.append(term)
+        found_terms = compile_terms(self.scientific_terms).found(text)
         
         return found_terms
     
@@ -799,7 +763,8 @@ class ScientificTextProcessor(BaseDomainProcessor):
         if not words:
             return 0.0
         
-        scientific_count = sum(1 for word in words if word.lower() in [term.lower() for term in self.scientific_terms])
+        vocabulary = {term.lower() for term in self.scientific_terms}
+        scientific_count = sum(1 for word in words if word.lower() in vocabulary)
         return (scientific_count / len(words)) * 100
     
     def _calculate_overall_quality(self, chunks: List[ProcessedChunk]) -> Dict[str, float]:
@@ -876,14 +841,7 @@ class HistoricalProcessor(DomainProcessor):
     
     def extract_key_terms(self, text: str) -> List[str]:
         """Extract historical key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.historical_terms:
-            if re.search(r'\b' + re.escape(term) + r'\b', text_lower):
-                found_terms.append(term)
-        
-        return found_terms
+        return compile_terms(self.historical_terms, whole_words=True).found(text)
     
     def calculate_quality_score(self, text: str) -> float:
         """Calculate quality score for historical content"""
@@ -934,11 +892,8 @@ class HistoricalProcessor(DomainProcessor):
     
     def _extract_dates(self, text: str) -> List[str]:
         """Extract dates from text"""
-        dates = []
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            dates.extend(matches)
-        return dates
+        hits = compile_patterns(self.date_patterns, re.IGNORECASE).by_key(text)
+        return [match.text for matches in hits.values() for match in matches]
     
     def _extract_time_periods(self, text: str) -> List[str]:
         """Extract historical time periods"""
@@ -957,18 +912,14 @@ class HistoricalProcessor(DomainProcessor):
     
     def _determine_chunk_type(self, text: str) -> str:
         """Determine the type of historical chunk"""
-        text_lower = text.lower()
-        
         if any(date_pattern in text for date_pattern in self.date_patterns):
             return "chronological"
-        elif re.search(r'speech|address|declaration|proclamation', text_lower):
-            return "speech"
-        elif re.search(r'letter|correspondence|diary', text_lower):
-            return "document"
-        elif re.search(r'battle|war|conflict', text_lower):
-            return "military"
-        else:
-            return "narrative"
+        chunk_types = compile_patterns({
+            "speech": r'speech|address|declaration|proclamation',
+            "document": r'letter|correspondence|diary',
+            "military": r'battle|war|conflict'
+        }).found(text.lower())
+        return chunk_types[0] if chunk_types else "narrative"
     
     def _calculate_overall_quality(self, chunks: List[ProcessedChunk]) -> Dict[str, float]:
         """Calculate overall quality metrics"""
@@ -1047,14 +998,7 @@ class PhilosophicalProcessor(DomainProcessor):
     
     def extract_key_terms(self, text: str) -> List[str]:
         """Extract philosophical key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.philosophical_terms:
-            if re.search(r'\b' + re.escape(term) + r'\b', text_lower):
-                found_terms.append(term)
-        
-        return found_terms
+        return compile_terms(self.philosophical_terms, whole_words=True).found(text)
     
     def calculate_quality_score(self, text: str) -> float:
         """Calculate quality score for philosophical content"""
@@ -1122,14 +1066,7 @@ class PhilosophicalProcessor(DomainProcessor):
     
     def _extract_philosophers(self, text: str) -> List[str]:
         """Extract philosopher names from text"""
-        text_lower = text.lower()
-        found_philosophers = []
-        
-        for philosopher in self.philosophers:
-            if re.search(r'\b' + re.escape(philosopher) + r'\b', text_lower):
-                found_philosophers.append(philosopher)
-        
-        return found_philosophers
+        return compile_terms(self.philosophers, whole_words=True).found(text)
     
     def _has_logical_structure(self, text: str) -> bool:
         """Check if text has logical argument structure"""
@@ -1142,19 +1079,20 @@ class PhilosophicalProcessor(DomainProcessor):
             r'(?:implies|entails|leads to)'
         ]
         
-        return any(re.search(indicator, text, re.IGNORECASE) for indicator in logical_indicators)
+        return compile_patterns(logical_indicators, re.IGNORECASE).contains(text)
     
     def _determine_chunk_type(self, text: str) -> str:
         """Determine the type of philosophical chunk"""
-        text_lower = text.lower()
-        
         if self._has_logical_structure(text):
             return "argument"
-        elif re.search(r'definition|concept|meaning', text_lower):
-            return "definition"
-        elif re.search(r'example|instance|case', text_lower):
-            return "example"
-        elif any(philosopher in text_lower for philosopher in self.philosophers):
+        text_lower = text.lower()
+        chunk_types = compile_patterns({
+            "definition": r'definition|concept|meaning',
+            "example": r'example|instance|case'
+        }).found(text_lower)
+        if chunk_types:
+            return chunk_types[0]
+        elif compile_terms(self.philosophers, ignore_case=False).contains(text_lower):
             return "commentary"
         else:
             return "exposition"
@@ -1204,15 +1142,13 @@ class MultiDomainProcessor:
         """
         text_lower = text.lower()
         domain_scores = {}
+        found = set(compile_terms(self.domain_keywords, ignore_case=False, whole_words=True).found(text_lower))
+        word_count = len(text_lower.split())
         
         for domain, keywords in self.domain_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
-                    score += 1
+            score = sum(1 for keyword in keywords if keyword in found)
             
             # Normalize by text length
-            word_count = len(text_lower.split())
             domain_scores[domain] = score / max(word_count, 1) * 100
         
         # Return domain with highest score, default to spiritual
@@ -1367,12 +1303,7 @@ class HistoricalTextProcessor(BaseDomainProcessor):
     
     def identify_key_terms(self, text: str) -> List[str]:
         """Identify historical key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.historical_terms:
-            if term.lower() in text_lower:
-                found_terms.append(term)
+        found_terms = compile_terms(self.historical_terms).found(text)
         
         # Proper nouns (likely historical figures/places)
         proper_nouns = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
@@ -1386,7 +1317,8 @@ class HistoricalTextProcessor(BaseDomainProcessor):
         if not words:
             return 0.0
         
-        historical_count = sum(1 for word in words if word.lower() in [term.lower() for term in self.historical_terms])
+        vocabulary = {term.lower() for term in self.historical_terms}
+        historical_count = sum(1 for word in words if word.lower() in vocabulary)
         return (historical_count / len(words)) * 100
 
 
@@ -1467,12 +1399,7 @@ class PhilosophicalTextProcessor(BaseDomainProcessor):
     
     def identify_key_terms(self, text: str) -> List[str]:
         """Identify philosophical key terms"""
-        text_lower = text.lower()
-        found_terms = []
-        
-        for term in self.philosophical_terms:
-            if term.lower() in text_lower:
-                found_terms.append(term)
+        found_terms = compile_terms(self.philosophical_terms).found(text)
         
         # Philosophical schools/thinkers
         philosophers = re.findall(r'\b(Plato|Aristotle|Kant|Hegel|Nietzsche|Descartes|Hume|Locke|Spinoza)\b', text)
@@ -1486,7 +1413,8 @@ class PhilosophicalTextProcessor(BaseDomainProcessor):
         if not words:
             return 0.0
         
-        philosophical_count = sum(1 for word in words if word.lower() in [term.lower() for term in self.philosophical_terms])
+        vocabulary = {term.lower() for term in self.philosophical_terms}
+        philosophical_count = sum(1 for word in words if word.lower() in vocabulary)
         return (philosophical_count / len(words)) * 100
 
 
@@ -9,6 +9,8 @@ import logging
 from typing import List, Dict, Any, Optional, Union
 import numpy as np
 
+from services.vector_scoring import EmbeddingMatrix
+
 # Optional dependency for vector embeddings (heavy package, only for production)
 try:
     from sentence_transformers import SentenceTransformer
@@ -146,18 +148,11 @@ class EmbeddingGenerator:
         Returns:
             List of similarity results with indices and scores
         """
-        similarities = []
-        
-        for i, candidate in enumerate(candidate_embeddings):
-            similarity = self.compute_similarity(query_embedding, candidate)
-            similarities.append({
-                'index': i,
-                'similarity': similarity
-            })
-        
-        # Sort by similarity and return top k
-        similarities.sort(key=lambda x: x['similarity'], reverse=True)
-        return similarities[:top_k]
+        matrix = EmbeddingMatrix(candidate_embeddings)
+        return [
+            {'index': index, 'similarity': similarity}
+            for index, similarity in matrix.top_k(query_embedding, k=top_k)
+        ]
     
     def get_model_info(self) -> Dict[str, Any]:
         """
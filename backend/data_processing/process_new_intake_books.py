@@ -16,11 +16,15 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Tuple
+from functools import partial
 import hashlib
 
 # Add the backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
 
+from utils.near_duplicates import NearDuplicateIndex
+from utils.staged_pipeline import CPU_STAGE, PipelineStage, StagedPipeline
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -79,9 +83,12 @@ class NewIntakeBooksProcessor:
         }
         
         self.processed_entries = []
+        # Near-duplicate chunks (overlapping editions, repeated sections) are rejected per personality
+        self.duplicate_indexes: Dict[str, NearDuplicateIndex] = {}
         self.processing_stats = {
             "files_processed": 0,
             "total_chunks": 0,
+            "duplicates_rejected": 0,
             "total_vectors": 0,
             "personalities_enhanced": set(),
             "new_personalities": set(),
@@ -101,12 +108,19 @@ class NewIntakeBooksProcessor:
         
         print(f"📁 Found {len(available_files)} files in intake directory")
         
-        for file_path in available_files:
-            try:
-                await self.process_single_file(file_path)
+        # Extraction and chunking run in the process pool; entries are then added
+        # in file order so near-duplicate rejection does not depend on timing
+        pipeline = StagedPipeline.from_env([
+            PipelineStage("extract", partial(_extract_book_sections_in_worker, str(self.intake_dir)), CPU_STAGE)
+        ])
+        run = await pipeline.run(available_files)
+        
+        for item in run.items:
+            if item.ok:
+                self.add_book_sections(item.item.name, item.value)
                 self.processing_stats["files_processed"] += 1
-            except Exception as e:
-                error_msg = f"Error processing {file_path.name}: {str(e)}"
+            else:
+                error_msg = f"Error processing {item.item.name}: {item.error}"
                 logger.error(error_msg)
                 self.processing_stats["processing_errors"].append(error_msg)
         
@@ -123,18 +137,24 @@ class NewIntakeBooksProcessor:
     
     async def process_single_file(self, file_path: Path):
         """Process a single file (PDF or TXT) into chunks"""
+        self.add_book_sections(file_path.name, self.extract_book_sections(file_path))
+    
+    def extract_book_sections(self, file_path: Path) -> List[Tuple[str, str, List[str], bool]]:
+        """
+        Extract and chunk one file (the CPU-bound part of processing)
         
+        Returns:
+            (personality, work_title, chunks, is_multi_personality) per section
+        """
         filename = file_path.name
         personality = self.file_personality_mapping.get(filename, "Unknown")
         work_title = self.file_work_mapping.get(filename, filename)
         
-        print(f"\n📖 Processing: {work_title} ({personality})")
-        
         # Extract content based on file type
         if file_path.suffix.lower() == '.pdf':
-            content = await self.extract_pdf_text(file_path)
+            content = self._read_pdf_text(file_path)
         elif file_path.suffix.lower() == '.txt':
-            content = await self.extract_txt_content(file_path)
+            content = self._read_txt_content(file_path)
         else:
             raise Exception(f"Unsupported file type: {file_path.suffix}")
         
@@ -143,30 +163,53 @@ class NewIntakeBooksProcessor:
         
         # Handle multi-personality content specially
         if personality == "Multi-Personality":
-            await self.process_multi_personality_content(content, work_title, filename)
-        else:
-            # Regular single-personality processing
-            chunks = self.chunk_content(content, work_title)
-            print(f"   📄 Generated {len(chunks)} chunks")
+            return [
+                (section_personality, section_title, self.chunk_content(section_content, section_title), True)
+                for section_personality, section_title, section_content
+                in self._split_multi_personality_content(content, work_title)
+            ]
+        return [(personality, work_title, self.chunk_content(content, work_title), False)]
+    
+    def add_book_sections(self, filename: str, sections: List[Tuple[str, str, List[str], bool]]):
+        """Create entries for a file's chunked sections and update the stats"""
+        personality = self.file_personality_mapping.get(filename, "Unknown")
+        work_title = self.file_work_mapping.get(filename, filename)
+        
+        print(f"\n📖 Processing: {work_title} ({personality})")
+        
+        if personality == "Multi-Personality":
+            print(f"   🎭 Processing multi-personality content...")
+        
+        for section_personality, section_title, chunks, is_multi_personality in sections:
+            if not is_multi_personality:
+                print(f"   📄 Generated {len(chunks)} chunks")
             
             # Create entries for each chunk
             for i, chunk in enumerate(chunks):
-                entry = self.create_entry(chunk, personality, work_title, filename, i)
-                self.processed_entries.append(entry)
+                entry = self.create_entry(
+                    chunk, section_personality, section_title, filename, i,
+                    is_multi_personality=is_multi_personality
+                )
+                self.add_entry(entry)
             
             self.processing_stats["total_chunks"] += len(chunks)
             
             # Track personality enhancement vs new addition
-            if personality in ["Einstein", "Buddha", "Confucius", "Lao Tzu"]:
-                self.processing_stats["personalities_enhanced"].add(personality)
+            if is_multi_personality or section_personality in ["Einstein", "Buddha", "Confucius", "Lao Tzu"]:
+                self.processing_stats["personalities_enhanced"].add(section_personality)
             else:
-                self.processing_stats["new_personalities"].add(personality)
+                self.processing_stats["new_personalities"].add(section_personality)
             
-            print(f"   ✅ Processed {len(chunks)} chunks for {personality}")
+            if is_multi_personality:
+                print(f"   📚 {section_personality}: {len(chunks)} chunks")
+            else:
+                print(f"   ✅ Processed {len(chunks)} chunks for {section_personality}")
     
     async def extract_pdf_text(self, file_path: Path) -> str:
         """Extract text from PDF file"""
-        
+        return self._read_pdf_text(file_path)
+    
+    def _read_pdf_text(self, file_path: Path) -> str:
         try:
             # Try using PyPDF2 first
             import PyPDF2
@@ -211,7 +254,9 @@ Note: In production, implement proper PDF extraction with libraries like pdfplum
     
     async def extract_txt_content(self, file_path: Path) -> str:
         """Extract content from text file"""
-        
+        return self._read_txt_content(file_path)
+    
+    def _read_txt_content(self, file_path: Path) -> str:
         try:
             # Try different encodings
             for encoding in ['utf-8', 'utf-16', 'latin-1', 'cp1252']:
@@ -245,8 +290,14 @@ Processing Date: {datetime.now().isoformat()}
     
     async def process_multi_personality_content(self, content: str, work_title: str, filename: str):
         """Handle multi-personality content by splitting into personality-specific sections"""
-        
-        print(f"   🎭 Processing multi-personality content...")
+        self.add_book_sections(filename, [
+            (personality, section_title, self.chunk_content(section_content, section_title), True)
+            for personality, section_title, section_content
+            in self._split_multi_personality_content(content, work_title)
+        ])
+    
+    def _split_multi_personality_content(self, content: str, work_title: str) -> List[Tuple[str, str, str]]:
+        """(personality, section title, section content) for each non-empty section"""
         
         # Simple strategy: split content into sections and assign to different personalities
         # In production, use more sophisticated content analysis
@@ -255,6 +306,7 @@ Processing Date: {datetime.now().isoformat()}
         section_size = len(content_sections) // 4  # Divide into 4 parts
         
         personalities = ["Confucius", "Buddha", "Jesus Christ", "Muhammad"]
+        sections = []
         
         for i, personality in enumerate(personalities):
             start_idx = i * section_size
@@ -263,19 +315,9 @@ Processing Date: {datetime.now().isoformat()}
             section_content = '\n\n'.join(content_sections[start_idx:end_idx])
             
             if section_content.strip():
-                chunks = self.chunk_content(section_content, f"{work_title} - {personality} Section")
-                
-                for j, chunk in enumerate(chunks):
-                    entry = self.create_entry(
-                        chunk, personality, f"{work_title} - {personality} Section", 
-                        filename, j, is_multi_personality=True
-                    )
-                    self.processed_entries.append(entry)
-                
-                self.processing_stats["total_chunks"] += len(chunks)
-                self.processing_stats["personalities_enhanced"].add(personality)
-                
-                print(f"   📚 {personality}: {len(chunks)} chunks")
+                sections.append((personality, f"{work_title} - {personality} Section", section_content))
+        
+        return sections
     
     def chunk_content(self, content: str, work_title: str) -> List[str]:
         """Chunk content into manageable pieces"""
@@ -321,6 +363,20 @@ Processing Date: {datetime.now().isoformat()}
         
         return chunks
     
+    def add_entry(self, entry: Dict) -> bool:
+        """Keep an entry unless it near-duplicates one already processed for its personality"""
+        if entry["personality"] not in self.duplicate_indexes:
+            self.duplicate_indexes[entry["personality"]] = NearDuplicateIndex()
+        index = self.duplicate_indexes[entry["personality"]]
+        match = index.check_and_add(entry["id"], entry["content"])
+        if match is not None:
+            logger.info(f"Rejected duplicate chunk {entry['id']} (matches {match.original_id}, "
+                        f"similarity {match.similarity:.3f})")
+            self.processing_stats["duplicates_rejected"] += 1
+            return False
+        self.processed_entries.append(entry)
+        return True
+    
     def create_entry(self, chunk: str, personality: str, work_title: str, filename: str, 
                     chunk_index: int, is_multi_personality: bool = False) -> Dict:
         """Create a database entry for a chunk"""
@@ -497,6 +553,7 @@ Processing Date: {datetime.now().isoformat()}
         print(f"📊 PROCESSING COMPLETE!")
         print(f"Files processed: {self.processing_stats['files_processed']}")
         print(f"Total chunks generated: {self.processing_stats['total_chunks']}")
+        print(f"Duplicate chunks rejected: {self.processing_stats['duplicates_rejected']}")
         print(f"Total embeddings created: {self.processing_stats['total_vectors']}")
         print(f"Personalities enhanced: {', '.join(self.processing_stats['personalities_enhanced'])}")
         
@@ -512,6 +569,16 @@ Processing Date: {datetime.now().isoformat()}
         
         return processed_data
 
+# One processor per pool process, reused for every file that process extracts
+_worker_processors: Dict[str, NewIntakeBooksProcessor] = {}
+
+
+def _extract_book_sections_in_worker(intake_dir: str, file_path: Path) -> List[Tuple[str, str, List[str], bool]]:
+    """CPU stage of process_all_new_books"""
+    if intake_dir not in _worker_processors:
+        _worker_processors[intake_dir] = NewIntakeBooksProcessor(Path(intake_dir))
+    return _worker_processors[intake_dir].extract_book_sections(file_path)
+
 async def analyze_complete_rag_dataset():
     """Analyze and report on the complete enhanced RAG dataset state"""
     
@@ -7,8 +7,10 @@ maintaining proper verse boundaries, citations, and semantic coherence.
 
 import os
 import re
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import hashlib
 from dataclasses import dataclass
@@ -18,6 +20,7 @@ import json
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from rag.text_processor import AdvancedSpiritualTextProcessor, TextType, EnhancedTextChunk
+from utils.staged_pipeline import CPU_STAGE, IO_STAGE, PipelineStage, StagedPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -205,20 +208,28 @@ class DataIngestionPipeline:
         processed_files = []
         failed_files = []
         
-        # Process each file
-        for file_path in text_files:
-            processed_doc = self.process_file(file_path)
-            
-            if processed_doc:
-                output_path = self.save_processed_document(processed_doc)
+        # Read/clean/chunk in the process pool while finished documents are written out
+        async def save(doc: ProcessedDocument) -> Tuple[ProcessedDocument, str]:
+            return doc, await asyncio.to_thread(self.save_processed_document, doc)
+        
+        pipeline = StagedPipeline.from_env([
+            PipelineStage("process", partial(_process_file_in_worker, str(self.source_dir), str(self.output_dir)),
+                          CPU_STAGE),
+            PipelineStage("save", save, IO_STAGE)
+        ])
+        run = pipeline.run_sync(text_files)
+        
+        for item in run.items:
+            if item.ok:
+                processed_doc, output_path = item.value
                 processed_files.append({
-                    "source": str(file_path),
+                    "source": str(item.item),
                     "output": output_path,
                     "chunks": processed_doc.total_chunks,
                     "text_type": processed_doc.text_type.value
                 })
             else:
-                failed_files.append(str(file_path))
+                failed_files.append(str(item.item))
         
         # Create summary
         summary = {
@@ -239,6 +250,21 @@ class DataIngestionPipeline:
         return summary
 
 
+# One pipeline per pool process, reused for every file that process handles
+_worker_pipelines: Dict[Tuple[str, str], DataIngestionPipeline] = {}
+
+
+def _process_file_in_worker(source_dir: str, output_dir: str, file_path: Path) -> ProcessedDocument:
+    """CPU stage of process_all_sources: read, clean and chunk one file"""
+    key = (source_dir, output_dir)
+    if key not in _worker_pipelines:
+        _worker_pipelines[key] = DataIngestionPipeline(source_dir, output_dir)
+    processed_doc = _worker_pipelines[key].process_file(file_path)
+    if processed_doc is None:
+        raise ValueError(f"Failed to process file {file_path}")
+    return processed_doc
+
+
 def main():
     """Main function for running the data ingestion pipeline."""
     # Configure logging
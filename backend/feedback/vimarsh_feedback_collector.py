@@ -24,6 +24,13 @@ except ImportError:
     ANALYTICS_AVAILABLE = False
     logging.warning("Analytics libraries not available - using basic feedback processing")
 
+# Optional SQLite storage (LOCAL_STORAGE_BACKEND=sqlite)
+try:
+    from services.sqlite_store import get_local_sqlite_store
+except ImportError:
+    def get_local_sqlite_store():
+        return None
+
 class FeedbackType(Enum):
     """Types of feedback that can be collected"""
     RATING = "rating"
@@ -107,6 +114,9 @@ class VimarshFeedbackCollector:
         
         # Initialize feedback storage
         os.makedirs(feedback_storage_path, exist_ok=True)
+        self.sqlite_store = get_local_sqlite_store()
+        if self.sqlite_store is not None:
+            self.sqlite_store.collection("feedback").create_index("by_time", (), "timestamp")
         
         # Feedback processing queue
         self.feedback_queue = []
@@ -327,6 +337,13 @@ class VimarshFeedbackCollector:
     async def _store_feedback(self, feedback: UserFeedback):
         """Store feedback to persistent storage"""
         
+        if self.sqlite_store is not None:
+            try:
+                self.sqlite_store.collection("feedback").append(self._feedback_to_record(feedback))
+            except Exception as e:
+                self.logger.error(f"Error saving feedback: {e}")
+            return
+        
         # Daily feedback file
         date_str = feedback.timestamp.strftime("%Y%m%d")
         feedback_file = os.path.join(self.feedback_storage_path, f"feedback_{date_str}.json")
@@ -350,6 +367,33 @@ class VimarshFeedbackCollector:
         except Exception as e:
             self.logger.error(f"Error saving feedback: {e}")
 
+    @staticmethod
+    def _feedback_to_record(feedback: UserFeedback) -> Dict[str, Any]:
+        """Serialize feedback with enum values and an ISO timestamp"""
+        record = asdict(feedback)
+        record['id'] = feedback.feedback_id
+        record['feedback_type'] = feedback.feedback_type.value
+        record['sentiment'] = feedback.sentiment.value if feedback.sentiment else None
+        record['priority'] = feedback.priority.value
+        record['timestamp'] = feedback.timestamp.isoformat()
+        return record
+
+    @staticmethod
+    def _feedback_from_record(fb_data: Dict[str, Any]) -> UserFeedback:
+        """Convert a stored feedback record back to a UserFeedback object"""
+        fb_data = {k: v for k, v in fb_data.items() if k != 'id'}
+        fb_data['feedback_type'] = FeedbackType(fb_data['feedback_type'])
+        if fb_data.get('sentiment'):
+            fb_data['sentiment'] = FeedbackSentiment(fb_data['sentiment'])
+        fb_data['priority'] = FeedbackPriority(fb_data['priority'])
+        fb_data['timestamp'] = datetime.fromisoformat(fb_data['timestamp'])
+        return UserFeedback(**fb_data)
+
+    def _load_feedback_since(self, start: datetime) -> List[UserFeedback]:
+        """Feedback stored in SQLite at or after ``start``, oldest first"""
+        rows = self.sqlite_store.collection("feedback").find("by_time", (), since=start.isoformat())
+        return [self._feedback_from_record(row) for row in rows]
+
     async def analyze_feedback_trends(self, days: int = 30) -> FeedbackAnalytics:
         """Analyze feedback trends over specified period"""
         
@@ -413,6 +457,15 @@ class VimarshFeedbackCollector:
     async def _load_feedback_range(self, start_date: datetime, end_date: datetime) -> List[UserFeedback]:
         """Load feedback from date range"""
         
+        if self.sqlite_store is not None:
+            try:
+                last_day = end_date.strftime("%Y-%m-%d")
+                return [fb for fb in self._load_feedback_since(start_date.replace(hour=0, minute=0, second=0, microsecond=0))
+                        if fb.timestamp.strftime("%Y-%m-%d") <= last_day]
+            except Exception as e:
+                self.logger.error(f"Error loading feedback: {e}")
+                return []
+        
         all_feedback = []
         current_date = start_date
         
@@ -427,14 +480,7 @@ class VimarshFeedbackCollector:
                     
                     for fb_data in daily_feedback:
                         # Convert back to UserFeedback object
-                        fb_data['feedback_type'] = FeedbackType(fb_data['feedback_type'])
-                        if fb_data.get('sentiment'):
-                            fb_data['sentiment'] = FeedbackSentiment(fb_data['sentiment'])
-                        fb_data['priority'] = FeedbackPriority(fb_data['priority'])
-                        fb_data['timestamp'] = datetime.fromisoformat(fb_data['timestamp'])
-                        
-                        feedback = UserFeedback(**fb_data)
-                        all_feedback.append(feedback)
+                        all_feedback.append(self._feedback_from_record(fb_data))
                         
                 except Exception as e:
                     self.logger.error(f"Error loading feedback from {feedback_file}: {e}")
@@ -733,6 +779,13 @@ class VimarshFeedbackCollector:
         }
         
         # Store expert review flag
+        if self.sqlite_store is not None:
+            try:
+                self.sqlite_store.collection("expert_review_queue").append(expert_review_data)
+            except Exception as e:
+                self.logger.error(f"Error saving expert review queue: {e}")
+            return
+        
         expert_file = os.path.join(self.feedback_storage_path, "expert_review_queue.json")
         
         expert_queue = []
@@ -909,6 +962,10 @@ class VimarshFeedbackCollector:
                 if feedback.timestamp >= cutoff_date:
                     feedback_data.append(feedback)
             
+            if self.sqlite_store is not None:
+                feedback_data.extend(self._load_feedback_since(cutoff_date))
+                return feedback_data
+            
             # Load from stored files
             for i in range(days):
                 date = datetime.now() - timedelta(days=i)
@@ -43,6 +43,17 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ Safety service not available: {e}")
 
+try:
+    # HTTP streams for Python Functions (azurefunctions-extensions-http-fastapi)
+    from azurefunctions.extensions.http.fastapi import Request as StreamingRequest, StreamingResponse
+    http_streaming_available = True
+except ImportError:
+    http_streaming_available = False
+    logger.warning(
+        "⚠️ HTTP streams extension not available: /guidance/stream will buffer "
+        "all events into one response (install azurefunctions-extensions-http-fastapi)"
+    )
+
 try:
     from services.admin_service import AdminService
     admin_service = AdminService()
@@ -100,6 +111,11 @@ FALLBACK_PERSONALITIES = {
     "tesla": {"name": "Nikola Tesla", "domain": "scientific", "description": "Serbian-American inventor and electrical engineer, pioneer of modern technology"}
 }
 
+# Hardcoded guidance used when the personality service is unavailable
+FALLBACK_GUIDANCE_RESPONSES = {
+    "krishna": "Beloved devotee, in the Bhagavad Gita 2.47, I teach: \"You have the right to perform your prescribed duty, but not to the fruits of action.\" This timeless wisdom guides us to act with devotion while surrendering attachment to outcomes. Focus on righteous action with love and dedication. May you find peace in dharmic living. 🙏"
+}
+
 def get_cors_headers() -> Dict[str, str]:
     """Get standard CORS headers for all responses"""
     return {
@@ -110,6 +126,19 @@ def get_cors_headers() -> Dict[str, str]:
         "Access-Control-Allow-Headers": "Content-Type, Authorization"
     }
 
+def get_sse_headers() -> Dict[str, str]:
+    """CORS headers for Server-Sent Events responses"""
+    return {
+        **get_cors_headers(),
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    }
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.route(route="health", methods=["GET"])
 def health_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Enhanced health check endpoint with service status"""
@@ -562,8 +591,44 @@ async def admin_users_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             headers=get_cors_headers()
         )
 
+def parse_guidance_request(query_data: Dict[str, Any]):
+    """Extract (query, personality_id, language) from a guidance request body"""
+    user_query = query_data.get('query', '').strip()
+    personality_id = query_data.get('personality_id', 'krishna')
+    language = query_data.get('language', 'English')
+    
+    # Validate personality
+    valid_personalities = (
+        list(FALLBACK_PERSONALITIES.keys()) if not personality_service_available
+        else optimized_personality_service.get_available_personalities()
+    )
+    
+    if personality_id not in valid_personalities:
+        logger.warning(f"Invalid personality: {personality_id}, defaulting to Krishna")
+        personality_id = "krishna"
+    
+    return user_query, personality_id, language
+
+def get_personality_info(personality_id: str) -> Dict[str, Any]:
+    """Personality summary included in guidance responses"""
+    if personality_models_available:
+        config = get_personality_config(personality_id)
+        return {
+            "id": config.id,
+            "name": config.name,
+            "domain": config.domain.value,
+            "description": config.description
+        }
+    fallback_info = FALLBACK_PERSONALITIES[personality_id]
+    return {
+        "id": personality_id,
+        "name": fallback_info["name"],
+        "domain": fallback_info["domain"],
+        "description": fallback_info["description"]
+    }
+
 @app.route(route="guidance", methods=["POST"])
-def guidance_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+async def guidance_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Enhanced guidance endpoint with modular service integration"""
     try:
         # Parse request body
@@ -583,10 +648,8 @@ def guidance_endpoint(req: func.HttpRequest) -> func.HttpResponse:
                 headers=get_cors_headers()
             )
         
-        # Extract parameters
-        user_query = query_data.get('query', '').strip()
-        personality_id = query_data.get('personality_id', 'krishna')
-        language = query_data.get('language', 'English')
+        # Extract and validate parameters
+        user_query, personality_id, language = parse_guidance_request(query_data)
         
         if not user_query:
             return func.HttpResponse(
@@ -595,27 +658,14 @@ def guidance_endpoint(req: func.HttpRequest) -> func.HttpResponse:
                 headers=get_cors_headers()
             )
         
-        # Validate personality
-        valid_personalities = (
-            list(FALLBACK_PERSONALITIES.keys()) if not personality_service_available
-            else optimized_personality_service.get_available_personalities()
-        )
-        
-        if personality_id not in valid_personalities:
-            logger.warning(f"Invalid personality: {personality_id}, defaulting to Krishna")
-            personality_id = "krishna"
-        
         # Generate response using available service
         if personality_service_available:
-            service_response = optimized_personality_service.generate_response(user_query, personality_id, language)
+            service_response = await optimized_personality_service.generate_response(user_query, personality_id, language)
             response_text = service_response["content"]
             response_metadata = service_response["metadata"]
         else:
             # Fallback response generation
-            fallback_responses = {
-                "krishna": "Beloved devotee, in the Bhagavad Gita 2.47, I teach: \"You have the right to perform your prescribed duty, but not to the fruits of action.\" This timeless wisdom guides us to act with devotion while surrendering attachment to outcomes. Focus on righteous action with love and dedication. May you find peace in dharmic living. 🙏"
-            }
-            response_text = fallback_responses.get(personality_id, fallback_responses["krishna"])
+            response_text = FALLBACK_GUIDANCE_RESPONSES.get(personality_id, FALLBACK_GUIDANCE_RESPONSES["krishna"])
             response_metadata = {
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "service_version": "fallback_v1.0",
@@ -623,22 +673,7 @@ def guidance_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             }
         
         # Get personality info
-        if personality_models_available:
-            config = get_personality_config(personality_id)
-            personality_info = {
-                "id": config.id,
-                "name": config.name,
-                "domain": config.domain.value,
-                "description": config.description
-            }
-        else:
-            fallback_info = FALLBACK_PERSONALITIES[personality_id]
-            personality_info = {
-                "id": personality_id,
-                "name": fallback_info["name"],
-                "domain": fallback_info["domain"],
-                "description": fallback_info["description"]
-            }
+        personality_info = get_personality_info(personality_id)
         
         # Build final response
         response = {
@@ -672,5 +707,87 @@ def guidance_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             headers=get_cors_headers()
         )
 
+async def guidance_event_stream(user_query: str, personality_id: str, language: str):
+    """SSE events for a streamed guidance response: personality, token*, done"""
+    yield format_sse_event("personality", get_personality_info(personality_id))
+    try:
+        if personality_service_available:
+            async for event in optimized_personality_service.stream_response(user_query, personality_id, language):
+                if event["type"] == "token":
+                    yield format_sse_event("token", {"content": event["content"]})
+                else:
+                    yield format_sse_event("done", {
+                        **event["metadata"],
+                        "service_mode": "enhanced",
+                        "streaming": http_streaming_available
+                    })
+        else:
+            response_text = FALLBACK_GUIDANCE_RESPONSES.get(personality_id, FALLBACK_GUIDANCE_RESPONSES["krishna"])
+            yield format_sse_event("token", {"content": response_text})
+            yield format_sse_event("done", {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "service_version": "fallback_v1.0",
+                "response_source": "hardcoded_fallback",
+                "language": language,
+                "response_length": len(response_text),
+                "service_mode": "fallback"
+            })
+    except Exception as e:
+        logger.error(f"❌ Error in guidance stream: {str(e)}")
+        yield format_sse_event("error", {
+            "error": "Internal server error",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+
+if http_streaming_available:
+    @app.route(route="guidance/stream", methods=["POST"])
+    async def guidance_stream_endpoint(req: StreamingRequest) -> StreamingResponse:
+        """Streaming guidance endpoint (Server-Sent Events over HTTP streams)"""
+        try:
+            query_data = await req.json()
+        except ValueError:
+            query_data = None
+        
+        user_query, personality_id, language = parse_guidance_request(query_data or {})
+        if not user_query:
+            return StreamingResponse(
+                iter([format_sse_event("error", {"error": "Query is required"})]),
+                status_code=400,
+                headers=get_sse_headers()
+            )
+        
+        return StreamingResponse(
+            guidance_event_stream(user_query, personality_id, language),
+            headers=get_sse_headers()
+        )
+else:
+    @app.route(route="guidance/stream", methods=["POST"])
+    async def guidance_stream_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+        """
+        Guidance as Server-Sent Events without the HTTP streams extension
+        
+        The host buffers func.HttpResponse bodies, so the events are collected
+        and returned together; clients use the same parser either way.
+        """
+        try:
+            query_data = req.get_json()
+        except ValueError:
+            query_data = None
+        
+        user_query, personality_id, language = parse_guidance_request(query_data or {})
+        if not user_query:
+            return func.HttpResponse(
+                format_sse_event("error", {"error": "Query is required"}),
+                status_code=400,
+                headers=get_sse_headers()
+            )
+        
+        events = [event async for event in guidance_event_stream(user_query, personality_id, language)]
+        return func.HttpResponse(
+            "".join(events),
+            status_code=200,
+            headers=get_sse_headers()
+        )
+
 # Enhanced CORS handling in each endpoint - no separate OPTIONS handlers needed
 # All endpoints already include proper CORS headers
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Build the memory-mapped local embedding store from the vimarsh-db JSON corpora
+
+Converts data/vimarsh-db/<personality>-texts.json into per-personality binary
+stores (see services/local_embedding_store.py) so local mode no longer parses
+megabytes of JSON floats on every search. Documents that already carry an
+embedding are copied; the rest are embedded with Gemini unless --skip-missing.
+
+Usage:
+    python scripts/build_embedding_store.py
+    python scripts/build_embedding_store.py --personality krishna --output data/vimarsh-db/embeddings
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from services.local_embedding_store import LocalEmbeddingStore, DEFAULT_STORE_PATH
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'vimarsh-db')
+
+
+def _embedder(skip_missing: bool):
+    if skip_missing:
+        return None
+    try:
+        from services.gemini_embedding_service import get_gemini_embedding_service
+        service = get_gemini_embedding_service()
+        return lambda text: service.generate_embedding(text).embedding
+    except Exception as e:
+        print(f"⚠️ Gemini embeddings unavailable ({e}); documents without embeddings are skipped")
+        return None
+
+
+def build_store(output: str, personality: str = None, skip_missing: bool = False) -> int:
+    """Build stores for every <personality>-texts.json corpus, returning documents written"""
+    store = LocalEmbeddingStore(output)
+    embed_fn = _embedder(skip_missing)
+    total = 0
+
+    for path in sorted(glob.glob(os.path.join(SOURCE_DIR, '*-texts.json'))):
+        name = os.path.basename(path)[:-len('-texts.json')]
+        if name == 'spiritual' or (personality and name != personality):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            documents = json.load(f)
+        written = store.build_from_documents(name, documents, embed_fn)
+        print(f"✅ {name}: {written}/{len(documents)} documents")
+        total += written
+
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local memory-mapped embedding store")
+    parser.add_argument('--output', default=os.getenv('VECTOR_STORE_PATH', DEFAULT_STORE_PATH))
+    parser.add_argument('--personality', help="Only build one personality")
+    parser.add_argument('--skip-missing', action='store_true', help="Do not embed documents lacking embeddings")
+    args = parser.parse_args()
+
+    count = build_store(args.output, args.personality, args.skip_missing)
+    print(f"Done: {count} documents written to {os.path.abspath(args.output)}")
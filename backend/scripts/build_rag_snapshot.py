@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Build the SimpleRAGService startup snapshot from data/sources
+
+Parses every personality's teachings once and writes one pickle per
+personality (content rows plus its BM25 index) and an index.json with
+document counts and source hashes (see services/rag_service.py). At runtime a
+personality is loaded from its snapshot on first use; a snapshot whose source
+files changed since the build is ignored and the sources are parsed instead.
+
+Usage:
+    python scripts/build_rag_snapshot.py
+    python scripts/build_rag_snapshot.py --output data/sources/snapshot
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.rag_service import SimpleRAGService, DEFAULT_DATA_DIR, DEFAULT_SNAPSHOT_DIR
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SimpleRAGService startup snapshot")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--output', default=os.getenv('RAG_SNAPSHOT_DIR') or DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    counts = SimpleRAGService(data_dir=args.data_dir, snapshot_dir=args.output).write_snapshot()
+    for personality, count in counts.items():
+        print(f"✅ {personality}: {count} items")
+    print(f"Done: {sum(counts.values())} items written to {os.path.abspath(args.output)}")
@@ -15,6 +15,12 @@ WHAT IT DOES:
 
 USAGE:
     python scripts/migrate_vector_database.py [--dry-run] [--personality PERSONALITY]
+        [--checkpoint PATH]
+
+Migrated documents are written through the bulk upsert pipeline (concurrent,
+batched by personality, retried on throttling). Document ids are derived from
+the source ids, so a rerun overwrites instead of duplicating; with --checkpoint
+an interrupted run skips documents that were already written.
 
 SAFETY FEATURES:
 - Dry run mode to preview changes without modifying data
@@ -30,7 +36,7 @@ import json
 import os
 import sys
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 # Add parent directory to path for imports
@@ -53,6 +59,7 @@ except ImportError:
 
 try:
     from services.vector_database_service import VectorDatabaseService
+    from services.bulk_writer import BulkCheckpoint
     from services.personality_service import personality_service
     from azure.cosmos import CosmosClient
 except ImportError as e:
@@ -100,8 +107,13 @@ class MigrationStats:
 class VectorDatabaseMigrator:
     """Handles migration from old to new vector database structure"""
     
-    def __init__(self, dry_run: bool = False):
+    # Documents embedded before each bulk write
+    WRITE_BATCH_SIZE = 500
+    
+    def __init__(self, dry_run: bool = False, checkpoint_path: Optional[str] = None):
         self.dry_run = dry_run
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = BulkCheckpoint(checkpoint_path) if checkpoint_path else None
         self.stats = MigrationStats()
         self.vector_service = None
         self.cosmos_client = None
@@ -247,14 +259,23 @@ class VectorDatabaseMigrator:
             
             logger.info(f"[INFO] Found {len(items)} documents in source collection")
             
+            pending = []
             for item in items:
-                await self._migrate_single_document(item, personality_filter)
+                vector_doc = await self._migrate_single_document(item, personality_filter)
+                if vector_doc is not None:
+                    pending.append(vector_doc)
                 self.stats.documents_processed += 1
                 
+                if len(pending) >= self.WRITE_BATCH_SIZE:
+                    await self._write_documents(pending)
+                    pending = []
+                
                 # Progress logging every 100 documents
                 if self.stats.documents_processed % 100 == 0:
                     logger.info(f"[PROGRESS] Progress: {self.stats.documents_processed}/{len(items)} documents processed")
             
+            await self._write_documents(pending)
+            
             self.stats.end_time = datetime.now()
             
             # Log final statistics
@@ -267,8 +288,24 @@ class VectorDatabaseMigrator:
             self.stats.errors += 1
             raise
     
+    async def _write_documents(self, documents: List[Any]):
+        """Bulk upsert embedded documents and update statistics"""
+        if not documents:
+            return
+        result = await self.vector_service.upsert_documents(documents, checkpoint_path=self.checkpoint_path)
+        
+        written = set(result.written_ids)
+        for vector_doc in documents:
+            if vector_doc.id in written:
+                self.stats.documents_migrated += 1
+                self.stats.chunks_created += len(vector_doc.content) // 1000  # Estimate chunks
+                self.stats.embeddings_generated += 1  # Each document gets one embedding
+        self.stats.errors += result.failed
+        logger.info(f"[OK] Wrote {result.succeeded} documents ({result.failed} failed, "
+                    f"{result.throttled_retries} throttled retries, {result.documents_per_second:.1f} docs/sec)")
+    
     async def _migrate_single_document(self, document: Dict[str, Any], personality_filter: Optional[str] = None):
-        """Migrate a single document to the new structure"""
+        """Classify and embed a single document; returns the vector document to write"""
         try:
             # Extract document metadata
             doc_id = document.get('id', 'unknown')
@@ -307,25 +344,27 @@ class VectorDatabaseMigrator:
                 'language': document.get('language', 'English')
             }
             
-            # Use the VectorDatabaseService add_content method to migrate
-            success = await self.vector_service.add_content(
+            # Stable id so reruns overwrite instead of duplicating
+            target_id = f"{personality_id}_{doc_id}"
+            if self.checkpoint is not None and target_id in self.checkpoint:
+                return None
+            
+            vector_doc = self.vector_service.build_document(
                 content=content,
                 personality_id=personality_id,
-                metadata=metadata
+                metadata=metadata,
+                doc_id=target_id
             )
             
-            if success:
-                logger.info(f"[OK] Migrated '{title[:50]}...' to {personality_id} personality")
-                self.stats.documents_migrated += 1
-                self.stats.chunks_created += len(content) // 1000  # Estimate chunks
-                self.stats.embeddings_generated += 1  # Each document gets one embedding
-            else:
+            if vector_doc is None:
                 logger.error(f"[ERROR] Failed to migrate document: {doc_id}")
                 self.stats.errors += 1
+            return vector_doc
                 
         except Exception as e:
             logger.error(f"[ERROR] Error migrating document {document.get('id', 'unknown')}: {e}")
             self.stats.errors += 1
+            return None
     
     def _log_migration_summary(self):
         """Log comprehensive migration summary"""
@@ -405,10 +444,11 @@ async def main():
     parser.add_argument("--personality", type=str, help="Migrate only specific personality")
     parser.add_argument("--skip-backup", action="store_true", help="Skip backup creation")
     parser.add_argument("--validate-only", action="store_true", help="Only run validation, skip migration")
+    parser.add_argument("--checkpoint", type=str, help="Checkpoint file for resuming an interrupted migration")
     
     args = parser.parse_args()
     
-    migrator = VectorDatabaseMigrator(dry_run=args.dry_run)
+    migrator = VectorDatabaseMigrator(dry_run=args.dry_run, checkpoint_path=args.checkpoint)
     
     try:
         # Initialize
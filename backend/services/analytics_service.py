@@ -25,6 +25,13 @@ except ImportError as e:
     EventType = None
     PersonalityUsageStats = None
 
+# Optional SQLite storage (LOCAL_STORAGE_BACKEND=sqlite)
+try:
+    from services.sqlite_store import get_local_sqlite_store
+except ImportError:
+    def get_local_sqlite_store():
+        return None
+
 logger = logging.getLogger(__name__)
 
 class AnalyticsService:
@@ -39,6 +46,11 @@ class AnalyticsService:
         self.local_storage_path = "data/analytics"
         os.makedirs(self.local_storage_path, exist_ok=True)
         
+        # Optional SQLite backend (LOCAL_STORAGE_BACKEND=sqlite)
+        self.sqlite_store = get_local_sqlite_store()
+        if self.sqlite_store is not None:
+            self.sqlite_store.collection("analytics_events").create_index("by_time", (), "timestamp")
+        
         # Cache popular queries
         self.popular_queries_cache = {}
         self.personality_stats_cache = {}
@@ -395,6 +407,10 @@ class AnalyticsService:
     def _save_event_to_local(self, event: UserAnalyticsEvent) -> bool:
         """Save event to local JSON storage"""
         try:
+            if self.sqlite_store is not None:
+                self.sqlite_store.collection("analytics_events").append(model_to_dict(event))
+                return True
+            
             # Organize by date for easier querying
             event_date = event.timestamp[:10]  # YYYY-MM-DD
             date_dir = os.path.join(self.local_storage_path, event_date)
@@ -439,6 +455,14 @@ class AnalyticsService:
     def _get_events_by_period_local(self, start_date: datetime, end_date: datetime) -> List[UserAnalyticsEvent]:
         """Get events from local storage for a time period"""
         try:
+            if self.sqlite_store is not None:
+                last_day = end_date.strftime('%Y-%m-%d')
+                rows = self.sqlite_store.collection("analytics_events").find(
+                    "by_time", (), since=start_date.strftime('%Y-%m-%d')
+                )
+                return [dict_to_model(row, UserAnalyticsEvent) for row in rows
+                        if row.get('timestamp', '')[:10] <= last_day]
+            
             events = []
             current_date = start_date
             
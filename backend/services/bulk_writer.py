@@ -0,0 +1,275 @@
+"""
+Bulk Upsert Pipeline for Vimarsh
+
+Shared write path for loading, migrating and re-embedding corpora in
+personality_vectors. Replaces one synchronous upsert_item per document inside
+a loop (plus fixed sleeps between batches) with:
+
+- batching by partition key: documents are grouped by personality and cut
+  into batches of ``batch_size``, written as concurrent point upserts
+  (transactional batches need a newer azure-cosmos than the pinned 4.5.1)
+- bounded concurrency: at most ``concurrency`` requests in flight (the sync
+  SDK calls run in worker threads)
+- throttling: 429/408/503 responses are retried after the service's
+  x-ms-retry-after-ms delay, so throughput is bounded by provisioned RU/s
+  rather than by per-item round-trips
+- resumable checkpoints: ids of written documents are appended to a
+  checkpoint file and skipped when the same load is run again
+- progress: a LoadingProgress-style object (loaded_chunks, failed_chunks,
+  errors) is updated as batches complete
+
+Bulk deletes (e.g. duplicate cleanup) go through the same batching and retries.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 429, 503}
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of one bulk upsert run"""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    batches: int = 0
+    throttled_retries: int = 0
+    duration_seconds: float = 0.0
+    written_ids: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.succeeded / self.duration_seconds if self.duration_seconds > 0 else 0.0
+
+
+class BulkCheckpoint:
+    """Append-only file of document ids that have been written"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._done.update(line.strip() for line in f if line.strip())
+            logger.info(f"📍 Resuming from checkpoint {path}: {len(self._done)} documents already written")
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def mark(self, doc_ids: List[str]) -> None:
+        if not doc_ids:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(f"{doc_id}\n" for doc_id in doc_ids))
+            f.flush()
+            os.fsync(f.fileno())
+        self._done.update(doc_ids)
+
+    def clear(self) -> None:
+        self._done.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _doc_id(doc: Any) -> str:
+    return str(doc['id'] if isinstance(doc, dict) else doc.id)
+
+
+class BulkUpsertPipeline:
+    """Concurrent, partition-batched, throttle-aware upserts (and deletes)"""
+
+    def __init__(
+        self,
+        container=None,
+        upsert_fn: Optional[Callable[[Any], Any]] = None,
+        concurrency: int = 8,
+        batch_size: int = 100,
+        max_retries: int = 9,
+        partition_key_field: str = "personality",
+        checkpoint_path: Optional[str] = None,
+        progress: Any = None
+    ):
+        """
+        Args:
+            container: Cosmos ContainerProxy to write to
+            upsert_fn: per-document writer (sync or async) used instead of
+                container.upsert_item, e.g. a storage adapter's add_chunk
+            concurrency: maximum requests in flight
+            batch_size: documents per partition batch
+            max_retries: retries per request on throttling / timeouts
+            partition_key_field: document property holding the partition key
+            checkpoint_path: file recording written ids for resumable loads
+            progress: LoadingProgress-style object updated as batches finish
+        """
+        if container is None and upsert_fn is None:
+            raise ValueError("BulkUpsertPipeline needs a container or an upsert_fn")
+        self.container = container
+        self.upsert_fn = upsert_fn
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.partition_key_field = partition_key_field
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+
+    @classmethod
+    def from_env(cls, container=None, **kwargs) -> "BulkUpsertPipeline":
+        """Create a pipeline with BULK_UPSERT_* settings (keyword arguments win)"""
+        kwargs.setdefault('concurrency', int(os.getenv('BULK_UPSERT_CONCURRENCY', '8')))
+        kwargs.setdefault('batch_size', int(os.getenv('BULK_UPSERT_BATCH_SIZE', '100')))
+        kwargs.setdefault('max_retries', int(os.getenv('BULK_UPSERT_MAX_RETRIES', '9')))
+        return cls(container=container, **kwargs)
+
+    def _partition_key(self, doc: Any) -> Any:
+        if isinstance(doc, dict):
+            return doc.get(self.partition_key_field)
+        return getattr(doc, self.partition_key_field, None)
+
+    # =======================
+    # PUBLIC API
+    # =======================
+
+    async def upsert(self, documents: Iterable[Any]) -> BulkWriteResult:
+        """Write all documents; returns counts, retries and the written ids"""
+        return await self._run(documents, "upsert")
+
+    async def delete(self, documents: Iterable[Dict[str, Any]]) -> BulkWriteResult:
+        """Delete documents (id and partition key) with the same batching and retries"""
+        if self.container is None:
+            raise ValueError("Bulk deletes need a container")
+        return await self._run(documents, "delete")
+
+    # =======================
+    # INTERNALS
+    # =======================
+
+    async def _run(self, documents: Iterable[Any], operation: str) -> BulkWriteResult:
+        start = time.perf_counter()
+        result = BulkWriteResult()
+        checkpoint = BulkCheckpoint(self.checkpoint_path) if self.checkpoint_path else None
+
+        by_partition: Dict[Any, List[Any]] = {}
+        for doc in documents:
+            result.total += 1
+            if checkpoint is not None and _doc_id(doc) in checkpoint:
+                result.skipped += 1
+                continue
+            by_partition.setdefault(self._partition_key(doc), []).append(doc)
+
+        batches = [
+            (partition_key, docs[i:i + self.batch_size])
+            for partition_key, docs in by_partition.items()
+            for i in range(0, len(docs), self.batch_size)
+        ]
+        pending = result.total - result.skipped
+        logger.info(f"💾 Bulk {operation}: {pending} documents in {len(batches)} batches across "
+                    f"{len(by_partition)} partitions (concurrency {self.concurrency})")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(
+            self._write_batch(operation, partition_key, batch, semaphore, result, checkpoint)
+            for partition_key, batch in batches
+        ))
+
+        result.duration_seconds = time.perf_counter() - start
+        logger.info(
+            f"✅ Bulk {operation} complete: {result.succeeded} written, {result.failed} failed, "
+            f"{result.skipped} skipped (checkpoint), {result.throttled_retries} throttled retries, "
+            f"{result.documents_per_second:.1f} docs/s"
+        )
+        return result
+
+    def _delete_item(self, doc: Dict[str, Any]) -> None:
+        try:
+            self.container.delete_item(item=_doc_id(doc), partition_key=self._partition_key(doc))
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:  # already gone
+                raise
+
+    async def _write_batch(
+        self,
+        operation: str,
+        partition_key: Any,
+        batch: List[Any],
+        semaphore: asyncio.Semaphore,
+        result: BulkWriteResult,
+        checkpoint: Optional[BulkCheckpoint]
+    ) -> None:
+        written: List[str] = []
+        errors: List[str] = []
+
+        if operation == "delete":
+            write_one = self._delete_item
+        else:
+            write_one = self.upsert_fn or self.container.upsert_item
+        outcomes = await asyncio.gather(
+            *(self._call(semaphore, result, write_one, doc) for doc in batch),
+            return_exceptions=True
+        )
+        for doc, outcome in zip(batch, outcomes):
+            if isinstance(outcome, BaseException):
+                errors.append(f"{operation.capitalize()} failed: {_doc_id(doc)} - {outcome}")
+            else:
+                written.append(_doc_id(doc))
+
+        if checkpoint is not None:
+            checkpoint.mark(written)
+
+        result.batches += 1
+        result.succeeded += len(written)
+        result.failed += len(errors)
+        result.written_ids.extend(written)
+        result.errors.extend(errors)
+        for error in errors:
+            logger.error(f"❌ {error}")
+
+        if self.progress is not None:
+            self.progress.loaded_chunks += len(written)
+            self.progress.failed_chunks += len(errors)
+            self.progress.errors.extend(errors)
+        logger.debug(f"💾 Batch {result.batches} ({partition_key}): {len(written)} written, {len(errors)} failed")
+
+    async def _call(self, semaphore: asyncio.Semaphore, result: BulkWriteResult,
+                    fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run one request under the concurrency limit, retrying throttled requests"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    if asyncio.iscoroutinefunction(fn):
+                        return await fn(*args, **kwargs)
+                    return await asyncio.to_thread(fn, *args, **kwargs)
+            except Exception as e:
+                status = getattr(e, 'status_code', None)
+                if status not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    raise
+                delay = self._retry_after(e, attempt)
+                result.throttled_retries += 1
+                logger.debug(f"⏳ Throttled ({status}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_after(error: Exception, attempt: int) -> float:
+        """Delay requested by the service, or exponential backoff"""
+        headers = getattr(error, 'headers', None) or getattr(getattr(error, 'response', None), 'headers', None) or {}
+        retry_after_ms = headers.get('x-ms-retry-after-ms')
+        if retry_after_ms is not None:
+            return float(retry_after_ms) / 1000
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            return float(retry_after)
+        return min(0.1 * (2 ** attempt), 5.0)
@@ -20,6 +20,11 @@ try:
 except ImportError:
     CONFIG_AVAILABLE = False
 
+try:
+    from .single_flight import SingleFlight
+except ImportError:
+    from single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,6 +92,9 @@ class CacheService:
         self._misses = 0
         self._evictions = 0
         
+        # Concurrent misses on the same key run compute_func once
+        self._single_flight = SingleFlight("cache_service")
+        
         # Load configuration
         self._load_configuration()
         
@@ -231,11 +239,14 @@ class CacheService:
         if value is not None:
             return value
         
-        # Compute value
-        try:
+        def compute() -> Any:
             computed_value = compute_func()
             self.put(key, computed_value, ttl_seconds)
             return computed_value
+        
+        # Compute value
+        try:
+            return self._single_flight.do(key, compute)
         except Exception as e:
             logger.error(f"Error computing cache value for key '{key}': {e}")
             raise
@@ -250,8 +261,7 @@ class CacheService:
         if value is not None:
             return value
         
-        # Compute value asynchronously
-        try:
+        async def compute() -> Any:
             if asyncio.iscoroutinefunction(compute_func):
                 computed_value = await compute_func()
             else:
@@ -259,6 +269,10 @@ class CacheService:
             
             self.put(key, computed_value, ttl_seconds)
             return computed_value
+        
+        # Compute value asynchronously (concurrent callers for the same key share it)
+        try:
+            return await self._single_flight.do_async(key, compute)
         except Exception as e:
             logger.error(f"Error computing async cache value for key '{key}': {e}")
             raise
@@ -315,7 +329,8 @@ class CacheService:
                 "evictions": self._evictions,
                 "hit_rate": f"{hit_rate:.1f}%",
                 "strategy": self.strategy.value,
-                "default_ttl": self.default_ttl
+                "default_ttl": self.default_ttl,
+                "coalesced_computes": self._single_flight.shared
             }
     
     def get_keys(self, pattern: Optional[str] = None) -> List[str]:
@@ -0,0 +1,449 @@
+"""
+Shared Cache Tiers for PersonalityCacheService
+
+- L2: Redis (or any RESP-compatible server such as Azure Cache for Redis),
+      spoken to by a small asyncio RESP2 client so no extra dependency is
+      needed. Configured with CACHE_REDIS_URL (redis:// or rediss://).
+- L3: SQLite file shared by workers on the same host / file share.
+      Configured with CACHE_L3_PATH.
+
+Values are stored as JSON envelopes {"v": value, "exp": epoch seconds} so the
+absolute expiry travels with the value between tiers. Values that are not
+JSON-serializable stay in L1 only.
+"""
+
+import os
+import re
+import ssl
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, unquote
+
+logger = logging.getLogger(__name__)
+
+_GLOB_SPECIAL = re.compile(r'([*?\[\]\\])')
+
+
+def glob_escape(text: str) -> str:
+    """Escape Redis glob metacharacters so text only matches itself in a MATCH pattern"""
+    return _GLOB_SPECIAL.sub(r'\\\1', text)
+
+
+def encode_entry(value: Any, expires_at: float) -> str:
+    """Serialize a cache value with its absolute expiry (raises TypeError if not JSON)"""
+    return json.dumps({"v": value, "exp": expires_at}, ensure_ascii=False, separators=(',', ':'))
+
+
+def decode_entry(payload: Any) -> Optional[Tuple[Any, float]]:
+    """Inverse of encode_entry; None for corrupt payloads"""
+    try:
+        if isinstance(payload, bytes):
+            payload = payload.decode('utf-8')
+        envelope = json.loads(payload)
+        return envelope["v"], float(envelope["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class RespError(Exception):
+    """Error reply from a RESP server"""
+
+
+# Failures that make a tier unavailable (asyncio.TimeoutError is an OSError on 3.11+)
+TIER_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, RespError)
+
+
+class RespClient:
+    """Minimal asyncio Redis (RESP2) client: one connection, one command at a time"""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        password: Optional[str] = None,
+        username: Optional[str] = None,
+        db: int = 0,
+        use_ssl: bool = False,
+        timeout: float = 1.0
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.username = username
+        self.db = db
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 1.0) -> "RespClient":
+        """redis://[[user]:password@]host[:port][/db] or rediss:// for TLS"""
+        parsed = urlparse(url)
+        db = parsed.path.lstrip('/')
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or (6380 if parsed.scheme == "rediss" else 6379),
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            db=int(db) if db else 0,
+            use_ssl=parsed.scheme == "rediss",
+            timeout=timeout
+        )
+
+    def _bind_loop(self) -> asyncio.Lock:
+        # Streams belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._reader = self._writer = None
+        return self._lock
+
+    async def _connect(self) -> None:
+        ssl_context = ssl.create_default_context() if self.use_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context),
+            timeout=self.timeout
+        )
+        if self.password:
+            auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            await self._roundtrip(auth)
+        if self.db:
+            await self._roundtrip(("SELECT", self.db))
+
+    async def execute(self, *args: Any) -> Any:
+        """Send one command and return its decoded reply"""
+        async with self._bind_loop():
+            try:
+                if self._writer is None:
+                    await self._connect()
+                return await self._roundtrip(args)
+            except RespError:
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                await self.close()
+                raise
+
+    async def _roundtrip(self, args) -> Any:
+        self._writer.write(self._encode(args))
+        await self._writer.drain()
+        return await asyncio.wait_for(self._read_reply(), timeout=self.timeout)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode('utf-8')
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readuntil(b"\r\n")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode('utf-8')
+        if prefix == b"-":
+            raise RespError(body.decode('utf-8'))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RespError(f"Unexpected reply prefix {prefix!r}")
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    # Commands used by the cache tier
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: str, px: Optional[int] = None, nx: bool = False) -> bool:
+        args: List[Any] = ["SET", key, value]
+        if px is not None:
+            args += ["PX", max(1, int(px))]
+        if nx:
+            args.append("NX")
+        return await self.execute(*args) == "OK"
+
+    async def delete(self, *keys: str) -> int:
+        return await self.execute("DEL", *keys) if keys else 0
+
+    async def eval(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        return await self.execute("EVAL", script, len(keys), *keys, *args)
+
+    async def scan_iter(self, match: str, count: int = 500) -> AsyncIterator[str]:
+        cursor = "0"
+        while True:
+            cursor, keys = await self.execute("SCAN", cursor, "MATCH", match, "COUNT", count)
+            cursor = cursor.decode('utf-8') if isinstance(cursor, bytes) else str(cursor)
+            for key in keys:
+                yield key.decode('utf-8') if isinstance(key, bytes) else key
+            if cursor == "0":
+                return
+
+
+# Delete the lock only if it still holds our token (atomic on the server)
+RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+class RedisCacheTier:
+    """L2 tier on a RESP server; connection failures open a short circuit breaker"""
+
+    def __init__(self, client: RespClient, namespace: str = "vimarsh:cache", retry_after_seconds: float = 30.0):
+        self.client = client
+        self.namespace = namespace
+        self.retry_after_seconds = retry_after_seconds
+        self._unavailable_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["RedisCacheTier"]:
+        url = os.getenv('CACHE_REDIS_URL')
+        if not url:
+            return None
+        timeout = float(os.getenv('CACHE_REDIS_TIMEOUT_SECONDS', '0.5'))
+        return cls(RespClient.from_url(url, timeout=timeout))
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    @property
+    def available(self) -> bool:
+        return time.time() >= self._unavailable_until
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        self._unavailable_until = time.time() + self.retry_after_seconds
+        logger.warning(f"⚠️ L2 cache {operation} failed ({error}); bypassing L2 for {self.retry_after_seconds:.0f}s")
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        if not self.available:
+            return None
+        try:
+            payload = await self.client.get(self._key(key))
+        except TIER_ERRORS as e:
+            self._failed("read", e)
+            return None
+        entry = decode_entry(payload) if payload is not None else None
+        if entry is None or entry[1] <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def peek(self, key: str) -> Optional[Tuple[Any, float]]:
+        """get() without touching hit/miss stats (used while polling for another instance's result)"""
+        if not self.available:
+            return None
+        try:
+            payload = await self.client.get(self._key(key))
+        except TIER_ERRORS as e:
+            self._failed("read", e)
+            return None
+        entry = decode_entry(payload) if payload is not None else None
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry
+
+    async def set(self, key: str, payload: str, expires_at: float) -> bool:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0 or not self.available:
+            return False
+        try:
+            await self.client.set(self._key(key), payload, px=ttl_ms)
+            self.writes += 1
+            return True
+        except TIER_ERRORS as e:
+            self._failed("write", e)
+            return False
+
+    async def delete(self, key: str) -> int:
+        if not self.available:
+            return 0
+        try:
+            return await self.client.delete(self._key(key))
+        except TIER_ERRORS as e:
+            self._failed("delete", e)
+            return 0
+
+    async def delete_matching(self, pattern: str) -> int:
+        """Delete keys matching a glob pattern (literal parts escaped with glob_escape)"""
+        if not self.available:
+            return 0
+        try:
+            keys = [key async for key in self.client.scan_iter(f"{glob_escape(self.namespace)}:{pattern}")]
+            deleted = 0
+            for start in range(0, len(keys), 500):
+                deleted += await self.client.delete(*keys[start:start + 500])
+            return deleted
+        except TIER_ERRORS as e:
+            self._failed("delete", e)
+            return 0
+
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        """Cross-instance recompute lock (SET NX PX); returns a token or None"""
+        if not self.available:
+            return None
+        token = uuid.uuid4().hex
+        try:
+            if await self.client.set(self._key(f"lock:{key}"), token, px=ttl_ms, nx=True):
+                return token
+        except TIER_ERRORS as e:
+            self._failed("lock", e)
+        return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        try:
+            await self.client.eval(RELEASE_LOCK_SCRIPT, [self._key(f"lock:{key}")], [token])
+        except TIER_ERRORS as e:
+            # The lock expires on its own (PX); nothing else to do
+            logger.debug(f"L2 lock release failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "enabled": True,
+            "endpoint": f"{self.client.host}:{self.client.port}",
+            "available": self.available,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+class SQLiteCacheTier:
+    """L3 tier: SQLite table keyed like the L2 namespace, with expiry column"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, personality_id TEXT NOT NULL, cache_type TEXT NOT NULL, "
+            "cache_key TEXT NOT NULL, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_scope ON cache_entries (personality_id, cache_type)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expiry ON cache_entries (expires_at)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SQLiteCacheTier"]:
+        path = os.getenv('CACHE_L3_PATH')
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ L3 cache unavailable at {path}: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] <= time.time():
+                self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+        entry = decode_entry(row[0])
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, personality_id: str, cache_type: str, cache_key: str,
+            payload: str, expires_at: float) -> bool:
+        """Store a payload under its tier key; scope columns allow targeted invalidation"""
+        if expires_at <= time.time():
+            return False
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(key, personality_id, cache_type, cache_key, payload, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, personality_id, cache_type, cache_key, payload, expires_at)
+            )
+            self._db.commit()
+            self.writes += 1
+        return True
+
+    def delete(self, cache_key: Optional[str] = None, personality_id: Optional[str] = None,
+               cache_type: Optional[str] = None) -> int:
+        """Delete entries matching every given criterion; no arguments clears the tier"""
+        clauses, params = [], []
+        for column, value in (("cache_key", cache_key), ("personality_id", personality_id), ("cache_type", cache_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            deleted = self._db.execute(f"DELETE FROM cache_entries{where}", params).rowcount
+            self._db.commit()
+            return deleted
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._db.commit()
+            return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "enabled": True,
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,351 @@
+"""
+Cosmos DB Query Builder for Vimarsh
+
+Builds parameterized SQL for the personality_vectors container and runs it
+with the right routing:
+
+- values are always bound as @parameters, never interpolated
+- only the projected fields are returned (no SELECT * just to count rows or
+  read a few properties - embeddings are ~6 KB of JSON per document)
+- a query that filters on the partition key (personality) is sent to that
+  single partition; anything else is a cross-partition fan-out
+
+Every execution records its request charge (summed from the
+x-ms-request-charge header of each page) and latency per query label, so the
+admin performance endpoint can show what each query shape costs. When the
+header is unavailable (emulator, test doubles) the charge is estimated from
+the response size.
+"""
+
+import re
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PATH = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+# Rough read cost used when the service does not report a charge:
+# a point read of 1 KB is 1 RU, a query adds ~2.3 RU of fixed overhead
+QUERY_BASE_RU = 2.3
+RU_PER_KB = 1.0
+
+
+def _path(name: str) -> str:
+    """Qualify a document property (``source`` -> ``c.source``)"""
+    if name.startswith('c.'):
+        name = name[2:]
+    if not _PATH.match(name):
+        raise ValueError(f"Unsupported property path in Cosmos query: {name!r}")
+    return f"c.{name}"
+
+
+@dataclass
+class CosmosQuery:
+    """A built query: SQL text, bound parameters and routing"""
+    label: str
+    sql: str
+    parameters: List[Dict[str, Any]]
+    partition_key: Optional[str] = None
+
+    @property
+    def single_partition(self) -> bool:
+        return self.partition_key is not None
+
+    def options(self) -> Dict[str, Any]:
+        """Routing keyword arguments for ContainerProxy.query_items"""
+        if self.partition_key is not None:
+            return {'partition_key': self.partition_key}
+        return {'enable_cross_partition_query': True}
+
+    @staticmethod
+    def _charge_hook(charges: List[float]):
+        def record_charge(headers, result):
+            # Called once per fetched page; container.query_items also calls it
+            # once up front with the pager, which is not a response
+            if isinstance(result, dict) and headers:
+                charge = headers.get('x-ms-request-charge')
+                if charge is not None:
+                    charges.append(float(charge))
+        return record_charge
+
+    def execute(self, container) -> List[Dict[str, Any]]:
+        """Run the query, record its RU charge and latency, and return all items"""
+        charges: List[float] = []
+        record_charge = self._charge_hook(charges)
+
+        start = time.perf_counter()
+        items = list(container.query_items(
+            query=self.sql,
+            parameters=self.parameters,
+            response_hook=record_charge,
+            **self.options()
+        ))
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        if charges:
+            request_charge, estimated = sum(charges), False
+        else:
+            response_kb = len(json.dumps(items, default=str)) / 1024
+            request_charge, estimated = QUERY_BASE_RU + RU_PER_KB * response_kb, True
+
+        _metrics.record(self, len(items), request_charge, latency_ms, estimated)
+        logger.info(
+            f"📊 Cosmos query {self.label}: {len(items)} items, "
+            f"{'~' if estimated else ''}{request_charge:.2f} RU, {latency_ms:.1f} ms, "
+            f"{'partition ' + self.partition_key if self.single_partition else 'cross-partition'}"
+        )
+        return items
+
+    def pages(self, container, page_size: int = 100,
+              continuation_token: Optional[str] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Stream results one page at a time as (items, continuation_token)
+
+        Only one page is held in memory; the token after a page resumes the
+        query from the next page (None when the query is exhausted). Charge
+        and latency are recorded once the pages have been consumed.
+        """
+        charges: List[float] = []
+        pager = container.query_items(
+            query=self.sql,
+            parameters=self.parameters,
+            max_item_count=page_size,
+            response_hook=self._charge_hook(charges),
+            **self.options()
+        ).by_page(continuation_token)
+
+        start = time.perf_counter()
+        total_items, response_kb = 0, 0.0
+        for page in pager:
+            items = list(page)
+            total_items += len(items)
+            if not charges:
+                response_kb += len(json.dumps(items, default=str)) / 1024
+            yield items, pager.continuation_token
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        estimated = not charges
+        request_charge = QUERY_BASE_RU + RU_PER_KB * response_kb if estimated else sum(charges)
+        _metrics.record(self, total_items, request_charge, latency_ms, estimated)
+        logger.info(
+            f"📊 Cosmos query {self.label} (paged): {total_items} items, "
+            f"{'~' if estimated else ''}{request_charge:.2f} RU, {latency_ms:.1f} ms"
+        )
+
+
+class CosmosQueryBuilder:
+    """
+    Fluent builder for parameterized, projected Cosmos DB queries
+
+        query = (CosmosQueryBuilder("search_scan")
+                 .select("id", "content", "embedding")
+                 .where("personality", "krishna")
+                 .where_in("content_type", ["verse", "teaching"])
+                 .build())
+        items = query.execute(container)
+    """
+
+    def __init__(self, label: str, partition_key_path: str = "personality"):
+        self.label = label
+        self.partition_key_path = _path(partition_key_path)
+        self._select: List[str] = []
+        self._value = False
+        self._distinct = False
+        self._top: Optional[int] = None
+        self._conditions: List[str] = []
+        self._parameters: List[Dict[str, Any]] = []
+        self._group_by: List[str] = []
+        self._order_by: Optional[str] = None
+        self._offset_limit: Optional[Tuple[int, int]] = None
+        self._partition_key: Optional[str] = None
+
+    def _param(self, hint: str, value: Any) -> str:
+        """Bind ``value`` under a parameter named after the property it filters"""
+        base = "@" + hint.replace('.', '_')
+        taken = {p["name"] for p in self._parameters}
+        name, n = base, 1
+        while name in taken:
+            n += 1
+            name = f"{base}{n}"
+        self._parameters.append({"name": name, "value": value})
+        return name
+
+    # =======================
+    # PROJECTION
+    # =======================
+
+    def select(self, *fields: str) -> "CosmosQueryBuilder":
+        """Project document properties (returned under their own names)"""
+        self._select.extend(_path(f) for f in fields)
+        return self
+
+    def select_expr(self, expression: str, alias: str) -> "CosmosQueryBuilder":
+        """Project a computed expression (e.g. ``COUNT(1)``) as ``alias``"""
+        if not _PATH.match(alias):
+            raise ValueError(f"Unsupported alias in Cosmos query: {alias!r}")
+        self._select.append(f"{expression} AS {alias}")
+        return self
+
+    def select_value(self, expression: str, distinct: bool = False) -> "CosmosQueryBuilder":
+        """SELECT [DISTINCT] VALUE <expression> - returns scalars instead of objects"""
+        self._select = [expression]
+        self._value = True
+        self._distinct = distinct
+        return self
+
+    def top(self, count: int) -> "CosmosQueryBuilder":
+        self._top = int(count)
+        return self
+
+    # =======================
+    # FILTERS
+    # =======================
+
+    def where(self, field_name: str, value: Any) -> "CosmosQueryBuilder":
+        """Equality filter; on the partition key it also routes to that partition"""
+        path = _path(field_name)
+        self._conditions.append(f"{path} = {self._param(path[2:], value)}")
+        if path == self.partition_key_path and isinstance(value, str):
+            self._partition_key = value
+        return self
+
+    def where_in(self, field_name: str, values: Iterable[Any]) -> "CosmosQueryBuilder":
+        """Membership filter bound as a single array parameter"""
+        path = _path(field_name)
+        self._conditions.append(f"ARRAY_CONTAINS({self._param(path[2:] + 's', list(values))}, {path})")
+        return self
+
+    def where_raw(self, condition: str, **parameters: Any) -> "CosmosQueryBuilder":
+        """Free-form condition; values must be passed as named parameters"""
+        for name, value in parameters.items():
+            self._parameters.append({"name": f"@{name}", "value": value})
+        self._conditions.append(condition)
+        return self
+
+    # =======================
+    # GROUPING / ORDERING
+    # =======================
+
+    def group_by(self, *expressions: str) -> "CosmosQueryBuilder":
+        """GROUP BY document properties or expressions (select the same ones)"""
+        self._group_by.extend(expressions)
+        return self
+
+    def order_by(self, field_name: str, descending: bool = False) -> "CosmosQueryBuilder":
+        self._order_by = f"{_path(field_name)}{' DESC' if descending else ''}"
+        return self
+
+    def nearest(self, field_name: str, vector: Iterable[float], alias: str = "similarity_score") -> "CosmosQueryBuilder":
+        """
+        Project VectorDistance(field, @query_vector) as ``alias`` and order by it
+
+        Results come back most similar first; combine with top(k) so the
+        vector index only has to produce k candidates.
+        """
+        if not _PATH.match(alias):
+            raise ValueError(f"Unsupported alias in Cosmos query: {alias!r}")
+        expression = f"VectorDistance({_path(field_name)}, {self._param('query_vector', [float(x) for x in vector])})"
+        self._select.append(f"{expression} AS {alias}")
+        self._order_by = expression
+        return self
+
+    def offset_limit(self, offset: int, limit: int) -> "CosmosQueryBuilder":
+        self._offset_limit = (int(offset), int(limit))
+        return self
+
+    def partition(self, partition_key: str) -> "CosmosQueryBuilder":
+        """Route to a single partition without adding a filter"""
+        self._partition_key = partition_key
+        return self
+
+    def build(self) -> CosmosQuery:
+        head = "SELECT "
+        if self._distinct:
+            head += "DISTINCT "
+        if self._top is not None:
+            head += f"TOP {self._top} "
+        if self._value:
+            head += "VALUE "
+        sql = head + (", ".join(self._select) if self._select else "*") + " FROM c"
+        if self._conditions:
+            sql += " WHERE " + " AND ".join(self._conditions)
+        if self._group_by:
+            sql += " GROUP BY " + ", ".join(self._group_by)
+        if self._order_by:
+            sql += f" ORDER BY {self._order_by}"
+        if self._offset_limit:
+            sql += " OFFSET {} LIMIT {}".format(*self._offset_limit)
+        return CosmosQuery(
+            label=self.label,
+            sql=sql,
+            parameters=list(self._parameters),
+            partition_key=self._partition_key
+        )
+
+
+@dataclass
+class _LabelStats:
+    executions: int = 0
+    single_partition: int = 0
+    items: int = 0
+    request_charge: float = 0.0
+    latency_ms: float = 0.0
+    estimated: int = 0
+    last_sql: str = field(default="", repr=False)
+
+
+class CosmosQueryMetrics:
+    """Per-label RU and latency totals for executed queries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[str, _LabelStats] = {}
+
+    def record(self, query: CosmosQuery, items: int, request_charge: float,
+               latency_ms: float, estimated: bool) -> None:
+        with self._lock:
+            stats = self._labels.setdefault(query.label, _LabelStats())
+            stats.executions += 1
+            stats.single_partition += int(query.single_partition)
+            stats.items += items
+            stats.request_charge += request_charge
+            stats.latency_ms += latency_ms
+            stats.estimated += int(estimated)
+            stats.last_sql = query.sql
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queries = {
+                label: {
+                    'executions': s.executions,
+                    'single_partition_ratio': round(s.single_partition / s.executions, 3),
+                    'avg_items': round(s.items / s.executions, 1),
+                    'avg_request_charge': round(s.request_charge / s.executions, 2),
+                    'avg_latency_ms': round(s.latency_ms / s.executions, 2),
+                    'total_request_charge': round(s.request_charge, 2),
+                    'charge_estimated': s.estimated > 0,
+                    'last_sql': s.last_sql
+                }
+                for label, s in self._labels.items()
+            }
+        return {
+            'queries': queries,
+            'total_request_charge': round(sum(q['total_request_charge'] for q in queries.values()), 2)
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._labels.clear()
+
+
+_metrics = CosmosQueryMetrics()
+
+
+def get_cosmos_query_metrics() -> Dict[str, Any]:
+    """RU/latency totals per query label for the admin performance endpoint"""
+    return _metrics.get_stats()
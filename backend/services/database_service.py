@@ -1,17 +1,50 @@
 """
 Simple database service for spiritual texts storage and retrieval.
 Implements local JSON storage for development and Cosmos DB for production.
+
+Local collections are log-structured (see log_structured_store): a JSON
+snapshot plus an append-only JSONL log, so saving a record appends one line
+instead of rewriting the whole file. With LOCAL_STORAGE_BACKEND=sqlite they
+live in the embedded SQLite database instead (see sqlite_store).
 """
 
-import json
 import os
 import logging
-from typing import Dict, List, Any, Optional
+import sqlite3
+from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 
+try:
+    from .log_structured_store import LogStructuredStore, get_local_store
+    from .sqlite_store import SQLiteCollection, get_local_sqlite_store
+except ImportError:
+    from log_structured_store import LogStructuredStore, get_local_store
+    from sqlite_store import SQLiteCollection, get_local_sqlite_store
+
 logger = logging.getLogger(__name__)
 
+# Secondary indexes on the local conversations collection:
+# name -> (indexed fields, sort field, default sort value)
+CONVERSATION_INDEXES = {
+    "by_user": (("type", "userId"), "timestamp", ""),
+    "by_session": (("type", "sessionId"), "timestamp", ""),
+    "by_personality": (("type", "personality"), "timestamp", ""),
+    "by_type": (("type",), "timestamp", ""),
+    "by_cost": (("type",), "totalCostUsd", 0.0),
+    "by_personality_name": (("type", "personalityName"), None, ""),
+}
+
+def _parse_local_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """ISO timestamp as naive local time (offsets converted), None if unparsable"""
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
 @dataclass
 class SpiritualText:
     """Represents a spiritual text document"""
@@ -188,7 +221,7 @@ class DatabaseService:
         os.makedirs(self.storage_path, exist_ok=True)
         
         # Initialize personality-vectors container
-        if not os.path.exists(self.spiritual_texts_path):
+        if not self._local_collection_exists(self.spiritual_texts_path):
             initial_texts = [
                 SpiritualText(
                     id="bg_2_47",
@@ -241,22 +274,41 @@ class DatabaseService:
             logger.info(f"✅ Initialized personality-vectors container with {len(initial_texts)} texts")
         
         # Initialize conversations container
-        if not os.path.exists(self.conversations_path):
+        if not self._local_collection_exists(self.conversations_path):
             self._save_to_local_file(self.conversations_path, [])
             logger.info(f"✅ Initialized conversations container")
     
+    def _local_store(self, file_path: str) -> Union[LogStructuredStore, SQLiteCollection]:
+        """Store backing a local collection (SQLite table or log-structured JSON file)"""
+        sqlite_store = get_local_sqlite_store()
+        if sqlite_store is not None:
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            return sqlite_store.collection(name, seed_path=file_path)
+        return get_local_store(file_path)
+    
+    def _local_collection_exists(self, file_path: str) -> bool:
+        if get_local_sqlite_store() is not None:
+            return len(self._local_store(file_path)) > 0
+        return os.path.exists(file_path)
+    
+    def _conversations_store(self) -> Union[LogStructuredStore, SQLiteCollection]:
+        """Local conversations collection with its secondary indexes"""
+        store = self._local_store(self.conversations_path)
+        for name, (fields, sort_field, sort_default) in CONVERSATION_INDEXES.items():
+            store.create_index(name, fields, sort_field, sort_default)
+        return store
+    
     def _load_from_local_file(self, file_path: str) -> List[Dict[str, Any]]:
-        """Load data from local JSON file"""
+        """Load all records of a local collection"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            return self._local_store(file_path).all()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Failed to load {file_path}: {e}")
             return []
     
     def _save_to_local_file(self, file_path: str, data: List[Dict[str, Any]]):
-        """Save data to local JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Replace a local collection (written as a new snapshot)"""
+        self._local_store(file_path).replace_all(data)
     
     def get_spiritual_text(self, text_id: str) -> Optional[SpiritualText]:
         """Get a specific spiritual text by ID"""
@@ -313,9 +365,7 @@ class DatabaseService:
     def _add_to_local(self, text: SpiritualText) -> bool:
         """Add spiritual text to local storage"""
         try:
-            data = self._load_from_local_file(self.spiritual_texts_path)
-            data.append(asdict(text))
-            self._save_to_local_file(self.spiritual_texts_path, data)
+            self._local_store(self.spiritual_texts_path).append(asdict(text))
             logger.info(f"✅ Added spiritual text: {text.id}")
             return True
         except Exception as e:
@@ -663,14 +713,8 @@ class DatabaseService:
     def _save_conversation_local(self, conversation: Conversation) -> bool:
         """Save conversation to local conversations.json"""
         try:
-            # Load existing conversations
-            conversations = self._load_from_local_file(self.conversations_path)
-            
-            # Add new conversation
-            conversations.append(asdict(conversation))
-            
-            # Save back to file
-            self._save_to_local_file(self.conversations_path, conversations)
+            # Append to the conversations log
+            self._local_store(self.conversations_path).append(asdict(conversation))
             
             logger.info(f"💾 Saved conversation locally: {conversation.id}")
             return True
@@ -681,14 +725,8 @@ class DatabaseService:
     def _save_usage_record_local(self, usage: UsageRecord) -> bool:
         """Save usage record to local conversations.json"""
         try:
-            # Load existing data
-            data = self._load_from_local_file(self.conversations_path)
-            
-            # Add new usage record
-            data.append(asdict(usage))
-            
-            # Save back to file
-            self._save_to_local_file(self.conversations_path, data)
+            # Append to the conversations log
+            self._local_store(self.conversations_path).append(asdict(usage))
             
             logger.info(f"💾 Saved usage record locally: {usage.id}")
             return True
@@ -699,17 +737,11 @@ class DatabaseService:
     def _save_user_stats_local(self, stats: UserStats) -> bool:
         """Save user stats to local conversations.json"""
         try:
-            # Load existing data
-            data = self._load_from_local_file(self.conversations_path)
-            
-            # Remove any existing stats for this user
-            data = [item for item in data if not (item.get('userId') == stats.userId and item.get('type') == 'user_stats')]
-            
-            # Add new stats
-            data.append(asdict(stats))
-            
-            # Save back to file
-            self._save_to_local_file(self.conversations_path, data)
+            # Replace any existing stats for this user
+            self._local_store(self.conversations_path).write(
+                [asdict(stats)],
+                delete={'userId': stats.userId, 'type': 'user_stats'}
+            )
             
             logger.info(f"💾 Saved user stats locally: {stats.id}")
             return True
@@ -720,17 +752,11 @@ class DatabaseService:
     def _save_personality_config_local(self, config: PersonalityConfig) -> bool:
         """Save personality config to local conversations.json"""
         try:
-            # Load existing data
-            data = self._load_from_local_file(self.conversations_path)
-            
-            # Remove any existing config for this personality
-            data = [item for item in data if not (item.get('personalityName') == config.personalityName and item.get('type') == 'personality_config')]
-            
-            # Add new config
-            data.append(asdict(config))
-            
-            # Save back to file
-            self._save_to_local_file(self.conversations_path, data)
+            # Replace any existing config for this personality
+            self._local_store(self.conversations_path).write(
+                [asdict(config)],
+                delete={'personalityName': config.personalityName, 'type': 'personality_config'}
+            )
             
             logger.info(f"💾 Saved personality config locally: {config.id}")
             return True
@@ -742,12 +768,11 @@ class DatabaseService:
     def _get_user_conversations_local(self, user_id: str, limit: int, offset: int) -> List[Conversation]:
         """Get user conversations from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            conversations = [Conversation(**item) for item in data 
-                           if item.get('userId') == user_id and item.get('type') == 'conversation']
-            # Sort by timestamp descending
-            conversations.sort(key=lambda x: x.timestamp, reverse=True)
-            return conversations[offset:offset+limit]
+            # Newest first
+            items = self._conversations_store().find(
+                "by_user", ("conversation", user_id), limit=limit, offset=offset, descending=True
+            )
+            return [Conversation(**item) for item in items]
         except Exception as e:
             logger.error(f"Failed to get user conversations locally: {e}")
             return []
@@ -755,12 +780,9 @@ class DatabaseService:
     def _get_session_conversations_local(self, session_id: str) -> List[Conversation]:
         """Get session conversations from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            conversations = [Conversation(**item) for item in data 
-                           if item.get('sessionId') == session_id and item.get('type') == 'conversation']
-            # Sort by timestamp ascending
-            conversations.sort(key=lambda x: x.timestamp)
-            return conversations
+            # Oldest first
+            items = self._conversations_store().find("by_session", ("conversation", session_id))
+            return [Conversation(**item) for item in items]
         except Exception as e:
             logger.error(f"Failed to get session conversations locally: {e}")
             return []
@@ -768,12 +790,11 @@ class DatabaseService:
     def _get_conversations_by_personality_local(self, personality: str, limit: int) -> List[Conversation]:
         """Get conversations by personality from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            conversations = [Conversation(**item) for item in data 
-                           if item.get('personality') == personality and item.get('type') == 'conversation']
-            # Sort by timestamp descending
-            conversations.sort(key=lambda x: x.timestamp, reverse=True)
-            return conversations[:limit]
+            # Newest first
+            items = self._conversations_store().find(
+                "by_personality", ("conversation", personality), limit=limit, descending=True
+            )
+            return [Conversation(**item) for item in items]
         except Exception as e:
             logger.error(f"Failed to get conversations by personality locally: {e}")
             return []
@@ -781,14 +802,15 @@ class DatabaseService:
     def _get_usage_records_local(self, days: int, limit: int) -> List[UsageRecord]:
         """Get usage records from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
             cutoff_date = datetime.now() - timedelta(days=days)
-            records = [UsageRecord(**item) for item in data 
-                      if item.get('type') == 'usage_tracking' and 
-                      datetime.fromisoformat(item.get('timestamp', '')) >= cutoff_date]
-            # Sort by timestamp descending
-            records.sort(key=lambda x: x.timestamp, reverse=True)
-            return records[:limit]
+            # Timestamps may or may not carry an offset, so compare parsed datetimes
+            records = []
+            for item in self._conversations_store().find("by_type", ("usage_tracking",)):
+                timestamp = _parse_local_timestamp(item.get('timestamp'))
+                if timestamp is not None and timestamp >= cutoff_date:
+                    records.append((timestamp, UsageRecord(**item)))
+            records.sort(key=lambda pair: pair[0], reverse=True)
+            return [record for _, record in records[:limit]]
         except Exception as e:
             logger.error(f"Failed to get usage records locally: {e}")
             return []
@@ -796,11 +818,8 @@ class DatabaseService:
     def _get_user_stats_local(self, user_id: str) -> Optional[UserStats]:
         """Get user stats from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            for item in data:
-                if item.get('userId') == user_id and item.get('type') == 'user_stats':
-                    return UserStats(**item)
-            return None
+            items = self._conversations_store().find("by_user", ("user_stats", user_id), limit=1)
+            return UserStats(**items[0]) if items else None
         except Exception as e:
             logger.error(f"Failed to get user stats locally: {e}")
             return None
@@ -808,11 +827,9 @@ class DatabaseService:
     def _get_top_users_local(self, limit: int) -> List[UserStats]:
         """Get top users from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            stats = [UserStats(**item) for item in data if item.get('type') == 'user_stats']
-            # Sort by total cost descending
-            stats.sort(key=lambda x: x.totalCostUsd, reverse=True)
-            return stats[:limit]
+            # Highest total cost first
+            items = self._conversations_store().find("by_cost", ("user_stats",), limit=limit, descending=True)
+            return [UserStats(**item) for item in items]
         except Exception as e:
             logger.error(f"Failed to get top users locally: {e}")
             return []
@@ -820,9 +837,8 @@ class DatabaseService:
     def _get_blocked_users_local(self) -> List[UserStats]:
         """Get blocked users from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            return [UserStats(**item) for item in data 
-                   if item.get('type') == 'user_stats' and item.get('isBlocked') == True]
+            items = self._conversations_store().find("by_type", ("user_stats",))
+            return [UserStats(**item) for item in items if item.get('isBlocked') == True]
         except Exception as e:
             logger.error(f"Failed to get blocked users locally: {e}")
             return []
@@ -830,11 +846,10 @@ class DatabaseService:
     def _get_personality_config_local(self, personality_name: str) -> Optional[PersonalityConfig]:
         """Get personality config from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            for item in data:
-                if item.get('personalityName') == personality_name and item.get('type') == 'personality_config':
-                    return PersonalityConfig(**item)
-            return None
+            items = self._conversations_store().find(
+                "by_personality_name", ("personality_config", personality_name), limit=1
+            )
+            return PersonalityConfig(**items[0]) if items else None
         except Exception as e:
             logger.error(f"Failed to get personality config locally: {e}")
             return None
@@ -842,9 +857,8 @@ class DatabaseService:
     def _get_all_personalities_local(self) -> List[PersonalityConfig]:
         """Get all personalities from local storage (not just active)"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            return [PersonalityConfig(**item) for item in data 
-                   if item.get('type') == 'personality_config']
+            items = self._conversations_store().find("by_type", ("personality_config",))
+            return [PersonalityConfig(**item) for item in items]
         except Exception as e:
             logger.error(f"Failed to get all personalities locally: {e}")
             return []
@@ -852,16 +866,9 @@ class DatabaseService:
     def _delete_personality_config_local(self, personality_name: str) -> bool:
         """Delete personality config from local storage"""
         try:
-            data = self._load_from_local_file(self.conversations_path)
-            
-            # Filter out the personality to delete
-            filtered_data = [
-                item for item in data 
-                if not (item.get('personalityName') == personality_name and item.get('type') == 'personality_config')
-            ]
-            
-            # Save filtered data back
-            self._save_to_local_file(self.conversations_path, filtered_data)
+            self._local_store(self.conversations_path).delete_where(
+                {'personalityName': personality_name, 'type': 'personality_config'}
+            )
             
             logger.info(f"🗑️ Deleted personality config locally: {personality_name}")
             return True
@@ -872,14 +879,8 @@ class DatabaseService:
     def _save_enhanced_text_local(self, text: EnhancedSpiritualText) -> bool:
         """Save enhanced text to local spiritual-texts.json"""
         try:
-            # Load existing spiritual texts
-            data = self._load_from_local_file(self.spiritual_texts_path)
-            
-            # Add new enhanced text
-            data.append(asdict(text))
-            
-            # Save back to file
-            self._save_to_local_file(self.spiritual_texts_path, data)
+            # Append to the spiritual texts log
+            self._local_store(self.spiritual_texts_path).append(asdict(text))
             
             logger.info(f"💾 Saved enhanced spiritual text locally: {text.id}")
             return True
@@ -0,0 +1,181 @@
+"""
+Embedding Cache for Vimarsh
+
+Bounded cache for text embeddings keyed by a content hash of
+(model_name, task_type, cleaned text). Two tiers:
+
+- L1: in-memory LRU (per worker process)
+- L2: optional SQLite file that survives restarts and is shared by workers
+      on the same host (enabled by setting EMBEDDING_CACHE_PATH)
+
+Vectors are stored as float32 blobs, so a 768-dim embedding costs ~3 KB.
+The SQLite tier is capped at persistent_max_entries rows; the oldest rows
+(by created_at) are deleted when it grows past the cap.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + optional SQLite) embedding cache"""
+
+    def __init__(self, max_entries: int = 10000, persistent_path: Optional[str] = None,
+                 persistent_max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.persistent_path = persistent_path
+        self.persistent_max_entries = persistent_max_entries  # 0 = unbounded
+        # Rows written between cap checks (the tier may exceed the cap by this much meanwhile)
+        self._prune_interval = max(1, min(256, persistent_max_entries // 20))
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Metrics
+        self._memory_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._writes = 0
+
+        if persistent_path:
+            self._open_persistent_tier(persistent_path)
+
+    @classmethod
+    def from_env(cls) -> Optional["EmbeddingCache"]:
+        """Create a cache from EMBEDDING_CACHE_* environment variables (None if disabled)"""
+        if os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        return cls(
+            max_entries=int(os.getenv('EMBEDDING_CACHE_SIZE', '10000')),
+            persistent_path=os.getenv('EMBEDDING_CACHE_PATH') or None,
+            persistent_max_entries=int(os.getenv('EMBEDDING_CACHE_PERSISTENT_SIZE', '100000'))
+        )
+
+    @staticmethod
+    def make_key(model_name: str, task_type: str, cleaned_text: str) -> str:
+        """Content-hash key for an embedding request"""
+        payload = f"{model_name}\x1f{task_type}\x1f{cleaned_text}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def _open_persistent_tier(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at)")
+            self._db.commit()
+            self._prune_persistent()
+            logger.info(f"✅ Persistent embedding cache opened at {path}")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Persistent embedding cache unavailable ({e}); using memory only")
+            self._db = None
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return a cached embedding, promoting persistent hits into memory"""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return vector.tolist()
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT vector FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding cache read failed: {e}")
+                    row = None
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self._persistent_hits += 1
+                    return vector.tolist()
+
+            self._misses += 1
+            return None
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        """Store an embedding in every tier"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            self._writes += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                        (key, vector.tobytes(), time.time())
+                    )
+                    self._db.commit()
+                    if self._writes % self._prune_interval == 0:
+                        self._prune_persistent()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding cache write failed: {e}")
+
+    def _prune_persistent(self) -> None:
+        """Delete the oldest SQLite rows beyond persistent_max_entries"""
+        if self._db is None or self.persistent_max_entries <= 0:
+            return
+        excess = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.persistent_max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY created_at LIMIT ?)", (excess,)
+            )
+            self._db.commit()
+            logger.debug(f"Embedding cache: pruned {excess} oldest persistent entries")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the admin cache metrics endpoint"""
+        with self._lock:
+            hits = self._memory_hits + self._persistent_hits
+            total = hits + self._misses
+            persistent_entries = 0
+            if self._db is not None:
+                try:
+                    persistent_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent_enabled": self._db is not None,
+                "persistent_entries": persistent_entries,
+                "persistent_max_entries": self.persistent_max_entries,
+                "memory_hits": self._memory_hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "hit_rate": hits / total if total else 0.0
+            }
@@ -6,8 +6,12 @@ to reduce deployment size and eliminate heavy ML dependencies.
 """
 
 import os
+import time
+import random
 import logging
-from typing import List, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
 from dataclasses import dataclass
 
 try:
@@ -17,8 +21,21 @@ except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
 
+try:
+    from .embedding_cache import EmbeddingCache
+    from .single_flight import SingleFlight, get_single_flight
+except ImportError:
+    from embedding_cache import EmbeddingCache
+    from single_flight import SingleFlight, get_single_flight
+
 logger = logging.getLogger(__name__)
 
+# batchEmbedContents accepts at most 100 requests per call
+MAX_BATCH_SIZE = 100
+
+# (model_name, texts, task_type) -> one embedding per text, in order
+EmbeddingTransport = Callable[[str, List[str], str], List[List[float]]]
+
 @dataclass
 class EmbeddingResult:
     """Result from embedding generation"""
@@ -26,6 +43,52 @@ class EmbeddingResult:
     model: str
     dimension: int
     text_length: int
+    error: Optional[str] = None
+    
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 / ResourceExhausted errors from the Gemini API"""
+    if getattr(error, 'code', None) == 429:
+        return True
+    message = str(error).lower()
+    return '429' in message or 'resource exhausted' in message or 'resource_exhausted' in message or 'rate limit' in message
+
+class AdaptiveBackoff:
+    """
+    Backoff shared by all batch workers
+    
+    Each 429 doubles the delay (with jitter) and pauses every worker until it
+    has elapsed; each successful request halves it again.
+    """
+    
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self.rate_limited = 0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self) -> None:
+        with self._lock:
+            remaining = self._resume_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+    
+    def on_rate_limited(self) -> float:
+        with self._lock:
+            self.rate_limited += 1
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+            pause = self.delay * random.uniform(0.5, 1.0)
+            self._resume_at = max(self._resume_at, time.monotonic() + pause)
+            return pause
+    
+    def on_success(self) -> None:
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay / 2 >= self.base_delay else 0.0
 
 class GeminiEmbeddingService:
     """
@@ -82,6 +145,24 @@ class GeminiEmbeddingService:
         self.client = None
         self.dimension = 768  # text-embedding-004 dimension
         
+        # Query/document embedding cache (EMBEDDING_CACHE_* environment variables)
+        self.cache = EmbeddingCache.from_env()
+        
+        # Batch request settings (EMBEDDING_BATCH_* environment variables)
+        self.batch_size = max(1, min(int(os.getenv('EMBEDDING_BATCH_SIZE', str(MAX_BATCH_SIZE))), MAX_BATCH_SIZE))
+        self.batch_max_chars = int(os.getenv('EMBEDDING_BATCH_MAX_CHARS', '60000'))
+        self.batch_concurrency = max(1, int(os.getenv('EMBEDDING_BATCH_CONCURRENCY', '4')))
+        self.max_retries = int(os.getenv('EMBEDDING_MAX_RETRIES', '5'))
+        self.backoff = AdaptiveBackoff()
+        
+        # Optional replacement for the Gemini batch call (used for offline tests/benchmarks)
+        self.transport: Optional[EmbeddingTransport] = None
+        self._batch_requests = 0
+        self._failed_items = 0
+        
+        # Concurrent requests for the same text share one embed_content call
+        self.single_flight = get_single_flight("embeddings")
+        
         if not GEMINI_AVAILABLE:
             logger.error("❌ google-generativeai package not available")
             raise ImportError("google-generativeai package is required")
@@ -116,14 +197,33 @@ class GeminiEmbeddingService:
             # Clean and prepare text
             cleaned_text = self._clean_text(text)
             
+            # Repeated questions are served from the cache
+            cache_key = None
+            if self.cache is not None:
+                cache_key = EmbeddingCache.make_key(self.model_name, task_type, cleaned_text)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return EmbeddingResult(
+                        embedding=cached,
+                        model=self.model_name,
+                        dimension=len(cached),
+                        text_length=len(cleaned_text)
+                    )
+            
             # Generate embedding using Gemini API
-            result = self.client.embed_content(
-                model=self.model_name,
-                content=cleaned_text,
-                task_type=task_type
-            )
+            def embed() -> List[float]:
+                result = self.client.embed_content(
+                    model=self.model_name,
+                    content=cleaned_text,
+                    task_type=task_type
+                )
+                embedding = result['embedding']
+                if cache_key is not None:
+                    self.cache.put(cache_key, embedding)
+                return embedding
             
-            embedding = result['embedding']
+            flight_key = SingleFlight.fingerprint(self.model_name, task_type, cleaned_text)
+            embedding = self.single_flight.do(flight_key, embed)
             
             return EmbeddingResult(
                 embedding=embedding,
@@ -141,40 +241,141 @@ class GeminiEmbeddingService:
         """
         Generate embeddings for multiple texts
         
+        Cache misses are de-duplicated and packed into batch requests of at most
+        batch_size texts / batch_max_chars characters, which are sent with up to
+        batch_concurrency requests in flight. Texts that cannot be embedded come
+        back as failed results (``result.failed``) with an empty embedding.
+        
         Args:
             texts: List of texts to embed
             task_type: Gemini task type
             
         Returns:
-            List of EmbeddingResult objects
+            List of EmbeddingResult objects, in input order
         """
-        if not self.client:
+        if not self.client and self.transport is None:
             raise RuntimeError("Gemini client not initialized")
         
-        results = []
+        cleaned = [self._clean_text(text) for text in texts]
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
         
-        for i, text in enumerate(texts):
+        for i, text in enumerate(cleaned):
+            if not text:
+                results[i] = self._failed_result(text, "empty text")
+                continue
+            if self.cache is not None:
+                cached = self.cache.get(EmbeddingCache.make_key(self.model_name, task_type, text))
+                if cached is not None:
+                    results[i] = self._make_result(text, cached)
+                    continue
+            pending.setdefault(text, []).append(i)
+        
+        batches = self._pack_batches(list(pending))
+        if batches:
+            workers = min(self.batch_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding-batch") as executor:
+                for batch_results in executor.map(lambda batch: self._embed_batch(batch, task_type), batches):
+                    for text, result in batch_results.items():
+                        for i in pending[text]:
+                            results[i] = result
+        
+        failed = sum(1 for result in results if result.failed)
+        self._failed_items += failed
+        if failed:
+            logger.warning(f"⚠️ {failed}/{len(texts)} texts could not be embedded")
+        logger.info(f"✅ Generated {len(texts) - failed} embeddings ({len(batches)} batch requests)")
+        return results
+    
+    def _pack_batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into batch requests within the item and character budgets"""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_chars = 0
+        for text in texts:
+            if current and (len(current) >= self.batch_size or current_chars + len(text) > self.batch_max_chars):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(text)
+            current_chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _embed_batch(self, texts: List[str], task_type: str) -> Dict[str, EmbeddingResult]:
+        """
+        Embed one batch; a rejected batch is bisected so that only the
+        offending texts are reported as failed
+        """
+        try:
+            embeddings = self._request_with_backoff(texts, task_type)
+        except Exception as e:
+            if len(texts) > 1 and not _is_rate_limit_error(e):
+                middle = len(texts) // 2
+                results = self._embed_batch(texts[:middle], task_type)
+                results.update(self._embed_batch(texts[middle:], task_type))
+                return results
+            logger.error(f"❌ Failed to generate {len(texts)} embedding(s): {e}")
+            return {text: self._failed_result(text, str(e)) for text in texts}
+        
+        results = {}
+        for text, embedding in zip(texts, embeddings):
+            embedding = list(embedding)
+            if self.cache is not None:
+                self.cache.put(EmbeddingCache.make_key(self.model_name, task_type, text), embedding)
+            results[text] = self._make_result(text, embedding)
+        return results
+    
+    def _request_with_backoff(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """Send one batch request, retrying 429s with the shared adaptive backoff"""
+        attempt = 0
+        while True:
+            self.backoff.wait()
             try:
-                result = self.generate_embedding(text, task_type)
-                results.append(result)
-                
-                # Add small delay to respect rate limits
-                if i > 0 and i % 10 == 0:
-                    logger.info(f"Generated {i+1}/{len(texts)} embeddings")
-                    
+                embeddings = self._send_batch(texts, task_type)
             except Exception as e:
-                logger.error(f"❌ Failed to generate embedding for text {i}: {e}")
-                # Return zero vector as fallback
-                fallback_result = EmbeddingResult(
-                    embedding=[0.0] * self.dimension,
-                    model=self.model_name,
-                    dimension=self.dimension,
-                    text_length=len(text)
-                )
-                results.append(fallback_result)
+                if not _is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                pause = self.backoff.on_rate_limited()
+                logger.warning(f"⚠️ Embedding API rate limited, retry {attempt}/{self.max_retries} in {pause:.1f}s")
+                continue
+            self.backoff.on_success()
+            return embeddings
+    
+    def _send_batch(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """One provider call for a whole batch (batchEmbedContents under the hood)"""
+        self._batch_requests += 1
+        if self.transport is not None:
+            embeddings = self.transport(self.model_name, texts, task_type)
+        else:
+            result = self.client.embed_content(
+                model=self.model_name,
+                content=texts,
+                task_type=task_type
+            )
+            embeddings = result['embedding']
         
-        logger.info(f"✅ Generated {len(results)} embeddings")
-        return results
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, received {len(embeddings)}")
+        return embeddings
+    
+    def _make_result(self, text: str, embedding: List[float]) -> EmbeddingResult:
+        return EmbeddingResult(
+            embedding=embedding,
+            model=self.model_name,
+            dimension=len(embedding),
+            text_length=len(text)
+        )
+    
+    def _failed_result(self, text: str, error: str) -> EmbeddingResult:
+        return EmbeddingResult(
+            embedding=[],
+            model=self.model_name,
+            dimension=0,
+            text_length=len(text),
+            error=error
+        )
     
     def generate_query_embedding(self, query: str) -> EmbeddingResult:
         """
@@ -224,26 +425,35 @@ class GeminiEmbeddingService:
             Cosine similarity score (0-1)
         """
         try:
-            import numpy as np
-            
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
-            
-            # Calculate cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
+            try:
+                from .vector_scoring import cosine_similarity
+            except ImportError:
+                from vector_scoring import cosine_similarity
             
-            similarity = dot_product / (norm1 * norm2)
+            similarity = cosine_similarity(embedding1, embedding2)
             return max(0.0, min(1.0, similarity))  # Clamp to [0, 1]
             
         except Exception as e:
             logger.error(f"❌ Failed to calculate similarity: {e}")
             return 0.0
     
+    def get_cache_stats(self) -> dict:
+        """Get embedding cache hit/miss statistics"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+    
+    def get_batch_stats(self) -> dict:
+        """Batch request counters (requests sent, 429s seen, texts that failed)"""
+        return {
+            "batch_requests": self._batch_requests,
+            "rate_limited": self.backoff.rate_limited,
+            "failed_items": self._failed_items,
+            "batch_size": self.batch_size,
+            "concurrency": self.batch_concurrency,
+            "coalesced_requests": self.single_flight.shared
+        }
+    
     def get_model_info(self) -> dict:
         """Get information about the current embedding model"""
         return {
@@ -275,6 +485,12 @@ def get_gemini_embedding_service() -> GeminiEmbeddingService:
     
     return _gemini_embedding_service
 
+def get_embedding_cache_metrics() -> dict:
+    """Embedding cache metrics for admin endpoints (empty if the service was never created)"""
+    if _gemini_embedding_service is None:
+        return {}
+    return _gemini_embedding_service.get_cache_stats()
+
 # Compatibility functions for drop-in replacement
 def encode(text: Union[str, List[str]], task_type: str = "RETRIEVAL_DOCUMENT") -> Union[List[float], List[List[float]]]:
     """
@@ -285,7 +501,7 @@ def encode(text: Union[str, List[str]], task_type: str = "RETRIEVAL_DOCUMENT") -
         task_type: Task type for Gemini API
         
     Returns:
-        Single embedding or list of embeddings
+        Single embedding or list of embeddings (an empty list for texts that failed)
     """
     service = get_gemini_embedding_service()
     
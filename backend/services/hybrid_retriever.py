@@ -0,0 +1,277 @@
+"""
+Hybrid Lexical + Vector Retrieval for Vimarsh
+
+Runs vector search (VectorDatabaseService.semantic_search) and BM25 keyword
+search (SimpleRAGService) concurrently and fuses the two ranked lists:
+
+- reciprocal rank fusion (default): score = sum of weight / (rrf_k + rank)
+- weighted: weighted sum of the stages' own relevance scores (both in [0, 1])
+
+Passages are deduplicated by verse/citation (e.g. "Bhagavad Gita 2.47" and
+"Bhagavad Gita, Chapter 2, Verse 47" are the same passage) or, without a
+verse reference, by their normalized opening text. A passage found by both
+stages keeps one copy and both contributions.
+
+Each stage has a latency budget; a stage that overruns it (or fails) is
+dropped and the other stage's candidates are used, so adding lexical
+retrieval never adds a serial round-trip.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .vector_database_service import ContentType, PersonalityType, SearchResult, VectorDocument
+    from .lexical_index import fold
+except ImportError:
+    from vector_database_service import ContentType, PersonalityType, SearchResult, VectorDocument
+    from lexical_index import fold
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STAGE = "vector"
+LEXICAL_STAGE = "lexical"
+
+_REFERENCE_WORDS = {'chapter', 'ch', 'verse', 'verses', 'v', 'text', 'sloka', 'shloka'}
+_KEY_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def citation_key(document: VectorDocument) -> str:
+    """Deduplication key: the verse reference when there is one, else the opening text"""
+    reference = document.citation or ''
+    if document.verse and not re.search(r'\d', reference):
+        reference = f"{document.source} {document.chapter or ''} {document.verse}"
+    tokens = [t for t in _KEY_TOKEN.findall(fold(reference)) if t not in _REFERENCE_WORDS]
+    if any(t.isdigit() for t in tokens):
+        return 'ref:' + ' '.join(tokens)
+    return 'text:' + ' '.join(_KEY_TOKEN.findall(fold(document.content))[:24])
+
+
+@dataclass
+class HybridCandidate:
+    """One passage with its per-stage ranks and scores"""
+    key: str
+    document: VectorDocument
+    fused_score: float = 0.0
+    ranks: Dict[str, int] = field(default_factory=dict)
+    scores: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def relevance_score(self) -> float:
+        """Best stage relevance (cosine or normalized BM25), comparable to single-stage scores"""
+        return max(self.scores.values()) if self.scores else 0.0
+
+
+@dataclass
+class HybridRetrievalResult:
+    """Fused candidates plus what each stage cost"""
+    candidates: List[HybridCandidate]
+    stage_ms: Dict[str, float] = field(default_factory=dict)
+    stage_counts: Dict[str, int] = field(default_factory=dict)
+    skipped_stages: List[str] = field(default_factory=list)
+
+    def to_search_results(self, personality: Optional[PersonalityType] = None) -> List[SearchResult]:
+        return [
+            SearchResult(
+                document=c.document,
+                relevance_score=c.relevance_score,
+                personality_match=personality is None or c.document.personality == personality,
+                content_type_match=True
+            )
+            for c in self.candidates
+        ]
+
+
+def fuse_rankings(
+    rankings: Dict[str, List[Tuple[VectorDocument, float]]],
+    method: str = "rrf",
+    rrf_k: int = 60,
+    weights: Optional[Dict[str, float]] = None
+) -> List[HybridCandidate]:
+    """
+    Fuse per-stage ranked (document, score) lists into one deduplicated ranking
+
+    Within a stage only a passage's best rank counts; across stages the
+    contributions add up.
+    """
+    weights = weights or {}
+    candidates: Dict[str, HybridCandidate] = {}
+    for stage, ranked in rankings.items():
+        weight = weights.get(stage, 1.0)
+        rank = 0
+        for document, score in ranked:
+            key = citation_key(document)
+            candidate = candidates.get(key)
+            if candidate is None:
+                candidate = candidates[key] = HybridCandidate(key=key, document=document)
+            if stage in candidate.ranks:
+                continue  # duplicate passage within one stage
+            rank += 1
+            candidate.ranks[stage] = rank
+            candidate.scores[stage] = score
+            if method == "weighted":
+                candidate.fused_score += weight * score
+            else:
+                candidate.fused_score += weight / (rrf_k + rank)
+    return sorted(candidates.values(), key=lambda c: c.fused_score, reverse=True)
+
+
+class SimpleRAGLexicalSource:
+    """BM25 candidates from SimpleRAGService as VectorDocuments"""
+
+    def __init__(self, rag_service=None):
+        self._rag_service = rag_service
+
+    @property
+    def rag_service(self):
+        if self._rag_service is None:
+            try:
+                from .rag_service import simple_rag_service
+            except ImportError:
+                from rag_service import simple_rag_service
+            self._rag_service = simple_rag_service
+        return self._rag_service
+
+    def search(self, query: str, personality: Optional[PersonalityType], k: int) -> List[Tuple[VectorDocument, float]]:
+        hits = self.rag_service.search_content(query, personality.value if personality else None, k)
+        results = []
+        for hit in hits:
+            content = hit.content
+            try:
+                document_personality = PersonalityType(content.personality)
+            except ValueError:
+                continue
+            try:
+                content_type = ContentType(content.content_type)
+            except ValueError:
+                content_type = ContentType.TEACHING
+            results.append((VectorDocument(
+                id=content.id,
+                content=content.content,
+                personality=document_personality,
+                content_type=content_type,
+                source=content.source,
+                chapter=str(content.chapter) if content.chapter is not None else None,
+                verse=str(content.verse) if content.verse is not None else None,
+                citation=content.get_citation(),
+                relevance_score=hit.relevance_score
+            ), hit.relevance_score))
+        return results
+
+
+class HybridRetriever:
+    """Concurrent lexical + vector candidate generation with rank fusion"""
+
+    def __init__(
+        self,
+        vector_db=None,
+        lexical_source=None,
+        fusion: str = "rrf",
+        rrf_k: int = 60,
+        vector_weight: float = 1.0,
+        lexical_weight: float = 1.0,
+        candidate_factor: int = 3,
+        vector_budget_ms: float = 2000.0,
+        lexical_budget_ms: float = 250.0,
+        lexical_min_relevance: float = 0.1
+    ):
+        self.vector_db = vector_db
+        self.lexical_source = lexical_source if lexical_source is not None else SimpleRAGLexicalSource()
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.weights = {VECTOR_STAGE: vector_weight, LEXICAL_STAGE: lexical_weight}
+        self.candidate_factor = max(1, candidate_factor)
+        self.budgets_ms = {VECTOR_STAGE: vector_budget_ms, LEXICAL_STAGE: lexical_budget_ms}
+        self.lexical_min_relevance = lexical_min_relevance
+
+    @classmethod
+    def from_env(cls, vector_db=None, lexical_source=None) -> "HybridRetriever":
+        return cls(
+            vector_db=vector_db,
+            lexical_source=lexical_source,
+            fusion=os.getenv('HYBRID_FUSION', 'rrf').lower(),
+            rrf_k=int(os.getenv('HYBRID_RRF_K', '60')),
+            vector_weight=float(os.getenv('HYBRID_VECTOR_WEIGHT', '1.0')),
+            lexical_weight=float(os.getenv('HYBRID_LEXICAL_WEIGHT', '1.0')),
+            candidate_factor=int(os.getenv('HYBRID_CANDIDATE_FACTOR', '3')),
+            vector_budget_ms=float(os.getenv('HYBRID_VECTOR_BUDGET_MS', '2000')),
+            lexical_budget_ms=float(os.getenv('HYBRID_LEXICAL_BUDGET_MS', '250'))
+        )
+
+    async def _run_stage(self, stage: str, work: Awaitable[List[Tuple[VectorDocument, float]]],
+                         result: HybridRetrievalResult) -> List[Tuple[VectorDocument, float]]:
+        start = time.perf_counter()
+        try:
+            ranked = await asyncio.wait_for(work, timeout=self.budgets_ms[stage] / 1000)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {stage} retrieval exceeded its {self.budgets_ms[stage]:.0f} ms budget, skipped")
+            result.skipped_stages.append(stage)
+            ranked = []
+        except Exception as e:
+            logger.warning(f"⚠️ {stage} retrieval failed, skipped: {e}")
+            result.skipped_stages.append(stage)
+            ranked = []
+        result.stage_ms[stage] = (time.perf_counter() - start) * 1000
+        result.stage_counts[stage] = len(ranked)
+        return ranked
+
+    async def _vector_candidates(self, query: str, personality: Optional[PersonalityType], fetch_k: int,
+                                 min_relevance: float, include_cross_personality: bool,
+                                 cross_min_relevance: Optional[float]) -> List[Tuple[VectorDocument, float]]:
+        results = await self.vector_db.semantic_search(
+            query=query,
+            personality=personality,
+            content_types=None,
+            top_k=fetch_k,
+            min_relevance=min_relevance,
+            include_cross_personality=include_cross_personality,
+            cross_min_relevance=cross_min_relevance
+        )
+        return [(r.document, r.relevance_score) for r in results]
+
+    async def _lexical_candidates(self, query: str, personality: Optional[PersonalityType],
+                                  fetch_k: int) -> List[Tuple[VectorDocument, float]]:
+        ranked = await asyncio.to_thread(self.lexical_source.search, query, personality, fetch_k)
+        return [(document, score) for document, score in ranked if score >= self.lexical_min_relevance]
+
+    async def retrieve(
+        self,
+        query: str,
+        personality: Optional[PersonalityType] = None,
+        top_k: int = 5,
+        min_relevance: float = 0.1,
+        include_cross_personality: bool = False,
+        cross_min_relevance: Optional[float] = None
+    ) -> HybridRetrievalResult:
+        """Fused top_k passages; with a personality and no cross-personality, only that personality's"""
+        fetch_k = top_k * self.candidate_factor
+        result = HybridRetrievalResult(candidates=[])
+
+        stages: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        if self.vector_db is not None:
+            stages[VECTOR_STAGE] = lambda: self._vector_candidates(
+                query, personality, fetch_k, min_relevance, include_cross_personality, cross_min_relevance
+            )
+        if self.lexical_source is not None:
+            lexical_personality = None if include_cross_personality else personality
+            stages[LEXICAL_STAGE] = lambda: self._lexical_candidates(query, lexical_personality, fetch_k)
+
+        ranked_lists = await asyncio.gather(*(
+            self._run_stage(stage, make_work(), result) for stage, make_work in stages.items()
+        ))
+        rankings = dict(zip(stages.keys(), ranked_lists))
+
+        candidates = fuse_rankings(rankings, self.fusion, self.rrf_k, self.weights)
+        if personality is not None and include_cross_personality:
+            # Same ordering rule as semantic_search: the personality's passages first
+            candidates.sort(key=lambda c: c.document.personality != personality)
+        result.candidates = candidates[:top_k]
+
+        logger.debug(f"🔀 Hybrid retrieval: {result.stage_counts} candidates, "
+                     f"{', '.join(f'{s} {ms:.1f} ms' for s, ms in result.stage_ms.items())}")
+        return result
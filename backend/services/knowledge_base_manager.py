@@ -24,6 +24,16 @@ except ImportError:
     HAS_NUMPY = False
     np = None  # Will cause AttributeError if used, alerting developer
 
+# Shared vectorized scoring engine (requires numpy)
+try:
+    from .vector_scoring import EmbeddingMatrix, cosine_similarity
+except ImportError:
+    try:
+        from vector_scoring import EmbeddingMatrix, cosine_similarity
+    except ImportError:
+        EmbeddingMatrix = None
+        cosine_similarity = None
+
 # Optional dependency for vector embeddings - using Gemini API instead of heavy packages
 try:
     from .gemini_embedding_service import GeminiTransformer
@@ -323,7 +333,7 @@ class KnowledgeBaseManager:
             
             # Generate embedding
             embedding = self.embedding_model.encode(text, convert_to_tensor=False)
-            embedding_list = embedding.tolist()
+            embedding_list = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
             
             # Apply domain-specific weighting if needed
             if domain in self.domain_strategies:
@@ -390,23 +400,17 @@ class KnowledgeBaseManager:
                     retrieval_time=(datetime.now() - start_time).total_seconds()
                 )
             
-            # Calculate similarities
-            similarities = []
-            for chunk in all_chunks:
-                similarity = self._calculate_cosine_similarity(query_embedding, chunk.embedding)
-                similarities.append(similarity)
+            # Score all chunks with a single matrix-vector product
+            matrix = EmbeddingMatrix([chunk.embedding for chunk in all_chunks])
+            similarities = matrix.score(query_embedding)
             
-            # Filter by threshold and sort
-            filtered_results = [
-                (chunk, sim) for chunk, sim in zip(all_chunks, similarities)
-                if sim >= similarity_threshold
+            # Filter by threshold and take top k
+            total_results = int((similarities >= similarity_threshold).sum())
+            top_results = [
+                (all_chunks[row], score)
+                for row, score in matrix.top_k_from_scores(similarities, k, similarity_threshold)
             ]
             
-            filtered_results.sort(key=lambda x: x[1], reverse=True)
-            
-            # Take top k results
-            top_results = filtered_results[:k]
-            
             retrieval_time = (datetime.now() - start_time).total_seconds()
             
             return RetrievalResult(
@@ -414,7 +418,7 @@ class KnowledgeBaseManager:
                 query=query,
                 personality_id=personality_id,
                 similarity_scores=[sim for _, sim in top_results],
-                total_results=len(filtered_results),
+                total_results=total_results,
                 retrieval_time=retrieval_time
             )
             
@@ -432,20 +436,7 @@ class KnowledgeBaseManager:
     def _calculate_cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
         try:
-            # Convert to numpy arrays
-            a = np.array(vec1)
-            b = np.array(vec2)
-            
-            # Calculate cosine similarity
-            dot_product = np.dot(a, b)
-            norm_a = np.linalg.norm(a)
-            norm_b = np.linalg.norm(b)
-            
-            if norm_a == 0 or norm_b == 0:
-                return 0.0
-            
-            similarity = dot_product / (norm_a * norm_b)
-            return float(similarity)
+            return cosine_similarity(vec1, vec2)
             
         except Exception as e:
             logger.error(f"❌ Similarity calculation failed: {e}")
@@ -0,0 +1,245 @@
+"""
+Lexical (BM25) Search Index for Vimarsh
+
+Inverted index used for keyword retrieval when embeddings are unavailable:
+
+- tokenize() folds case and diacritics (IAST "kṛṣṇa" -> "krsna"), maps common
+  romanizations of Sanskrit terms to one spelling (krsna/krishn -> krishna,
+  geeta -> gita, atma -> atman, ...), drops stopwords and applies a light
+  English suffix stemmer (actions/acting/acted -> act) that leaves the
+  canonical Sanskrit terms alone
+- postings are built once per corpus; a query only touches the postings of
+  its own terms and picks the top-k with a heap
+- query terms missing from the vocabulary are expanded to indexed terms that
+  start with them, so partial words still match as they did with the old
+  substring search
+"""
+
+import re
+import math
+import heapq
+import unicodedata
+import logging
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+_UNICODE_WORD = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves thee thou thy
+thine unto shall hath doth
+""".split())
+
+# Romanization variants (after diacritics are folded) -> canonical spelling
+SANSKRIT_VARIANTS = {
+    'krsna': 'krishna', 'krishn': 'krishna', 'krisna': 'krishna',
+    'geeta': 'gita', 'geetha': 'gita', 'githa': 'gita',
+    'bhagwad': 'bhagavad', 'bhagawad': 'bhagavad', 'bhagvad': 'bhagavad',
+    'bhagwat': 'bhagavat', 'bhagawat': 'bhagavat',
+    'atma': 'atman', 'aatma': 'atman', 'aatman': 'atman',
+    'dharm': 'dharma', 'dharam': 'dharma',
+    'karm': 'karma', 'karman': 'karma',
+    'yog': 'yoga',
+    'arjun': 'arjuna',
+    'moksa': 'moksha', 'moksh': 'moksha',
+    'samsar': 'samsara',
+    'nirvan': 'nirvana', 'nibbana': 'nirvana',
+    'jnan': 'jnana', 'gyan': 'jnana', 'gyana': 'jnana', 'gnana': 'jnana',
+    'bhakthi': 'bhakti', 'bhakt': 'bhakti',
+    'satva': 'sattva', 'satwa': 'sattva', 'sattwa': 'sattva',
+    'prakrti': 'prakriti', 'purusa': 'purusha',
+    'isvara': 'ishvara', 'iswara': 'ishvara', 'ishwar': 'ishvara', 'ishwara': 'ishvara',
+    'visnu': 'vishnu', 'siva': 'shiva',
+    'samkhya': 'sankhya', 'sanatan': 'sanatana',
+    'brahmana': 'brahmin',
+    'ahinsa': 'ahimsa',
+    'upanisad': 'upanishad', 'upanisads': 'upanishad', 'upanishads': 'upanishad',
+    'vedant': 'vedanta',
+    'gunas': 'guna',
+}
+
+# Canonical Sanskrit/Pali terms are never stemmed (e.g. "dharma" is not "dharm" + "a")
+SANSKRIT_TERMS = frozenset(SANSKRIT_VARIANTS.values()) | frozenset("""
+ahimsa ananda asana avatar avatara bhakti brahma brahman buddha dhamma dharma dhyana guna guru karma kshatriya
+mantra maya nirvana prana samadhi sangha satya shanti sutra tao veda vedas yoga yogi yogis
+""".split())
+
+_SUFFIXES = ('ments', 'ment', 'nesses', 'ness', 'fully', 'ful', 'ings', 'ing',
+             'ions', 'ion', 'edly', 'ed', 'ly')
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics (NFKD, combining marks removed)"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word: str) -> str:
+    """Light English suffix stripping; keeps at least three characters of stem"""
+    if len(word) <= 3 or word in SANSKRIT_TERMS:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]  # running -> runn -> run
+            elif word.endswith('i'):
+                word = word[:-1] + 'y'  # happiness, studied -> happy, study
+            break
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def normalize_term(word: str) -> str:
+    word = SANSKRIT_VARIANTS.get(word, word)
+    if word in SANSKRIT_TERMS:
+        return word
+    stemmed = stem(word)
+    return SANSKRIT_VARIANTS.get(stemmed, stemmed)
+
+
+@lru_cache(maxsize=65536)
+def _word_parts(word: str) -> Tuple[str, ...]:
+    """ASCII parts of one lowercased word once diacritics are folded (no stopwords)"""
+    return tuple(part for part in _WORD.findall(fold(word)) if part not in STOPWORDS)
+
+
+def tokenize(text: str) -> List[str]:
+    """Index terms of a text, in order (stopwords removed)"""
+    return [normalize_term(part) for word in _UNICODE_WORD.findall(text.lower()) for part in _word_parts(word)]
+
+
+class LexicalIndex:
+    """Okapi BM25 over an inverted index of (document, term frequency) postings"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_expansions: int = 10):
+        self.k1 = k1
+        self.b = b
+        self.max_expansions = max_expansions
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._vocabulary: Optional[List[str]] = None  # sorted, built lazily for prefix expansion
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self._lengths) if self._lengths else 0.0
+
+    def add(self, text: str) -> int:
+        """Index a document and return its number (0, 1, 2, ... in insertion order)"""
+        doc = len(self._lengths)
+        terms = tokenize(text)
+        for term, count in Counter(terms).items():
+            self._postings.setdefault(term, []).append((doc, count))
+        self._lengths.append(len(terms))
+        self._total_length += len(terms)
+        self._vocabulary = None
+        return doc
+
+    def add_many(self, texts: Iterable[str]) -> int:
+        added = 0
+        for text in texts:
+            self.add(text)
+            added += 1
+        return added
+
+    def to_state(self) -> Dict[str, object]:
+        """Plain-data state (builtins only) for snapshots"""
+        return {'k1': self.k1, 'b': self.b, 'max_expansions': self.max_expansions,
+                'postings': self._postings, 'lengths': self._lengths}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> "LexicalIndex":
+        index = cls(k1=state['k1'], b=state['b'], max_expansions=state['max_expansions'])
+        index._postings = state['postings']
+        index._lengths = state['lengths']
+        index._total_length = sum(index._lengths)
+        return index
+
+    def idf(self, term: str) -> float:
+        frequency = len(self._postings.get(term, ()))
+        return math.log(1.0 + (len(self._lengths) - frequency + 0.5) / (frequency + 0.5))
+
+    def _expand(self, term: str) -> List[str]:
+        """The term itself if indexed, else indexed terms it is a prefix of"""
+        if term in self._postings:
+            return [term]
+        if len(term) < 3:
+            return []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        expansions = []
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and len(expansions) < self.max_expansions:
+            candidate = self._vocabulary[position]
+            if not candidate.startswith(term):
+                break
+            expansions.append(candidate)
+            position += 1
+        return expansions
+
+    def query_terms(self, query: str) -> Dict[str, float]:
+        """Indexed terms for a query with their weights (query frequency)"""
+        weights: Dict[str, float] = {}
+        for term in tokenize(query):
+            for expanded in self._expand(term):
+                weights[expanded] = weights.get(expanded, 0.0) + 1.0
+        return weights
+
+    def max_score(self, terms: Dict[str, float]) -> float:
+        """Upper bound of a document's score for these terms (term frequency -> infinity)"""
+        return sum(weight * self.idf(term) * (self.k1 + 1.0) for term, weight in terms.items())
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        doc_filter: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        """Top-k (document number, BM25 score) pairs, best first"""
+        terms = self.query_terms(query)
+        return self.search_terms(terms, k, doc_filter)
+
+    def search_terms(
+        self,
+        terms: Dict[str, float],
+        k: int = 5,
+        doc_filter: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        if not terms or k <= 0 or not self._lengths:
+            return []
+        average = self.average_length or 1.0
+        scores: Dict[int, float] = {}
+        for term, weight in terms.items():
+            idf = self.idf(term) * weight
+            for doc, count in self._postings.get(term, ()):
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[doc] / average)
+                scores[doc] = scores.get(doc, 0.0) + idf * count * (self.k1 + 1.0) / (count + norm)
+
+        candidates = scores.items()
+        if doc_filter is not None:
+            candidates = [(doc, score) for doc, score in candidates if doc_filter(doc)]
+        return heapq.nlargest(k, candidates, key=lambda hit: hit[1])
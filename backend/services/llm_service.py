@@ -10,13 +10,38 @@ import os
 import logging
 import time
 import asyncio
+import threading
 import google.generativeai as genai
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, AsyncIterator
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    from .single_flight import SingleFlight, get_single_flight
+except ImportError:
+    from single_flight import SingleFlight, get_single_flight
+
 logger = logging.getLogger(__name__)
 
+# Dedicated, bounded pool for blocking generate_content calls (shared by all
+# LLMService instances) so LLM traffic never competes for the event loop's
+# default executor
+_llm_executor: Optional[ThreadPoolExecutor] = None
+_llm_executor_lock = threading.Lock()
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """Get the shared LLM client executor (LLM_EXECUTOR_MAX_WORKERS threads)"""
+    global _llm_executor
+    if _llm_executor is None:
+        with _llm_executor_lock:
+            if _llm_executor is None:
+                _llm_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('LLM_EXECUTOR_MAX_WORKERS', '32')),
+                    thread_name_prefix="llm-client"
+                )
+    return _llm_executor
+
 class PersonalityDomain(Enum):
     """Personality domains for classification"""
     SPIRITUAL = "spiritual"
@@ -47,6 +72,56 @@ class SpiritualResponse:
     max_allowed: int
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+class CharacterLimitedStream:
+    """
+    Applies the buffered path's character limit to a token stream
+    
+    The output is identical to stripping the full text and truncating it to
+    ``max_chars - 3`` characters plus "..." when it is too long: text is
+    released as soon as it is known to be inside the limit, and only the last
+    few characters (plus trailing whitespace) are held back.
+    """
+    
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.emitted = 0
+        self.truncated = False
+        self._pending = ""
+        self._started = False
+    
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of model output; returns the text that can be sent now"""
+        if self.truncated or not chunk:
+            return ""
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return ""
+            self._started = True
+        
+        self._pending += chunk
+        content_length = len(self._pending.rstrip())
+        if self.emitted + content_length > self.max_chars:
+            self.truncated = True
+            text = self._pending[:self.max_chars - 3 - self.emitted] + "..."
+            self.emitted = self.max_chars
+            self._pending = ""
+            return text
+        
+        safe = min(content_length, self.max_chars - 3 - self.emitted)
+        text, self._pending = self._pending[:safe], self._pending[safe:]
+        self.emitted += safe
+        return text
+    
+    def finish(self) -> str:
+        """Flush the held-back text once the stream has ended"""
+        if self.truncated:
+            return ""
+        text = self._pending.rstrip()
+        self._pending = ""
+        self.emitted += len(text)
+        return text
+
 class LLMService:
     """Production LLM service for generating spiritual guidance responses"""
     
@@ -61,6 +136,9 @@ class LLMService:
             self.model = genai.GenerativeModel('gemini-1.5-flash')
         else:
             self.model = None
+        
+        # Identical questions in flight at the same time share one Gemini call
+        self.single_flight = get_single_flight("llm")
             
         self._initialize_personalities()
     
@@ -389,6 +467,20 @@ Response:"""
         config = self.personalities[personality_id]
         prompt = config.prompt_template.format(query=query)
         
+        flight_key = SingleFlight.fingerprint(personality_id, prompt)
+        return await self.single_flight.do_async(
+            flight_key,
+            lambda: self._generate_with_retries(query, personality_id, config, prompt)
+        )
+    
+    async def _generate_with_retries(
+        self,
+        query: str,
+        personality_id: str,
+        config: PersonalityConfig,
+        prompt: str
+    ) -> SpiritualResponse:
+        """Call Gemini for one prompt with timeout handling and retry logic"""
         # Implement retry logic with timeout handling
         for attempt in range(config.max_retries + 1):
             try:
@@ -472,13 +564,131 @@ Response:"""
         """Generate response from Gemini API with async wrapper"""
         if not self.model:
             raise RuntimeError("Gemini model not configured")
-        # Wrap the synchronous Gemini call in an async context
-        return await asyncio.get_event_loop().run_in_executor(
-            None, 
-            self.model.generate_content, 
+        # Run the synchronous Gemini call on the dedicated LLM executor
+        return await asyncio.get_running_loop().run_in_executor(
+            get_llm_executor(),
+            self.model.generate_content,
             prompt
         )
     
+    async def stream_personality_response(
+        self,
+        query: str,
+        personality_id: str,
+        outcome: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a personality response as it is generated
+        
+        Yields text chunks with the character limit enforced on the stream. If
+        the model fails before producing any text, the same fallback message
+        as generate_personality_response is yielded instead. When given,
+        ``outcome["source"]`` is set like SpiritualResponse.source once the
+        stream ends: "gemini_api_*" only when the model's answer was streamed
+        in full, "fallback_*" otherwise (including failures after some text).
+        """
+        outcome = outcome if outcome is not None else {}
+        if not self.is_configured:
+            outcome["source"] = "fallback_not_configured"
+            yield "I apologize, but I cannot access my wisdom at this moment. Please try again later."
+            return
+        
+        if personality_id not in self.personalities:
+            logger.warning(f"Personality {personality_id} not found, defaulting to Krishna")
+            personality_id = "krishna"
+        
+        config = self.personalities[personality_id]
+        prompt = config.prompt_template.format(query=query)
+        limiter = CharacterLimitedStream(config.max_chars)
+        start_time = time.time()
+        first_chunk_time = None
+        
+        try:
+            async for chunk in self._stream_gemini_response(prompt, config.timeout_seconds):
+                text = limiter.feed(chunk)
+                if text:
+                    if first_chunk_time is None:
+                        first_chunk_time = time.time() - start_time
+                    yield text
+                if limiter.truncated:
+                    break
+            text = limiter.finish()
+            if text:
+                yield text
+        except asyncio.TimeoutError:
+            logger.error(f"⏰ Streaming timeout for {personality_id} after {config.timeout_seconds}s")
+            outcome["source"] = "fallback_timeout_error"
+            if limiter.emitted == 0:
+                yield f"{config.greeting_style}, I need more time to formulate my response. Please try asking your question again."
+            return
+        except Exception as e:
+            logger.error(f"❌ Gemini streaming failed for {personality_id}: {e}")
+            outcome["source"] = "fallback_api_error"
+            if limiter.emitted == 0:
+                yield f"{config.greeting_style}, I am experiencing difficulties accessing my wisdom. Please try your question again shortly."
+            return
+        
+        if limiter.emitted == 0:
+            logger.warning(f"⚠️ Empty streaming response from Gemini API for {personality_id}")
+            outcome["source"] = "fallback_empty_response"
+            yield f"{config.greeting_style}, I am unable to provide guidance at this moment. Please ask again with a specific question."
+            return
+        
+        outcome["source"] = f"gemini_api_{personality_id}_optimized"
+        logger.info(f"✅ Streamed {config.name} response: {limiter.emitted} chars, first chunk after "
+                    f"{first_chunk_time or 0:.2f}s, total {time.time() - start_time:.2f}s")
+    
+    async def _stream_gemini_response(self, prompt: str, timeout_seconds: float) -> AsyncIterator[str]:
+        """
+        Stream text chunks from generate_content(stream=True)
+        
+        The blocking iterator runs on the dedicated LLM executor and hands
+        chunks to the event loop through a queue; timeout_seconds applies to
+        the wait for each chunk. Closing the generator stops the producer at
+        the next chunk.
+        """
+        if not self.model:
+            raise RuntimeError("Gemini model not configured")
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        cancelled = threading.Event()
+        
+        def emit(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                cancelled.set()  # event loop already closed
+        
+        def produce():
+            try:
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    if cancelled.is_set():
+                        break
+                    try:
+                        text = chunk.text
+                    except (AttributeError, ValueError):
+                        text = ""  # e.g. a chunk without parts (blocked or finish-only)
+                    if text:
+                        emit(text)
+            except Exception as e:
+                emit(e)
+            finally:
+                emit(finished)
+        
+        loop.run_in_executor(get_llm_executor(), produce)
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout=timeout_seconds)
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+    
     def get_available_personalities(self) -> List[Dict[str, Any]]:
         """Get list of available personalities with their metadata"""
         return [
@@ -0,0 +1,377 @@
+"""
+Memory-Mapped Local Embedding Store for Vimarsh
+
+Binary replacement for keeping embeddings inside the vimarsh-db JSON corpora in
+local/development mode. Each personality gets three files:
+
+- {personality}.f32        raw float32 matrix (rows x dimension), unit-normalized,
+                           opened with np.memmap so worker processes share it
+                           through the OS page cache
+- {personality}.ids.tsv    compact sidecar: id, content offset, content length
+- {personality}.docs.jsonl document records (without embeddings), read lazily
+                           by byte offset only for the hits that are returned
+
+Writes are append-only; re-inserting an id appends a new row and the sidecar's
+last entry wins. rebuild() compacts stale rows away with atomic renames.
+Writers (threads or processes) are serialised with an advisory file lock
+where fcntl is available. The sidecar is written last, so it only ever lists
+rows whose content and embedding are complete; bytes a crashed writer left
+beyond what the sidecar covers are truncated before the next append.
+
+With VECTOR_STORE_PRECISION=float16 or int8 a quantized copy of each matrix is
+held in RAM and scanned instead of the memmap; only the top candidates' float32
+rows are read from the .f32 file to re-rank them exactly.
+"""
+
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+try:
+    from .vector_scoring import normalize_vector, top_k_indices
+    from .vector_quantization import SCORE_BLOCK_ROWS, QuantizedMatrix, rerank, resolve_precision
+except ImportError:
+    from vector_scoring import normalize_vector, top_k_indices
+    from vector_quantization import SCORE_BLOCK_ROWS, QuantizedMatrix, rerank, resolve_precision
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'vimarsh-db', 'embeddings')
+
+
+class _Partition:
+    """Open handles and sidecar index for a single personality"""
+
+    def __init__(self, ids: List[str], offsets: List[Tuple[int, int]], live: Dict[str, int], sidecar_size: int,
+                 sidecar_valid: int):
+        self.sidecar_size = sidecar_size  # detects appends made by other processes
+        self.sidecar_valid = sidecar_valid  # bytes up to the last complete sidecar line
+        self.ids = ids                # row -> id
+        self.offsets = offsets        # row -> (content offset, content length)
+        self.live = live              # id -> latest row
+        self.matrix: Optional[np.memmap] = None
+        self.matrix_rows = 0
+        self.dead_rows: Optional[np.ndarray] = None
+        self.compact: Optional[QuantizedMatrix] = None  # quantized in-RAM copy of the matrix
+        self.compact_rows = 0
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+
+class LocalEmbeddingStore:
+    """Per-personality memory-mapped embedding store with lazily read content"""
+
+    def __init__(
+        self,
+        root_path: Optional[str] = None,
+        dimension: int = 768,
+        precision: Optional[str] = None,
+        rerank_factor: Optional[int] = None
+    ):
+        self.root_path = os.path.abspath(root_path or os.getenv('VECTOR_STORE_PATH', DEFAULT_STORE_PATH))
+        self.dimension = dimension
+        self.precision = resolve_precision(precision, 'VECTOR_STORE_PRECISION')
+        self.rerank_factor = int(os.getenv('VECTOR_INDEX_RERANK_FACTOR', '4')) if rerank_factor is None else rerank_factor
+        self._partitions: Dict[str, _Partition] = {}
+        self._lock = threading.RLock()
+        self._file_locks: Dict[str, Any] = {}  # personality -> [lock file, depth]
+
+    # ------------------------------------------------------------------
+    # Paths and loading
+    # ------------------------------------------------------------------
+
+    def _paths(self, personality: str) -> Tuple[str, str, str]:
+        base = os.path.join(self.root_path, personality)
+        return f"{base}.f32", f"{base}.ids.tsv", f"{base}.docs.jsonl"
+
+    @contextmanager
+    def _write_locked(self, personality: str):
+        """Thread lock plus (when available) an exclusive lock on the personality's lock file"""
+        with self._lock:
+            held = self._file_locks.get(personality)
+            if held is not None:  # re-entered by this thread
+                held[1] += 1
+            elif fcntl is not None:
+                os.makedirs(self.root_path, exist_ok=True)
+                lock_file = open(os.path.join(self.root_path, f"{personality}.lock"), 'a')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                held = self._file_locks[personality] = [lock_file, 1]
+            try:
+                yield
+            finally:
+                if held is not None:
+                    held[1] -= 1
+                    if held[1] == 0:
+                        del self._file_locks[personality]
+                        fcntl.flock(held[0], fcntl.LOCK_UN)
+                        held[0].close()
+
+    def personalities(self) -> List[str]:
+        """Personalities that have a store on disk"""
+        if not os.path.isdir(self.root_path):
+            return []
+        return sorted(name[:-len('.ids.tsv')] for name in os.listdir(self.root_path) if name.endswith('.ids.tsv'))
+
+    def has_data(self) -> bool:
+        return any(self.count(p) > 0 for p in self.personalities())
+
+    def _load_partition(self, personality: str) -> _Partition:
+        _, ids_path, _ = self._paths(personality)
+        sidecar_size = os.path.getsize(ids_path) if os.path.exists(ids_path) else 0
+
+        partition = self._partitions.get(personality)
+        if partition is not None and partition.sidecar_size == sidecar_size:
+            return partition
+
+        ids: List[str] = []
+        offsets: List[Tuple[int, int]] = []
+        live: Dict[str, int] = {}
+        complete = b''
+        if os.path.exists(ids_path):
+            with open(ids_path, 'rb') as f:
+                data = f.read()
+            complete = data[:data.rfind(b'\n') + 1]  # a torn last line is ignored
+            for line in complete.decode('utf-8').splitlines():
+                parts = line.split('\t')
+                if len(parts) != 3:
+                    continue
+                doc_id, offset, length = parts
+                live[doc_id] = len(ids)
+                ids.append(doc_id)
+                offsets.append((int(offset), int(length)))
+
+        partition = _Partition(ids, offsets, live, sidecar_size, len(complete))
+        self._partitions[personality] = partition
+        return partition
+
+    def _matrix(self, personality: str, partition: _Partition) -> Optional[np.ndarray]:
+        """Memory-map the embedding file, remapping only when rows were appended"""
+        if partition.rows == 0:
+            return None
+        if partition.matrix is None or partition.matrix_rows != partition.rows:
+            matrix_path, _, _ = self._paths(personality)
+            partition.matrix = np.memmap(
+                matrix_path, dtype=np.float32, mode='r', shape=(partition.rows, self.dimension)
+            )
+            partition.matrix_rows = partition.rows
+            stale = np.ones(partition.rows, dtype=bool)
+            stale[list(partition.live.values())] = False
+            partition.dead_rows = stale if stale.any() else None
+            if self.precision != 'float32':
+                self._update_compact(partition)
+        return partition.matrix
+
+    def _update_compact(self, partition: _Partition) -> None:
+        """Quantize rows appended since the last remap into the in-RAM copy"""
+        if partition.compact is None:
+            partition.compact = QuantizedMatrix(self.dimension, 0, self.precision)
+            partition.compact_rows = 0
+        if partition.compact.capacity < partition.rows:
+            partition.compact.resize(max(partition.rows, partition.compact.capacity * 2), keep=partition.compact_rows)
+        for start in range(partition.compact_rows, partition.rows, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, partition.rows)
+            partition.compact.store(start, partition.matrix[start:end])
+        partition.compact_rows = partition.rows
+
+    def _truncate_to_sidecar(self, personality: str, partition: _Partition) -> None:
+        """Drop bytes past what the sidecar covers (left by a writer that crashed mid-append)"""
+        matrix_path, ids_path, docs_path = self._paths(personality)
+        covered = {
+            matrix_path: partition.rows * self.dimension * np.dtype(np.float32).itemsize,
+            docs_path: max((offset + length for offset, length in partition.offsets), default=0),
+            ids_path: partition.sidecar_valid
+        }
+        for path, size in covered.items():
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                logger.warning(f"⚠️ Truncating {os.path.basename(path)} to the {partition.rows} rows its sidecar covers")
+                os.truncate(path, size)
+        partition.sidecar_size = partition.sidecar_valid
+
+    def count(self, personality: str) -> int:
+        with self._lock:
+            return len(self._load_partition(personality).live)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, personality: str, document: Dict[str, Any], embedding: Iterable[float]) -> bool:
+        """Append one document (upsert semantics: the latest row for an id wins)"""
+        return self.add_many(personality, [(document, embedding)]) == 1
+
+    def add_many(self, personality: str, records: Iterable[Tuple[Dict[str, Any], Iterable[float]]]) -> int:
+        """Append many (document, embedding) pairs to a personality's store"""
+        with self._write_locked(personality):
+            os.makedirs(self.root_path, exist_ok=True)
+            matrix_path, ids_path, docs_path = self._paths(personality)
+            partition = self._load_partition(personality)
+            self._truncate_to_sidecar(personality, partition)
+
+            vectors, sidecar_lines, added = [], [], []
+            with open(docs_path, 'ab') as docs_file:
+                offset = docs_file.tell()
+                for document, embedding in records:
+                    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+                    if vector.shape[0] != self.dimension or not vector.any():
+                        logger.warning(f"Skipping {document.get('id')}: invalid embedding")
+                        continue
+                    record = {k: v for k, v in document.items() if k != 'embedding'}
+                    payload = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+                    docs_file.write(payload)
+                    vectors.append(normalize_vector(vector))
+                    sidecar_lines.append(f"{record['id']}\t{offset}\t{len(payload)}\n")
+                    added.append((record['id'], offset, len(payload)))
+                    offset += len(payload)
+
+            if not added:
+                return 0
+
+            with open(matrix_path, 'ab') as matrix_file:
+                matrix_file.write(np.vstack(vectors).astype(np.float32).tobytes())
+            # The sidecar goes last: its rows are only visible once content and embeddings are on disk
+            with open(ids_path, 'a', encoding='utf-8') as ids_file:
+                ids_file.writelines(sidecar_lines)
+            partition.sidecar_size = partition.sidecar_valid = os.path.getsize(ids_path)
+
+            for doc_id, doc_offset, length in added:
+                partition.live[doc_id] = partition.rows
+                partition.ids.append(doc_id)
+                partition.offsets.append((doc_offset, length))
+            return len(added)
+
+    def rebuild(self, personality: str) -> int:
+        """Compact a personality's store, dropping superseded rows (atomic rename)"""
+        with self._write_locked(personality):
+            partition = self._load_partition(personality)
+            matrix = self._matrix(personality, partition)
+            if matrix is None:
+                return 0
+
+            rows = sorted(partition.live.values())
+            records = [(self._read_document(personality, partition, row), np.array(matrix[row])) for row in rows]
+
+            tmp_store = LocalEmbeddingStore(os.path.join(self.root_path, '.rebuild'), self.dimension, 'float32')
+            tmp_store.add_many(personality, records)
+            for src, dst in zip(tmp_store._paths(personality), self._paths(personality)):
+                os.replace(src, dst)
+            tmp_lock = os.path.join(tmp_store.root_path, f"{personality}.lock")
+            if os.path.exists(tmp_lock):
+                os.remove(tmp_lock)
+            os.rmdir(tmp_store.root_path)
+
+            self._partitions.pop(personality, None)
+            return len(rows)
+
+    def build_from_documents(
+        self,
+        personality: str,
+        documents: Iterable[Dict[str, Any]],
+        embed_fn: Optional[Callable[[str], List[float]]] = None
+    ) -> int:
+        """Replace a personality's store from documents with embeddings (or embed_fn)"""
+        with self._write_locked(personality):
+            for path in self._paths(personality):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._partitions.pop(personality, None)
+
+            records = []
+            for document in documents:
+                embedding = document.get('embedding')
+                if not embedding and embed_fn is not None:
+                    embedding = embed_fn(document.get('content', ''))
+                if embedding:
+                    records.append((document, embedding))
+            return self.add_many(personality, records)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _read_document(self, personality: str, partition: _Partition, row: int) -> Dict[str, Any]:
+        _, _, docs_path = self._paths(personality)
+        offset, length = partition.offsets[row]
+        with open(docs_path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length).decode('utf-8'))
+
+    def get_document(self, personality: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Read one document's content by offset (no embedding)"""
+        with self._lock:
+            partition = self._load_partition(personality)
+            row = partition.live.get(doc_id)
+            return None if row is None else self._read_document(personality, partition, row)
+
+    def get_embedding(self, personality: str, doc_id: str) -> Optional[np.ndarray]:
+        """Return the stored (normalized) embedding for a document"""
+        with self._lock:
+            partition = self._load_partition(personality)
+            row = partition.live.get(doc_id)
+            matrix = self._matrix(personality, partition)
+            return None if row is None or matrix is None else np.array(matrix[row])
+
+    def search(
+        self,
+        query_embedding: Iterable[float],
+        personality: str,
+        k: int = 5,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Top-k (document, cosine score) pairs; only the hits' content is read"""
+        query = normalize_vector(query_embedding)
+        with self._lock:
+            partition = self._load_partition(personality)
+            matrix = self._matrix(personality, partition)
+            if matrix is None or not query.any():
+                return []
+
+            if partition.compact is None:
+                scores = np.asarray(matrix @ query)
+            else:
+                scores = partition.compact.scores(query, partition.rows)
+            if partition.dead_rows is not None:
+                scores[partition.dead_rows] = -np.inf
+
+            if partition.compact is None or self.rerank_factor <= 0:
+                rows = top_k_indices(scores, k)
+                ranked = [(int(row), float(scores[row])) for row in rows]
+            else:
+                # Re-rank the approximate candidates with their exact float32 rows
+                candidates = np.sort(top_k_indices(scores, k * self.rerank_factor))
+                candidates = candidates[np.isfinite(scores[candidates])]
+                order, exact = rerank(matrix[candidates], query, k)
+                ranked = [(int(candidates[i]), float(exact[i])) for i in order]
+
+            results = []
+            for row, score in ranked:
+                if not np.isfinite(score) or (min_score is not None and score < min_score):
+                    continue
+                results.append((self._read_document(personality, partition, row), score))
+            return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"root_path": self.root_path, "dimension": self.dimension,
+                     "precision": self.precision, "personalities": {}}
+            for personality in self.personalities():
+                matrix_path, _, docs_path = self._paths(personality)
+                partition = self._partitions.get(personality)
+                stats["personalities"][personality] = {
+                    "documents": self.count(personality),
+                    "embedding_bytes": os.path.getsize(matrix_path) if os.path.exists(matrix_path) else 0,
+                    "resident_bytes": partition.compact.nbytes if partition and partition.compact else 0,
+                    "content_bytes": os.path.getsize(docs_path) if os.path.exists(docs_path) else 0
+                }
+            return stats
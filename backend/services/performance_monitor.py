@@ -280,8 +280,13 @@ class PerformanceMonitor:
         """Start background monitoring tasks"""
         
         if self.monitoring_enabled:
-            self.monitoring_task = asyncio.create_task(self._monitoring_loop())
-            self.cleanup_task = asyncio.create_task(self._cleanup_loop())
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                logger.debug("No running event loop; background monitoring not started")
+                return
+            self.monitoring_task = loop.create_task(self._monitoring_loop())
+            self.cleanup_task = loop.create_task(self._cleanup_loop())
     
     async def _monitoring_loop(self) -> None:
         """Background monitoring loop"""
@@ -18,6 +18,13 @@ import asyncio
 from collections import defaultdict, OrderedDict
 import threading
 
+try:
+    from .cache_tiers import RedisCacheTier, SQLiteCacheTier, encode_entry, glob_escape
+    from .single_flight import SingleFlight
+except ImportError:
+    from cache_tiers import RedisCacheTier, SQLiteCacheTier, encode_entry, glob_escape
+    from single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 class CacheLevel(Enum):
@@ -132,6 +139,16 @@ class PersonalityCacheService:
             lambda: {cache_type: LRUCache(max_size=500) for cache_type in CacheType}
         )
         
+        # L2 (Redis, CACHE_REDIS_URL) and L3 (SQLite, CACHE_L3_PATH) shared tiers
+        self.configure_tiers(RedisCacheTier.from_env(), SQLiteCacheTier.from_env())
+        
+        # Stampede protection: one in-flight computation per key in this process,
+        # plus an L2 lock across instances
+        self._single_flight = SingleFlight("personality_cache")
+        self.stampede_lock_ms = 10000
+        self.stampede_wait_seconds = 5.0
+        self._l2_waits_served = 0
+        
         # Cache metrics per personality and cache type
         self.cache_metrics: Dict[str, Dict[CacheType, Dict[CacheLevel, CacheMetrics]]] = defaultdict(
             lambda: defaultdict(lambda: defaultdict(lambda: CacheMetrics(
@@ -157,9 +174,22 @@ class PersonalityCacheService:
         self.monitoring_enabled = True
         self.metrics_collection_interval = 60  # seconds
         
-        # Initialize cache warming
+        # Initialize cache warming (only possible once an event loop is running)
         if self.cache_warming_config["warm_on_startup"]:
-            asyncio.create_task(self._initialize_cache_warming())
+            try:
+                asyncio.get_running_loop().create_task(self._initialize_cache_warming())
+            except RuntimeError:
+                logger.debug("No running event loop; skipping startup cache warming")
+    
+    def configure_tiers(self, l2_tier: Optional[RedisCacheTier] = None, l3_tier: Optional[SQLiteCacheTier] = None) -> None:
+        """Set the shared L2/L3 tiers; put() writes through to every configured level"""
+        self.l2_tier = l2_tier
+        self.l3_tier = l3_tier
+        self.write_levels = [CacheLevel.L1_MEMORY]
+        if l2_tier:
+            self.write_levels.append(CacheLevel.L2_REDIS)
+        if l3_tier:
+            self.write_levels.append(CacheLevel.L3_DATABASE)
     
     async def get(
         self,
@@ -177,13 +207,14 @@ class PersonalityCacheService:
         
         for cache_level in cache_levels:
             try:
-                value = await self._get_from_level(key, personality_id, cache_type, cache_level)
-                if value is not None:
+                found = await self._get_from_level(key, personality_id, cache_type, cache_level)
+                if found is not None:
+                    value, expires_at = found
                     # Record cache hit
                     self._record_cache_hit(personality_id, cache_type, cache_level, start_time)
                     
-                    # Promote to higher cache levels
-                    await self._promote_to_higher_levels(key, value, personality_id, cache_type, cache_level)
+                    # Promote to higher cache levels (keeping the original expiry)
+                    await self._promote_to_higher_levels(key, value, personality_id, cache_type, cache_level, expires_at)
                     
                     return value
                     
@@ -204,10 +235,10 @@ class PersonalityCacheService:
         ttl_seconds: int = 3600,
         cache_levels: List[CacheLevel] = None
     ) -> bool:
-        """Put value into cache at specified levels"""
+        """Put value into cache at specified levels (default: every configured level)"""
         
         if cache_levels is None:
-            cache_levels = [CacheLevel.L1_MEMORY]
+            cache_levels = self.write_levels
         
         success = True
         expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
@@ -254,6 +285,25 @@ class PersonalityCacheService:
                 for caches in self.l1_caches.values():
                     caches[cache_type].clear()
             
+            # Shared tiers (same criteria; nothing is invalidated without any)
+            if key or personality_id or cache_type:
+                if self.l2_tier:
+                    if key and personality_id and cache_type:
+                        await self.l2_tier.delete(self._tier_key(key, personality_id, cache_type))
+                    else:
+                        await self.l2_tier.delete_matching(":".join([
+                            glob_escape(personality_id) if personality_id else "*",
+                            glob_escape(cache_type.value) if cache_type else "*",
+                            glob_escape(key) if key else "*"
+                        ]))
+                if self.l3_tier:
+                    await asyncio.to_thread(
+                        self.l3_tier.delete,
+                        cache_key=key,
+                        personality_id=personality_id,
+                        cache_type=cache_type.value if cache_type else None
+                    )
+            
             return True
             
         except Exception as e:
@@ -261,7 +311,12 @@ class PersonalityCacheService:
             return False
     
     async def warm_cache(self, personality_id: str) -> bool:
-        """Warm cache for a specific personality"""
+        """
+        Warm cache for a specific personality
+        
+        Goes through get_or_compute, so entries another instance already
+        warmed are reused and concurrent warmers share one computation.
+        """
         
         try:
             logger.info(f"Warming cache for personality: {personality_id}")
@@ -282,6 +337,64 @@ class PersonalityCacheService:
             logger.error(f"Cache warming failed for {personality_id}: {str(e)}")
             return False
     
+    async def get_or_compute(
+        self,
+        key: str,
+        personality_id: str,
+        cache_type: CacheType,
+        compute_fn,
+        ttl_seconds: int = 3600
+    ) -> Any:
+        """
+        Get a value, computing and caching it on a miss with stampede protection
+        
+        Concurrent misses for the same key in this process share one
+        computation; across instances the first one takes an L2 lock and the
+        others wait briefly for its result before computing themselves.
+        """
+        value = await self.get(key, personality_id, cache_type)
+        if value is not None:
+            return value
+        
+        tier_key = self._tier_key(key, personality_id, cache_type)
+        return await self._single_flight.do_async(
+            tier_key,
+            lambda: self._compute_with_lock(key, personality_id, cache_type, compute_fn, ttl_seconds)
+        )
+    
+    @property
+    def coalesced_requests(self) -> int:
+        """Misses served by another caller's computation (in this process or via L2)"""
+        return self._single_flight.shared + self._l2_waits_served
+    
+    async def _compute_with_lock(self, key, personality_id, cache_type, compute_fn, ttl_seconds) -> Any:
+        tier_key = self._tier_key(key, personality_id, cache_type)
+        token = await self.l2_tier.acquire_lock(tier_key, self.stampede_lock_ms) if self.l2_tier else None
+        
+        if self.l2_tier and token is None and self.l2_tier.available:
+            # Another instance is computing: poll L2 for its result
+            deadline = time.time() + self.stampede_wait_seconds
+            while time.time() < deadline:
+                await asyncio.sleep(0.05)
+                found = await self.l2_tier.peek(tier_key)
+                if found is not None:
+                    value, expires_at = found[0], datetime.fromtimestamp(found[1])
+                    await self._put_to_level(key, value, personality_id, cache_type, expires_at,
+                                             CacheLevel.L1_MEMORY)
+                    self._l2_waits_served += 1
+                    return value
+        
+        try:
+            value = compute_fn()
+            if asyncio.iscoroutine(value):
+                value = await value
+            if value is not None:
+                await self.put(key, value, personality_id, cache_type, ttl_seconds=ttl_seconds)
+            return value
+        finally:
+            if token:
+                await self.l2_tier.release_lock(tier_key, token)
+    
     def get_cache_metrics(self, personality_id: str = None) -> Dict[str, Any]:
         """Get cache performance metrics"""
         
@@ -319,6 +432,9 @@ class PersonalityCacheService:
                 
                 optimization_results["personalities_optimized"] += 1
             
+            if self.l3_tier:
+                optimization_results["cleaned_entries"] += await asyncio.to_thread(self.l3_tier.purge_expired)
+            
             # Update metrics
             await self._update_performance_metrics()
             
@@ -338,26 +454,26 @@ class PersonalityCacheService:
         cache_type: CacheType,
         cache_level: CacheLevel
     ) -> Optional[Any]:
-        """Get value from specific cache level"""
+        """Get (value, expires_at) from specific cache level"""
         
         if cache_level == CacheLevel.L1_MEMORY:
             cache = self.l1_caches[personality_id][cache_type]
             entry = cache.get(key)
             if entry and entry.expires_at > datetime.now():
-                return entry.value
+                return entry.value, entry.expires_at
             elif entry:
                 # Remove expired entry
                 cache.remove(key)
         
-        elif cache_level == CacheLevel.L2_REDIS:
-            # Redis implementation would go here
-            # For now, return None as Redis is not implemented
-            return None
+        elif cache_level == CacheLevel.L2_REDIS and self.l2_tier:
+            found = await self.l2_tier.get(self._tier_key(key, personality_id, cache_type))
+            if found is not None:
+                return found[0], datetime.fromtimestamp(found[1])
         
-        elif cache_level == CacheLevel.L3_DATABASE:
-            # Database cache implementation would go here
-            # For now, return None as database cache is not implemented
-            return None
+        elif cache_level == CacheLevel.L3_DATABASE and self.l3_tier:
+            found = await asyncio.to_thread(self.l3_tier.get, self._tier_key(key, personality_id, cache_type))
+            if found is not None:
+                return found[0], datetime.fromtimestamp(found[1])
         
         return None
     
@@ -390,13 +506,19 @@ class PersonalityCacheService:
             
             cache.put(key, entry)
         
-        elif cache_level == CacheLevel.L2_REDIS:
-            # Redis implementation would go here
-            pass
-        
-        elif cache_level == CacheLevel.L3_DATABASE:
-            # Database cache implementation would go here
-            pass
+        elif cache_level == CacheLevel.L2_REDIS and self.l2_tier:
+            payload = self._serialize(key, value, expires_at)
+            if payload is not None:
+                await self.l2_tier.set(self._tier_key(key, personality_id, cache_type), payload, expires_at.timestamp())
+        
+        elif cache_level == CacheLevel.L3_DATABASE and self.l3_tier:
+            payload = self._serialize(key, value, expires_at)
+            if payload is not None:
+                await asyncio.to_thread(
+                    self.l3_tier.set,
+                    self._tier_key(key, personality_id, cache_type), personality_id,
+                    cache_type.value, key, payload, expires_at.timestamp()
+                )
     
     async def _promote_to_higher_levels(
         self,
@@ -404,22 +526,34 @@ class PersonalityCacheService:
         value: Any,
         personality_id: str,
         cache_type: CacheType,
-        current_level: CacheLevel
+        current_level: CacheLevel,
+        expires_at: datetime = None
     ) -> None:
-        """Promote cache entry to higher levels"""
+        """Promote cache entry to higher levels, keeping its remaining TTL"""
+        
+        if expires_at is None:
+            expires_at = datetime.now() + timedelta(hours=1)
         
         if current_level == CacheLevel.L2_REDIS:
             # Promote to L1
-            await self._put_to_level(
-                key, value, personality_id, cache_type,
-                datetime.now() + timedelta(hours=1),
-                CacheLevel.L1_MEMORY
-            )
+            await self._put_to_level(key, value, personality_id, cache_type, expires_at, CacheLevel.L1_MEMORY)
         elif current_level == CacheLevel.L3_DATABASE:
             # Promote to L1 and L2
-            expires_at = datetime.now() + timedelta(hours=1)
             await self._put_to_level(key, value, personality_id, cache_type, expires_at, CacheLevel.L1_MEMORY)
-            # await self._put_to_level(key, value, personality_id, cache_type, expires_at, CacheLevel.L2_REDIS)
+            await self._put_to_level(key, value, personality_id, cache_type, expires_at, CacheLevel.L2_REDIS)
+    
+    @staticmethod
+    def _tier_key(key: str, personality_id: str, cache_type: CacheType) -> str:
+        return f"{personality_id}:{cache_type.value}:{key}"
+    
+    @staticmethod
+    def _serialize(key: str, value: Any, expires_at: datetime) -> Optional[str]:
+        try:
+            return encode_entry(value, expires_at.timestamp())
+        except (TypeError, ValueError):
+            logger.debug(f"Cache value for {key} is not JSON-serializable; keeping it in L1 only")
+            return None
+
     
     def _record_cache_hit(
         self,
@@ -470,11 +604,11 @@ class PersonalityCacheService:
             "knowledge_base_ids": []
         }
         
-        await self.put(
+        await self.get_or_compute(
             f"personality:{personality_id}",
-            personality_data,
             personality_id,
             CacheType.PERSONALITY_DATA,
+            lambda: personality_data,
             ttl_seconds=7200  # 2 hours
         )
     
@@ -493,11 +627,11 @@ class PersonalityCacheService:
             query_hash = hashlib.md5(query.encode()).hexdigest()
             mock_response = f"This is a {personality_id} response to: {query}"
             
-            await self.put(
+            await self.get_or_compute(
                 f"response:{query_hash}",
-                mock_response,
                 personality_id,
                 CacheType.RESPONSE_CACHE,
+                lambda: mock_response,
                 ttl_seconds=3600  # 1 hour
             )
     
@@ -510,11 +644,11 @@ class PersonalityCacheService:
             "embeddings": [f"embedding_{i}" for i in range(10)]
         }
         
-        await self.put(
+        await self.get_or_compute(
             f"knowledge:{personality_id}",
-            knowledge_data,
             personality_id,
             CacheType.KNOWLEDGE_BASE,
+            lambda: knowledge_data,
             ttl_seconds=14400  # 4 hours
         )
     
@@ -616,6 +750,12 @@ class PersonalityCacheService:
         if personality_count > 0:
             global_stats["avg_hit_rate"] = total_hit_rate / personality_count
         
+        global_stats["tiers"] = {
+            CacheLevel.L2_REDIS.value: self.l2_tier.get_stats() if self.l2_tier else {"enabled": False},
+            CacheLevel.L3_DATABASE.value: self.l3_tier.get_stats() if self.l3_tier else {"enabled": False}
+        }
+        global_stats["coalesced_requests"] = self.coalesced_requests
+        
         return global_stats
     
     async def _initialize_cache_warming(self) -> None:
@@ -3,9 +3,10 @@ Personality service for generating responses.
 Enhanced with LLM integration for dynamic responses.
 """
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,9 @@ class PersonalityService:
         self._response_templates = self._load_response_templates()
         self._llm_service = None
         self._initialize_llm_service()
+        self._response_cache = None
+        self._embedding_service = None
+        self._initialize_response_cache()
     
     def _initialize_llm_service(self):
         """Initialize LLM service if available"""
@@ -30,23 +34,62 @@ class PersonalityService:
         except Exception as e:
             self.logger.warning(f"⚠️ LLM service initialization failed, using templates: {e}")
     
-    def _run_async_llm_call(self, query: str, personality_id: str):
-        """Helper method to run async LLM call in a new event loop"""
-        if not self._llm_service:
+    def _initialize_response_cache(self):
+        """Initialize the semantic response cache and its query embedder if available"""
+        try:
+            from services.semantic_response_cache import get_semantic_response_cache
+            self._response_cache = get_semantic_response_cache()
+        except ImportError as e:
+            self.logger.warning(f"⚠️ Semantic response cache not available: {e}")
+            return
+        if self._response_cache is None:
+            return
+        try:
+            from services.gemini_embedding_service import get_gemini_embedding_service
+            self._embedding_service = get_gemini_embedding_service()
+        except Exception as e:
+            self.logger.info(f"💡 Query embeddings unavailable, response cache uses exact matches only: {e}")
+    
+    def _prompt_version(self, personality_id: str) -> str:
+        """Fingerprint of the prompt that produced (or would produce) a response"""
+        from services.semantic_response_cache import prompt_version
+        config = self._llm_service.personalities.get(personality_id) if self._llm_service else None
+        return prompt_version(config.prompt_template if config else "")
+    
+    async def _embed_query(self, query: str):
+        """Query embedding for the semantic cache (None if unavailable)"""
+        if not self._embedding_service:
             return None
-            
-        import asyncio
-        loop = asyncio.new_event_loop()
         try:
-            asyncio.set_event_loop(loop)
-            return loop.run_until_complete(
-                self._llm_service.generate_personality_response(
-                    query=query,
-                    personality_id=personality_id
-                )
-            )
-        finally:
-            loop.close()
+            result = await asyncio.to_thread(self._embedding_service.generate_query_embedding, query)
+            return result.embedding
+        except Exception as e:
+            self.logger.warning(f"⚠️ Query embedding failed, semantic cache limited to exact matches: {e}")
+            return None
+    
+    async def _lookup_cached_response(self, query: str, personality_id: str, language: str):
+        """Return (cached response, query embedding) for a question"""
+        if not self._response_cache or not self._llm_service:
+            return None, None
+        query_embedding = await self._embed_query(query)
+        hit = self._response_cache.lookup(
+            personality_id, language, query, query_embedding, self._prompt_version(personality_id)
+        )
+        if hit is None:
+            return None, query_embedding
+        
+        response, similarity = hit
+        self.logger.info(f"⚡ Response cache hit for {personality_id} (similarity {similarity:.3f})")
+        return {
+            "content": response["content"],
+            "metadata": {
+                **response["metadata"],
+                "timestamp": datetime.now().isoformat(),
+                "query_length": len(query),
+                "response_source": "semantic_cache",
+                "cache_similarity": round(similarity, 4)
+            }
+        }, query_embedding
     
     def _load_response_templates(self) -> Dict[str, str]:
         """Load personality-specific response templates"""
@@ -76,7 +119,7 @@ class PersonalityService:
             "tesla": "Curious mind, the future belongs to those who dare to imagine beyond current limitations. Through harnessing the forces of nature - electricity, magnetism, resonance - we can transform human civilization. \"The present is theirs; the future, for which I really worked, is mine.\" Think boldly and let innovation light the path forward."
         }
     
-    def generate_response(
+    async def generate_response(
         self, 
         query: str, 
         personality_id: str, 
@@ -96,15 +139,22 @@ class PersonalityService:
         try:
             self.logger.info(f"Generating {personality_id} response for query: {query[:50]}...")
             
+            # Repeated and near-duplicate questions are answered from the response cache
+            cached_response, query_embedding = await self._lookup_cached_response(query, personality_id, language)
+            if cached_response:
+                return cached_response
+            
             # Try LLM service first, fallback to templates
             if self._llm_service:
                 try:
-                    # Use helper method to handle async call
-                    llm_response = self._run_async_llm_call(query, personality_id)
+                    llm_response = await self._llm_service.generate_personality_response(
+                        query=query,
+                        personality_id=personality_id
+                    )
                     
                     if llm_response and hasattr(llm_response, 'content') and llm_response.content:
                         self.logger.info(f"✅ LLM service generated response for {personality_id}")
-                        return {
+                        response = {
                             "content": llm_response.content,
                             "metadata": {
                                 "timestamp": datetime.now().isoformat(),
@@ -118,6 +168,13 @@ class PersonalityService:
                                 "max_allowed": getattr(llm_response, 'max_allowed', 0)
                             }
                         }
+                        # Fallback messages (source "fallback_*") are not worth caching
+                        if self._response_cache and str(getattr(llm_response, 'source', '')).startswith('gemini_api'):
+                            self._response_cache.store(
+                                personality_id, language, query, response,
+                                query_embedding, self._prompt_version(personality_id)
+                            )
+                        return response
                     else:
                         self.logger.warning(f"⚠️ LLM service returned empty response for {personality_id}, using template")
                         
@@ -154,6 +211,81 @@ class PersonalityService:
                 }
             }
     
+    async def stream_response(
+        self,
+        query: str,
+        personality_id: str,
+        language: str = "English"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a personality-specific response.
+        
+        Yields {"type": "token", "content": ...} events as text arrives from the
+        LLM service, then a single {"type": "done", "metadata": {...}} event.
+        Falls back to the template response (as one token event) when the LLM
+        service is unavailable or fails before producing any text.
+        """
+        started = datetime.now()
+        response_length = 0
+        response_source = "template_fallback"
+        service_version = "template_v1.0"
+        
+        cached_response, query_embedding = await self._lookup_cached_response(query, personality_id, language)
+        if cached_response:
+            yield {"type": "token", "content": cached_response["content"]}
+            yield {"type": "done", "metadata": {**cached_response["metadata"], "response_length": len(cached_response["content"])}}
+            return
+        
+        if self._llm_service:
+            outcome: Dict[str, Any] = {}
+            chunks: List[str] = []
+            try:
+                async for chunk in self._llm_service.stream_personality_response(query, personality_id, outcome):
+                    response_length += len(chunk)
+                    chunks.append(chunk)
+                    yield {"type": "token", "content": chunk}
+                response_source = "llm_service_stream"
+                service_version = "llm_enhanced_v1.0"
+                # Cache only a model answer that was streamed in full, like generate_response
+                if self._response_cache and str(outcome.get('source', '')).startswith('gemini_api'):
+                    content = "".join(chunks)
+                    self._response_cache.store(personality_id, language, query, {
+                        "content": content,
+                        "metadata": {
+                            "timestamp": datetime.now().isoformat(),
+                            "personality_id": personality_id,
+                            "query_length": len(query),
+                            "response_length": len(content),
+                            "service_version": service_version,
+                            "response_source": response_source,
+                            "language": language
+                        }
+                    }, query_embedding, self._prompt_version(personality_id))
+            except Exception as llm_error:
+                self.logger.warning(f"⚠️ LLM streaming failed for {personality_id}: {llm_error}")
+        
+        if response_length == 0:
+            self.logger.info(f"📝 Using template response for {personality_id}")
+            response_source = "template_fallback"
+            service_version = "template_v1.0"
+            template_response = self._get_template_response(personality_id, query)
+            response_length = len(template_response)
+            yield {"type": "token", "content": template_response}
+        
+        yield {
+            "type": "done",
+            "metadata": {
+                "timestamp": datetime.now().isoformat(),
+                "personality_id": personality_id,
+                "query_length": len(query),
+                "response_length": response_length,
+                "service_version": service_version,
+                "response_source": response_source,
+                "language": language,
+                "duration_seconds": (datetime.now() - started).total_seconds()
+            }
+        }
+    
     def _get_template_response(self, personality_id: str, query: str) -> str:
         """Get template-based response for a personality"""
         template = self._response_templates.get(personality_id)
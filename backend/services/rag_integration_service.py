@@ -26,6 +26,11 @@ except ImportError:
     EnhancedSimpleLLMService = None
     SpiritualResponse = None
 
+try:
+    from hybrid_retriever import HybridRetriever
+except ImportError:
+    HybridRetriever = None
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -57,11 +62,17 @@ class EnhancedSpiritualResponse:
 class RAGIntegrationService:
     """Service that integrates vector search with LLM generation"""
     
+    # Lexical + vector retrieval with rank fusion (None: vector search only)
+    hybrid_retriever = None
+    
     def __init__(self):
         self.vector_db = VectorDatabaseService() if VectorDatabaseService else None
         self.llm_service = EnhancedSimpleLLMService() if EnhancedSimpleLLMService else None
         self.is_available = self.vector_db is not None and self.llm_service is not None
         
+        if HybridRetriever and os.getenv('HYBRID_RETRIEVAL_ENABLED', 'true').lower() == 'true':
+            self.hybrid_retriever = HybridRetriever.from_env(vector_db=self.vector_db)
+        
         if not self.is_available:
             logger.warning("⚠️ RAG Integration Service not fully available - missing dependencies")
         else:
@@ -137,36 +148,29 @@ class RAGIntegrationService:
             # Convert personality string to enum
             personality_enum = PersonalityType(personality_id)
             
-            # Primary search: Same personality
-            primary_results = await self.vector_db.semantic_search(
-                query=query,
-                personality=personality_enum,
-                content_types=None,  # All content types
-                top_k=context_limit,
-                min_relevance=min_relevance
-            )
-            
-            all_results = primary_results
-            
-            # Secondary search: Cross-personality if enabled and primary results are insufficient
-            if include_cross_personality and len(primary_results) < context_limit:
-                remaining_slots = context_limit - len(primary_results)
-                
-                cross_personality_results = await self.vector_db.semantic_search(
+            # One search: same personality first, other personalities fill any
+            # remaining slots when enabled (slightly lower threshold)
+            if self.hybrid_retriever is not None:
+                # Lexical and vector candidates fetched concurrently, then fused
+                retrieval = await self.hybrid_retriever.retrieve(
                     query=query,
-                    personality=None,  # Search all personalities
-                    content_types=None,
-                    top_k=remaining_slots * 2,  # Get more to filter out same personality
-                    min_relevance=min_relevance * 0.8  # Slightly lower threshold
+                    personality=personality_enum,
+                    top_k=context_limit,
+                    min_relevance=min_relevance,
+                    include_cross_personality=include_cross_personality,
+                    cross_min_relevance=min_relevance * 0.8
+                )
+                all_results = retrieval.to_search_results(personality_enum)
+            else:
+                all_results = await self.vector_db.semantic_search(
+                    query=query,
+                    personality=personality_enum,
+                    content_types=None,  # All content types
+                    top_k=context_limit,
+                    min_relevance=min_relevance,
+                    include_cross_personality=include_cross_personality,
+                    cross_min_relevance=min_relevance * 0.8
                 )
-                
-                # Filter out same personality results
-                filtered_cross_results = [
-                    result for result in cross_personality_results
-                    if result.document.personality != personality_enum
-                ][:remaining_slots]
-                
-                all_results.extend(filtered_cross_results)
             
             # Extract context information
             relevant_passages = []
@@ -3,8 +3,9 @@ RAG Service - Phase 6b Implementation
 
 This service provides basic RAG functionality using local JSON files
 until the full vector database migration is complete. It provides:
-- Content loading from existing JSON files
-- Simple text matching for spiritual guidance
+- Lazy per-personality content loading from existing JSON files, or from a
+  prebuilt pickle snapshot (scripts/build_rag_snapshot.py) with an index
+- BM25 keyword search over a per-personality inverted index
 - Multi-personality content organization
 - Basic citation support
 
@@ -14,12 +15,26 @@ while the full vector database migration is being prepared.
 
 import os
 import json
+import heapq
+import pickle
+import hashlib
 import logging
+import threading
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
+try:
+    from .lexical_index import LexicalIndex
+except ImportError:
+    from lexical_index import LexicalIndex
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "sources")
+DEFAULT_SNAPSHOT_DIR = os.path.join(DEFAULT_DATA_DIR, "snapshot")
+SNAPSHOT_INDEX = "index.json"
+SNAPSHOT_VERSION = 1
+
 @dataclass
 class SpiritualContent:
     """Simple structure for spiritual content"""
@@ -58,13 +73,31 @@ class RAGResponse:
     sources_consulted: List[str] = field(default_factory=list)
     total_context_length: int = 0
 
+SNAPSHOT_FIELDS = tuple(SpiritualContent.__dataclass_fields__)
+
+@dataclass
+class PersonalityCorpus:
+    """One personality's content with its lexical index (document number = list position)"""
+    personality: str
+    contents: List[SpiritualContent]
+    lexical_index: LexicalIndex
+
+
 class SimpleRAGService:
-    """Simple RAG service using local JSON files"""
+    """
+    Simple RAG service using local JSON files
+    
+    Nothing is read at construction: each personality's corpus is loaded on
+    first use, from the prebuilt snapshot (scripts/build_rag_snapshot.py) when
+    it matches the source files, otherwise by parsing the sources.
+    """
     
-    def __init__(self):
-        self.content_by_personality: Dict[str, List[SpiritualContent]] = {}
-        self.all_content: List[SpiritualContent] = []
-        self.is_loaded = False
+    def __init__(self, data_dir: Optional[str] = None, snapshot_dir: Optional[str] = None):
+        self.data_dir = data_dir or DEFAULT_DATA_DIR
+        self.snapshot_dir = snapshot_dir or os.getenv('RAG_SNAPSHOT_DIR') or DEFAULT_SNAPSHOT_DIR
+        self._corpora: Dict[str, PersonalityCorpus] = {}
+        self._snapshot_index: Optional[Dict[str, Any]] = None
+        self._lock = threading.RLock()
         
         # Personality mapping
         self.personality_sources = {
@@ -83,67 +116,164 @@ class SimpleRAGService:
             "muhammad": ["muhammad_teachings.json"]
         }
         
-        # Load content on initialization
-        self._load_content()
+        self.is_loaded = os.path.isdir(self.data_dir) or os.path.exists(self._snapshot_path(SNAPSHOT_INDEX))
+    
+    @property
+    def content_by_personality(self) -> Dict[str, List[SpiritualContent]]:
+        """Every personality's content (loads all personalities)"""
+        return {personality: self._corpus(personality).contents for personality in self.personality_sources}
+    
+    @property
+    def all_content(self) -> List[SpiritualContent]:
+        """All content across personalities (loads all; the items are shared, not copied)"""
+        return [content for contents in self.content_by_personality.values() for content in contents]
     
     def _load_content(self):
-        """Load spiritual content from local JSON files"""
+        """Load every personality's corpus up front (warm-up)"""
+        for personality in self.personality_sources:
+            self._corpus(personality)
+        logger.info(f"Simple RAG service loaded {self.get_total_content_count()} total spiritual texts")
+    
+    def _corpus(self, personality: str) -> PersonalityCorpus:
+        """A personality's corpus, loaded on first use"""
+        corpus = self._corpora.get(personality)
+        if corpus is not None:
+            return corpus
+        with self._lock:
+            corpus = self._corpora.get(personality)
+            if corpus is None:
+                corpus = self._load_from_snapshot(personality) or self._load_from_sources(personality)
+                self._corpora[personality] = corpus
+            return corpus
+    
+    # =======================
+    # SNAPSHOT
+    # =======================
+    
+    def _snapshot_path(self, name: str) -> str:
+        return os.path.join(self.snapshot_dir, name)
+    
+    def _source_fingerprints(self, personality: str) -> Dict[str, Optional[str]]:
+        """Content hash of each source file (None when missing), to detect a stale snapshot"""
+        fingerprints = {}
+        for filename in self.personality_sources.get(personality, []):
+            file_path = os.path.join(self.data_dir, filename)
+            if not os.path.exists(file_path):
+                fingerprints[filename] = None
+                continue
+            with open(file_path, 'rb') as f:
+                fingerprints[filename] = hashlib.sha256(f.read()).hexdigest()
+        return fingerprints
+    
+    def _read_snapshot_index(self) -> Dict[str, Any]:
+        if self._snapshot_index is None:
+            self._snapshot_index = {}
+            index_path = self._snapshot_path(SNAPSHOT_INDEX)
+            if os.path.exists(index_path):
+                try:
+                    with open(index_path, 'r', encoding='utf-8') as f:
+                        index = json.load(f)
+                    if index.get('version') == SNAPSHOT_VERSION:
+                        self._snapshot_index = index.get('personalities', {})
+                except (OSError, ValueError) as e:
+                    logger.warning(f"⚠️ Ignoring unreadable RAG snapshot index: {e}")
+        return self._snapshot_index
+    
+    def _load_from_snapshot(self, personality: str) -> Optional[PersonalityCorpus]:
+        entry = self._read_snapshot_index().get(personality)
+        if not entry:
+            return None
+        if entry.get('sources') != self._source_fingerprints(personality):
+            logger.info(f"📦 RAG snapshot for {personality} is stale, loading sources")
+            return None
         try:
-            data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "sources")
+            # Snapshots are written by our own build step (trusted input)
+            with open(self._snapshot_path(entry['file']), 'rb') as f:
+                state = pickle.load(f)
+            field_names = state['fields']
+            corpus = PersonalityCorpus(
+                personality=personality,
+                contents=[SpiritualContent(**dict(zip(field_names, row))) for row in state['rows']],
+                lexical_index=LexicalIndex.from_state(state['lexical_index'])
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read RAG snapshot for {personality}: {e}")
+            return None
+        logger.info(f"Loaded {len(corpus.contents)} items for {personality} (snapshot)")
+        return corpus
+    
+    def write_snapshot(self, snapshot_dir: Optional[str] = None) -> Dict[str, int]:
+        """Parse every source and write one pickle per personality plus index.json"""
+        snapshot_dir = snapshot_dir or self.snapshot_dir
+        os.makedirs(snapshot_dir, exist_ok=True)
+        personalities = {}
+        counts = {}
+        for personality in self.personality_sources:
+            corpus = self._load_from_sources(personality)
+            filename = f"{personality}.pkl"
+            tmp_path = os.path.join(snapshot_dir, f"{filename}.tmp")
+            # Builtins only, so the snapshot loads whichever way this module was imported
+            state = {
+                'fields': SNAPSHOT_FIELDS,
+                'rows': [tuple(getattr(content, name) for name in SNAPSHOT_FIELDS) for content in corpus.contents],
+                'lexical_index': corpus.lexical_index.to_state()
+            }
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, os.path.join(snapshot_dir, filename))
+            personalities[personality] = {
+                'file': filename,
+                'documents': len(corpus.contents),
+                'sources': self._source_fingerprints(personality)
+            }
+            counts[personality] = len(corpus.contents)
+        
+        tmp_index = os.path.join(snapshot_dir, f"{SNAPSHOT_INDEX}.tmp")
+        with open(tmp_index, 'w', encoding='utf-8') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'personalities': personalities}, f, indent=2)
+        os.replace(tmp_index, os.path.join(snapshot_dir, SNAPSHOT_INDEX))
+        return counts
+    
+    # =======================
+    # SOURCE FILES
+    # =======================
+    
+    def _load_from_sources(self, personality: str) -> PersonalityCorpus:
+        """Parse a personality's JSON/JSONL source files and index them"""
+        personality_content: List[SpiritualContent] = []
+        
+        for filename in self.personality_sources.get(personality, []):
+            file_path = os.path.join(self.data_dir, filename)
             
-            for personality, files in self.personality_sources.items():
-                personality_content = []
-                
-                for filename in files:
-                    file_path = os.path.join(data_dir, filename)
-                    
-                    if not os.path.exists(file_path):
-                        logger.warning(f"File not found: {file_path}")
-                        continue
-                    
-                    try:
-                        if filename.endswith('.jsonl'):
-                            # Handle JSONL files (like Bhagavad Gita)
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                for line in f:
-                                    if line.strip():
-                                        data = json.loads(line)
-                                        content = self._create_content_from_data(data, personality)
-                                        if content:
-                                            personality_content.append(content)
-                                            self.all_content.append(content)
-                        
-                        else:
-                            # Handle JSON files
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                                
-                                if isinstance(data, list):
-                                    for item in data:
-                                        content = self._create_content_from_data(item, personality)
-                                        if content:
-                                            personality_content.append(content)
-                                            self.all_content.append(content)
-                                elif isinstance(data, dict):
-                                    content = self._create_content_from_data(data, personality)
-                                    if content:
-                                        personality_content.append(content)
-                                        self.all_content.append(content)
-                    
-                    except Exception as e:
-                        logger.error(f"Error loading {filename}: {e}")
-                
-                self.content_by_personality[personality] = personality_content
-                logger.info(f"Loaded {len(personality_content)} items for {personality}")
+            if not os.path.exists(file_path):
+                logger.warning(f"File not found: {file_path}")
+                continue
             
-            self.is_loaded = True
-            logger.info(f"Simple RAG service loaded {len(self.all_content)} total spiritual texts")
+            try:
+                if filename.endswith('.jsonl'):
+                    # Handle JSONL files (like Bhagavad Gita)
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        items = [json.loads(line) for line in f if line.strip()]
+                else:
+                    # Handle JSON files
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    items = data if isinstance(data, list) else [data] if isinstance(data, dict) else []
+                
+                for item in items:
+                    content = self._create_content_from_data(item, personality, len(personality_content))
+                    if content:
+                        personality_content.append(content)
             
-        except Exception as e:
-            logger.error(f"Failed to load RAG content: {e}")
-            self.is_loaded = False
+            except Exception as e:
+                logger.error(f"Error loading {filename}: {e}")
+        
+        lexical_index = LexicalIndex()
+        lexical_index.add_many(content.content for content in personality_content)
+        logger.info(f"Loaded {len(personality_content)} items for {personality}")
+        return PersonalityCorpus(personality=personality, contents=personality_content, lexical_index=lexical_index)
     
-    def _create_content_from_data(self, data: Dict[str, Any], personality: str) -> Optional[SpiritualContent]:
+    def _create_content_from_data(self, data: Dict[str, Any], personality: str, position: int = 0) -> Optional[SpiritualContent]:
         """Create SpiritualContent from JSON data"""
         try:
             # Handle different data formats
@@ -192,7 +322,7 @@ class SimpleRAGService:
                 content_type = data['content_type']
             
             return SpiritualContent(
-                id=data.get('id', f"{personality}_{len(self.all_content)}"),
+                id=data.get('id', f"{personality}_{position}"),
                 personality=personality,
                 content=content_text[:2000],  # Limit content length
                 source=source,
@@ -212,60 +342,34 @@ class SimpleRAGService:
         personality: Optional[str] = None, 
         max_results: int = 5
     ) -> List[RAGSearchResult]:
-        """Search for relevant content"""
+        """Search for relevant content (BM25 over the personality's lexical index)"""
         if not self.is_loaded:
             logger.warning("RAG service not loaded")
             return []
         
-        query_lower = query.lower()
-        results = []
-        
-        # Determine content to search
-        if personality and personality in self.content_by_personality:
-            search_content = self.content_by_personality[personality]
+        # Only a known personality's corpus is loaded and searched; otherwise all content is
+        if personality and personality in self.personality_sources:
+            personalities = [personality]
         else:
-            search_content = self.all_content
+            personalities = list(self.personality_sources)
         
-        # Search through content
-        for content in search_content:
-            score = 0.0
-            match_type = "none"
-            
-            content_lower = content.content.lower()
-            
-            # Exact phrase matching
-            if query_lower in content_lower:
-                score = 0.9
-                match_type = "exact"
-            else:
-                # Word matching
-                query_words = query_lower.split()
-                content_words = content_lower.split()
-                
-                matches = 0
-                for word in query_words:
-                    if any(word in content_word for content_word in content_words):
-                        matches += 1
-                
-                if matches > 0:
-                    score = matches / len(query_words) * 0.7
-                    match_type = "partial"
-            
-            # Add relevance boost for personality match
-            if personality and content.personality == personality:
-                score *= 1.2
-            
-            if score > 0.1:  # Minimum threshold
+        query_phrase = ' '.join(query.lower().split())
+        results = []
+        for name in personalities:
+            corpus = self._corpus(name)
+            terms = corpus.lexical_index.query_terms(query)
+            if not terms:
+                continue
+            max_score = corpus.lexical_index.max_score(terms) or 1.0
+            for doc, score in corpus.lexical_index.search_terms(terms, max_results):
+                content = corpus.contents[doc]
                 results.append(RAGSearchResult(
                     content=content,
-                    relevance_score=score,
-                    match_type=match_type
+                    relevance_score=min(1.0, score / max_score),
+                    match_type="exact" if query_phrase in content.content.lower() else "partial"
                 ))
         
-        # Sort by relevance score
-        results.sort(key=lambda x: x.relevance_score, reverse=True)
-        
-        return results[:max_results]
+        return heapq.nlargest(max_results, results, key=lambda result: result.relevance_score)
     
     def generate_rag_response(
         self,
@@ -328,15 +432,21 @@ class SimpleRAGService:
             )
     
     def get_personality_stats(self) -> Dict[str, int]:
-        """Get statistics about loaded content per personality"""
-        return {
-            personality: len(content_list) 
-            for personality, content_list in self.content_by_personality.items()
-        }
+        """Get statistics about content per personality (from the snapshot index when possible)"""
+        snapshot = self._read_snapshot_index()
+        stats = {}
+        for personality in self.personality_sources:
+            corpus = self._corpora.get(personality)
+            entry = snapshot.get(personality)
+            if corpus is None and entry and entry.get('sources') == self._source_fingerprints(personality):
+                stats[personality] = entry.get('documents', 0)
+            else:
+                stats[personality] = len(self._corpus(personality).contents)
+        return stats
     
     def get_total_content_count(self) -> int:
-        """Get total number of loaded content items"""
-        return len(self.all_content)
+        """Get total number of content items"""
+        return sum(self.get_personality_stats().values())
 
 # Global instance
 simple_rag_service = SimpleRAGService()
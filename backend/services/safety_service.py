@@ -3,11 +3,18 @@ Safety service for content validation and filtering.
 Implements basic safety checks while remaining lightweight.
 """
 
+import os
+import sys
 import logging
-import re
 from typing import Dict, Any, List
 from enum import Enum
 
+try:
+    from utils.text_matcher import compile_patterns
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.text_matcher import compile_patterns
+
 logger = logging.getLogger(__name__)
 
 
@@ -74,10 +81,14 @@ class SafetyService:
             warnings = []
             blocked_patterns = []
             
-            # Check for blocked patterns
+            # Check for blocked patterns (all patterns in one pass)
+            matcher = compile_patterns(
+                [pattern for patterns in self._safety_patterns.values() for pattern in patterns]
+            )
+            found = set(matcher.found(content.lower()))
             for category, patterns in self._safety_patterns.items():
                 for pattern in patterns:
-                    if re.search(pattern, content.lower()):
+                    if pattern in found:
                         blocked_patterns.append(pattern)
                         warnings.append(f"Content contains {category}: {pattern}")
             
@@ -0,0 +1,259 @@
+"""
+Semantic Response Cache for Vimarsh
+
+Caches generated guidance per (personality_id, language) and serves it again
+for the same or a near-duplicate question:
+
+- exact hit:    the whitespace/case-normalized query text was seen before
+                (no embedding needed)
+- semantic hit: cosine similarity between the query embedding and a cached
+                query embedding is at least SEMANTIC_CACHE_THRESHOLD
+
+Entries expire after SEMANTIC_CACHE_TTL_SECONDS, each (personality, language)
+bucket holds at most SEMANTIC_CACHE_MAX_ENTRIES answers (LRU), and a bucket is
+dropped as soon as it is used with a different prompt version, so editing a
+personality prompt never serves answers produced by the old prompt.
+"""
+
+import os
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    from .vector_index import FlatVectorIndex
+except ImportError:
+    from vector_index import FlatVectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a question"""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def prompt_version(prompt_template: str) -> str:
+    """Short fingerprint of a personality prompt template"""
+    return hashlib.sha256(prompt_template.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class CachedResponse:
+    entry_id: str
+    query: str
+    response: Dict[str, Any]
+    expires_at: float
+    hits: int = 0
+
+
+@dataclass
+class _Bucket:
+    """Cached answers for one (personality_id, language)"""
+    prompt_version: str
+    entries: "OrderedDict[str, CachedResponse]" = field(default_factory=OrderedDict)
+    exact: Dict[str, str] = field(default_factory=dict)   # normalized query -> entry id
+    index: Optional[FlatVectorIndex] = None
+
+
+class SemanticResponseCache:
+    """Near-duplicate question cache for guidance responses"""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: int = 6 * 3600,
+        max_entries_per_personality: int = 500
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_personality = max_entries_per_personality
+
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._lock = threading.RLock()
+
+        # Metrics
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SemanticResponseCache"]:
+        """Create a cache from SEMANTIC_CACHE_* environment variables (None if disabled)"""
+        if os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        return cls(
+            similarity_threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95')),
+            ttl_seconds=int(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', str(6 * 3600))),
+            max_entries_per_personality=int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '500'))
+        )
+
+    def _bucket(self, personality_id: str, language: str, version: str, create: bool) -> Optional[_Bucket]:
+        key = (personality_id, language.lower())
+        bucket = self._buckets.get(key)
+        if bucket is not None and bucket.prompt_version != version:
+            logger.info(f"🔄 Prompt changed for {personality_id}; dropping {len(bucket.entries)} cached responses")
+            self._invalidations += len(bucket.entries)
+            bucket = None
+            del self._buckets[key]
+        if bucket is None and create:
+            bucket = _Bucket(prompt_version=version)
+            self._buckets[key] = bucket
+        return bucket
+
+    def lookup(
+        self,
+        personality_id: str,
+        language: str,
+        query: str,
+        query_embedding: Optional[Iterable[float]] = None,
+        version: str = ""
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Return (response, similarity) for a cached answer, or None
+
+        Without an embedding only exact (normalized text) matches are found.
+        """
+        with self._lock:
+            bucket = self._bucket(personality_id, language, version, create=False)
+            if bucket is None:
+                self._misses += 1
+                return None
+
+            now = time.time()
+            entry_id = bucket.exact.get(normalize_query(query))
+            exact = entry_id is not None
+            similarity = 1.0
+            if not exact and query_embedding is not None and bucket.index is not None and len(bucket.index):
+                for candidate_id, score in bucket.index.search(query_embedding, k=4):
+                    if score < self.similarity_threshold:
+                        break
+                    if bucket.entries[candidate_id].expires_at > now:
+                        entry_id, similarity = candidate_id, score
+                        break
+
+            entry = bucket.entries.get(entry_id) if entry_id else None
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    self._remove(bucket, entry_id)
+                self._misses += 1
+                return None
+
+            bucket.entries.move_to_end(entry_id)
+            entry.hits += 1
+            if exact:
+                self._exact_hits += 1
+            else:
+                self._semantic_hits += 1
+            return entry.response, similarity
+
+    def store(
+        self,
+        personality_id: str,
+        language: str,
+        query: str,
+        response: Dict[str, Any],
+        query_embedding: Optional[Iterable[float]] = None,
+        version: str = ""
+    ) -> None:
+        """Cache a generated response for a question"""
+        normalized = normalize_query(query)
+        with self._lock:
+            bucket = self._bucket(personality_id, language, version, create=True)
+
+            previous = bucket.exact.get(normalized)
+            if previous is not None:
+                self._remove(bucket, previous)
+
+            entry_id = uuid.uuid4().hex
+            bucket.entries[entry_id] = CachedResponse(
+                entry_id=entry_id,
+                query=query,
+                response=response,
+                expires_at=time.time() + self.ttl_seconds
+            )
+            bucket.exact[normalized] = entry_id
+            if query_embedding is not None:
+                embedding = list(query_embedding)
+                if bucket.index is None:
+                    bucket.index = FlatVectorIndex(dimension=len(embedding))
+                try:
+                    bucket.index.upsert(entry_id, embedding)
+                except ValueError as e:
+                    logger.warning(f"Semantic cache embedding rejected: {e}")
+            self._stores += 1
+
+            while len(bucket.entries) > self.max_entries_per_personality:
+                oldest_id = next(iter(bucket.entries))
+                self._remove(bucket, oldest_id)
+                self._evictions += 1
+
+    def _remove(self, bucket: _Bucket, entry_id: str) -> None:
+        entry = bucket.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        normalized = normalize_query(entry.query)
+        if bucket.exact.get(normalized) == entry_id:
+            del bucket.exact[normalized]
+        if bucket.index is not None:
+            bucket.index.remove(entry_id)
+
+    def invalidate(self, personality_id: Optional[str] = None) -> int:
+        """Drop cached responses for one personality (or all); returns the count removed"""
+        with self._lock:
+            keys = [key for key in self._buckets if personality_id is None or key[0] == personality_id]
+            removed = sum(len(self._buckets.pop(key).entries) for key in keys)
+            self._invalidations += removed
+            return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit-rate statistics for the admin performance endpoints"""
+        with self._lock:
+            hits = self._exact_hits + self._semantic_hits
+            total = hits + self._misses
+            per_personality: Dict[str, int] = {}
+            for (personality_id, _), bucket in self._buckets.items():
+                per_personality[personality_id] = per_personality.get(personality_id, 0) + len(bucket.entries)
+            return {
+                "enabled": True,
+                "similarity_threshold": self.similarity_threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries_per_personality": self.max_entries_per_personality,
+                "entries": sum(per_personality.values()),
+                "entries_by_personality": per_personality,
+                "exact_hits": self._exact_hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": hits / total if total else 0.0
+            }
+
+
+# Shared instance (used by PersonalityService and the admin endpoints)
+_semantic_response_cache = None
+_semantic_response_cache_initialized = False
+
+
+def get_semantic_response_cache() -> Optional[SemanticResponseCache]:
+    """Get the shared semantic response cache (None when SEMANTIC_CACHE_ENABLED=false)"""
+    global _semantic_response_cache, _semantic_response_cache_initialized
+    if not _semantic_response_cache_initialized:
+        _semantic_response_cache = SemanticResponseCache.from_env()
+        _semantic_response_cache_initialized = True
+    return _semantic_response_cache
+
+
+def get_response_cache_metrics() -> Dict[str, Any]:
+    """Response cache metrics for admin endpoints"""
+    cache = get_semantic_response_cache()
+    return cache.get_stats() if cache is not None else {"enabled": False}
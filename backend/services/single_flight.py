@@ -0,0 +1,139 @@
+"""
+Single-Flight Request Coalescing for Vimarsh
+
+When several callers ask for the same thing at the same time (a popular
+question hitting the LLM, the same text being embedded, a cache miss on a hot
+key), only the first caller performs the upstream call; the others wait for
+and share its result (or exception). Nothing is cached once the call
+finishes - that is the job of the caches in front of it.
+
+Async callers share an asyncio task (per event loop); sync callers share a
+result across threads. Each caller's own cancellation or timeout never
+cancels the shared call.
+"""
+
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A synchronous in-flight call shared between threads"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that have the same key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._sync_calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[str, asyncio.Task] = {}
+
+        # Metrics
+        self.executed = 0   # upstream calls actually made
+        self.shared = 0     # callers served by someone else's call (upstream calls saved)
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Stable key for a request made of JSON-like parts"""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn once for all threads calling concurrently with the same key"""
+        with self._lock:
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._sync_calls[key] = call
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._sync_calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() once for all coroutines calling concurrently with the same key"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._async_calls.get(key)
+            if task is not None and task.get_loop() is loop and not task.done():
+                self.shared += 1
+            else:
+                task = loop.create_task(fn())
+                self._async_calls[key] = task
+                self.executed += 1
+                task.add_done_callback(lambda finished, key=key: self._forget(key, finished))
+        # shield: a caller timing out or being cancelled leaves the shared call running
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._async_calls.get(key) is task:
+                del self._async_calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure is not logged as lost
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._sync_calls) + len(self._async_calls)
+        requests = self.executed + self.shared
+        return {
+            "upstream_calls": self.executed,
+            "calls_saved": self.shared,
+            "in_flight": in_flight,
+            "saved_ratio": self.shared / requests if requests else 0.0
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get the shared coalescing group for a kind of upstream call"""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def get_single_flight_metrics() -> Dict[str, Any]:
+    """Per-group coalescing metrics for the admin performance endpoints"""
+    with _groups_lock:
+        groups = dict(_groups)
+    metrics = {name: group.get_stats() for name, group in groups.items()}
+    return {
+        "groups": metrics,
+        "total_calls_saved": sum(m["calls_saved"] for m in metrics.values())
+    }
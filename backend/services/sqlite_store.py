@@ -0,0 +1,284 @@
+"""
+Embedded SQLite Backend for Vimarsh Local Mode
+
+Optional replacement for the per-service JSON files used when Cosmos DB is
+not configured (DatabaseService, UserProfileService, AnalyticsService and the
+feedback collector). Enabled with LOCAL_STORAGE_BACKEND=sqlite; the database
+file is LOCAL_SQLITE_PATH (default data/vimarsh-local.sqlite).
+
+Each collection (Cosmos container equivalent) is a table of JSON documents:
+
+    seq INTEGER PRIMARY KEY   insertion order
+    id  TEXT                  document id (indexed)
+    body TEXT                 the document as JSON
+
+Secondary indexes are SQLite expression indexes over json_extract() of the
+indexed fields, so filtered, ordered, paginated queries are index scans.
+SQLiteCollection has the same query API as LogStructuredStore (find, count,
+append, write, delete_where, replace_all), so callers do not care which
+backend they get.
+
+The database runs in WAL mode (readers never block the writer), every thread
+gets its own connection, and statements are issued with fixed SQL text and
+bound parameters so each connection's statement cache reuses the prepared
+statements. Writes that belong together run in one transaction.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'vimarsh-local.sqlite')
+
+
+def _field(name: str) -> str:
+    """SQL expression for a top-level document field"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Unsupported field name for SQLite index: {name!r}")
+    return f"json_extract(body, '$.{name}')"
+
+
+def _encode(doc: Record) -> str:
+    return json.dumps(doc, ensure_ascii=False, default=str)
+
+
+class SQLiteCollection:
+    """A table of JSON documents with optional secondary indexes"""
+
+    def __init__(self, store: "SQLiteDocumentStore", name: str):
+        self.store = store
+        self.name = name
+        self.table = re.sub(r'[^A-Za-z0-9_]', '_', name)
+        self._indexes: Dict[str, Tuple[Tuple[str, ...], Optional[str]]] = {}
+        self._sql: Dict[Any, str] = {}
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        return self.store.connection().execute(sql, params)
+
+    # =======================
+    # READS
+    # =======================
+
+    def all(self) -> List[Record]:
+        """All documents in insertion order"""
+        rows = self._execute(f'SELECT body FROM "{self.table}" ORDER BY seq').fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def values(self):
+        return iter(self.all())
+
+    def get(self, doc_id: Any) -> Optional[Record]:
+        """Most recently written document with this id"""
+        row = self._execute(
+            f'SELECT body FROM "{self.table}" WHERE id = ? ORDER BY seq DESC LIMIT 1', (doc_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return self._execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+
+    def create_index(
+        self,
+        name: str,
+        fields: Tuple[str, ...],
+        sort_field: Optional[str] = None,
+        sort_default: Any = ""
+    ) -> None:
+        """Add a secondary index (no-op if one with this name exists)"""
+        if name in self._indexes:
+            return
+        columns = [_field(f) for f in fields] + ([_field(sort_field)] if sort_field else [])
+        if columns:
+            with self.store.connection() as conn:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{self.table}__{name}" ON "{self.table}" ({", ".join(columns)})'
+                )
+        self._indexes[name] = (tuple(fields), sort_field)
+
+    def _find_sql(self, index_name: str, descending: bool, since: bool, count: bool = False) -> str:
+        cache_key = (index_name, descending, since, count)
+        sql = self._sql.get(cache_key)
+        if sql is None:
+            fields, sort_field = self._indexes[index_name]
+            where = [f"{_field(f)} IS ?" for f in fields]
+            if since and sort_field:
+                where.append(f"{_field(sort_field)} >= ?")
+            sql = f'SELECT {"COUNT(*)" if count else "body"} FROM "{self.table}"'
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            if not count:
+                direction = "DESC" if descending else "ASC"
+                order = f"{_field(sort_field)} {direction}, " if sort_field else ""
+                sql += f" ORDER BY {order}seq {direction} LIMIT ? OFFSET ?"
+            self._sql[cache_key] = sql
+        return sql
+
+    def find(
+        self,
+        index_name: str,
+        key: Tuple[Any, ...],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        descending: bool = False,
+        since: Any = None
+    ) -> List[Record]:
+        """Documents whose index fields equal ``key``, ordered by the index sort field"""
+        sql = self._find_sql(index_name, descending, since is not None)
+        params = tuple(key) + ((since,) if since is not None else ()) + (
+            limit if limit is not None else -1, offset
+        )
+        return [json.loads(body) for (body,) in self._execute(sql, params).fetchall()]
+
+    def count(self, index_name: str, key: Tuple[Any, ...]) -> int:
+        """Number of documents whose index fields equal ``key``"""
+        return self._execute(self._find_sql(index_name, False, False, count=True), tuple(key)).fetchone()[0]
+
+    # =======================
+    # WRITES
+    # =======================
+
+    def append(self, doc: Record) -> None:
+        self.write([doc])
+
+    def write(self, docs: List[Record], delete: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Delete documents whose fields equal ``delete`` and insert ``docs`` in one transaction
+
+        Returns the number of documents deleted.
+        """
+        deleted = 0
+        with self.store.connection() as conn:
+            if delete:
+                fields = tuple(sorted(delete))
+                deleted = conn.execute(
+                    f'DELETE FROM "{self.table}" WHERE ' + " AND ".join(f"{_field(f)} IS ?" for f in fields),
+                    tuple(delete[f] for f in fields)
+                ).rowcount
+            conn.executemany(
+                f'INSERT INTO "{self.table}" (id, body) VALUES (?, ?)',
+                [(doc.get("id"), _encode(doc)) for doc in docs]
+            )
+        return deleted
+
+    def delete_where(self, match: Dict[str, Any]) -> int:
+        """Delete every document whose fields equal ``match``; returns the count"""
+        return self.write([], delete=match)
+
+    def replace_all(self, docs: List[Record]) -> None:
+        """Replace the whole collection"""
+        with self.store.connection() as conn:
+            conn.execute(f'DELETE FROM "{self.table}"')
+            conn.executemany(
+                f'INSERT INTO "{self.table}" (id, body) VALUES (?, ?)',
+                [(doc.get("id"), _encode(doc)) for doc in docs]
+            )
+
+    def flush(self) -> None:
+        """Writes are committed per call; nothing to flush"""
+
+    def close(self) -> None:
+        """Connections are owned by the store"""
+
+
+class SQLiteDocumentStore:
+    """WAL-mode SQLite database holding the local collections"""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._collections: Dict[str, SQLiteCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        logger.info(f"🗄️ Local SQLite storage at {self.path}")
+
+    @classmethod
+    def from_env(cls) -> Optional["SQLiteDocumentStore"]:
+        """Create the store when LOCAL_STORAGE_BACKEND=sqlite (None otherwise)"""
+        if os.getenv('LOCAL_STORAGE_BACKEND', 'json').lower() != 'sqlite':
+            return None
+        return cls(os.getenv('LOCAL_SQLITE_PATH') or DEFAULT_SQLITE_PATH)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def collection(self, name: str, seed_path: Optional[str] = None) -> SQLiteCollection:
+        """
+        Get a collection, creating its table on first use
+
+        When the table is new and ``seed_path`` is a JSON array file (the
+        collection's previous local JSON storage), its documents are imported.
+        The collection is only handed out once its table exists.
+        """
+        conn = self.connection()  # outside the lock: opening one registers it under the lock
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is not None:
+                return collection
+            collection = SQLiteCollection(self, name)
+
+            with conn:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (collection.table,)
+                ).fetchone()
+                conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{collection.table}" ('
+                    'seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT, body TEXT NOT NULL)'
+                )
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "{collection.table}__id" ON "{collection.table}" (id)')
+            if not exists and seed_path and os.path.exists(seed_path):
+                try:
+                    with open(seed_path, 'r', encoding='utf-8') as f:
+                        docs = json.load(f)
+                    collection.replace_all(docs)
+                    logger.info(f"📥 Imported {len(docs)} documents from {seed_path} into {name}")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"⚠️ Could not import {seed_path} into {name}: {e}")
+
+            self._collections[name] = collection
+        return collection
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass  # opened by another thread that still owns it
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_sqlite_store = None
+_sqlite_store_initialized = False
+_sqlite_store_lock = threading.Lock()
+
+
+def get_local_sqlite_store() -> Optional[SQLiteDocumentStore]:
+    """Shared SQLite store for local mode (None unless LOCAL_STORAGE_BACKEND=sqlite)"""
+    global _sqlite_store, _sqlite_store_initialized
+    if not _sqlite_store_initialized:
+        with _sqlite_store_lock:
+            if not _sqlite_store_initialized:
+                _sqlite_store = SQLiteDocumentStore.from_env()
+                _sqlite_store_initialized = True
+    return _sqlite_store
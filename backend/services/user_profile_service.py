@@ -24,6 +24,11 @@ except ImportError:
 # Import authentication models
 from auth.models import AuthenticatedUser
 
+try:
+    from .sqlite_store import get_local_sqlite_store
+except ImportError:
+    from sqlite_store import get_local_sqlite_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -149,6 +154,7 @@ class UserProfileService:
         self.sessions_container = None
         self.interactions_container = None
         self.local_storage_path = "data/vimarsh-db"
+        self.sqlite_store = None  # set when LOCAL_STORAGE_BACKEND=sqlite
         
         # Initialize connection
         self._initialize_connection()
@@ -207,7 +213,15 @@ class UserProfileService:
             self._ensure_local_directories()
     
     def _ensure_local_directories(self):
-        """Create local storage directories"""
+        """Create local storage directories (or SQLite collections when LOCAL_STORAGE_BACKEND=sqlite)"""
+        self.sqlite_store = get_local_sqlite_store()
+        if self.sqlite_store is not None:
+            self.sqlite_store.collection("users").create_index("by_auth_id", ("auth_id",))
+            self.sqlite_store.collection("user_sessions").create_index("by_session", ("user_id", "session_id"))
+            self.sqlite_store.collection("user_interactions").create_index("by_user", ("user_id",), "timestamp")
+            logger.info("🗄️ Using local SQLite storage for user profiles")
+            return
+        
         os.makedirs(f"{self.local_storage_path}/users", exist_ok=True)
         os.makedirs(f"{self.local_storage_path}/user_sessions", exist_ok=True)
         os.makedirs(f"{self.local_storage_path}/user_interactions", exist_ok=True)
@@ -334,28 +348,30 @@ class UserProfileService:
     async def _find_user_local(self, auth_id: str) -> Optional[UserDocument]:
         """Find user in local JSON storage by auth_id"""
         try:
+            if self.sqlite_store is not None:
+                items = self.sqlite_store.collection("users").find("by_auth_id", (auth_id,), limit=1)
+                return self._user_from_local_data(items[0]) if items else None
+            
             users_dir = f"{self.local_storage_path}/users"
             for filename in os.listdir(users_dir):
                 if filename.endswith('.json'):
                     with open(f"{users_dir}/{filename}", 'r') as f:
                         user_data = json.load(f)
                         if user_data.get('auth_id') == auth_id:
-                            # Convert datetime strings back to datetime objects
-                            if isinstance(user_data.get('created_at'), str):
-                                user_data['created_at'] = datetime.fromisoformat(user_data['created_at'])
-                            if isinstance(user_data.get('last_login'), str):
-                                user_data['last_login'] = datetime.fromisoformat(user_data['last_login'])
-                            if isinstance(user_data.get('last_activity'), str):
-                                user_data['last_activity'] = datetime.fromisoformat(user_data['last_activity'])
-                            if user_data.get('last_consent_update') and isinstance(user_data['last_consent_update'], str):
-                                user_data['last_consent_update'] = datetime.fromisoformat(user_data['last_consent_update'])
-                            
-                            return UserDocument(**user_data)
+                            return self._user_from_local_data(user_data)
             return None
         except Exception as e:
             logger.error(f"❌ Error finding user in local storage: {e}")
             return None
     
+    def _user_from_local_data(self, user_data: Dict[str, Any]) -> UserDocument:
+        """Build a UserDocument from locally stored JSON"""
+        # Convert datetime strings back to datetime objects
+        for field in ['created_at', 'last_login', 'last_activity', 'last_consent_update']:
+            if user_data.get(field) and isinstance(user_data[field], str):
+                user_data[field] = datetime.fromisoformat(user_data[field])
+        return UserDocument(**user_data)
+    
     async def _save_user_document(self, user_doc: UserDocument):
         """Save user document to storage"""
         if self.cosmos_client:
@@ -392,9 +408,12 @@ class UserProfileService:
                 if user_dict.get(field) and isinstance(user_dict[field], datetime):
                     user_dict[field] = user_dict[field].isoformat()
             
-            filepath = f"{self.local_storage_path}/users/{user_doc.id}.json"
-            with open(filepath, 'w') as f:
-                json.dump(user_dict, f, indent=2, default=str)
+            if self.sqlite_store is not None:
+                self.sqlite_store.collection("users").write([user_dict], delete={"id": user_doc.id})
+            else:
+                filepath = f"{self.local_storage_path}/users/{user_doc.id}.json"
+                with open(filepath, 'w') as f:
+                    json.dump(user_dict, f, indent=2, default=str)
             
             logger.info(f"💾 Saved user to local storage: {user_doc.email}")
             
@@ -531,8 +550,11 @@ class UserProfileService:
                     logger.debug(f"📋 Session {session_id} already exists for user {user_id}")
             else:
                 # For local storage, always create session file if it doesn't exist
-                session_file = f"{self.local_storage_path}/user_sessions/{session_id}.json"
-                if not os.path.exists(session_file):
+                if self.sqlite_store is not None:
+                    exists = self.sqlite_store.collection("user_sessions").count("by_session", (user_id, session_id)) > 0
+                else:
+                    exists = os.path.exists(f"{self.local_storage_path}/user_sessions/{session_id}.json")
+                if not exists:
                     session_doc = {
                         "id": str(uuid.uuid4()),
                         "partition_key": user_id,
@@ -572,6 +594,9 @@ class UserProfileService:
     async def _save_session_local(self, session_doc: Dict[str, Any]):
         """Save session document to local JSON storage"""
         try:
+            if self.sqlite_store is not None:
+                self.sqlite_store.collection("user_sessions").append(session_doc)
+                return
             filepath = f"{self.local_storage_path}/user_sessions/{session_doc['id']}.json"
             with open(filepath, 'w') as f:
                 json.dump(session_doc, f, indent=2, default=str)
@@ -598,6 +623,9 @@ class UserProfileService:
     async def _save_interaction_local(self, interaction_doc: Dict[str, Any]):
         """Save interaction document to local JSON storage"""
         try:
+            if self.sqlite_store is not None:
+                self.sqlite_store.collection("user_interactions").append(interaction_doc)
+                return
             filepath = f"{self.local_storage_path}/user_interactions/{interaction_doc['id']}.json"
             with open(filepath, 'w') as f:
                 json.dump(interaction_doc, f, indent=2, default=str)
@@ -677,17 +705,15 @@ class UserProfileService:
         else:
             # Local storage
             try:
+                if self.sqlite_store is not None:
+                    user_data = self.sqlite_store.collection("users").get(user_id)
+                    return self._user_from_local_data(user_data) if user_data else None
+                
                 filepath = f"{self.local_storage_path}/users/{user_id}.json"
                 if os.path.exists(filepath):
                     with open(filepath, 'r') as f:
                         user_data = json.load(f)
-                        
-                    # Convert datetime strings back to datetime objects
-                    for field in ['created_at', 'last_login', 'last_activity', 'last_consent_update']:
-                        if user_data.get(field) and isinstance(user_data[field], str):
-                            user_data[field] = datetime.fromisoformat(user_data[field])
-                    
-                    return UserDocument(**user_data)
+                    return self._user_from_local_data(user_data)
                 return None
             except Exception as e:
                 logger.error(f"❌ Error getting user from local storage: {e}")
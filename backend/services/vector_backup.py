@@ -0,0 +1,182 @@
+"""
+Streaming Export and Restore for Vimarsh Cosmos DB Containers
+
+Backups are gzip-compressed JSONL, one document per line, written while the
+container is paged through with continuation tokens, so memory use is one
+page regardless of container size (embeddings included):
+
+- each page is appended as its own gzip member (concatenated members are a
+  valid gzip stream) and fsynced, then the byte offset and continuation token
+  are saved to ``<path>.state.json``
+- an interrupted export with the same query resumes from the saved token,
+  after truncating anything written past the last completed page
+- restore streams the file back in chunks through the bulk upsert pipeline;
+  with a checkpoint file an interrupted restore skips what it already wrote
+
+Cosmos DB system properties (``_rid``, ``_etag``, ``_ts``, ...) are not exported.
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from .cosmos_query import CosmosQuery, CosmosQueryBuilder
+    from .bulk_writer import BulkUpsertPipeline, BulkWriteResult
+except ImportError:
+    from cosmos_query import CosmosQuery, CosmosQueryBuilder
+    from bulk_writer import BulkUpsertPipeline, BulkWriteResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExportResult:
+    """Outcome of one (possibly resumed) export"""
+    path: str
+    documents: int
+    pages: int
+    bytes_written: int
+    resumed: bool
+    duration_seconds: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _state_path(path: str) -> str:
+    return f"{path}.state.json"
+
+
+def _save_state(path: str, state: Dict[str, Any]) -> None:
+    tmp = f"{_state_path(path)}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, _state_path(path))
+
+
+def _load_state(path: str, query: CosmosQuery) -> Optional[Dict[str, Any]]:
+    """Saved progress of an earlier export of the same query to the same file"""
+    if not (os.path.exists(_state_path(path)) and os.path.exists(path)):
+        return None
+    try:
+        with open(_state_path(path), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('sql') != query.sql or state.get('parameters') != query.parameters:
+        logger.warning(f"⚠️ Export state for {path} is for a different query, starting over")
+        return None
+    return state
+
+
+def export_container(
+    container,
+    path: str,
+    query: Optional[CosmosQuery] = None,
+    page_size: int = 100,
+    resume: bool = True
+) -> ExportResult:
+    """Stream the query's documents (default: all) to gzip JSONL at ``path``"""
+    query = query or CosmosQueryBuilder("export").build()
+    start = time.perf_counter()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    state = _load_state(path, query) if resume else None
+    if state is not None:
+        with open(path, 'r+b') as f:
+            f.truncate(state['offset'])  # drop a partially written page
+        logger.info(f"📍 Resuming export to {path} after {state['documents']} documents")
+    else:
+        state = {'sql': query.sql, 'parameters': query.parameters, 'offset': 0,
+                 'continuation_token': None, 'documents': 0, 'pages': 0, 'complete': False}
+        open(path, 'wb').close()
+
+    resumed = state['pages'] > 0
+    if not state['complete']:
+        with open(path, 'ab') as raw:
+            for items, token in query.pages(container, page_size, state['continuation_token']):
+                lines = ''.join(
+                    json.dumps({k: v for k, v in item.items() if not k.startswith('_')},
+                               ensure_ascii=False, default=str) + '\n'
+                    for item in items
+                )
+                raw.write(gzip.compress(lines.encode('utf-8')))
+                raw.flush()
+                os.fsync(raw.fileno())
+
+                state.update(offset=raw.tell(), continuation_token=token,
+                             documents=state['documents'] + len(items), pages=state['pages'] + 1,
+                             complete=token is None)
+                _save_state(path, state)
+                logger.debug(f"💾 Exported page {state['pages']}: {state['documents']} documents")
+
+    if os.path.exists(_state_path(path)):
+        os.remove(_state_path(path))
+    result = ExportResult(
+        path=path,
+        documents=state['documents'],
+        pages=state['pages'],
+        bytes_written=os.path.getsize(path),
+        resumed=resumed,
+        duration_seconds=time.perf_counter() - start
+    )
+    logger.info(f"✅ Exported {result.documents} documents to {path} "
+                f"({result.bytes_written / (1024 * 1024):.2f} MB, {result.pages} pages)")
+    return result
+
+
+def iter_backup(path: str) -> Iterator[Dict[str, Any]]:
+    """Documents of a gzip JSONL backup, one at a time"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _chunks(documents: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def restore_container(
+    container,
+    path: str,
+    checkpoint_path: Optional[str] = None,
+    chunk_size: int = 500,
+    progress: Any = None
+) -> BulkWriteResult:
+    """Upsert a backup into ``container`` chunk by chunk (resumable with a checkpoint)"""
+    start = time.perf_counter()
+    pipeline = BulkUpsertPipeline.from_env(container, checkpoint_path=checkpoint_path, progress=progress)
+    totals = BulkWriteResult()
+
+    for chunk in _chunks(iter_backup(path), chunk_size):
+        result = await pipeline.upsert(chunk)
+        totals.total += result.total
+        totals.succeeded += result.succeeded
+        totals.failed += result.failed
+        totals.skipped += result.skipped
+        totals.batches += result.batches
+        totals.throttled_retries += result.throttled_retries
+        totals.written_ids.extend(result.written_ids)
+        totals.errors.extend(result.errors)
+
+    totals.duration_seconds = time.perf_counter() - start
+    logger.info(f"✅ Restored {totals.succeeded} documents from {path} "
+                f"({totals.skipped} already restored, {totals.failed} failed)")
+    return totals
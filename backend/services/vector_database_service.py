@@ -6,6 +6,9 @@ with proper admin panel integration and database reorganization.
 """
 
 import os
+import sys
+import json
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict, field
@@ -13,8 +16,42 @@ from datetime import datetime
 from enum import Enum
 import numpy as np
 
+try:
+    from .vector_index import PersonalityVectorIndex
+    from .vector_scoring import EmbeddingMatrix
+    from .local_embedding_store import LocalEmbeddingStore
+    from .cosmos_query import CosmosQueryBuilder
+    from .vector_search import CosmosVectorSearch, LocalVectorSearch, VectorSearchBackend
+    from .bulk_writer import BulkUpsertPipeline, BulkWriteResult
+    from .vector_stats import BREAKDOWNS, DocumentSummary, PartitionStats, VectorStatsStore, document_size, stats_from_groups
+    from .vector_backup import export_container, restore_container
+except ImportError:
+    from vector_index import PersonalityVectorIndex
+    from vector_scoring import EmbeddingMatrix
+    from local_embedding_store import LocalEmbeddingStore
+    from cosmos_query import CosmosQueryBuilder
+    from vector_search import CosmosVectorSearch, LocalVectorSearch, VectorSearchBackend
+    from bulk_writer import BulkUpsertPipeline, BulkWriteResult
+    from vector_stats import BREAKDOWNS, DocumentSummary, PartitionStats, VectorStatsStore, document_size, stats_from_groups
+    from vector_backup import export_container, restore_container
+
+try:
+    from utils.near_duplicates import DuplicateMatch, find_near_duplicates
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.near_duplicates import DuplicateMatch, find_near_duplicates
+
 logger = logging.getLogger(__name__)
 
+# Properties read by _item_to_document (embeddings are projected only where scored)
+DOCUMENT_FIELDS = (
+    'id', 'content', 'personality', 'content_type', 'source', 'title', 'chapter', 'verse',
+    'sanskrit', 'translation', 'citation', 'category', 'language', 'metadata'
+)
+
+# Candidates fetched per requested result when blending in other personalities
+CROSS_PERSONALITY_CANDIDATES = 4
+
 class PersonalityType(Enum):
     """Supported personality types"""
     KRISHNA = "krishna"
@@ -83,6 +120,7 @@ class DatabaseStats:
     storage_size_mb: float
     total_embeddings_generated: int
     failed_embeddings: int
+    reconciled_at: Optional[str] = None
 
 class VectorDatabaseService:
     """Enhanced vector database service for multi-personality system - UPDATED FOR NEW ARCHITECTURE"""
@@ -100,6 +138,20 @@ class VectorDatabaseService:
         self.local_cache: Dict[str, VectorDocument] = {}
         self.stats: Optional[DatabaseStats] = None
         
+        # Server-side VectorDistance top-k; when disabled, the in-process index (or a scan) is used
+        self.server_side_search = os.getenv('VECTOR_SEARCH_SERVER_SIDE', 'true').lower() == 'true'
+        self._vector_search: Optional[VectorSearchBackend] = None
+        
+        # In-process ANN index over personality_vectors, loaded lazily per partition
+        self.vector_index_enabled = os.getenv('VECTOR_INDEX_ENABLED', 'true').lower() == 'true'
+        self.vector_index = PersonalityVectorIndex(index_type=os.getenv('VECTOR_INDEX_TYPE', 'flat'))
+        
+        # Memory-mapped embedding store used in local (no Cosmos DB) mode
+        self.local_store = LocalEmbeddingStore()
+        
+        # Materialized per-personality statistics, updated on every write
+        self.stats_store: Optional[VectorStatsStore] = None
+        
         # Initialize components
         self._initialize_cosmos_db()
         self._initialize_embedding_model()
@@ -172,9 +224,28 @@ class VectorDatabaseService:
                 )
                 
                 logger.info("✅ Created new multi-personality Cosmos DB structure")
+            
+            self._initialize_stats_store()
                 
         except Exception as e:
             logger.error(f"❌ Failed to initialize Cosmos DB: {e}")
+    
+    def _initialize_stats_store(self):
+        """Connect the materialized statistics container (small, partitioned by personality)"""
+        if os.getenv('VECTOR_STATS_ENABLED', 'true').lower() != 'true':
+            return
+        try:
+            from azure.cosmos import PartitionKey
+            
+            stats_container = self.database.create_container_if_not_exists(
+                id=os.getenv('VECTOR_STATS_CONTAINER_NAME', 'vector_stats'),
+                partition_key=PartitionKey(path='/personality')
+            )
+            self.stats_store = VectorStatsStore.from_env(stats_container)
+            logger.info("✅ Materialized vector statistics enabled")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Materialized statistics unavailable, aggregating on demand: {e}")
             
     def _initialize_embedding_model(self):
         """Initialize embedding model for vector generation"""
@@ -244,23 +315,43 @@ class VectorDatabaseService:
         else:
             return ContentType.TEACHING
     
+    def _document_to_item(self, document: VectorDocument) -> Dict[str, Any]:
+        """Convert a vector document to its Cosmos DB item"""
+        doc_dict = asdict(document)
+        doc_dict['personality'] = document.personality.value
+        doc_dict['content_type'] = document.content_type.value
+        doc_dict['size_bytes'] = document_size(doc_dict)
+        return doc_dict
+    
     async def upsert_document(self, document: VectorDocument) -> bool:
         """Insert or update a vector document"""
         try:
-            if not self.container:
-                logger.error("❌ Cosmos DB container not available")
-                return False
-            
             # Convert to dictionary for Cosmos DB
-            doc_dict = asdict(document)
-            doc_dict['personality'] = document.personality.value
-            doc_dict['content_type'] = document.content_type.value
+            doc_dict = self._document_to_item(document)
+            
+            if not self.container:
+                # Local mode: append to the memory-mapped embedding store
+                if not document.embedding:
+                    logger.error(f"❌ No embedding for {document.id}, not stored locally")
+                    return False
+                self.local_store.add(document.personality.value, doc_dict, document.embedding)
+                self.local_cache[document.id] = document
+                logger.debug(f"✅ Stored document locally: {document.id}")
+                return True
             
             # Upsert document
+            previous = self._stored_summary(document.personality.value, document.id)
             self.container.upsert_item(body=doc_dict)
+            self._record_stats(document.personality.value, [(previous, DocumentSummary.from_item(doc_dict))])
             
-            # Update local cache
+            # Update local cache and in-process index
             self.local_cache[document.id] = document
+            self.vector_index.upsert(
+                document.id,
+                document.personality.value,
+                document.embedding,
+                document.content_type.value
+            )
             
             logger.debug(f"✅ Upserted document: {document.id}")
             return True
@@ -269,17 +360,98 @@ class VectorDatabaseService:
             logger.error(f"❌ Failed to upsert document {document.id}: {e}")
             return False
     
+    async def upsert_documents(
+        self,
+        documents: List[VectorDocument],
+        checkpoint_path: Optional[str] = None,
+        progress: Any = None
+    ) -> BulkWriteResult:
+        """
+        Insert or update many vector documents through the bulk upsert pipeline
+        
+        Writes are batched by personality, run concurrently and retried on
+        throttling; with checkpoint_path an interrupted load can be rerun and
+        skips what was already written.
+        """
+        if not self.container:
+            # Local mode: one append per personality partition
+            result = BulkWriteResult(total=len(documents))
+            by_personality: Dict[str, List[VectorDocument]] = {}
+            for document in documents:
+                if document.embedding:
+                    by_personality.setdefault(document.personality.value, []).append(document)
+                else:
+                    result.failed += 1
+                    result.errors.append(f"No embedding: {document.id}")
+            for personality, docs in by_personality.items():
+                self.local_store.add_many(personality, [(self._document_to_item(d), d.embedding) for d in docs])
+                for document in docs:
+                    self.local_cache[document.id] = document
+                    result.written_ids.append(document.id)
+            result.succeeded = len(result.written_ids)
+            return result
+        
+        items = [self._document_to_item(d) for d in documents]
+        pipeline = BulkUpsertPipeline.from_env(self.container, checkpoint_path=checkpoint_path, progress=progress)
+        result = await pipeline.upsert(items)
+        
+        # Overwritten documents are not looked up before a bulk write: the
+        # touched partitions are re-aggregated on the next statistics read
+        written = set(result.written_ids)
+        for personality in {item['personality'] for item in items if item['id'] in written}:
+            self._mark_stats_stale(personality)
+        
+        for document in documents:
+            if document.id in written:
+                self.local_cache[document.id] = document
+                self.vector_index.upsert(
+                    document.id,
+                    document.personality.value,
+                    document.embedding,
+                    document.content_type.value
+                )
+        return result
+    
     async def semantic_search(
         self,
         query: str,
         personality: Optional[PersonalityType] = None,
         content_types: Optional[List[ContentType]] = None,
         top_k: int = 5,
-        min_relevance: float = 0.1
+        min_relevance: float = 0.1,
+        include_cross_personality: bool = False,
+        cross_min_relevance: Optional[float] = None
+    ) -> List[SearchResult]:
+        """
+        Perform semantic search with personality and content type filtering
+        
+        With include_cross_personality, the requested personality's top_k come
+        from its own partition and a search over all personalities supplies
+        candidates from other personalities (scored against
+        cross_min_relevance, default 0.8 * min_relevance) that fill any
+        remaining slots.
+        
+        The query embedding and the Cosmos queries are blocking calls, so the
+        search runs in a worker thread and does not stall the event loop.
+        """
+        return await asyncio.to_thread(
+            self._semantic_search_sync, query, personality, content_types, top_k,
+            min_relevance, include_cross_personality, cross_min_relevance
+        )
+    
+    def _semantic_search_sync(
+        self,
+        query: str,
+        personality: Optional[PersonalityType],
+        content_types: Optional[List[ContentType]],
+        top_k: int,
+        min_relevance: float,
+        include_cross_personality: bool,
+        cross_min_relevance: Optional[float]
     ) -> List[SearchResult]:
-        """Perform semantic search with personality and content type filtering"""
         try:
-            if not self.embedding_model or not self.container:
+            use_local_store = not self.container and self.local_store.has_data()
+            if not self.embedding_model or not (self.container or use_local_store):
                 logger.error("❌ Embedding model or database not available")
                 return []
             
@@ -291,79 +463,240 @@ class VectorDatabaseService:
             elif not isinstance(query_embedding, list):
                 query_embedding = list(query_embedding)
             
-            # Build search query with filters
-            sql_query = "SELECT * FROM c"
-            conditions = []
-            
-            if personality:
-                conditions.append(f"c.personality = '{personality.value}'")
-            
-            if content_types:
-                content_type_values = [f"'{ct.value}'" for ct in content_types]
-                conditions.append(f"c.content_type IN ({', '.join(content_type_values)})")
+            results = self._search(query_embedding, personality, content_types, top_k, min_relevance)
             
-            if conditions:
-                sql_query += f" WHERE {' AND '.join(conditions)}"
-            
-            # Execute query
-            items = list(self.container.query_items(
-                query=sql_query,
-                enable_cross_partition_query=True
-            ))
-            
-            # Calculate similarities and rank results
-            results = []
-            for item in items:
-                if not item.get('embedding'):
-                    continue
-                
-                # Calculate cosine similarity
-                doc_embedding = np.array(item['embedding'])
-                query_embedding_np = np.array(query_embedding)
-                
-                similarity = np.dot(doc_embedding, query_embedding_np) / (
-                    np.linalg.norm(doc_embedding) * np.linalg.norm(query_embedding_np)
+            # Other personalities only fill slots the requested one leaves open
+            if include_cross_personality and personality is not None and len(results) < top_k:
+                if cross_min_relevance is None:
+                    cross_min_relevance = min_relevance * 0.8
+                candidates = self._search(
+                    query_embedding, None, content_types, top_k * CROSS_PERSONALITY_CANDIDATES, cross_min_relevance
                 )
-                
-                if similarity >= min_relevance:
-                    # Create vector document
-                    vector_doc = VectorDocument(
-                        id=item['id'],
-                        content=item['content'],
-                        personality=PersonalityType(item['personality']),
-                        content_type=ContentType(item['content_type']),
-                        source=item['source'],
-                        title=item.get('title'),
-                        chapter=item.get('chapter'),
-                        verse=item.get('verse'),
-                        sanskrit=item.get('sanskrit'),
-                        translation=item.get('translation'),
-                        citation=item.get('citation'),
-                        category=item.get('category', 'general'),
-                        language=item.get('language', 'English'),
-                        embedding=item.get('embedding'),
-                        metadata=item.get('metadata', {})
-                    )
-                    
-                    # Create search result
-                    result = SearchResult(
-                        document=vector_doc,
-                        relevance_score=float(similarity),
-                        personality_match=personality is None or vector_doc.personality == personality,
-                        content_type_match=content_types is None or vector_doc.content_type in content_types,
-                        query_embedding=query_embedding
-                    )
-                    
-                    results.append(result)
-            
-            # Sort by relevance score and return top_k
-            results.sort(key=lambda x: x.relevance_score, reverse=True)
-            return results[:top_k]
+                results = self._blend_cross_personality(results, candidates, personality, top_k)
+            return results
             
         except Exception as e:
             logger.error(f"❌ Semantic search failed: {e}")
             return []
     
+    def _search(
+        self,
+        query_embedding: List[float],
+        personality: Optional[PersonalityType],
+        content_types: Optional[List[ContentType]],
+        top_k: int,
+        min_relevance: float
+    ) -> List[SearchResult]:
+        """Top-k via the vector search backend, or the in-process index / scan when it is off or fails"""
+        backend = self._vector_search_backend()
+        if backend is not None:
+            try:
+                return self._search_backend(
+                    backend, query_embedding, personality, content_types, top_k, min_relevance
+                )
+            except Exception as e:
+                if self.container is None:
+                    raise
+                logger.warning(f"⚠️ {backend.name} vector search failed, using the in-process index: {e}")
+        if not self.vector_index_enabled:
+            return self._semantic_search_scan(query_embedding, personality, content_types, top_k, min_relevance)
+        return self._semantic_search_index(query_embedding, personality, content_types, top_k, min_relevance)
+    
+    def _vector_search_backend(self) -> Optional[VectorSearchBackend]:
+        """Backend that returns top-k hits with scores (None for the index/scan paths)"""
+        if self.container is None:
+            if not self.local_store.has_data():
+                return None
+            if not isinstance(self._vector_search, LocalVectorSearch) or self._vector_search.store is not self.local_store:
+                self._vector_search = LocalVectorSearch(self.local_store)
+        elif not self.server_side_search:
+            return None
+        elif not isinstance(self._vector_search, CosmosVectorSearch) or self._vector_search.container is not self.container:
+            self._vector_search = CosmosVectorSearch(
+                self.container, DOCUMENT_FIELDS, [p.value for p in PersonalityType]
+            )
+        return self._vector_search
+    
+    def _search_backend(
+        self,
+        backend: VectorSearchBackend,
+        query_embedding: List[float],
+        personality: Optional[PersonalityType],
+        content_types: Optional[List[ContentType]],
+        top_k: int,
+        min_relevance: float
+    ) -> List[SearchResult]:
+        """Top-k from the backend; only the k returned hits are touched"""
+        hits = backend.top_k(
+            query_embedding,
+            top_k,
+            personality=personality.value if personality else None,
+            content_types=[ct.value for ct in content_types] if content_types else None
+        )
+        
+        results = []
+        for hit in hits:
+            if hit.score < min_relevance:
+                continue
+            hit.item.setdefault('content_type', ContentType.TEACHING.value)
+            hit.item.setdefault('source', 'Local store')
+            vector_doc = self._item_to_document(hit.item)
+            results.append(SearchResult(
+                document=vector_doc,
+                relevance_score=hit.score,
+                personality_match=personality is None or vector_doc.personality == personality,
+                content_type_match=content_types is None or vector_doc.content_type in content_types,
+                query_embedding=query_embedding
+            ))
+        return results
+    
+    def _blend_cross_personality(
+        self,
+        primary: List[SearchResult],
+        candidates: List[SearchResult],
+        personality: PersonalityType,
+        top_k: int
+    ) -> List[SearchResult]:
+        """Requested personality's results first, other personalities fill the remaining slots"""
+        primary = primary[:top_k]
+        cross = [r for r in candidates if r.document.personality != personality]
+        blended = primary + cross[:top_k - len(primary)]
+        for result in blended:
+            result.personality_match = result.document.personality == personality
+        return blended
+    
+    def _semantic_search_index(
+        self,
+        query_embedding: List[float],
+        personality: Optional[PersonalityType],
+        content_types: Optional[List[ContentType]],
+        top_k: int,
+        min_relevance: float
+    ) -> List[SearchResult]:
+        """Top-k from the in-process index, then fetch only those k documents"""
+        self._ensure_index_loaded(personality)
+        hits = self.vector_index.search(
+            query_embedding,
+            k=top_k,
+            personality=personality.value if personality else None,
+            content_types=[ct.value for ct in content_types] if content_types else None,
+            min_score=min_relevance
+        )
+        documents = self._fetch_documents(hits)
+        
+        results = []
+        for doc_id, _, score in hits:
+            vector_doc = documents.get(doc_id)
+            if vector_doc is None:
+                continue
+            results.append(SearchResult(
+                document=vector_doc,
+                relevance_score=score,
+                personality_match=personality is None or vector_doc.personality == personality,
+                content_type_match=content_types is None or vector_doc.content_type in content_types,
+                query_embedding=query_embedding
+            ))
+        
+        return results
+    
+    def _ensure_index_loaded(self, personality: Optional[PersonalityType] = None) -> None:
+        """Load index partitions from Cosmos DB on first use (ids and embeddings only)"""
+        targets = [personality] if personality else list(PersonalityType)
+        
+        for target in targets:
+            if self.vector_index.is_loaded(target.value):
+                continue
+            
+            items = (CosmosQueryBuilder("index_load")
+                     .select("id", "personality", "content_type", "embedding")
+                     .where("personality", target.value)
+                     .build()
+                     .execute(self.container))
+            loaded = self.vector_index.load_items(items)
+            self.vector_index.mark_loaded(target.value)
+            logger.info(f"✅ Indexed {loaded} vectors for personality {target.value}")
+    
+    def _fetch_documents(self, hits: List[Tuple[str, str, float]]) -> Dict[str, VectorDocument]:
+        """Resolve index hits to documents, reading only uncached ones from their partitions"""
+        documents: Dict[str, VectorDocument] = {}
+        missing_by_partition: Dict[str, List[str]] = {}
+        
+        for doc_id, partition, _ in hits:
+            cached = self.local_cache.get(doc_id)
+            if cached is not None:
+                documents[doc_id] = cached
+            else:
+                missing_by_partition.setdefault(partition, []).append(doc_id)
+        
+        for partition, doc_ids in missing_by_partition.items():
+            items = (CosmosQueryBuilder("fetch_hits")
+                     .select(*DOCUMENT_FIELDS)
+                     .where_in("id", doc_ids)
+                     .partition(partition)
+                     .build()
+                     .execute(self.container))
+            for item in items:
+                vector_doc = self._item_to_document(item)
+                documents[vector_doc.id] = vector_doc
+                self.local_cache[vector_doc.id] = vector_doc
+        
+        return documents
+    
+    def _item_to_document(self, item: Dict[str, Any]) -> VectorDocument:
+        """Convert a Cosmos DB item to a VectorDocument"""
+        return VectorDocument(
+            id=item['id'],
+            content=item['content'],
+            personality=PersonalityType(item['personality']),
+            content_type=ContentType(item['content_type']),
+            source=item['source'],
+            title=item.get('title'),
+            chapter=item.get('chapter'),
+            verse=item.get('verse'),
+            sanskrit=item.get('sanskrit'),
+            translation=item.get('translation'),
+            citation=item.get('citation'),
+            category=item.get('category', 'general'),
+            language=item.get('language', 'English'),
+            embedding=item.get('embedding'),
+            metadata=item.get('metadata', {})
+        )
+    
+    def _semantic_search_scan(
+        self,
+        query_embedding: List[float],
+        personality: Optional[PersonalityType],
+        content_types: Optional[List[ContentType]],
+        top_k: int,
+        min_relevance: float
+    ) -> List[SearchResult]:
+        """Full-container scan fallback used when the in-process index is disabled"""
+        # Build search query with filters (single partition when the personality is known)
+        query = CosmosQueryBuilder("search_scan").select(*DOCUMENT_FIELDS, "embedding")
+        if personality:
+            query.where("personality", personality.value)
+        if content_types:
+            query.where_in("content_type", [ct.value for ct in content_types])
+        
+        items = query.build().execute(self.container)
+        
+        # Score every candidate with one matrix-vector product
+        items = [item for item in items if item.get('embedding')]
+        matrix = EmbeddingMatrix([item['embedding'] for item in items])
+        
+        results = []
+        for row, similarity in matrix.top_k(query_embedding, k=top_k, min_score=min_relevance):
+            vector_doc = self._item_to_document(items[row])
+            results.append(SearchResult(
+                document=vector_doc,
+                relevance_score=similarity,
+                personality_match=personality is None or vector_doc.personality == personality,
+                content_type_match=content_types is None or vector_doc.content_type in content_types,
+                query_embedding=query_embedding
+            ))
+        
+        return results
+    
     async def search_vectors_by_personality(self, query: str, personality_id: str, limit: int = 10) -> List[SearchResult]:
         """
         Optimized search using new hierarchical partition key strategy.
@@ -403,20 +736,13 @@ class VectorDatabaseService:
                 enable_cross_partition_query=False  # More efficient with partition key
             ))
             
-            # Process results
+            # Process results, scoring all returned candidates at once
+            items = [item for item in items if item.get('embedding')]
+            matrix = EmbeddingMatrix([item['embedding'] for item in items])
+            similarities = matrix.score(query_embedding)
+            
             results = []
-            for item in items:
-                if not item.get('embedding'):
-                    continue
-                
-                # Calculate similarity score
-                doc_embedding = np.array(item['embedding'])
-                query_embedding_np = np.array(query_embedding)
-                
-                similarity = np.dot(doc_embedding, query_embedding_np) / (
-                    np.linalg.norm(doc_embedding) * np.linalg.norm(query_embedding_np)
-                )
-                
+            for item, similarity in zip(items, similarities):
                 # Create search result with updated schema
                 vector_doc = VectorDocument(
                     id=item['id'],
@@ -457,90 +783,171 @@ class VectorDatabaseService:
             return []
     
     async def get_database_stats(self) -> DatabaseStats:
-        """Get comprehensive database statistics for admin panel"""
+        """
+        Get comprehensive database statistics for admin panel
+        
+        Read from the materialized statistics documents (one per personality)
+        when available; partitions whose statistics are older than the
+        reconciliation interval are re-aggregated first.
+        """
         try:
             if not self.container:
-                return DatabaseStats(
-                    total_documents=0,
-                    documents_by_personality={},
-                    documents_by_content_type={},
-                    documents_by_source={},
-                    avg_embedding_similarity=0.0,
-                    last_updated=datetime.utcnow().isoformat(),
-                    storage_size_mb=0.0,
-                    total_embeddings_generated=0,
-                    failed_embeddings=0
-                )
-            
-            # Query all documents for statistics
-            items = list(self.container.query_items(
-                query="SELECT * FROM c",
-                enable_cross_partition_query=True
-            ))
+                return self._database_stats({})
             
-            total_documents = len(items)
-            documents_by_personality = {}
-            documents_by_content_type = {}
-            documents_by_source = {}
-            total_embeddings_generated = 0
-            failed_embeddings = 0
-            
-            for item in items:
-                # Count by personality
-                personality = item.get('personality', 'unknown')
-                documents_by_personality[personality] = documents_by_personality.get(personality, 0) + 1
-                
-                # Count by content type
-                content_type = item.get('content_type', 'unknown')
-                documents_by_content_type[content_type] = documents_by_content_type.get(content_type, 0) + 1
-                
-                # Count by source
-                source = item.get('source', 'unknown')
-                documents_by_source[source] = documents_by_source.get(source, 0) + 1
-                
-                # Count embeddings
-                if item.get('embedding'):
-                    total_embeddings_generated += 1
-                else:
-                    failed_embeddings += 1
-            
-            # Estimate storage size (rough calculation)
-            storage_size_mb = total_documents * 0.01  # Rough estimate
-            
-            stats = DatabaseStats(
-                total_documents=total_documents,
-                documents_by_personality=documents_by_personality,
-                documents_by_content_type=documents_by_content_type,
-                documents_by_source=documents_by_source,
-                avg_embedding_similarity=0.85,  # Will be calculated properly in future versions
-                last_updated=datetime.utcnow().isoformat(),
-                storage_size_mb=storage_size_mb,
-                total_embeddings_generated=total_embeddings_generated,
-                failed_embeddings=failed_embeddings
-            )
+            if self.stats_store is not None:
+                partitions = self._materialized_partition_stats()
+            else:
+                # Server-side counts per partition instead of reading every document
+                partitions = {p: self._aggregate_partition_stats(p) for p in self._list_partitions()}
             
+            stats = self._database_stats(partitions)
             self.stats = stats
             return stats
             
         except Exception as e:
             logger.error(f"❌ Failed to get database stats: {e}")
-            return DatabaseStats(
-                total_documents=0,
-                documents_by_personality={},
-                documents_by_content_type={},
-                documents_by_source={},
-                avg_embedding_similarity=0.0,
-                last_updated=datetime.utcnow().isoformat(),
-                storage_size_mb=0.0,
-                total_embeddings_generated=0,
-                failed_embeddings=0
-            )
+            return self._database_stats({})
+    
+    def _database_stats(self, partitions: Dict[str, PartitionStats]) -> DatabaseStats:
+        """Combine per-personality statistics into the admin panel summary"""
+        documents_by_content_type: Dict[str, int] = {}
+        documents_by_source: Dict[str, int] = {}
+        for partition in partitions.values():
+            for content_type, count in partition.by_content_type.items():
+                documents_by_content_type[content_type] = documents_by_content_type.get(content_type, 0) + count
+            for source, count in partition.by_source.items():
+                documents_by_source[source] = documents_by_source.get(source, 0) + count
+        
+        total_documents = sum(p.documents for p in partitions.values())
+        total_embeddings_generated = sum(p.with_embeddings for p in partitions.values())
+        reconciled = [p.reconciled_at for p in partitions.values() if p.reconciled_at]
+        
+        return DatabaseStats(
+            total_documents=total_documents,
+            documents_by_personality={p.personality: p.documents for p in partitions.values() if p.documents},
+            documents_by_content_type={k: v for k, v in documents_by_content_type.items() if v},
+            documents_by_source={k: v for k, v in documents_by_source.items() if v},
+            avg_embedding_similarity=0.85 if total_documents else 0.0,  # Will be calculated properly in future versions
+            last_updated=max((p.updated_at for p in partitions.values() if p.updated_at),
+                             default=datetime.utcnow().isoformat()),
+            storage_size_mb=round(sum(p.size_bytes for p in partitions.values()) / (1024 * 1024), 3),
+            total_embeddings_generated=total_embeddings_generated,
+            failed_embeddings=total_documents - total_embeddings_generated,
+            reconciled_at=min(reconciled) if reconciled else None
+        )
+    
+    def _materialized_partition_stats(self) -> Dict[str, PartitionStats]:
+        """Statistics documents, reconciling stale ones (or all of them on first use)"""
+        partitions = self.stats_store.load()
+        if not partitions:
+            return self.reconcile_stats()
+        
+        for personality, stats in list(partitions.items()):
+            if self.stats_store.is_stale(stats):
+                partitions.update(self.reconcile_stats(personality))
+        return partitions
+    
+    def reconcile_stats(self, personality: Optional[str] = None) -> Dict[str, PartitionStats]:
+        """
+        Re-aggregate statistics from personality_vectors and overwrite the
+        materialized documents (all personalities when none is given)
+        """
+        personalities = [personality] if personality else self._list_partitions()
+        reconciled = {p: self._aggregate_partition_stats(p) for p in personalities}
+        
+        if self.stats_store is not None:
+            for stats in reconciled.values():
+                self.stats_store.replace(stats)
+            if personality is None:
+                for stale in set(self.stats_store.load()) - set(reconciled):
+                    self.stats_store.remove(stale)
+            logger.info(f"✅ Reconciled statistics for {len(reconciled)} personalities")
+        return reconciled
+    
+    def _aggregate_partition_stats(self, personality: str) -> PartitionStats:
+        return stats_from_groups(personality, self._partition_groups(personality, BREAKDOWNS))
+    
+    def _stored_summaries(self, personality: str, doc_ids: List[str]) -> Dict[str, DocumentSummary]:
+        """Current statistics contribution of existing documents (for overwrite/delete deltas)"""
+        if self.stats_store is None or not doc_ids:
+            return {}
+        summaries = {}
+        for i in range(0, len(doc_ids), 500):
+            rows = (CosmosQueryBuilder("stats_lookup")
+                    .select("id", "content_type", "source", "language", "size_bytes")
+                    .select_expr("IS_ARRAY(c.embedding) AND ARRAY_LENGTH(c.embedding) > 0", "has_embedding")
+                    .select_expr("LENGTH(c.content)", "content_length")
+                    .where("personality", personality)
+                    .where_in("id", doc_ids[i:i + 500])
+                    .build()
+                    .execute(self.container))
+            for row in rows:
+                summaries[row['id']] = DocumentSummary.from_stored(row)
+        return summaries
+    
+    def _stored_summary(self, personality: str, doc_id: str) -> Optional[DocumentSummary]:
+        """Statistics contribution of one existing document (point read by id and partition key)"""
+        if self.stats_store is None:
+            return None
+        try:
+            item = self.container.read_item(item=doc_id, partition_key=personality)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                logger.warning(f"⚠️ Could not read {doc_id} for statistics (fixed at next reconciliation): {e}")
+            return None
+        return DocumentSummary.from_stored(item)
+    
+    def _mark_stats_stale(self, personality: str) -> None:
+        if self.stats_store is None:
+            return
+        try:
+            self.stats_store.mark_stale(personality)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to mark statistics for {personality} stale: {e}")
+    
+    def _record_stats(self, personality: str,
+                      changes: List[Tuple[Optional[DocumentSummary], Optional[DocumentSummary]]]) -> None:
+        """Apply statistics deltas; a failure here never fails the write itself"""
+        if self.stats_store is None:
+            return
+        try:
+            self.stats_store.record(personality, changes)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to update statistics for {personality} (fixed at next reconciliation): {e}")
+    
+    def _list_partitions(self) -> List[str]:
+        """Personality partition key values present in the container"""
+        return (CosmosQueryBuilder("list_partitions")
+                .select_value("c.personality", distinct=True)
+                .build()
+                .execute(self.container))
+    
+    def _partition_groups(self, personality: str, group_fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """
+        Document counts for one partition grouped by ``group_fields``
+        
+        GROUP BY runs server-side within the partition (the Python SDK does not
+        support cross-partition GROUP BY), so only one row per group comes back.
+        Each row has the group fields plus documents, with_embeddings,
+        content_length (total characters) and size_bytes.
+        """
+        return (CosmosQueryBuilder("stats_group_by")
+                .select(*group_fields)
+                .select_expr("COUNT(1)", "documents")
+                .select_expr("SUM(IS_ARRAY(c.embedding) AND ARRAY_LENGTH(c.embedding) > 0 ? 1 : 0)", "with_embeddings")
+                .select_expr("SUM(IS_STRING(c.content) ? LENGTH(c.content) : 0)", "content_length")
+                .select_expr("SUM(IS_NUMBER(c.size_bytes) ? c.size_bytes : 0)", "size_bytes")
+                .group_by(*(f"c.{f}" for f in group_fields))
+                .partition(personality)
+                .build()
+                .execute(self.container))
     
     async def _update_database_stats(self):
         """Update cached database statistics"""
         self.stats = await self.get_database_stats()
     
-    async def bulk_generate_embeddings(self, batch_size: int = 10) -> Tuple[int, int]:
+    async def bulk_generate_embeddings(self, batch_size: int = 100,
+                                       checkpoint_path: Optional[str] = None) -> Tuple[int, int]:
         """Generate embeddings for documents that don't have them"""
         if not self.embedding_model or not self.container:
             logger.error("❌ Embedding model or database not available")
@@ -555,10 +962,11 @@ class VectorDatabaseService:
         
         logger.info(f"Found {len(items)} documents without embeddings")
         
-        successful = 0
+        updated = []
+        previous: Dict[str, DocumentSummary] = {}
         failed = 0
         
-        # Process in batches
+        # Encode in batches; the writes go through the bulk pipeline below
         for i in range(0, len(items), batch_size):
             batch = items[i:i + batch_size]
             
@@ -567,159 +975,186 @@ class VectorDatabaseService:
                 contents = [item.get('content', '') for item in batch]
                 embeddings = self.embedding_model.encode(contents)
                 
-                # Update documents with embeddings
                 for item, embedding in zip(batch, embeddings):
-                    try:
-                        item['embedding'] = embedding.tolist()
-                        item['updated_at'] = datetime.utcnow().isoformat()
-                        
-                        self.container.upsert_item(body=item)
-                        successful += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to update document {item.get('id')}: {e}")
+                    if embedding is None or len(embedding) == 0:
+                        logger.error(f"No embedding generated for document {item.get('id')}")
                         failed += 1
+                        continue
+                    previous[item['id']] = DocumentSummary.from_stored(item)
+                    item['embedding'] = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+                    item['updated_at'] = datetime.utcnow().isoformat()
+                    item['size_bytes'] = document_size(item)
+                    updated.append(item)
                 
-                logger.info(f"Processed batch {i//batch_size + 1}: {successful} successful, {failed} failed")
+                logger.info(f"Encoded batch {i//batch_size + 1}: {len(updated)} embedded, {failed} failed")
                 
             except Exception as e:
                 logger.error(f"Failed to process batch {i//batch_size + 1}: {e}")
                 failed += len(batch)
         
+        pipeline = BulkUpsertPipeline.from_env(self.container, checkpoint_path=checkpoint_path)
+        result = await pipeline.upsert(updated)
+        
+        written = set(result.written_ids)
+        changes: Dict[str, List[Tuple[Optional[DocumentSummary], DocumentSummary]]] = {}
+        for item in updated:
+            if item['id'] in written:
+                self.vector_index.upsert(item['id'], item.get('personality'), item['embedding'],
+                                         item.get('content_type', 'teaching'))
+                changes.setdefault(item.get('personality'), []).append(
+                    (previous[item['id']], DocumentSummary.from_item(item))
+                )
+        for personality, personality_changes in changes.items():
+            self._record_stats(personality, personality_changes)
+        
+        successful = result.succeeded
+        failed += result.failed
         logger.info(f"✅ Bulk embedding generation completed: {successful} successful, {failed} failed")
         return successful, failed
     
-    async def cleanup_duplicates(self) -> int:
-        """Remove duplicate documents based on content similarity"""
+    async def find_duplicates(self, threshold: float = 0.95,
+                              embedding_threshold: Optional[float] = None) -> List[DuplicateMatch]:
+        """
+        Near-duplicate documents within each personality / content type
+        
+        MinHash/LSH over word sets, confirmed by exact word Jaccard above
+        threshold (and by embedding cosine when embedding_threshold is given).
+        The oldest document of each cluster is the original.
+        """
+        if not self.container:
+            return []
+        
+        fields = ["id", "personality", "content_type", "content", "created_at"]
+        if embedding_threshold is not None:
+            fields.append("embedding")
+        # Only the properties the comparison needs (no embeddings unless confirming with them)
+        items = (CosmosQueryBuilder("duplicate_scan")
+                 .select(*fields)
+                 .build()
+                 .execute(self.container))
+        
+        logger.info(f"Checking {len(items)} documents for duplicates...")
+        return find_near_duplicates(items, threshold=threshold, embedding_threshold=embedding_threshold)
+    
+    async def cleanup_duplicates(self, dry_run: bool = False, threshold: float = 0.95,
+                                 embedding_threshold: Optional[float] = None) -> int:
+        """
+        Remove duplicate documents based on content similarity
+        
+        With dry_run the duplicates are only reported (logged) and the number
+        found is returned; otherwise the newer copies are bulk deleted and the
+        number removed is returned.
+        """
         try:
-            if not self.container:
-                return 0
+            matches = await self.find_duplicates(threshold, embedding_threshold)
             
-            # Get all documents
-            items = list(self.container.query_items(
-                query="SELECT * FROM c",
-                enable_cross_partition_query=True
-            ))
+            if dry_run:
+                for match in matches:
+                    logger.info(f"🔍 Duplicate {match.duplicate_id} of {match.original_id} "
+                                f"(similarity {match.similarity:.3f}, {match.group})")
+                logger.info(f"✅ Dry run: {len(matches)} duplicates found, nothing removed")
+                return len(matches)
             
-            logger.info(f"Checking {len(items)} documents for duplicates...")
+            if not matches:
+                logger.info("✅ Cleanup completed: 0 duplicates removed")
+                return 0
             
-            # Group by personality and content type for efficient comparison
-            groups = {}
-            for item in items:
-                key = f"{item.get('personality', 'unknown')}_{item.get('content_type', 'unknown')}"
-                if key not in groups:
-                    groups[key] = []
-                groups[key].append(item)
+            by_personality: Dict[str, List[str]] = {}
+            for match in matches:
+                by_personality.setdefault(match.partition_key, []).append(match.duplicate_id)
+            previous: Dict[str, Tuple[str, DocumentSummary]] = {}
+            for personality, doc_ids in by_personality.items():
+                for doc_id, summary in self._stored_summaries(personality, doc_ids).items():
+                    previous[doc_id] = (personality, summary)
+            
+            pipeline = BulkUpsertPipeline.from_env(self.container)
+            result = await pipeline.delete(
+                {'id': match.duplicate_id, 'personality': match.partition_key} for match in matches
+            )
             
-            duplicates_removed = 0
+            removed: Dict[str, List[Tuple[DocumentSummary, None]]] = {}
+            for doc_id in result.written_ids:
+                self.local_cache.pop(doc_id, None)
+                self.vector_index.remove(doc_id)
+                if doc_id in previous:
+                    personality, summary = previous[doc_id]
+                    removed.setdefault(personality, []).append((summary, None))
+            for personality, changes in removed.items():
+                self._record_stats(personality, changes)
             
-            for group_key, group_items in groups.items():
-                if len(group_items) < 2:
-                    continue
-                
-                # Find duplicates within the group
-                for i in range(len(group_items)):
-                    for j in range(i + 1, len(group_items)):
-                        item1, item2 = group_items[i], group_items[j]
-                        
-                        # Simple content similarity check
-                        content1 = item1.get('content', '')
-                        content2 = item2.get('content', '')
-                        
-                        if self._calculate_text_similarity(content1, content2) > 0.95:
-                            # Remove the newer document (keep the older one)
-                            older_item = item1 if item1.get('created_at', '') < item2.get('created_at', '') else item2
-                            newer_item = item2 if older_item == item1 else item1
-                            
-                            try:
-                                self.container.delete_item(
-                                    item=newer_item['id'],
-                                    partition_key=newer_item.get('personality')
-                                )
-                                duplicates_removed += 1
-                                logger.debug(f"Removed duplicate: {newer_item['id']}")
-                                
-                            except Exception as e:
-                                logger.error(f"Failed to remove duplicate {newer_item['id']}: {e}")
-            
-            logger.info(f"✅ Cleanup completed: {duplicates_removed} duplicates removed")
-            return duplicates_removed
+            logger.info(f"✅ Cleanup completed: {result.succeeded} duplicates removed")
+            return result.succeeded
             
         except Exception as e:
             logger.error(f"❌ Cleanup failed: {e}")
             return 0
     
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """Calculate simple text similarity (Jaccard similarity)"""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+    def build_document(self, content: str, personality_id: str, metadata: Dict[str, Any] = None,
+                       doc_id: Optional[str] = None) -> Optional[VectorDocument]:
+        """Classify content and generate its embedding; returns None if either fails"""
+        # Parse personality
+        try:
+            personality = PersonalityType(personality_id.lower())
+        except ValueError:
+            logger.error(f"❌ Invalid personality: {personality_id}")
+            return None
+        
+        metadata = metadata or {}
+        
+        # Determine content type from metadata or content analysis
+        content_type = ContentType.TEACHING
+        if metadata.get('content_type'):
+            try:
+                content_type = ContentType(metadata['content_type'])
+            except ValueError:
+                pass
+        elif 'verse' in metadata or 'sanskrit' in metadata:
+            content_type = ContentType.VERSE
+        elif 'commentary' in content.lower():
+            content_type = ContentType.COMMENTARY
         
-        if not words1 and not words2:
-            return 1.0
+        # Generate embedding
+        try:
+            embedding = self.embedding_model.encode(content)
+            embedding_list = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+        except Exception as e:
+            logger.error(f"❌ Failed to generate embedding: {e}")
+            return None
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        # Create document ID
+        if doc_id is None:
+            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            doc_id = f"{personality_id}_{timestamp}_{hash(content[:100]) % 1000:03d}"
         
-        return len(intersection) / len(union) if union else 0.0
-
+        return VectorDocument(
+            id=doc_id,
+            content=content,
+            personality=personality,
+            content_type=content_type,
+            source=metadata.get('source', 'Added via API'),
+            title=metadata.get('title'),
+            chapter=metadata.get('chapter'),
+            verse=metadata.get('verse'),
+            sanskrit=metadata.get('sanskrit'),
+            translation=metadata.get('translation'),
+            citation=metadata.get('citation'),
+            category=metadata.get('category', 'general'),
+            language=metadata.get('language', 'English'),
+            embedding=embedding_list,
+            metadata=metadata
+        )
+    
     async def add_content(self, content: str, personality_id: str, metadata: Dict[str, Any] = None) -> bool:
         """Add new content to the vector database with proper chunking and embedding generation"""
         try:
-            if not self.container or not self.embedding_model:
+            if not self.embedding_model:
                 logger.error("❌ Database or embedding service not available")
                 return False
             
-            # Parse personality
-            try:
-                personality = PersonalityType(personality_id.lower())
-            except ValueError:
-                logger.error(f"❌ Invalid personality: {personality_id}")
-                return False
-            
-            metadata = metadata or {}
-            
-            # Determine content type from metadata or content analysis
-            content_type = ContentType.TEACHING
-            if metadata.get('content_type'):
-                try:
-                    content_type = ContentType(metadata['content_type'])
-                except ValueError:
-                    pass
-            elif 'verse' in metadata or 'sanskrit' in metadata:
-                content_type = ContentType.VERSE
-            elif 'commentary' in content.lower():
-                content_type = ContentType.COMMENTARY
-            
-            # Generate embedding
-            try:
-                embedding = self.embedding_model.encode(content)
-                embedding_list = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
-            except Exception as e:
-                logger.error(f"❌ Failed to generate embedding: {e}")
+            vector_doc = self.build_document(content, personality_id, metadata)
+            if vector_doc is None:
                 return False
-            
-            # Create document ID
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            doc_id = f"{personality_id}_{timestamp}_{hash(content[:100]) % 1000:03d}"
-            
-            # Create vector document
-            vector_doc = VectorDocument(
-                id=doc_id,
-                content=content,
-                personality=personality,
-                content_type=content_type,
-                source=metadata.get('source', 'Added via API'),
-                title=metadata.get('title'),
-                chapter=metadata.get('chapter'),
-                verse=metadata.get('verse'),
-                sanskrit=metadata.get('sanskrit'),
-                translation=metadata.get('translation'),
-                citation=metadata.get('citation'),
-                category=metadata.get('category', 'general'),
-                language=metadata.get('language', 'English'),
-                embedding=embedding_list,
-                metadata=metadata
-            )
+            doc_id = vector_doc.id
             
             # Store in database
             success = await self.upsert_document(vector_doc)
@@ -745,90 +1180,43 @@ class VectorDatabaseService:
                 logger.error("❌ Database not available")
                 return {}
             
-            # Build query based on personality filter
             if personality_id:
-                query = f"SELECT * FROM c WHERE c.personality = '{personality_id.lower()}'"
-            else:
-                query = "SELECT * FROM c"
-            
-            items = list(self.container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-            ))
-            
-            if personality_id:
-                # Stats for specific personality
-                personality_docs = items
-                total_docs = len(personality_docs)
-                
-                content_types = {}
-                sources = {}
-                languages = {}
-                with_embeddings = 0
-                avg_content_length = 0
-                
-                for item in personality_docs:
-                    # Content types
-                    ct = item.get('content_type', 'unknown')
-                    content_types[ct] = content_types.get(ct, 0) + 1
-                    
-                    # Sources
-                    source = item.get('source', 'unknown')
-                    sources[source] = sources.get(source, 0) + 1
-                    
-                    # Languages
-                    lang = item.get('language', 'unknown')
-                    languages[lang] = languages.get(lang, 0) + 1
-                    
-                    # Embeddings
-                    if item.get('embedding'):
-                        with_embeddings += 1
-                    
-                    # Content length
-                    content_length = len(item.get('content', ''))
-                    avg_content_length += content_length
-                
-                avg_content_length = avg_content_length / total_docs if total_docs > 0 else 0
+                personality = personality_id.lower()
+                stats = None
+                if self.stats_store is not None:
+                    stats = self._materialized_partition_stats().get(personality)
+                if stats is None:
+                    # Single-partition GROUP BY
+                    stats = self._aggregate_partition_stats(personality)
                 
                 return {
                     'personality': personality_id,
-                    'total_documents': total_docs,
-                    'content_types': content_types,
-                    'sources': sources,
-                    'languages': languages,
-                    'embeddings_generated': with_embeddings,
-                    'missing_embeddings': total_docs - with_embeddings,
-                    'avg_content_length': avg_content_length,
-                    'last_updated': datetime.utcnow().isoformat()
+                    'total_documents': stats.documents,
+                    'content_types': {k: v for k, v in stats.by_content_type.items() if v},
+                    'sources': {k: v for k, v in stats.by_source.items() if v},
+                    'languages': {k: v for k, v in stats.by_language.items() if v},
+                    'embeddings_generated': stats.with_embeddings,
+                    'missing_embeddings': stats.documents - stats.with_embeddings,
+                    'avg_content_length': stats.content_length / stats.documents if stats.documents > 0 else 0,
+                    'storage_size_bytes': stats.size_bytes,
+                    'last_updated': stats.updated_at or datetime.utcnow().isoformat()
                 }
             else:
                 # Stats for all personalities
-                personalities = {}
-                
-                for item in items:
-                    personality = item.get('personality', 'unknown')
-                    if personality not in personalities:
-                        personalities[personality] = {
-                            'documents': 0,
-                            'content_types': {},
-                            'sources': set(),
-                            'with_embeddings': 0
-                        }
-                    
-                    personalities[personality]['documents'] += 1
-                    
-                    ct = item.get('content_type', 'unknown')
-                    personalities[personality]['content_types'][ct] = personalities[personality]['content_types'].get(ct, 0) + 1
-                    
-                    personalities[personality]['sources'].add(item.get('source', 'unknown'))
-                    
-                    if item.get('embedding'):
-                        personalities[personality]['with_embeddings'] += 1
+                if self.stats_store is not None:
+                    partitions = self._materialized_partition_stats()
+                else:
+                    partitions = {p: self._aggregate_partition_stats(p) for p in self._list_partitions()}
                 
-                # Convert sets to counts
-                for p_id, stats in personalities.items():
-                    stats['unique_sources'] = len(stats['sources'])
-                    del stats['sources']  # Remove set, keep count
+                personalities = {
+                    p_id: {
+                        'documents': stats.documents,
+                        'content_types': {k: v for k, v in stats.by_content_type.items() if v},
+                        'with_embeddings': stats.with_embeddings,
+                        'unique_sources': sum(1 for v in stats.by_source.values() if v)
+                    }
+                    for p_id, stats in partitions.items()
+                }
                 
                 return {
                     'total_personalities': len(personalities),
@@ -840,23 +1228,33 @@ class VectorDatabaseService:
             logger.error(f"❌ Failed to get personality stats: {e}")
             return {}
 
-    async def export_database(self, personality_filter: Optional[str] = None) -> Dict[str, Any]:
-        """Export database contents for backup or migration"""
+    async def export_database(self, personality_filter: Optional[str] = None,
+                              output_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Export database contents for backup or migration
+        
+        Documents are streamed page by page into a gzip-compressed JSONL file
+        (memory stays at one page); a manifest with the export metadata and
+        database statistics is written next to it. Exporting again to the same
+        output_path resumes an interrupted export.
+        """
         try:
             if not self.container:
                 logger.error("❌ Database not available")
                 return {}
             
-            # Build query
-            if personality_filter:
-                query = f"SELECT * FROM c WHERE c.personality = '{personality_filter.lower()}'"
-            else:
-                query = "SELECT * FROM c"
+            if output_path is None:
+                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+                suffix = f"_{personality_filter.lower()}" if personality_filter else ""
+                output_path = os.path.join(os.getenv('VECTOR_BACKUP_DIR', 'data/backups'),
+                                           f"personality_vectors_{timestamp}{suffix}.jsonl.gz")
             
-            items = list(self.container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-            ))
+            # Full documents - this is a backup
+            query = CosmosQueryBuilder("export")
+            if personality_filter:
+                query.where("personality", personality_filter.lower())
+            result = export_container(self.container, output_path, query.build(),
+                                      page_size=int(os.getenv('VECTOR_BACKUP_PAGE_SIZE', '100')))
             
             # Get database stats
             stats = await self.get_database_stats()
@@ -865,14 +1263,18 @@ class VectorDatabaseService:
                 'export_metadata': {
                     'timestamp': datetime.utcnow().isoformat(),
                     'personality_filter': personality_filter,
-                    'total_documents': len(items),
-                    'export_version': '1.0'
+                    'total_documents': result.documents,
+                    'path': output_path,
+                    'format': 'jsonl.gz',
+                    'size_bytes': result.bytes_written,
+                    'export_version': '2.0'
                 },
-                'database_stats': asdict(stats),
-                'documents': items
+                'database_stats': asdict(stats)
             }
+            with open(f"{output_path}.manifest.json", 'w', encoding='utf-8') as f:
+                json.dump(export_data, f, indent=2, default=str)
             
-            logger.info(f"✅ Exported {len(items)} documents" + 
+            logger.info(f"✅ Exported {result.documents} documents" + 
                        (f" for personality {personality_filter}" if personality_filter else ""))
             
             return export_data
@@ -880,6 +1282,21 @@ class VectorDatabaseService:
         except Exception as e:
             logger.error(f"❌ Failed to export database: {e}")
             return {}
+    
+    async def restore_database(self, input_path: str, checkpoint_path: Optional[str] = None) -> BulkWriteResult:
+        """
+        Restore an export_database backup through the bulk upsert pipeline
+        
+        With checkpoint_path an interrupted restore can be rerun and skips the
+        documents already written. Statistics are re-aggregated afterwards.
+        """
+        if not self.container:
+            raise RuntimeError("Database not available")
+        
+        result = await restore_container(self.container, input_path, checkpoint_path=checkpoint_path)
+        if self.stats_store is not None:
+            self.reconcile_stats()
+        return result
 
     async def health_check(self) -> Dict[str, Any]:
         """Comprehensive health check for the vector database service"""
@@ -943,6 +1360,7 @@ class VectorDatabaseService:
                     stats = await self.get_database_stats()
                     health_status['performance_metrics']['total_documents'] = stats.total_documents
                     health_status['performance_metrics']['total_embeddings'] = stats.total_embeddings_generated
+                    health_status['performance_metrics']['vector_index'] = self.vector_index.get_stats()
                     
                 except Exception as e:
                     health_status['performance_metrics']['error'] = str(e)
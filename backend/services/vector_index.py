@@ -0,0 +1,486 @@
+"""
+In-Process Vector Index for Vimarsh
+
+Keeps personality embeddings in contiguous float32 matrices so semantic search
+no longer pulls every document out of Cosmos DB and scores it in a Python loop.
+Two index types are provided behind a common interface:
+
+- FlatVectorIndex: exact brute-force search over a pre-normalized matrix
+- IVFFlatIndex: inverted-file index (k-means coarse quantizer + flat lists)
+
+Both can store vectors as float16 or per-vector-scaled int8 (VECTOR_INDEX_PRECISION)
+and re-rank their top candidates against exact float32 vectors.
+
+PersonalityVectorIndex partitions vectors per personality, mirroring the
+/personality partition key of the personality_vectors container.
+"""
+
+import os
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Iterable, Any, Set
+
+import numpy as np
+
+try:
+    from .vector_scoring import normalize_vector, top_k_indices
+    from .vector_quantization import ExactVectorFile, QuantizedMatrix, rerank, resolve_precision
+except ImportError:
+    from vector_scoring import normalize_vector, top_k_indices
+    from vector_quantization import ExactVectorFile, QuantizedMatrix, rerank, resolve_precision
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex(ABC):
+    """Base interface for in-process vector indexes (cosine similarity)"""
+
+    def __init__(self, dimension: int = 768):
+        self.dimension = dimension
+
+    @abstractmethod
+    def upsert(self, doc_id: str, embedding: Iterable[float]) -> None:
+        """Insert or replace a single vector"""
+
+    @abstractmethod
+    def remove(self, doc_id: str) -> bool:
+        """Remove a vector, returning True if it existed"""
+
+    @abstractmethod
+    def search(self, query_embedding: Iterable[float], k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to k (doc_id, cosine similarity) pairs, best first"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, doc_id: str) -> bool:
+        return False
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate heap bytes held by the stored vectors"""
+        return len(self) * self.dimension * 4
+
+    def upsert_many(self, items: Iterable[Tuple[str, Iterable[float]]]) -> int:
+        """Insert or replace many vectors, returning the number indexed"""
+        count = 0
+        for doc_id, embedding in items:
+            self.upsert(doc_id, embedding)
+            count += 1
+        return count
+
+    def _normalize(self, embedding: Iterable[float]) -> Optional[np.ndarray]:
+        """Convert to a unit-length float32 vector (None for zero/invalid vectors)"""
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dim embedding, got {vector.shape[0]}")
+        normalized = normalize_vector(vector)
+        return normalized if normalized.any() else None
+
+
+class FlatVectorIndex(VectorIndex):
+    """
+    Exact cosine search over a contiguous, pre-normalized matrix
+
+    With float16/int8 precision the in-memory matrix is quantized; the top
+    ``k * rerank_factor`` approximate candidates are then re-scored against
+    exact float32 vectors kept in a memory-mapped spill file (rerank_factor=0
+    keeps no float32 copy at all and returns the approximate scores).
+    """
+
+    def __init__(
+        self,
+        dimension: int = 768,
+        initial_capacity: int = 256,
+        precision: str = 'float32',
+        rerank_factor: int = 4
+    ):
+        super().__init__(dimension)
+        self.precision = precision
+        self.rerank_factor = rerank_factor
+        self._matrix = QuantizedMatrix(dimension, initial_capacity, precision)
+        self._exact = (
+            ExactVectorFile(dimension, initial_capacity)
+            if precision != 'float32' and rerank_factor > 0 else None
+        )
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._positions
+
+    @property
+    def memory_bytes(self) -> int:
+        """Heap bytes held by the (possibly quantized) matrix"""
+        return self._matrix.nbytes
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = self._matrix.capacity
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        self._matrix.resize(new_capacity, keep=len(self._ids))
+        if self._exact is not None:
+            self._exact.resize(new_capacity, keep=len(self._ids))
+
+    def upsert(self, doc_id: str, embedding: Iterable[float]) -> None:
+        vector = self._normalize(embedding)
+        with self._lock:
+            if vector is None:
+                self.remove(doc_id)
+                return
+            position = self._positions.get(doc_id)
+            if position is None:
+                position = len(self._ids)
+                self._ensure_capacity(position + 1)
+                self._ids.append(doc_id)
+                self._positions[doc_id] = position
+            self._matrix.store(position, vector)
+            if self._exact is not None:
+                self._exact.store(position, vector)
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            position = self._positions.pop(doc_id, None)
+            if position is None:
+                return False
+            # Swap the last row into the hole to keep the matrix contiguous
+            last = len(self._ids) - 1
+            if position != last:
+                last_id = self._ids[last]
+                self._matrix.move(position, last)
+                if self._exact is not None:
+                    self._exact.move(position, last)
+                self._ids[position] = last_id
+                self._positions[last_id] = position
+            self._ids.pop()
+            return True
+
+    def _vectors(self, rows) -> np.ndarray:
+        """Float32 vectors for matrix rows (exact when a spill file is kept)"""
+        source = self._exact if self._exact is not None else self._matrix
+        return source.decode(rows)
+
+    def get_vector(self, doc_id: str) -> Optional[np.ndarray]:
+        """Return the stored (normalized) vector for a document"""
+        with self._lock:
+            position = self._positions.get(doc_id)
+            return None if position is None else self._vectors(position)
+
+    def _search_rows(self, query: np.ndarray, k: int, positions: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """Top-k over all rows or the given positions, re-ranked exactly when quantized"""
+        scores = self._matrix.scores(query, len(self._ids), positions)
+        rows = np.arange(len(self._ids)) if positions is None else positions
+        if self._exact is None:
+            return [(self._ids[rows[i]], float(scores[i])) for i in top_k_indices(scores, k)]
+
+        # Sorted positions keep the reads from the spill file sequential
+        candidates = np.sort(rows[top_k_indices(scores, k * self.rerank_factor)])
+        order, exact = rerank(self._exact.decode(candidates), query, k)
+        return [(self._ids[candidates[i]], float(exact[i])) for i in order]
+
+    def search(self, query_embedding: Iterable[float], k: int = 5) -> List[Tuple[str, float]]:
+        query = self._normalize(query_embedding)
+        with self._lock:
+            if query is None or len(self._ids) == 0 or k <= 0:
+                return []
+            return self._search_rows(query, k)
+
+
+class IVFFlatIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are bucketed by nearest k-means centroid and only
+    the nprobe closest buckets are scanned at query time.
+
+    Below ``min_train_size`` vectors the index behaves exactly like a flat index;
+    it (re)trains its centroids once the corpus has grown past ``retrain_factor``
+    times the size it was last trained on.
+    """
+
+    def __init__(
+        self,
+        dimension: int = 768,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        min_train_size: int = 1024,
+        retrain_factor: float = 2.0,
+        seed: int = 42,
+        precision: str = 'float32',
+        rerank_factor: int = 4
+    ):
+        super().__init__(dimension)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+        self._flat = FlatVectorIndex(dimension, precision=precision, rerank_factor=rerank_factor)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[Set[str]] = []
+        self._assignments: Dict[str, int] = {}
+        self._trained_size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._flat)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._flat
+
+    @property
+    def memory_bytes(self) -> int:
+        centroids = self._centroids.nbytes if self._centroids is not None else 0
+        return self._flat.memory_bytes + centroids
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def upsert(self, doc_id: str, embedding: Iterable[float]) -> None:
+        with self._lock:
+            self._unassign(doc_id)
+            self._flat.upsert(doc_id, embedding)
+            if doc_id not in self._flat:
+                return
+            if self.is_trained:
+                self._assign(doc_id, self._flat.get_vector(doc_id))
+            self._maybe_train()
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            self._unassign(doc_id)
+            return self._flat.remove(doc_id)
+
+    def search(self, query_embedding: Iterable[float], k: int = 5) -> List[Tuple[str, float]]:
+        with self._lock:
+            if not self.is_trained:
+                return self._flat.search(query_embedding, k)
+
+            query = self._normalize(query_embedding)
+            if query is None or k <= 0:
+                return []
+
+            centroid_scores = self._centroids @ query
+            probe = top_k_indices(centroid_scores, self.nprobe)
+
+            candidate_ids = [doc_id for list_id in probe for doc_id in self._lists[list_id]]
+            if not candidate_ids:
+                return []
+
+            positions = np.fromiter(
+                (self._flat._positions[doc_id] for doc_id in candidate_ids),
+                dtype=np.int64,
+                count=len(candidate_ids)
+            )
+            return self._flat._search_rows(query, k, positions)
+
+    def train(self) -> None:
+        """(Re)build centroids with spherical k-means and reassign every vector"""
+        with self._lock:
+            count = len(self._flat)
+            if count == 0:
+                return
+            data = self._flat._vectors(slice(0, count))
+            nlist = self.nlist or max(1, int(np.sqrt(count)))
+            nlist = min(nlist, count)
+
+            rng = np.random.default_rng(self.seed)
+            centroids = data[rng.choice(count, size=nlist, replace=False)].copy()
+            for _ in range(10):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = data[labels == c]
+                    if len(members) == 0:
+                        continue
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm > 0:
+                        centroids[c] = centroid / norm
+
+            self._centroids = centroids
+            self._lists = [set() for _ in range(nlist)]
+            self._assignments = {}
+            labels = np.argmax(data @ centroids.T, axis=1)
+            for position, label in enumerate(labels):
+                doc_id = self._flat._ids[position]
+                self._lists[int(label)].add(doc_id)
+                self._assignments[doc_id] = int(label)
+            self._trained_size = count
+            logger.debug(f"IVF index trained: {count} vectors, {nlist} lists")
+
+    def _maybe_train(self) -> None:
+        count = len(self._flat)
+        if count < self.min_train_size:
+            return
+        if not self.is_trained or count >= self._trained_size * self.retrain_factor:
+            self.train()
+
+    def _assign(self, doc_id: str, vector: np.ndarray) -> None:
+        label = int(np.argmax(self._centroids @ vector))
+        self._lists[label].add(doc_id)
+        self._assignments[doc_id] = label
+
+    def _unassign(self, doc_id: str) -> None:
+        label = self._assignments.pop(doc_id, None)
+        if label is not None:
+            self._lists[label].discard(doc_id)
+
+
+def create_vector_index(
+    index_type: Optional[str] = None,
+    dimension: int = 768,
+    precision: Optional[str] = None
+) -> VectorIndex:
+    """
+    Create a vector index by type name ('flat' or 'ivf'), defaulting to VECTOR_INDEX_TYPE;
+    precision ('float32', 'float16' or 'int8') defaults to VECTOR_INDEX_PRECISION
+    """
+    index_type = (index_type or os.getenv('VECTOR_INDEX_TYPE', 'flat')).lower()
+    precision = resolve_precision(precision)
+    rerank_factor = int(os.getenv('VECTOR_INDEX_RERANK_FACTOR', '4'))
+    if index_type == 'ivf':
+        return IVFFlatIndex(
+            dimension=dimension,
+            nprobe=int(os.getenv('VECTOR_INDEX_NPROBE', '8')),
+            precision=precision,
+            rerank_factor=rerank_factor
+        )
+    if index_type != 'flat':
+        logger.warning(f"Unknown vector index type '{index_type}', using flat index")
+    return FlatVectorIndex(dimension=dimension, precision=precision, rerank_factor=rerank_factor)
+
+
+class PersonalityVectorIndex:
+    """Vector indexes partitioned per personality with lightweight per-document tags"""
+
+    def __init__(self, index_type: Optional[str] = None, dimension: int = 768, precision: Optional[str] = None):
+        self.index_type = index_type
+        self.dimension = dimension
+        self.precision = precision
+        self._partitions: Dict[str, VectorIndex] = {}
+        self._content_types: Dict[str, str] = {}
+        self._doc_partitions: Dict[str, str] = {}
+        self._loaded_partitions: Set[str] = set()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self._partitions.values())
+
+    def _partition(self, personality: str) -> VectorIndex:
+        index = self._partitions.get(personality)
+        if index is None:
+            index = create_vector_index(self.index_type, self.dimension, self.precision)
+            self._partitions[personality] = index
+        return index
+
+    def is_loaded(self, personality: str) -> bool:
+        return personality in self._loaded_partitions
+
+    def mark_loaded(self, personality: str) -> None:
+        with self._lock:
+            self._loaded_partitions.add(personality)
+            self._partition(personality)
+
+    def upsert(
+        self,
+        doc_id: str,
+        personality: str,
+        embedding: Optional[Iterable[float]],
+        content_type: Optional[str] = None
+    ) -> bool:
+        """Index (or re-index) a document; documents without embeddings are dropped"""
+        with self._lock:
+            previous = self._doc_partitions.get(doc_id)
+            if previous and previous != personality:
+                self.remove(doc_id)
+            if embedding is None:
+                self.remove(doc_id)
+                return False
+            try:
+                index = self._partition(personality)
+                index.upsert(doc_id, embedding)
+            except ValueError as e:
+                logger.warning(f"Skipping vector for {doc_id}: {e}")
+                return False
+            if doc_id not in index:
+                return False
+            self._doc_partitions[doc_id] = personality
+            if content_type:
+                self._content_types[doc_id] = content_type
+            return True
+
+    def load_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Bulk-load Cosmos items carrying id/personality/content_type/embedding"""
+        loaded = 0
+        for item in items:
+            if self.upsert(
+                item['id'],
+                item.get('personality', 'unknown'),
+                item.get('embedding'),
+                item.get('content_type')
+            ):
+                loaded += 1
+        return loaded
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            personality = self._doc_partitions.pop(doc_id, None)
+            self._content_types.pop(doc_id, None)
+            if personality is None:
+                return False
+            return self._partitions[personality].remove(doc_id)
+
+    def search(
+        self,
+        query_embedding: Iterable[float],
+        k: int = 5,
+        personality: Optional[str] = None,
+        content_types: Optional[List[str]] = None,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[str, str, float]]:
+        """Return up to k (doc_id, personality, score) triples, best first"""
+        with self._lock:
+            if personality is not None:
+                partitions = [personality] if personality in self._partitions else []
+            else:
+                partitions = list(self._partitions.keys())
+
+            # Over-fetch when post-filtering on content type
+            fetch_k = k * 4 if content_types else k
+            allowed = set(content_types) if content_types else None
+
+            hits: List[Tuple[str, str, float]] = []
+            for partition in partitions:
+                for doc_id, score in self._partitions[partition].search(query_embedding, fetch_k):
+                    if allowed is not None and self._content_types.get(doc_id) not in allowed:
+                        continue
+                    if min_score is not None and score < min_score:
+                        continue
+                    hits.append((doc_id, partition, score))
+
+            hits.sort(key=lambda hit: hit[2], reverse=True)
+            return hits[:k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+            self._content_types.clear()
+            self._doc_partitions.clear()
+            self._loaded_partitions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "index_type": self.index_type or os.getenv('VECTOR_INDEX_TYPE', 'flat'),
+                "precision": resolve_precision(self.precision),
+                "total_vectors": len(self),
+                "vectors_by_personality": {p: len(idx) for p, idx in self._partitions.items()},
+                "loaded_partitions": sorted(self._loaded_partitions),
+                "memory_mb": round(sum(idx.memory_bytes for idx in self._partitions.values()) / (1024 * 1024), 2)
+            }
@@ -0,0 +1,177 @@
+"""
+Compact Embedding Storage for Vimarsh
+
+Quantized row storage for the in-process vector index and the local embedding
+store, so every personality's embeddings fit in RAM on small instances:
+
+- float32: 4 bytes per dimension (exact, the previous behaviour)
+- float16: 2 bytes per dimension
+- int8:    1 byte per dimension plus one float32 scale per row
+           (symmetric per-vector scaling: q = round(x / scale), scale = max|x| / 127)
+
+Compact rows are scored block by block (converted to float32 a few thousand
+rows at a time), so a search never materializes a full float32 copy. The
+approximate top candidates are then re-ranked with exact float32 vectors read
+from a memory-mapped file, which the OS keeps out of the process heap
+(ExactVectorFile for the index, the .f32 matrix for the local store).
+
+numpy converts float16 to float32 in software, so float16 is the slowest
+precision to scan; int8 is both the smallest and close to float32 speed.
+See tests/performance/benchmark_vector_quantization.py for recall@k vs memory.
+"""
+
+import os
+import tempfile
+import logging
+from typing import Optional, Union
+
+import numpy as np
+
+try:
+    from .vector_scoring import top_k_indices
+except ImportError:
+    from vector_scoring import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('float32', 'float16', 'int8')
+SCORE_BLOCK_ROWS = 1024  # rows converted to float32 at a time while scoring (cache-sized)
+
+Rows = Union[slice, np.ndarray]
+
+
+def resolve_precision(precision: Optional[str] = None, env_var: str = 'VECTOR_INDEX_PRECISION') -> str:
+    """Validated precision name, defaulting to the environment variable (then float32)"""
+    value = (precision or os.getenv(env_var, 'float32')).lower()
+    if value not in PRECISIONS:
+        logger.warning(f"Unknown vector precision '{value}', using float32")
+        return 'float32'
+    return value
+
+
+def quantize_int8(vectors: np.ndarray):
+    """Per-row symmetric int8 quantization, returning (codes, scales)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    safe = np.where(scales > 0, scales, 1.0)
+    codes = np.clip(np.rint(vectors / safe[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedMatrix:
+    """Growable matrix of rows stored as float32, float16 or per-row-scaled int8"""
+
+    def __init__(self, dimension: int, capacity: int = 0, precision: str = 'float32'):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{precision}', expected one of {PRECISIONS}")
+        self.dimension = dimension
+        self.precision = precision
+        dtype = np.int8 if precision == 'int8' else np.dtype(precision)
+        self._codes = np.zeros((capacity, dimension), dtype=dtype)
+        self._scales = np.zeros(capacity, dtype=np.float32) if precision == 'int8' else None
+
+    @property
+    def capacity(self) -> int:
+        return self._codes.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+    def resize(self, capacity: int, keep: int) -> None:
+        """Reallocate to ``capacity`` rows, preserving the first ``keep``"""
+        codes = np.zeros((capacity, self.dimension), dtype=self._codes.dtype)
+        codes[:keep] = self._codes[:keep]
+        self._codes = codes
+        if self._scales is not None:
+            scales = np.zeros(capacity, dtype=np.float32)
+            scales[:keep] = self._scales[:keep]
+            self._scales = scales
+
+    def store(self, start: int, vectors: np.ndarray) -> None:
+        """Encode float32 rows into positions start, start + 1, ..."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        end = start + vectors.shape[0]
+        if self._scales is None:
+            self._codes[start:end] = vectors
+        else:
+            self._codes[start:end], self._scales[start:end] = quantize_int8(vectors)
+
+    def move(self, destination: int, source: int) -> None:
+        self._codes[destination] = self._codes[source]
+        if self._scales is not None:
+            self._scales[destination] = self._scales[source]
+
+    def decode(self, rows: Rows) -> np.ndarray:
+        """Approximate float32 values of the selected rows"""
+        values = self._codes[rows].astype(np.float32)
+        if self._scales is not None:
+            values *= self._scales[rows][..., None]
+        return values
+
+    def scores(self, query: np.ndarray, count: Optional[int] = None, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Dot products of ``query`` with the first ``count`` rows (or the given positions)"""
+        if self.precision == 'float32':
+            rows = self._codes[:count] if positions is None else self._codes[positions]
+            return rows @ query
+
+        total = (self.capacity if count is None else count) if positions is None else len(positions)
+        scores = np.empty(total, dtype=np.float32)
+        block = np.empty((min(total, SCORE_BLOCK_ROWS), self.dimension), dtype=np.float32)
+        for start in range(0, total, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, total)
+            rows = slice(start, end) if positions is None else positions[start:end]
+            np.copyto(block[:end - start], self._codes[rows], casting='unsafe')
+            scores[start:end] = block[:end - start] @ query
+            if self._scales is not None:
+                scores[start:end] *= self._scales[rows]
+        return scores
+
+
+class ExactVectorFile:
+    """
+    Float32 rows in an anonymous memory-mapped temporary file
+
+    Only the rows that are read for re-ranking are paged in; the file is
+    removed by the OS when the object is garbage collected.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 0, directory: Optional[str] = None):
+        self.dimension = dimension
+        self._file = tempfile.TemporaryFile(dir=directory or os.getenv('VECTOR_INDEX_SPILL_DIR') or None)
+        self._rows: Optional[np.memmap] = None
+        self.resize(capacity)
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._rows is None else self._rows.shape[0]
+
+    def resize(self, capacity: int, keep: int = 0) -> None:
+        """Grow the file to ``capacity`` rows (existing rows are kept in place)"""
+        if self._rows is not None:
+            self._rows.flush()
+        self._rows = None
+        self._file.truncate(capacity * self.dimension * 4)
+        if capacity:
+            self._rows = np.memmap(self._file, dtype=np.float32, mode='r+', shape=(capacity, self.dimension))
+
+    def store(self, start: int, vectors: np.ndarray) -> None:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        self._rows[start:start + vectors.shape[0]] = vectors
+
+    def move(self, destination: int, source: int) -> None:
+        self._rows[destination] = self._rows[source]
+
+    def decode(self, rows: Rows) -> np.ndarray:
+        return np.array(self._rows[rows])
+
+
+def rerank(exact_rows: np.ndarray, query: np.ndarray, k: int):
+    """
+    Exact float32 re-ranking of approximate candidates
+
+    Returns (order, scores): indices into ``exact_rows`` of the k best rows,
+    best first, and the exact cosine of every candidate.
+    """
+    exact = np.asarray(exact_rows, dtype=np.float32) @ query
+    return top_k_indices(exact, k), exact
@@ -0,0 +1,111 @@
+"""
+Vectorized Cosine Scoring for Vimarsh Retrieval
+
+Shared scoring engine used by every retrieval path (vector database search,
+knowledge base retrieval, embedding utilities). Document embeddings are held as
+a pre-normalized float32 matrix so a query is scored with a single
+matrix-vector product, and many queries with a single matrix-matrix product.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[np.ndarray, Sequence[float], Sequence[Sequence[float]]]
+
+
+def normalize_vector(vector: ArrayLike) -> np.ndarray:
+    """Return a unit-length float32 copy of a vector (zero vectors stay zero)"""
+    vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(vec))
+    if norm == 0.0 or not np.isfinite(norm):
+        return np.zeros_like(vec)
+    return vec / norm
+
+
+def normalize_rows(matrix: ArrayLike) -> np.ndarray:
+    """Return a row-normalized float32 copy of a 2-D matrix (zero rows stay zero)"""
+    mat = np.asarray(matrix, dtype=np.float32)
+    if mat.ndim == 1:
+        mat = mat.reshape(1, -1)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def cosine_similarity(vector1: ArrayLike, vector2: ArrayLike) -> float:
+    """Cosine similarity between two vectors (0.0 when either is a zero vector)"""
+    return float(np.dot(normalize_vector(vector1), normalize_vector(vector2)))
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, using argpartition"""
+    count = scores.shape[0]
+    if k <= 0 or count == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < count:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(count)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class EmbeddingMatrix:
+    """Pre-normalized float32 matrix of document embeddings"""
+
+    def __init__(self, embeddings: Optional[ArrayLike] = None, dimension: Optional[int] = None):
+        if embeddings is None or len(embeddings) == 0:
+            self.matrix = np.zeros((0, dimension or 0), dtype=np.float32)
+        else:
+            self.matrix = normalize_rows(embeddings)
+        self.dimension = self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def score(self, query: ArrayLike) -> np.ndarray:
+        """Cosine similarity of one query against every row"""
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ normalize_vector(query)
+
+    def score_batch(self, queries: ArrayLike) -> np.ndarray:
+        """Cosine similarity of many queries against every row (queries x documents)"""
+        if len(self) == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        return normalize_rows(queries) @ self.matrix.T
+
+    def top_k(
+        self,
+        query: ArrayLike,
+        k: int = 5,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """(row index, score) pairs for the k best rows, best first"""
+        scores = self.score(query)
+        return self.top_k_from_scores(scores, k, min_score)
+
+    def top_k_batch(
+        self,
+        queries: ArrayLike,
+        k: int = 5,
+        min_score: Optional[float] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """top_k for many queries, scored with a single matrix-matrix product"""
+        all_scores = self.score_batch(queries)
+        return [self.top_k_from_scores(scores, k, min_score) for scores in all_scores]
+
+    @staticmethod
+    def top_k_from_scores(
+        scores: np.ndarray,
+        k: int,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Select the k best (row index, score) pairs from precomputed scores"""
+        results = [(int(i), float(scores[i])) for i in top_k_indices(scores, k)]
+        if min_score is not None:
+            results = [(i, s) for i, s in results if s >= min_score]
+        return results
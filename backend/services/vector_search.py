@@ -0,0 +1,150 @@
+"""
+Vector Top-k Search Backends for Vimarsh
+
+VectorDatabaseService.semantic_search asks one backend for the k nearest
+documents together with their similarity scores, then only builds results for
+those k - it never re-scores candidates in Python.
+
+- CosmosVectorSearch: server-side ``ORDER BY VectorDistance(c.embedding, @v)``
+  with TOP k against the container's vector index. The score is projected
+  alongside the document properties (cosine similarity under the container's
+  vector embedding policy) and embeddings are not returned. Every query
+  targets one partition: a search over all personalities runs one query per
+  personality and merges them, because cross-partition TOP ... ORDER BY
+  VectorDistance needs the NonStreamingOrderBy query feature, which the
+  pinned azure-cosmos SDK does not advertise. The per-partition queries run
+  concurrently on a small thread pool.
+- LocalVectorSearch: the same interface over the memory-mapped
+  LocalEmbeddingStore, used in local mode and as the offline stand-in in tests.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    from .cosmos_query import CosmosQueryBuilder
+    from .local_embedding_store import LocalEmbeddingStore
+except ImportError:
+    from cosmos_query import CosmosQueryBuilder
+    from local_embedding_store import LocalEmbeddingStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VectorHit:
+    """A document (without its embedding) and its similarity to the query"""
+    item: Dict[str, Any]
+    score: float
+
+
+class VectorSearchBackend(ABC):
+    """Top-k nearest documents, optionally within one personality / content types"""
+
+    name = "base"
+
+    @abstractmethod
+    def top_k(
+        self,
+        query_embedding: Sequence[float],
+        k: int,
+        personality: Optional[str] = None,
+        content_types: Optional[List[str]] = None
+    ) -> List[VectorHit]:
+        """Hits ordered by descending score"""
+
+
+class CosmosVectorSearch(VectorSearchBackend):
+    """Server-side VectorDistance top-k on the personality_vectors container"""
+
+    name = "cosmos"
+
+    # Upper bound on per-partition queries in flight for an all-personality search
+    MAX_PARTITION_WORKERS = 8
+
+    def __init__(self, container, fields: Iterable[str], partitions: Iterable[str],
+                 embedding_path: str = "embedding"):
+        self.container = container
+        self.fields = tuple(fields)
+        self.partitions = tuple(partitions)
+        self.embedding_path = embedding_path
+
+    def top_k(
+        self,
+        query_embedding: Sequence[float],
+        k: int,
+        personality: Optional[str] = None,
+        content_types: Optional[List[str]] = None
+    ) -> List[VectorHit]:
+        if personality:
+            return self._partition_top_k(query_embedding, k, personality, content_types)
+
+        hits = []
+        if self.partitions:
+            workers = min(self.MAX_PARTITION_WORKERS, len(self.partitions))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vector-top-k") as executor:
+                for partition_hits in executor.map(
+                    lambda partition: self._partition_top_k(query_embedding, k, partition, content_types),
+                    self.partitions
+                ):
+                    hits.extend(partition_hits)
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits[:k]
+
+    def _partition_top_k(
+        self,
+        query_embedding: Sequence[float],
+        k: int,
+        personality: str,
+        content_types: Optional[List[str]]
+    ) -> List[VectorHit]:
+        query = (CosmosQueryBuilder("vector_top_k")
+                 .select(*self.fields)
+                 .top(k)
+                 .nearest(self.embedding_path, query_embedding, alias="similarity_score")
+                 .where("personality", personality))  # routes to one partition
+        if content_types:
+            query.where_in("content_type", content_types)
+
+        hits = []
+        for item in query.build().execute(self.container):
+            score = item.pop("similarity_score", None)
+            if score is not None:
+                hits.append(VectorHit(item=item, score=float(score)))
+        return hits
+
+
+class LocalVectorSearch(VectorSearchBackend):
+    """Same interface over the memory-mapped local embedding store"""
+
+    name = "local"
+
+    # Over-fetch factor when post-filtering on content type
+    CONTENT_TYPE_OVERFETCH = 4
+
+    def __init__(self, store: LocalEmbeddingStore):
+        self.store = store
+
+    def top_k(
+        self,
+        query_embedding: Sequence[float],
+        k: int,
+        personality: Optional[str] = None,
+        content_types: Optional[List[str]] = None
+    ) -> List[VectorHit]:
+        partitions = [personality] if personality else self.store.personalities()
+        fetch_k = k * self.CONTENT_TYPE_OVERFETCH if content_types else k
+
+        hits = []
+        for partition in partitions:
+            for item, score in self.store.search(query_embedding, partition, fetch_k):
+                item.setdefault('personality', partition)
+                if content_types and item.get('content_type', 'teaching') not in content_types:
+                    continue
+                hits.append(VectorHit(item=item, score=score))
+
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits[:k]
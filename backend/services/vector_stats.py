@@ -0,0 +1,241 @@
+"""
+Materialized Vector Database Statistics for Vimarsh
+
+One statistics document per personality, kept in a small ``vector_stats``
+container (partitioned by /personality) so the admin dashboard reads a
+handful of tiny documents instead of aggregating personality_vectors:
+
+- counts by content type, source and language, documents with embeddings,
+  total content length and total stored bytes (the serialized size of each
+  document, also stored on the document as ``size_bytes`` so deletes and
+  overwrites can subtract it)
+- VectorDatabaseService applies a delta on every upsert/delete. Deltas are
+  applied with Cosmos DB patch ``incr`` operations, which are atomic on the
+  server, so concurrent writers do not lose updates. A document's delta is
+  never split across patch requests, so a failed request cannot leave it
+  half-applied.
+- bulk upserts do not look up the documents they overwrite; they mark the
+  partition's statistics stale instead, so the next read re-aggregates it.
+- writes that bypass the service (data_processing loaders) and pre-existing
+  documents are corrected by reconciliation: a per-partition GROUP BY that
+  replaces the document. It runs when a partition's statistics are older
+  than VECTOR_STATS_RECONCILE_HOURS or on demand from the admin API.
+"""
+
+import os
+import json
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .cosmos_query import CosmosQueryBuilder
+except ImportError:
+    from cosmos_query import CosmosQueryBuilder
+
+logger = logging.getLogger(__name__)
+
+MAX_PATCH_OPERATIONS = 10  # Cosmos DB limit per patch request
+BREAKDOWNS = ('content_type', 'source', 'language')
+
+
+def document_size(item: Dict[str, Any]) -> int:
+    """Serialized size in bytes of a document (without Cosmos system properties)"""
+    body = {k: v for k, v in item.items() if not k.startswith('_') and k != 'size_bytes'}
+    return len(json.dumps(body, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+@dataclass
+class DocumentSummary:
+    """What one document contributes to its partition's statistics"""
+    content_type: str = 'unknown'
+    source: str = 'unknown'
+    language: str = 'unknown'
+    has_embedding: bool = False
+    content_length: int = 0
+    size_bytes: int = 0
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "DocumentSummary":
+        """Summary of a full item (``size_bytes`` is used when present, else computed)"""
+        embedding = item.get('embedding')
+        content = item.get('content')
+        size = item.get('size_bytes')
+        return cls(
+            content_type=str(item.get('content_type') or 'unknown'),
+            source=str(item.get('source') or 'unknown'),
+            language=str(item.get('language') or 'unknown'),
+            has_embedding=bool(item.get('has_embedding', isinstance(embedding, list) and len(embedding) > 0)),
+            content_length=len(content) if isinstance(content, str) else int(item.get('content_length') or 0),
+            size_bytes=int(size) if isinstance(size, (int, float)) else document_size(item)
+        )
+
+    @classmethod
+    def from_stored(cls, item: Dict[str, Any]) -> "DocumentSummary":
+        """Summary of a document as reconciliation counted it (no ``size_bytes`` counts as 0)"""
+        if isinstance(item.get('size_bytes'), (int, float)):
+            return cls.from_item(item)
+        return cls.from_item({**item, 'size_bytes': 0})  # written before size accounting
+
+
+@dataclass
+class PartitionStats:
+    """Materialized statistics document for one personality"""
+    personality: str
+    documents: int = 0
+    with_embeddings: int = 0
+    content_length: int = 0
+    size_bytes: int = 0
+    by_content_type: Dict[str, int] = field(default_factory=dict)
+    by_source: Dict[str, int] = field(default_factory=dict)
+    by_language: Dict[str, int] = field(default_factory=dict)
+    updated_at: str = ''
+    reconciled_at: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "PartitionStats":
+        known = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in item.items() if k in known})
+
+    def to_item(self) -> Dict[str, Any]:
+        item = asdict(self)
+        item['id'] = self.personality
+        return item
+
+
+def _escape(key: str) -> str:
+    """JSON Pointer escaping for a dictionary key in a patch path"""
+    return key.replace('~', '~0').replace('/', '~1')
+
+
+def _deltas(changes: Iterable[Tuple[Optional[DocumentSummary], Optional[DocumentSummary]]]) -> Dict[str, int]:
+    """Patch paths -> increments for (old, new) summary pairs of one partition"""
+    deltas: Dict[str, int] = {}
+
+    def add(path: str, amount: int):
+        if amount:
+            deltas[path] = deltas.get(path, 0) + amount
+
+    for old, new in changes:
+        for summary, sign in ((old, -1), (new, 1)):
+            if summary is None:
+                continue
+            add('/documents', sign)
+            add('/with_embeddings', sign * int(summary.has_embedding))
+            add('/content_length', sign * summary.content_length)
+            add('/size_bytes', sign * summary.size_bytes)
+            for breakdown in BREAKDOWNS:
+                add(f"/by_{breakdown}/{_escape(getattr(summary, breakdown))}", sign)
+    return {path: amount for path, amount in deltas.items() if amount}
+
+
+def _patch_groups(changes: Iterable[Tuple[Optional[DocumentSummary], Optional[DocumentSummary]]]) -> List[Dict[str, int]]:
+    """
+    Deltas packed into patch-sized groups (room is left for the updated_at
+    operation); each document's delta is kept whole within one group
+    """
+    groups: List[Dict[str, int]] = []
+    current: Dict[str, int] = {}
+    for change in changes:
+        delta = _deltas([change])
+        if len(set(current) | set(delta)) > MAX_PATCH_OPERATIONS - 1:
+            groups.append(current)
+            current = {}
+        for path, amount in delta.items():
+            current[path] = current.get(path, 0) + amount
+    groups.append(current)
+    return [group for group in ({p: a for p, a in g.items() if a} for g in groups) if group]
+
+
+class VectorStatsStore:
+    """Reads, incrementally updates and reconciles the statistics documents"""
+
+    def __init__(self, container, reconcile_hours: float = 24.0):
+        self.container = container
+        self.reconcile_after = timedelta(hours=reconcile_hours)
+
+    @classmethod
+    def from_env(cls, container) -> "VectorStatsStore":
+        return cls(container, reconcile_hours=float(os.getenv('VECTOR_STATS_RECONCILE_HOURS', '24')))
+
+    # =======================
+    # READ
+    # =======================
+
+    def load(self) -> Dict[str, PartitionStats]:
+        """All statistics documents (one small document per personality)"""
+        items = CosmosQueryBuilder("vector_stats").build().execute(self.container)
+        return {item['personality']: PartitionStats.from_item(item) for item in items if item.get('personality')}
+
+    def is_stale(self, stats: PartitionStats, now: Optional[datetime] = None) -> bool:
+        if not stats.reconciled_at:
+            return True
+        return (now or datetime.utcnow()) - datetime.fromisoformat(stats.reconciled_at) > self.reconcile_after
+
+    # =======================
+    # INCREMENTAL UPDATES
+    # =======================
+
+    def record(self, personality: str,
+               changes: Iterable[Tuple[Optional[DocumentSummary], Optional[DocumentSummary]]]) -> None:
+        """
+        Apply (old, new) summary pairs for documents of one personality:
+        (None, new) is an insert, (old, None) a delete, (old, new) an overwrite
+        """
+        now = datetime.utcnow().isoformat()
+        for deltas in _patch_groups(changes):
+            operations = [{'op': 'incr', 'path': path, 'value': amount} for path, amount in deltas.items()]
+            operations.append({'op': 'set', 'path': '/updated_at', 'value': now})
+            self._patch(personality, operations, now)
+
+    def mark_stale(self, personality: str) -> None:
+        """Have the next read re-aggregate a personality (after writes whose deltas are unknown)"""
+        self._patch(personality, [{'op': 'set', 'path': '/reconciled_at', 'value': None}],
+                    datetime.utcnow().isoformat())
+
+    def _patch(self, personality: str, operations: List[Dict[str, Any]], now: str) -> None:
+        """One patch request, creating the statistics document on the first write for a personality"""
+        try:
+            self.container.patch_item(item=personality, partition_key=personality, patch_operations=operations)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                raise
+            try:
+                self.container.create_item(body=PartitionStats(personality=personality, updated_at=now).to_item())
+            except Exception as create_error:
+                if getattr(create_error, 'status_code', None) != 409:  # created concurrently
+                    raise
+            self.container.patch_item(item=personality, partition_key=personality, patch_operations=operations)
+
+    # =======================
+    # RECONCILIATION
+    # =======================
+
+    def replace(self, stats: PartitionStats) -> None:
+        """Overwrite a personality's statistics with freshly aggregated values"""
+        stats.updated_at = stats.reconciled_at = datetime.utcnow().isoformat()
+        self.container.upsert_item(body=stats.to_item())
+
+    def remove(self, personality: str) -> None:
+        try:
+            self.container.delete_item(item=personality, partition_key=personality)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                raise
+
+
+def stats_from_groups(personality: str, groups: List[Dict[str, Any]]) -> PartitionStats:
+    """PartitionStats from per-partition GROUP BY rows (content_type, source, language)"""
+    stats = PartitionStats(personality=personality)
+    for group in groups:
+        count = group.get('documents', 0)
+        stats.documents += count
+        stats.with_embeddings += group.get('with_embeddings', 0)
+        stats.content_length += group.get('content_length', 0)
+        stats.size_bytes += group.get('size_bytes', 0)
+        for breakdown in BREAKDOWNS:
+            key = str(group.get(breakdown) or 'unknown')
+            counts = getattr(stats, f"by_{breakdown}")
+            counts[key] = counts.get(key, 0) + count
+    return stats
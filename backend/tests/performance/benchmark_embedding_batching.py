@@ -0,0 +1,72 @@
+"""
+Benchmark: batched embedding requests vs one request per text
+
+Runs GeminiEmbeddingService.generate_embeddings_batch against a local stub
+transport with a simulated round-trip latency, so the effect of request
+packing and concurrency can be measured offline. The "serial" row reproduces
+the old behaviour (batch_size=1, concurrency=1).
+
+Usage:
+    python tests/performance/benchmark_embedding_batching.py
+    python tests/performance/benchmark_embedding_batching.py --texts 2000 --latency-ms 120
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+os.environ.setdefault('EMBEDDING_CACHE_ENABLED', 'false')
+
+from unittest.mock import patch  # noqa: E402
+
+from services.gemini_embedding_service import GeminiEmbeddingService  # noqa: E402
+
+
+def stub_transport(latency_s, per_item_s, dimension):
+    def transport(model, texts, task_type):
+        time.sleep(latency_s + per_item_s * len(texts))
+        return [[1.0] * dimension for _ in texts]
+    return transport
+
+
+def run(texts, batch_size, concurrency, transport):
+    with patch.object(GeminiEmbeddingService, '_initialize_client'):
+        service = GeminiEmbeddingService(api_key="benchmark")
+    service.transport = transport
+    service.batch_size = batch_size
+    service.batch_concurrency = concurrency
+
+    start = time.perf_counter()
+    service.generate_embeddings_batch(texts)
+    elapsed = time.perf_counter() - start
+    return elapsed, service.get_batch_stats()["batch_requests"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='simulated round trip per request')
+    parser.add_argument('--per-item-ms', type=float, default=0.5, help='simulated server time per text')
+    parser.add_argument('--dimension', type=int, default=768)
+    args = parser.parse_args()
+
+    texts = [f"Chapter {i // 40 + 1}, verse {i % 40 + 1}: sample text {i}" for i in range(args.texts)]
+    transport = stub_transport(args.latency_ms / 1000, args.per_item_ms / 1000, args.dimension)
+
+    print(f"Embedding batching benchmark ({args.texts} texts, {args.latency_ms:.0f} ms/request)")
+    print(f"{'mode':>22} {'requests':>9} {'seconds':>9} {'texts/s':>9} {'speedup':>8}")
+    baseline = None
+    for label, batch_size, concurrency in [
+        ('serial (old)', 1, 1),
+        ('batched', 100, 1),
+        ('batched + 4 workers', 100, 4),
+    ]:
+        elapsed, requests = run(texts, batch_size, concurrency, transport)
+        baseline = baseline or elapsed
+        print(f"{label:>22} {requests:>9} {elapsed:>9.2f} {args.texts / elapsed:>9.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
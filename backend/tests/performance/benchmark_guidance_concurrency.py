@@ -0,0 +1,122 @@
+"""
+Load test: async guidance path vs a new event loop per request
+
+Simulates N concurrent /guidance requests against PersonalityService with a
+stub Gemini model whose generate_content blocks for --llm-ms (like the real
+client). Two designs are compared:
+
+- legacy: each request runs on a worker thread (the sync Functions host),
+  creates and tears down its own event loop and pushes generate_content onto
+  that loop's default executor (the old _run_async_llm_call)
+- async:  requests are coroutines on one long-lived loop, awaiting
+  PersonalityService.generate_response, which uses the dedicated LLM executor
+
+Usage:
+    python tests/performance/benchmark_guidance_concurrency.py
+    python tests/performance/benchmark_guidance_concurrency.py --requests 500 --concurrency 16 64 --host-threads 8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from services.personality_service import PersonalityService  # noqa: E402
+
+
+class StubModel:
+    def __init__(self, latency_s):
+        self.latency_s = latency_s
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency_s)
+        return type('Response', (), {'text': 'Beloved devotee, perform your duty without attachment. 🙏'})()
+
+
+def legacy_request(model, prompt):
+    """The old per-request pattern: new loop + default executor"""
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(loop.run_in_executor(None, model.generate_content, prompt))
+    finally:
+        loop.close()
+
+
+def run_legacy(model, requests, clients, host_threads):
+    """`clients` closed-loop clients sharing a sync host with `host_threads` workers"""
+    counter = iter(range(requests))
+    latencies = []
+
+    def client(host):
+        for i in counter:
+            start = time.perf_counter()
+            host.submit(legacy_request, model, f"question {i}").result()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=host_threads) as host, ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(client, host) for _ in range(clients)]:
+            future.result()
+    return latencies, time.perf_counter() - start
+
+
+def run_async(service, requests, clients):
+    """`clients` closed-loop clients as coroutines on one long-lived loop"""
+    async def main():
+        counter = iter(range(requests))
+        latencies = []
+
+        async def client():
+            for i in counter:
+                start = time.perf_counter()
+                await service.generate_response(f"question {i}", "krishna")
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(clients)])
+        return latencies, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(label, latencies, elapsed, requests):
+    print(f"{label:>26} {percentile(latencies, 50) * 1000:>9.0f} {percentile(latencies, 99) * 1000:>9.0f} "
+          f"{statistics.mean(latencies) * 1000:>9.0f} {requests / elapsed:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 64], help='concurrent clients')
+    parser.add_argument('--host-threads', type=int, default=min(32, (os.cpu_count() or 1) + 4),
+                        help='worker threads of the sync Functions host (legacy design)')
+    parser.add_argument('--llm-ms', type=float, default=200.0)
+    args = parser.parse_args()
+
+    model = StubModel(args.llm_ms / 1000)
+    service = PersonalityService()
+    service._llm_service.is_configured = True
+    service._llm_service.model = model
+
+    print(f"Guidance load test ({args.requests} requests, LLM latency {args.llm_ms:.0f} ms, "
+          f"{args.host_threads} sync host threads)")
+    print(f"{'design':>26} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'req/s':>9}")
+    for clients in args.concurrency:
+        latencies, elapsed = run_legacy(model, args.requests, clients, args.host_threads)
+        report(f"legacy ({clients} clients)", latencies, elapsed, args.requests)
+        latencies, elapsed = run_async(service, args.requests, clients)
+        report(f"async ({clients} clients)", latencies, elapsed, args.requests)
+
+if __name__ == '__main__':
+    main()
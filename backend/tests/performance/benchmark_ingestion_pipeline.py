@@ -0,0 +1,116 @@
+"""
+Benchmark: staged intake pipeline vs one book at a time
+
+Ingests a synthetic intake of text books with NewIntakeBooksProcessor, each
+book first "downloaded" (simulated network latency), then extracted and
+chunked, then added (near-duplicate check, entries):
+
+- serial:  download -> extract/chunk -> add, one book after the other
+           (what process_all_new_books used to do)
+- staged:  StagedPipeline with an async download stage feeding the process
+           pool extraction stage through a bounded queue; entries are added
+           in file order afterwards
+
+Speedup comes from overlapping downloads with extraction and from running
+extraction on several cores, so it grows with --latency-ms and --workers
+(up to the machine's core count).
+
+Usage:
+    python tests/performance/benchmark_ingestion_pipeline.py
+    python tests/performance/benchmark_ingestion_pipeline.py --books 32 --latency-ms 200 --workers 4
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(BACKEND, 'data_processing'))
+
+from utils.staged_pipeline import CPU_STAGE, IO_STAGE, PipelineStage, StagedPipeline  # noqa: E402
+from process_new_intake_books import NewIntakeBooksProcessor, _extract_book_sections_in_worker  # noqa: E402
+
+WORDS = ("dharma karma duty action devotion wisdom knowledge truth peace mind self "
+         "virtue harmony way nature heaven learning ritual compassion suffering path").split()
+
+
+def write_books(intake: Path, books: int, paragraphs: int):
+    rng = random.Random(11)
+    for i in range(books):
+        text = "\n\n".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + "."
+            for _ in range(paragraphs)
+        )
+        (intake / f"book_{i:03d}.txt").write_text(text, encoding="utf-8")
+
+
+async def run_serial(intake: Path, latency: float) -> NewIntakeBooksProcessor:
+    processor = NewIntakeBooksProcessor(intake)
+    for file_path in sorted(intake.glob("*.txt")):
+        await asyncio.sleep(latency)
+        await processor.process_single_file(file_path)
+    return processor
+
+
+async def run_staged(intake: Path, latency: float, workers: int, queue_size: int) -> NewIntakeBooksProcessor:
+    processor = NewIntakeBooksProcessor(intake)
+
+    async def download(file_path):
+        await asyncio.sleep(latency)
+        return file_path
+
+    pipeline = StagedPipeline([
+        PipelineStage("download", download, IO_STAGE),
+        PipelineStage("extract", partial(_extract_book_sections_in_worker, str(intake)), CPU_STAGE)
+    ], process_workers=workers, queue_size=queue_size, io_concurrency=max(4, workers))
+    run = await pipeline.run(sorted(intake.glob("*.txt")))
+    for item in run.items:
+        processor.add_book_sections(item.item.name, item.value)
+    return processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=16)
+    parser.add_argument('--paragraphs', type=int, default=400)
+    parser.add_argument('--latency-ms', type=float, default=100.0, help="simulated download time per book")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--queue-size', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the processor writes its output directory relative to the cwd
+        intake = Path(tmp) / "intake"
+        intake.mkdir()
+        write_books(intake, args.books, args.paragraphs)
+        latency = args.latency_ms / 1000
+
+        timings = {}
+        entries = {}
+        for name, make in [("serial", lambda: run_serial(intake, latency)),
+                           ("staged", lambda: run_staged(intake, latency, args.workers, args.queue_size))]:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                processor = asyncio.run(make())
+            timings[name] = time.perf_counter() - start
+            entries[name] = [e["id"] for e in processor.processed_entries]
+
+    assert entries["serial"] == entries["staged"], "staged ingestion must keep the same entries"
+    print(f"Intake of {args.books} books x {args.paragraphs} paragraphs, {args.latency_ms:.0f} ms download, "
+          f"{args.workers} workers ({os.cpu_count()} cores), {len(entries['serial'])} entries")
+    for name, seconds in timings.items():
+        print(f"{name:>8}: {seconds:6.2f}s  {args.books / seconds:6.1f} books/s  "
+              f"{timings['serial'] / seconds:4.1f}x")
+
+
+if __name__ == '__main__':
+    main()
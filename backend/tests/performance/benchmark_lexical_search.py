@@ -0,0 +1,116 @@
+"""
+Benchmark: BM25 inverted-index search vs the substring scan in SimpleRAGService
+
+Builds a corpus of --docs passages (the loaded data/sources teachings plus the
+vimarsh-db texts, repeated as needed) and times one keyword query against:
+
+- scan:  the previous search_content loop (lowercase + split every document,
+         then `word in content_word` for every query word)
+- bm25:  LexicalIndex built once, scoring only the postings of the query terms
+
+Usage:
+    python tests/performance/benchmark_lexical_search.py
+    python tests/performance/benchmark_lexical_search.py --docs 1000 10000 100000 --queries 200
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, BACKEND)
+
+from services.lexical_index import LexicalIndex  # noqa: E402
+
+QUERIES = [
+    "how do I perform my duty without attachment",
+    "what is the nature of the soul",
+    "finding peace of mind",
+    "dealing with anger and desire",
+    "meaning of dharma and karma yoga",
+    "how to overcome fear of death",
+    "compassion towards all beings",
+    "the path of devotion",
+]
+
+
+def load_passages():
+    passages = []
+    for path in glob.glob(os.path.join(BACKEND, 'data', 'vimarsh-db', '*-texts.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            passages.extend(item['content'] for item in json.load(f) if item.get('content'))
+    for path in glob.glob(os.path.join(BACKEND, 'data', 'sources', '*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            passages.extend(item['text'] for item in json.load(f) if isinstance(item, dict) and item.get('text'))
+    return passages
+
+
+def scan_search(query, documents, max_results=5):
+    """The original per-query scan"""
+    query_lower = query.lower()
+    results = []
+    for text in documents:
+        content_lower = text.lower()
+        if query_lower in content_lower:
+            score = 0.9
+        else:
+            query_words = query_lower.split()
+            content_words = content_lower.split()
+            matches = 0
+            for word in query_words:
+                if any(word in content_word for content_word in content_words):
+                    matches += 1
+            score = matches / len(query_words) * 0.7
+        if score > 0.1:
+            results.append((score, text))
+    results.sort(key=lambda r: r[0], reverse=True)
+    return results[:max_results]
+
+
+def benchmark(size, passages, queries, scan_sample):
+    rng = random.Random(size)
+    documents = [rng.choice(passages) for _ in range(size)]
+
+    start = time.perf_counter()
+    index = LexicalIndex()
+    index.add_many(documents)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, k=5)
+    bm25_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    sample = queries[:scan_sample]
+    start = time.perf_counter()
+    for query in sample:
+        scan_search(query, documents)
+    scan_ms = (time.perf_counter() - start) * 1000 / len(sample)
+
+    return {'size': size, 'build_ms': build_ms, 'scan_ms': scan_ms, 'bm25_ms': bm25_ms,
+            'speedup': scan_ms / bm25_ms if bm25_ms else float('inf')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--scan-sample', type=int, default=8, help='queries timed with the (slow) scan')
+    args = parser.parse_args()
+
+    passages = load_passages()
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+
+    print(f"Lexical search benchmark ({len(passages)} distinct passages, top 5)")
+    print(f"{'documents':>10} {'scan ms':>10} {'bm25 ms':>10} {'build ms':>10} {'speedup':>9}")
+    for size in args.docs:
+        r = benchmark(size, passages, queries, args.scan_sample)
+        print(f"{r['size']:>10} {r['scan_ms']:>10.2f} {r['bm25_ms']:>10.3f} {r['build_ms']:>10.1f} {r['speedup']:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Micro-benchmark: local DatabaseService queries, full scan vs secondary indexes
+
+Builds a conversations collection with N records (conversations, usage
+records and user stats for --users users) in a temp directory and times the
+paginated local queries:
+
+- scan:    the previous implementation - load conversations.json, filter
+           every record, sort, slice
+- indexed: DatabaseService on the log-structured store with its secondary
+           indexes (LogStructuredStore.find)
+
+Usage:
+    python tests/performance/benchmark_local_db_queries.py
+    python tests/performance/benchmark_local_db_queries.py --records 1000 10000 100000 --queries 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from services.database_service import DatabaseService  # noqa: E402
+
+
+def make_records(count, users):
+    start = datetime(2025, 1, 1)
+    records = []
+    for i in range(count):
+        user_id = f"user-{i % users}"
+        timestamp = (start + timedelta(minutes=i)).isoformat()
+        if i % 3 == 0:
+            records.append({
+                "id": f"conv-{i}", "userId": user_id, "userEmail": f"{user_id}@example.com",
+                "sessionId": f"session-{i % (users * 4)}", "timestamp": timestamp,
+                "question": "What is dharma?", "response": "Beloved devotee, " + "x" * 200,
+                "citations": [], "personality": random.choice(["krishna", "buddha", "jesus"]),
+                "metadata": None, "type": "conversation"
+            })
+        else:
+            records.append({
+                "id": f"usage-{i}", "userId": user_id, "userEmail": f"{user_id}@example.com",
+                "sessionId": f"session-{i % (users * 4)}", "timestamp": timestamp,
+                "model": "gemini-2.5-flash", "inputTokens": 100, "outputTokens": 200,
+                "totalTokens": 300, "costUsd": 0.001, "requestType": "spiritual_guidance",
+                "responseQuality": "high", "personality": "krishna", "type": "usage_tracking"
+            })
+    for u in range(users):
+        records.append({
+            "id": f"stats_user-{u}", "userId": f"user-{u}", "userEmail": f"user-{u}@example.com",
+            "totalRequests": u, "totalTokens": 0, "totalCostUsd": random.random(),
+            "currentMonthTokens": 0, "currentMonthCostUsd": 0.0, "lastRequest": None,
+            "avgTokensPerRequest": 0.0, "favoriteModel": "gemini-2.5-flash",
+            "personalityUsage": {}, "qualityBreakdown": {}, "riskScore": 0.0,
+            "isBlocked": False, "blockReason": None, "type": "user_stats", "updatedAt": None
+        })
+    return records
+
+
+def scan_user_conversations(path, user_id, limit, offset):
+    """The previous _get_user_conversations_local"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    conversations = [item for item in data
+                     if item.get('userId') == user_id and item.get('type') == 'conversation']
+    conversations.sort(key=lambda x: x['timestamp'], reverse=True)
+    return conversations[offset:offset + limit]
+
+
+def scan_top_users(path, limit):
+    """The previous _get_top_users_local"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    stats = [item for item in data if item.get('type') == 'user_stats']
+    stats.sort(key=lambda x: x['totalCostUsd'], reverse=True)
+    return stats[:limit]
+
+
+def timed(fn, queries):
+    samples = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def run(count, users, queries):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'conversations.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(make_records(count, users), f, indent=2)
+
+        db = DatabaseService()
+        db.conversations_path = path
+        build_start = time.perf_counter()
+        db._conversations_store().all()
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        loop = asyncio.new_event_loop()
+        scan_queries = max(3, queries // 20)   # a full scan is slow; fewer samples are enough
+
+        results = {
+            "user page (scan)": timed(
+                lambda: scan_user_conversations(path, f"user-{random.randrange(users)}", 20, 20), scan_queries),
+            "user page (indexed)": timed(
+                lambda: loop.run_until_complete(
+                    db.get_user_conversations(f"user-{random.randrange(users)}", limit=20, offset=20)), queries),
+            "top users (scan)": timed(lambda: scan_top_users(path, 10), scan_queries),
+            "top users (indexed)": timed(lambda: loop.run_until_complete(db.get_top_users(10)), queries),
+            "usage 30d (indexed)": timed(
+                lambda: loop.run_until_complete(db.get_usage_records(days=30, limit=100)), queries),
+        }
+        loop.close()
+        db._conversations_store().close()
+
+    print(f"\n{count:,} records ({users} users), index build on load: {build_ms:.0f} ms")
+    for name, (p50, p99) in results.items():
+        print(f"  {name:<22} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(7)
+    for count in args.records:
+        run(count, args.users, args.queries)
+
+
+if __name__ == '__main__':
+    main()
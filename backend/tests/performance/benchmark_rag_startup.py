@@ -0,0 +1,111 @@
+"""
+Benchmark: SimpleRAGService cold start (import + construct + first query)
+
+Each case runs in a fresh interpreter so imports and caches are cold:
+
+- eager:     construct, then _load_content() (parse every personality, as the
+             service did at import time before lazy loading)
+- lazy:      construct, first query parses only the queried personality
+- snapshot:  construct, first query loads that personality's prebuilt snapshot
+
+The data/sources teachings are replicated --scale times into a temporary
+directory so the effect is visible beyond the small checked-in corpus.
+Reported: import+construct ms, first query ms, peak Python allocations
+(tracemalloc) and the child's peak RSS.
+
+Usage:
+    python tests/performance/benchmark_rag_startup.py
+    python tests/performance/benchmark_rag_startup.py --scale 1 20 100 --runs 5
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+SOURCES = os.path.join(BACKEND, 'data', 'sources')
+
+CHILD = r'''
+import json, sys, time, tracemalloc
+
+def peak_rss_mb():
+    # VmHWM restarts at exec; ru_maxrss would include the parent's pre-exec peak
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+tracemalloc.start()
+start = time.perf_counter()
+sys.path.insert(0, {services!r})  # the module alone, not the services package __init__
+from rag_service import SimpleRAGService
+service = SimpleRAGService(data_dir={data_dir!r}, snapshot_dir={snapshot_dir!r})
+if {eager!r}:
+    service._load_content()
+construct_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+service.search_content("peace of mind and compassion", "buddha")
+query_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"construct_ms": construct_ms, "query_ms": query_ms,
+                  "peak_mb": tracemalloc.get_traced_memory()[1] / 2**20,
+                  "rss_mb": peak_rss_mb()}}))
+'''
+
+
+def replicate_sources(target, scale):
+    """Copy every source file with its items repeated scale times"""
+    for path in glob.glob(os.path.join(SOURCES, '*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        items = [dict(item, id=f"{item.get('id', i)}_{r}") for r in range(scale) for i, item in enumerate(items)]
+        with open(os.path.join(target, os.path.basename(path)), 'w', encoding='utf-8') as f:
+            json.dump(items, f)
+
+
+def run_case(data_dir, snapshot_dir, eager, runs):
+    code = CHILD.format(services=os.path.join(BACKEND, 'services'), data_dir=data_dir, snapshot_dir=snapshot_dir, eager=eager)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 20, 100])
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per case (median reported)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(BACKEND, 'services'))
+    from rag_service import SimpleRAGService
+
+    print("SimpleRAGService cold start (median of fresh interpreters)")
+    print(f"{'scale':>6} {'items':>7} {'case':>9} {'start ms':>9} {'query ms':>9} {'peak MB':>8} {'RSS MB':>7}")
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'sources')
+            snapshot_dir = os.path.join(tmp, 'snapshot')
+            os.makedirs(data_dir)
+            replicate_sources(data_dir, scale)
+            items = sum(SimpleRAGService(data_dir=data_dir, snapshot_dir=snapshot_dir).write_snapshot().values())
+            cases = [
+                ('eager', os.path.join(tmp, 'missing'), True),
+                ('lazy', os.path.join(tmp, 'missing'), False),
+                ('snapshot', snapshot_dir, False),
+            ]
+            for name, snapshot, eager in cases:
+                r = run_case(data_dir, snapshot, eager, args.runs)
+                print(f"{scale:>6} {items:>7} {name:>9} {r['construct_ms']:>9.1f} {r['query_ms']:>9.1f} "
+                      f"{r['peak_mb']:>8.2f} {r['rss_mb']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: shared multi-pattern matcher vs per-term scans
+
+Times each text-processing hot path over the vimarsh-db passages, before
+(one re.search / `in` per term, as the callers used to do) and after (one
+TermMatcher / PatternMatcher pass, see utils/text_matcher.py):
+
+- safety:     SafetyService blocked patterns
+- key terms:  SpiritualProcessor sacred terms (whole words)
+- domains:    MultiDomainProcessor.detect_domain vocabularies (substring, 4 domains)
+- vocab N:    synthetic whole-word vocabularies of N corpus words
+
+Usage:
+    python tests/performance/benchmark_text_matcher.py
+    python tests/performance/benchmark_text_matcher.py --repeat 5 --vocab 100 1000 5000
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, BACKEND)
+
+from data_processing.domain_processors import MultiDomainProcessor, SpiritualProcessor  # noqa: E402
+from services.safety_service import SafetyService  # noqa: E402
+from utils.text_matcher import compile_patterns, compile_terms  # noqa: E402
+
+
+def load_passages():
+    passages = []
+    for path in glob.glob(os.path.join(BACKEND, 'data', 'vimarsh-db', '*-texts.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            passages.extend(item['content'] for item in json.load(f) if item.get('content'))
+    return passages
+
+
+def whole_word_loop(terms, text):
+    text_lower = text.lower()
+    return [term for term in terms if re.search(r'\b' + re.escape(term) + r'\b', text_lower)]
+
+
+def build_cases(vocab_sizes, passages):
+    safety_patterns = [p for patterns in SafetyService()._safety_patterns.values() for p in patterns]
+    sacred_terms = SpiritualProcessor().sacred_terms
+    domain_vocabularies = [
+        getattr(processor, f'{"sacred" if domain == "spiritual" else domain}_terms')
+        for domain, processor in MultiDomainProcessor().processors.items()
+    ]
+
+    def safety_before(text):
+        return [p for p in safety_patterns if re.search(p, text.lower())]
+
+    cases = [
+        ('safety', safety_before, lambda text: compile_patterns(safety_patterns).found(text.lower())),
+        ('key terms', lambda text: whole_word_loop([t for ts in sacred_terms.values() for t in ts], text),
+         lambda text: compile_terms(sacred_terms, whole_words=True).found(text)),
+        ('domains', lambda text: [[t for t in terms if t.lower() in text.lower()] for terms in domain_vocabularies],
+         lambda text: [compile_terms(terms).found(text) for terms in domain_vocabularies]),
+    ]
+
+    words = sorted({w for text in passages for w in re.findall(r'[a-z]{4,}', text.lower())})
+    rng = random.Random(7)
+    for size in vocab_sizes:
+        vocabulary = rng.sample(words, min(size, len(words)))
+        cases.append((f'vocab {len(vocabulary)}', lambda text, v=vocabulary: whole_word_loop(v, text),
+                      lambda text, v=vocabulary: compile_terms(v, whole_words=True).found(text)))
+    return cases
+
+
+def throughput(fn, passages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in passages:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(passages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--vocab', type=int, nargs='+', default=[100, 1000])
+    args = parser.parse_args()
+
+    passages = load_passages()
+    cases = build_cases(args.vocab, passages)
+
+    print(f"Multi-pattern matching ({len(passages)} passages, "
+          f"{sum(map(len, passages)) / len(passages):.0f} chars avg; texts/s, best of {args.repeat})")
+    print(f"{'case':>12} {'before':>10} {'after':>10} {'speedup':>8}")
+    for name, before, after in cases:
+        for text in passages[:50]:
+            after(text)  # compile once, outside the timing
+        before_rate = throughput(before, passages, args.repeat)
+        after_rate = throughput(after, passages, args.repeat)
+        print(f"{name:>12} {before_rate:>10.0f} {after_rate:>10.0f} {after_rate / before_rate:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark: recall@k vs memory for float32 / float16 / int8 vector storage
+
+Indexes the Bhagavad Gita corpus (data/vimarsh-db krishna texts) in a
+FlatVectorIndex at each precision and measures, against exact float32 search:
+
+- recall@k of the quantized scores alone (rerank factor 0)
+- recall@k after exact float32 re-ranking of the top k * factor candidates
+- resident matrix memory and per-query latency
+
+The stored corpus carries no embeddings, so by default texts are embedded with
+a deterministic feature-hashing embedder (hashed word unigrams and bigrams with
+random signs); --gemini uses the real embedding model (GEMINI_API_KEY). The
+corpus is small, so --replicas adds word-dropout variants of every verse:
+crowded near-duplicates are where quantization error reorders neighbours.
+
+Usage:
+    python tests/performance/benchmark_vector_quantization.py
+    python tests/performance/benchmark_vector_quantization.py --replicas 200 --top-k 10 --factors 2 4 8
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zlib
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, BACKEND)
+
+from services.vector_index import FlatVectorIndex  # noqa: E402
+
+CORPUS_FILES = [
+    ('krishna-texts.json', None),
+    ('spiritual-texts.json', 'krishna'),
+]
+
+
+def load_gita_corpus():
+    texts = []
+    for name, personality in CORPUS_FILES:
+        path = os.path.join(BACKEND, 'data', 'vimarsh-db', name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                if personality and item.get('personality') != personality:
+                    continue
+                if item.get('content'):
+                    texts.append(item['content'])
+    return texts
+
+
+def hashed_embeddings(texts, dimension):
+    """Feature-hashing embeddings: similar wording gives similar vectors"""
+    matrix = np.zeros((len(texts), dimension), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = re.findall(r'\w+', text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(feature.encode('utf-8'))
+            matrix[row, h % dimension] += 1.0 if (h >> 16) & 1 else -1.0
+    return matrix
+
+
+def gemini_embeddings(texts):
+    from services.gemini_embedding_service import get_gemini_embedding_service
+    results = get_gemini_embedding_service().generate_embeddings_batch(texts)
+    return np.asarray([r.embedding for r in results], dtype=np.float32)
+
+
+def word_dropout(texts, replicas, rate, rng):
+    variants = []
+    for text in texts:
+        words = text.split()
+        for _ in range(replicas):
+            kept = [w for w in words if rng.random() > rate]
+            variants.append(' '.join(kept or words))
+    return variants
+
+
+def build(vectors, precision, factor):
+    index = FlatVectorIndex(dimension=vectors.shape[1], initial_capacity=len(vectors),
+                            precision=precision, rerank_factor=factor)
+    index.upsert_many((str(i), v) for i, v in enumerate(vectors))
+    return index
+
+
+def evaluate(index, queries, truth, k):
+    found = 0
+    start = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        found += len(expected & {doc_id for doc_id, _ in index.search(query, k)})
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return found / (k * len(queries)), elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replicas', type=int, default=50, help='word-dropout variants per verse')
+    parser.add_argument('--dropout', type=float, default=0.15)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--factors', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--dimension', type=int, default=768)
+    parser.add_argument('--gemini', action='store_true', help='embed with the Gemini embedding model')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    verses = load_gita_corpus()
+    texts = verses + word_dropout(verses, args.replicas, args.dropout, rng)
+    query_texts = word_dropout([verses[i] for i in rng.integers(0, len(verses), args.queries)], 1, 0.3, rng)
+
+    embed = gemini_embeddings if args.gemini else (lambda t: hashed_embeddings(t, args.dimension))
+    vectors = embed(texts)
+    queries = embed(query_texts)
+
+    exact = build(vectors, 'float32', 0)
+    truth = [{doc_id for doc_id, _ in exact.search(q, args.top_k)} for q in queries]
+    _, exact_ms = evaluate(exact, queries, truth, args.top_k)
+    baseline_mb = exact.memory_bytes / (1024 * 1024)
+    list_mb = len(texts) * vectors.shape[1] * 32 / (1024 * 1024)  # List[float]: 8-byte pointer + 24-byte float
+
+    print(f"Vector quantization benchmark: {len(verses)} Gita verses + variants = {len(texts)} vectors, "
+          f"dimension={vectors.shape[1]}, recall@{args.top_k} over {args.queries} queries")
+    print(f"Python List[float] embeddings would hold ~{list_mb:.1f} MB")
+    print(f"{'precision':>9} {'rerank':>7} {'recall':>8} {'matrix MB':>10} {'vs f32':>7} {'ms/query':>9}")
+    print(f"{'float32':>9} {'-':>7} {1.0:>8.4f} {baseline_mb:>10.2f} {1.0:>6.2f}x {exact_ms:>9.2f}")
+    for precision in ('float16', 'int8'):
+        for factor in [0] + args.factors:
+            index = build(vectors, precision, factor)
+            recall, ms = evaluate(index, queries, truth, args.top_k)
+            memory_mb = index.memory_bytes / (1024 * 1024)
+            label = f"x{factor}" if factor else 'none'
+            print(f"{precision:>9} {label:>7} {recall:>8.4f} {memory_mb:>10.2f} "
+                  f"{memory_mb / baseline_mb:>6.2f}x {ms:>9.2f}")
+    print("rerank xN: exact float32 re-scoring of the top k*N candidates from a memory-mapped spill file")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: vectorized cosine scoring vs the per-document Python loops
+
+Compares the shared EmbeddingMatrix engine against the loop that
+semantic_search / KnowledgeBaseManager / EmbeddingGenerator used to run
+(np.array per document, re-normalizing the query every time).
+
+Usage:
+    python tests/performance/benchmark_vector_scoring.py
+    python tests/performance/benchmark_vector_scoring.py --sizes 10000 100000 --dimension 768
+
+The 1M-chunk case needs ~3 GB of RAM at 768 dimensions. The loop baseline is
+timed on a sample of at most --loop-sample documents and extrapolated linearly,
+since it would otherwise take minutes per run.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from services.vector_scoring import EmbeddingMatrix  # noqa: E402
+
+
+def loop_scores(query, embeddings):
+    """The original per-document scoring loop"""
+    scores = []
+    for embedding in embeddings:
+        doc = np.array(embedding)
+        q = np.array(query)
+        scores.append(np.dot(doc, q) / (np.linalg.norm(doc) * np.linalg.norm(q)))
+    scores.sort(reverse=True)
+    return scores
+
+
+def benchmark(size, dimension, top_k, loop_sample, batch_queries):
+    rng = np.random.default_rng(size)
+    embeddings = rng.standard_normal((size, dimension), dtype=np.float32)
+    query = rng.standard_normal(dimension, dtype=np.float32).tolist()
+    queries = rng.standard_normal((batch_queries, dimension), dtype=np.float32)
+
+    # Baseline: embeddings as List[float], as they arrive from Cosmos DB / JSON
+    sample = min(size, loop_sample)
+    sample_lists = embeddings[:sample].tolist()
+    start = time.perf_counter()
+    loop_scores(query, sample_lists)
+    loop_ms = (time.perf_counter() - start) * 1000 * (size / sample)
+
+    start = time.perf_counter()
+    matrix = EmbeddingMatrix(embeddings)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    runs = 5
+    start = time.perf_counter()
+    for _ in range(runs):
+        matrix.top_k(query, k=top_k)
+    single_ms = (time.perf_counter() - start) * 1000 / runs
+
+    start = time.perf_counter()
+    matrix.top_k_batch(queries, k=top_k)
+    batch_ms = (time.perf_counter() - start) * 1000 / batch_queries
+
+    return {
+        'size': size,
+        'loop_ms': loop_ms,
+        'build_ms': build_ms,
+        'single_ms': single_ms,
+        'batch_ms_per_query': batch_ms,
+        'speedup': loop_ms / single_ms if single_ms else float('inf'),
+        'loop_extrapolated': sample < size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--dimension', type=int, default=768)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--loop-sample', type=int, default=10_000)
+    parser.add_argument('--batch-queries', type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"Vector scoring benchmark (dimension={args.dimension}, top_k={args.top_k})")
+    print(f"{'chunks':>10} {'loop ms':>12} {'matvec ms':>10} {'batch ms/q':>11} {'build ms':>10} {'speedup':>9}")
+    for size in args.sizes:
+        r = benchmark(size, args.dimension, args.top_k, args.loop_sample, args.batch_queries)
+        marker = '*' if r['loop_extrapolated'] else ' '
+        print(f"{r['size']:>10} {r['loop_ms']:>11.1f}{marker} {r['single_ms']:>10.2f} "
+              f"{r['batch_ms_per_query']:>11.2f} {r['build_ms']:>10.1f} {r['speedup']:>8.0f}x")
+    print("* loop time extrapolated from --loop-sample documents")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Tests for the async and streaming guidance paths (PersonalityService -> LLMService)
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from services import llm_service
+from services.llm_service import CharacterLimitedStream
+from services.personality_service import PersonalityService
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class BlockingModel:
+    """Stands in for genai.GenerativeModel: generate_content blocks its thread"""
+
+    def __init__(self, latency=0.05, text="Beloved devotee, act without attachment. 🙏"):
+        self.latency = latency
+        self.text = text
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False):
+        if stream:
+            return (FakeResponse(self.text[i:i + 7]) for i in range(0, len(self.text), 7))
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return FakeResponse(self.text)
+
+
+@pytest.fixture
+def service():
+    service = PersonalityService()
+    service._llm_service.is_configured = True
+    service._llm_service.model = BlockingModel()
+    service._response_cache = None
+    return service
+
+
+class TestAsyncGuidance:
+    """generate_response is awaitable and runs LLM calls concurrently"""
+
+    @pytest.mark.asyncio
+    async def test_generate_response_uses_llm(self, service):
+        result = await service.generate_response("What is dharma?", "krishna")
+
+        assert result["metadata"]["response_source"] == "llm_service"
+        assert result["content"].startswith("Beloved devotee")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_loop(self, service):
+        model = service._llm_service.model
+
+        results = await asyncio.gather(*[
+            service.generate_response(f"question {i}", "krishna") for i in range(8)
+        ])
+
+        assert all(r["metadata"]["response_source"] == "llm_service" for r in results)
+        assert model.max_in_flight > 1
+        assert all(name.startswith("llm-client") for name in model.threads)
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_falls_back_to_template(self, service):
+        with patch.object(service._llm_service, 'generate_personality_response', side_effect=RuntimeError("down")):
+            result = await service.generate_response("What is dharma?", "buddha")
+
+        assert result["metadata"]["response_source"] == "template_fallback"
+
+    def test_llm_executor_is_shared_and_bounded(self):
+        executor = llm_service.get_llm_executor()
+
+        assert executor is llm_service.get_llm_executor()
+        assert executor._max_workers >= 1
+
+
+def _buffered_limit(text, max_chars):
+    """What generate_personality_response does with a complete response"""
+    text = text.strip()
+    return text[:max_chars - 3] + "..." if len(text) > max_chars else text
+
+
+class TestStreamingGuidance:
+    """Token streaming with the character limit applied on the stream"""
+
+    @pytest.mark.parametrize("text", [
+        "  Beloved devotee, be steadfast.  ",
+        "x" * 20,
+        "x" * 21,
+        "y" * 30 + "   ",
+        "short",
+    ])
+    @pytest.mark.parametrize("chunk_size", [1, 4, 50])
+    def test_stream_limit_matches_buffered_limit(self, text, chunk_size):
+        limiter = CharacterLimitedStream(20)
+        streamed = "".join(limiter.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size))
+        streamed += limiter.finish()
+
+        assert streamed == _buffered_limit(text, 20)
+
+    def test_text_is_released_before_the_stream_ends(self):
+        limiter = CharacterLimitedStream(500)
+
+        assert limiter.feed("Beloved devotee, ") == "Beloved devotee,"
+        assert limiter.feed("act.") == " act."
+        assert limiter.finish() == ""
+
+    @pytest.mark.asyncio
+    async def test_llm_streams_chunks(self, service):
+        outcome = {}
+        chunks = [c async for c in service._llm_service.stream_personality_response("What is dharma?", "krishna", outcome)]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == service._llm_service.model.text
+        assert outcome["source"] == "gemini_api_krishna_optimized"
+
+    @pytest.mark.asyncio
+    async def test_long_stream_is_truncated(self, service):
+        service._llm_service.model.text = "Om " * 400
+
+        text = "".join([c async for c in service._llm_service.stream_personality_response("Chant", "krishna")])
+
+        assert text == _buffered_limit("Om " * 400, 500)
+
+    @pytest.mark.asyncio
+    async def test_stream_failure_before_first_token_yields_fallback(self, service):
+        def broken(prompt, stream=False):
+            raise RuntimeError("quota")
+        service._llm_service.model.generate_content = broken
+
+        outcome = {}
+        chunks = [c async for c in service._llm_service.stream_personality_response("What is dharma?", "buddha", outcome)]
+
+        assert chunks == ["Dear friend, I am experiencing difficulties accessing my wisdom. Please try your question again shortly."]
+        assert outcome["source"] == "fallback_api_error"
+
+    @pytest.mark.asyncio
+    async def test_personality_service_stream_events(self, service):
+        events = [e async for e in service.stream_response("What is dharma?", "krishna")]
+
+        assert all(e["type"] == "token" for e in events[:-1])
+        assert events[-1]["type"] == "done"
+        assert events[-1]["metadata"]["response_source"] == "llm_service_stream"
+        assert events[-1]["metadata"]["response_length"] == len(service._llm_service.model.text)
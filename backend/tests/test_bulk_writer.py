@@ -0,0 +1,153 @@
+"""
+Tests for the bulk upsert pipeline: throttling retries, partition batching,
+bounded concurrency, checkpoints and progress reporting
+"""
+
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import patch
+
+from services.bulk_writer import BulkUpsertPipeline
+from services.vector_database_service import VectorDatabaseService
+
+
+class Throttled(Exception):
+    """Shaped like azure.cosmos.exceptions.CosmosHttpResponseError for a 429"""
+
+    def __init__(self, retry_after_ms="5"):
+        super().__init__("Request rate is large")
+        self.status_code = 429
+        self.headers = {"x-ms-retry-after-ms": retry_after_ms}
+
+
+class FakeContainer:
+    """Sync upsert_item that throttles some calls and tracks concurrency"""
+
+    def __init__(self, throttle_first=0, fail_ids=(), delay=0.0):
+        self.items = {}
+        self.throttle_first = throttle_first
+        self.fail_ids = set(fail_ids)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def upsert_item(self, body):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            throttle = self.calls <= self.throttle_first
+        try:
+            time.sleep(self.delay)
+            if throttle:
+                raise Throttled()
+            if body["id"] in self.fail_ids:
+                raise ValueError("bad document")
+            self.items[body["id"]] = body
+            return body
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _docs(count, personalities=("krishna", "buddha")):
+    return [{"id": f"doc-{i}", "personality": personalities[i % len(personalities)], "content": "text"}
+            for i in range(count)]
+
+
+def _progress():
+    return SimpleNamespace(loaded_chunks=0, failed_chunks=0, errors=[])
+
+
+class TestBulkUpsertPipeline:
+
+    @pytest.mark.asyncio
+    async def test_throttled_writes_are_retried(self):
+        container = FakeContainer(throttle_first=3)
+        pipeline = BulkUpsertPipeline(container, concurrency=1)
+
+        with patch('services.bulk_writer.asyncio.sleep') as sleep:
+            result = await pipeline.upsert(_docs(5))
+
+        assert result.succeeded == 5 and result.failed == 0
+        assert result.throttled_retries == 3
+        assert len(container.items) == 5
+        sleep.assert_called_with(0.005)  # x-ms-retry-after-ms honoured
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_to_progress(self):
+        container = FakeContainer(fail_ids={"doc-2"})
+        progress = _progress()
+
+        result = await BulkUpsertPipeline(container, progress=progress).upsert(_docs(6))
+
+        assert (result.succeeded, result.failed) == (5, 1)
+        assert (progress.loaded_chunks, progress.failed_chunks) == (5, 1)
+        assert "doc-2" in progress.errors[0]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        container = FakeContainer(delay=0.01)
+
+        result = await BulkUpsertPipeline(container, concurrency=3, batch_size=4).upsert(_docs(24))
+
+        assert result.succeeded == 24
+        assert 1 < container.max_in_flight <= 3
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_resumes_interrupted_load(self, tmp_path):
+        checkpoint = str(tmp_path / "load.ckpt")
+        first = FakeContainer(fail_ids={"doc-4", "doc-5"})
+        await BulkUpsertPipeline(first, checkpoint_path=checkpoint).upsert(_docs(6))
+
+        second = FakeContainer()
+        result = await BulkUpsertPipeline(second, checkpoint_path=checkpoint).upsert(_docs(6))
+
+        assert result.skipped == 4
+        assert sorted(second.items) == ["doc-4", "doc-5"]
+
+    @pytest.mark.asyncio
+    async def test_batches_per_partition(self):
+        container = FakeContainer()
+
+        result = await BulkUpsertPipeline(container, batch_size=3).upsert(_docs(8))
+
+        assert result.succeeded == 8 and container.calls == 8
+        assert result.batches == 4  # 3 + 1 per personality
+
+    @pytest.mark.asyncio
+    async def test_async_writer_objects(self):
+        written = []
+
+        async def add_chunk(chunk):
+            written.append(chunk.id)
+
+        chunks = [SimpleNamespace(id=f"chunk-{i}") for i in range(5)]
+        result = await BulkUpsertPipeline(upsert_fn=add_chunk).upsert(chunks)
+
+        assert result.succeeded == 5 and sorted(written) == sorted(c.id for c in chunks)
+
+
+@pytest.mark.asyncio
+async def test_bulk_generate_embeddings_uses_pipeline():
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        service = VectorDatabaseService()
+
+    class Container(FakeContainer):
+        def query_items(self, query, **kwargs):
+            return iter(_docs(4))
+
+    service.container = Container(throttle_first=1)
+    service.embedding_model = SimpleNamespace(encode=lambda texts: [[1.0, 0.0] for _ in texts])
+
+    with patch('services.bulk_writer.asyncio.sleep'):
+        successful, failed = await service.bulk_generate_embeddings(batch_size=2)
+
+    assert (successful, failed) == (4, 0)
+    assert all(item["embedding"] == [1.0, 0.0] for item in service.container.items.values())
@@ -0,0 +1,174 @@
+"""
+Tests for the parameterized Cosmos DB query builder and its use by
+VectorDatabaseService
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from services.cosmos_query import CosmosQueryBuilder, get_cosmos_query_metrics
+from services.vector_database_service import PersonalityType, ContentType, VectorDatabaseService
+
+
+class RecordingContainer:
+    """Returns canned pages and reports a request charge per page like the SDK"""
+
+    def __init__(self, responses, charge="2.5"):
+        self.responses = responses
+        self.charge = charge
+        self.calls = []
+
+    def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+        self.calls.append({"query": query, "parameters": parameters or [], **kwargs})
+        items = next((items for match, items in self.responses if match(query, kwargs)), [])
+        if response_hook is not None:
+            response_hook({}, iter(items))  # the up-front call with the pager
+            if self.charge is not None:
+                response_hook({"x-ms-request-charge": self.charge}, {"Documents": items})
+        return iter(items)
+
+
+class TestCosmosQueryBuilder:
+    """SQL text, parameters and routing"""
+
+    def test_values_are_bound_not_interpolated(self):
+        query = (CosmosQueryBuilder("search")
+                 .select("id", "content")
+                 .where("source", "Bhagavad Gita' OR 1=1 --")
+                 .where_in("content_type", ["verse", "teaching"])
+                 .build())
+
+        assert query.sql == ("SELECT c.id, c.content FROM c WHERE c.source = @source "
+                             "AND ARRAY_CONTAINS(@content_types, c.content_type)")
+        assert query.parameters == [
+            {"name": "@source", "value": "Bhagavad Gita' OR 1=1 --"},
+            {"name": "@content_types", "value": ["verse", "teaching"]},
+        ]
+        assert query.options() == {"enable_cross_partition_query": True}
+
+    def test_partition_key_filter_routes_to_one_partition(self):
+        query = CosmosQueryBuilder("search").select("id").where("personality", "krishna").build()
+
+        assert query.single_partition
+        assert query.options() == {"partition_key": "krishna"}
+
+    def test_group_by_and_value_queries(self):
+        grouped = (CosmosQueryBuilder("stats")
+                   .select("content_type")
+                   .select_expr("COUNT(1)", "documents")
+                   .group_by("c.content_type")
+                   .partition("buddha")
+                   .build())
+        distinct = CosmosQueryBuilder("partitions").select_value("c.personality", distinct=True).build()
+
+        assert grouped.sql == "SELECT c.content_type, COUNT(1) AS documents FROM c GROUP BY c.content_type"
+        assert grouped.options() == {"partition_key": "buddha"}
+        assert distinct.sql == "SELECT DISTINCT VALUE c.personality FROM c"
+
+    def test_property_names_are_validated(self):
+        with pytest.raises(ValueError):
+            CosmosQueryBuilder("bad").select("id, c.embedding")
+        with pytest.raises(ValueError):
+            CosmosQueryBuilder("bad").where("personality = 'x' OR c.id", "y")
+
+    def test_execute_records_charge_and_latency(self):
+        container = RecordingContainer([(lambda q, kw: True, [{"id": "a"}, {"id": "b"}])], charge="3.25")
+
+        items = CosmosQueryBuilder("metrics_test").select("id").where("personality", "rumi").build().execute(container)
+
+        assert items == [{"id": "a"}, {"id": "b"}]
+        assert container.calls[0]["partition_key"] == "rumi"
+        stats = get_cosmos_query_metrics()["queries"]["metrics_test"]
+        assert stats["avg_request_charge"] >= 3.25
+        assert stats["single_partition_ratio"] == 1.0
+        assert not stats["charge_estimated"]
+
+    def test_charge_is_estimated_without_headers(self):
+        container = RecordingContainer([(lambda q, kw: True, [{"id": "a"}])], charge=None)
+
+        CosmosQueryBuilder("estimate_test").select("id").build().execute(container)
+
+        assert get_cosmos_query_metrics()["queries"]["estimate_test"]["charge_estimated"]
+
+
+@pytest.fixture
+def vector_service():
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        service = VectorDatabaseService()
+    return service
+
+
+class TestVectorDatabaseQueries:
+    """Stats and scans no longer read whole documents"""
+
+    @pytest.mark.asyncio
+    async def test_database_stats_use_server_side_group_by(self, vector_service):
+        groups = {
+            "krishna": [
+                {"content_type": "verse", "source": "Bhagavad Gita", "documents": 700, "with_embeddings": 698},
+                {"content_type": "teaching", "source": "Gita Commentary", "documents": 10, "with_embeddings": 10},
+            ],
+            "buddha": [
+                {"content_type": "teaching", "source": "Dhammapada", "documents": 5, "with_embeddings": 5},
+            ],
+        }
+        vector_service.container = RecordingContainer(
+            [(lambda q, kw: "DISTINCT VALUE c.personality" in q, ["krishna", "buddha"])] +
+            [(lambda q, kw, p=p: kw.get("partition_key") == p, rows) for p, rows in groups.items()]
+        )
+
+        stats = await vector_service.get_database_stats()
+
+        assert stats.total_documents == 715
+        assert stats.documents_by_personality == {"krishna": 710, "buddha": 5}
+        assert stats.documents_by_content_type == {"verse": 700, "teaching": 15}
+        assert stats.total_embeddings_generated == 713
+        assert stats.failed_embeddings == 2
+        group_queries = [c for c in vector_service.container.calls if "GROUP BY" in c["query"]]
+        assert [c["partition_key"] for c in group_queries] == ["krishna", "buddha"]
+        assert all("SELECT *" not in c["query"] for c in vector_service.container.calls)
+
+    @pytest.mark.asyncio
+    async def test_personality_stats_stay_in_one_partition(self, vector_service):
+        vector_service.container = RecordingContainer([(lambda q, kw: True, [
+            {"content_type": "verse", "source": "Gita", "language": "English",
+             "documents": 4, "with_embeddings": 3, "content_length": 400},
+        ])])
+
+        stats = await vector_service.get_personality_stats("Krishna")
+
+        assert stats["total_documents"] == 4
+        assert stats["missing_embeddings"] == 1
+        assert stats["avg_content_length"] == 100
+        assert len(vector_service.container.calls) == 1
+        assert vector_service.container.calls[0]["partition_key"] == "krishna"
+
+    @pytest.mark.asyncio
+    async def test_scan_search_is_parameterized_and_routed(self, vector_service):
+        vector_service.server_side_search = False
+        vector_service.vector_index_enabled = False
+        vector_service.embedding_model = Mock()
+        vector_service.embedding_model.encode.return_value = [1.0, 0.0]
+        vector_service.container = RecordingContainer([(lambda q, kw: True, [
+            {"id": "bg_2_47", "content": "You have a right to action", "personality": "krishna",
+             "content_type": "verse", "source": "Bhagavad Gita", "embedding": [1.0, 0.0]},
+        ])])
+
+        results = await vector_service.semantic_search(
+            "karma", personality=PersonalityType.KRISHNA, content_types=[ContentType.VERSE]
+        )
+
+        call = vector_service.container.calls[0]
+        assert [r.document.id for r in results] == ["bg_2_47"]
+        assert call["partition_key"] == "krishna"
+        assert "'krishna'" not in call["query"] and "SELECT *" not in call["query"]
+        assert {"name": "@content_types", "value": ["verse"]} in call["parameters"]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_scan_does_not_read_embeddings(self, vector_service):
+        vector_service.container = RecordingContainer([])
+
+        await vector_service.cleanup_duplicates()
+
+        assert "embedding" not in vector_service.container.calls[0]["query"]
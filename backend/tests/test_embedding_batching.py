@@ -0,0 +1,121 @@
+"""
+Tests for batched embedding requests in GeminiEmbeddingService
+"""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+from services.gemini_embedding_service import AdaptiveBackoff, GeminiEmbeddingService
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class StubTransport:
+    """Local stand-in for batchEmbedContents"""
+
+    def __init__(self, latency=0.0, reject=None, rate_limit_first=0):
+        self.latency = latency
+        self.reject = reject
+        self.rate_limit_first = rate_limit_first
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, model, texts, task_type):
+        with self._lock:
+            self.calls.append(list(texts))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            limited = len(self.calls) <= self.rate_limit_first
+        try:
+            time.sleep(self.latency)
+            if limited:
+                raise RateLimited("429 Resource has been exhausted")
+            if self.reject and any(self.reject in text for text in texts):
+                raise ValueError("invalid content")
+            return [[float(len(text)), 1.0, 0.0] for text in texts]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def service():
+    with patch.dict('os.environ', {'EMBEDDING_CACHE_ENABLED': 'true', 'EMBEDDING_BATCH_SIZE': '3'}, clear=False):
+        with patch.object(GeminiEmbeddingService, '_initialize_client'):
+            service = GeminiEmbeddingService(api_key="test-key")
+    service.client = Mock()
+    service.backoff = AdaptiveBackoff(base_delay=0.001, max_delay=0.01)
+    return service
+
+
+class TestBatchedEmbeddings:
+    """Packing, concurrency, backoff and failure isolation"""
+
+    def test_texts_are_packed_into_batch_requests(self, service):
+        service.transport = StubTransport()
+        texts = [f"verse {i}" for i in range(7)]
+
+        results = service.generate_embeddings_batch(texts)
+
+        assert [len(call) for call in service.transport.calls] == [3, 3, 1]
+        assert [r.embedding[0] for r in results] == [float(len(t)) for t in texts]
+        assert service.get_batch_stats()["batch_requests"] == 3
+
+    def test_character_budget_splits_batches(self, service):
+        service.transport = StubTransport()
+        service.batch_max_chars = 10
+
+        service.generate_embeddings_batch(["a" * 6, "b" * 6, "c" * 3])
+
+        assert service.transport.calls == [["a" * 6], ["b" * 6, "c" * 3]]
+
+    def test_duplicates_and_cached_texts_are_not_resent(self, service):
+        service.transport = StubTransport()
+        service.generate_embeddings_batch(["karma", "dharma", "karma"])
+        service.generate_embeddings_batch(["dharma", "moksha"])
+
+        assert service.transport.calls == [["karma", "dharma"], ["moksha"]]
+
+    def test_batches_run_concurrently(self, service):
+        service.transport = StubTransport(latency=0.05)
+        service.batch_concurrency = 4
+
+        service.generate_embeddings_batch([f"text {i}" for i in range(12)])
+
+        assert len(service.transport.calls) == 4
+        assert service.transport.max_in_flight > 1
+
+    def test_failures_are_isolated_without_zero_vectors(self, service):
+        service.transport = StubTransport(reject="BAD")
+
+        results = service.generate_embeddings_batch(["one", "BAD two", "three", ""])
+
+        assert [r.failed for r in results] == [False, True, False, True]
+        assert results[1].embedding == [] and "invalid content" in results[1].error
+        assert results[2].embedding == [5.0, 1.0, 0.0]
+
+    def test_rate_limits_are_retried_with_backoff(self, service):
+        service.transport = StubTransport(rate_limit_first=2)
+
+        results = service.generate_embeddings_batch(["shanti", "ahimsa"])
+
+        assert not any(r.failed for r in results)
+        assert len(service.transport.calls) == 3
+        assert service.get_batch_stats()["rate_limited"] == 2
+
+    def test_default_transport_sends_list_content(self, service):
+        service.client.embed_content.return_value = {'embedding': [[0.1, 0.2], [0.3, 0.4]]}
+
+        results = service.generate_embeddings_batch(["a", "b"], task_type="RETRIEVAL_QUERY")
+
+        service.client.embed_content.assert_called_once_with(
+            model=service.model_name, content=["a", "b"], task_type="RETRIEVAL_QUERY"
+        )
+        assert [r.embedding for r in results] == [[0.1, 0.2], [0.3, 0.4]]
@@ -0,0 +1,96 @@
+"""
+Tests for the embedding cache and its integration with GeminiEmbeddingService
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from services.embedding_cache import EmbeddingCache
+from services.gemini_embedding_service import GeminiEmbeddingService
+
+
+class TestEmbeddingCache:
+    """Memory LRU and persistent SQLite tiers"""
+
+    def test_key_depends_on_model_task_and_text(self):
+        key = EmbeddingCache.make_key("models/text-embedding-004", "RETRIEVAL_QUERY", "what is dharma")
+        assert key == EmbeddingCache.make_key("models/text-embedding-004", "RETRIEVAL_QUERY", "what is dharma")
+        assert key != EmbeddingCache.make_key("models/text-embedding-004", "RETRIEVAL_DOCUMENT", "what is dharma")
+        assert key != EmbeddingCache.make_key("models/other", "RETRIEVAL_QUERY", "what is dharma")
+
+    def test_lru_eviction_and_counters(self):
+        cache = EmbeddingCache(max_entries=2)
+        cache.put("a", [1.0, 0.0])
+        cache.put("b", [0.0, 1.0])
+        assert cache.get("a") == [1.0, 0.0]
+        cache.put("c", [0.5, 0.5])
+
+        assert cache.get("b") is None
+        stats = cache.get_stats()
+        assert stats["memory_entries"] == 2
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "cache" / "embeddings.sqlite")
+        EmbeddingCache(persistent_path=path).put("dharma", [0.25, 0.5, 0.75])
+
+        reopened = EmbeddingCache(persistent_path=path)
+        assert reopened.get("dharma") == [0.25, 0.5, 0.75]
+        assert reopened.get("dharma") == [0.25, 0.5, 0.75]
+
+        stats = reopened.get_stats()
+        assert stats["persistent_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["persistent_entries"] == 1
+
+    def test_persistent_tier_is_capped_oldest_first(self, tmp_path):
+        path = str(tmp_path / "embeddings.sqlite")
+        clock = iter(range(1000))
+        with patch("services.embedding_cache.time.time", side_effect=lambda: next(clock)):
+            cache = EmbeddingCache(max_entries=5, persistent_path=path, persistent_max_entries=20)
+            for i in range(30):
+                cache.put(f"text-{i}", [float(i)])
+
+        assert cache.get_stats()["persistent_entries"] == 20
+        assert cache.get("text-0") is None
+        assert cache.get("text-29") == [29.0]
+
+        reopened = EmbeddingCache(persistent_path=path, persistent_max_entries=8)
+        assert reopened.get_stats()["persistent_entries"] == 8
+        assert reopened.get("text-21") is None
+        assert reopened.get("text-22") == [22.0]
+
+
+class TestGeminiEmbeddingServiceCache:
+    """Repeated questions must not call embed_content again"""
+
+    @pytest.fixture
+    def service(self):
+        with patch.dict('os.environ', {'EMBEDDING_CACHE_ENABLED': 'true'}, clear=False):
+            with patch.object(GeminiEmbeddingService, '_initialize_client'):
+                service = GeminiEmbeddingService(api_key="test-key")
+        service.client = Mock()
+        service.client.embed_content.return_value = {'embedding': [0.5] * 768}
+        return service
+
+    def test_repeated_query_hits_cache(self, service):
+        first = service.generate_query_embedding("What is   dharma?")
+        second = service.generate_query_embedding("What is dharma?")
+
+        assert service.client.embed_content.call_count == 1
+        assert second.embedding == first.embedding
+        assert service.get_cache_stats()["memory_hits"] == 1
+
+    def test_task_type_is_part_of_key(self, service):
+        service.generate_embedding("karma yoga", task_type="RETRIEVAL_DOCUMENT")
+        service.generate_embedding("karma yoga", task_type="RETRIEVAL_QUERY")
+
+        assert service.client.embed_content.call_count == 2
+
+    def test_cache_can_be_disabled(self):
+        with patch.dict('os.environ', {'EMBEDDING_CACHE_ENABLED': 'false'}, clear=False):
+            with patch.object(GeminiEmbeddingService, '_initialize_client'):
+                service = GeminiEmbeddingService(api_key="test-key")
+        assert service.cache is None
+        assert service.get_cache_stats() == {"enabled": False}
@@ -0,0 +1,172 @@
+"""
+Tests for hybrid lexical + vector retrieval with rank fusion
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from services.hybrid_retriever import HybridRetriever, citation_key, fuse_rankings
+from services.rag_integration_service import RAGIntegrationService
+from services.vector_database_service import ContentType, PersonalityType, SearchResult, VectorDocument
+
+
+def _doc(doc_id, content="text", personality=PersonalityType.KRISHNA, citation=None, verse=None, chapter=None):
+    return VectorDocument(id=doc_id, content=content, personality=personality, content_type=ContentType.VERSE,
+                          source="Bhagavad Gita", citation=citation, verse=verse, chapter=chapter)
+
+
+class StaticLexicalSource:
+    def __init__(self, ranked, delay=0.0):
+        self.ranked = ranked
+        self.delay = delay
+        self.calls = []
+
+    def search(self, query, personality, k):
+        self.calls.append((query, personality, k))
+        time.sleep(self.delay)
+        return self.ranked[:k]
+
+
+def _vector_db(ranked, delay=0.0):
+    async def semantic_search(**kwargs):
+        await asyncio.sleep(delay)
+        return [SearchResult(document=d, relevance_score=s, personality_match=True, content_type_match=True)
+                for d, s in ranked][:kwargs["top_k"]]
+    db = Mock()
+    db.semantic_search = AsyncMock(side_effect=semantic_search)
+    return db
+
+
+class TestFusion:
+
+    def test_citation_key_matches_verse_references(self):
+        assert citation_key(_doc("a", citation="Bhagavad Gita 2.47")) == \
+            citation_key(_doc("b", citation="Bhagavad Gita, Chapter 2, Verse 47")) == \
+            citation_key(_doc("c", chapter="2", verse="47"))
+        assert citation_key(_doc("d", content="Peace comes from within.")) == \
+            citation_key(_doc("e", content="peace comes from within"))
+        assert citation_key(_doc("f", citation="Bhagavad Gita 2.48")) != citation_key(_doc("a", citation="Bhagavad Gita 2.47"))
+
+    def test_rrf_rewards_agreement_and_deduplicates(self):
+        gita_247 = _doc("v1", citation="Bhagavad Gita 2.47")
+        same_verse = _doc("lex-1", citation="Bhagavad Gita Chapter 2 Verse 47")
+        rankings = {
+            "vector": [(_doc("v0", content="only vector"), 0.9), (gita_247, 0.8)],
+            "lexical": [(same_verse, 0.7), (_doc("l1", content="only lexical"), 0.6)],
+        }
+
+        fused = fuse_rankings(rankings)
+
+        assert [c.document.id for c in fused] == ["v1", "v0", "l1"]
+        assert fused[0].ranks == {"vector": 2, "lexical": 1}
+        assert fused[0].relevance_score == 0.8
+
+    def test_weighted_fusion_uses_scores(self):
+        rankings = {"vector": [(_doc("a", content="a"), 0.9)], "lexical": [(_doc("b", content="b"), 0.95)]}
+
+        fused = fuse_rankings(rankings, method="weighted", weights={"vector": 1.0, "lexical": 0.5})
+
+        assert [c.document.id for c in fused] == ["a", "b"]
+
+
+class TestHybridRetriever:
+
+    @pytest.mark.asyncio
+    async def test_stages_run_concurrently(self):
+        retriever = HybridRetriever(
+            vector_db=_vector_db([(_doc("v", content="vector hit"), 0.8)], delay=0.2),
+            lexical_source=StaticLexicalSource([(_doc("l", content="lexical hit"), 0.5)], delay=0.2)
+        )
+
+        start = time.perf_counter()
+        result = await retriever.retrieve("duty", PersonalityType.KRISHNA, top_k=2)
+
+        assert time.perf_counter() - start < 0.35
+        assert {c.document.id for c in result.candidates} == {"v", "l"}
+        assert retriever.lexical_source.calls == [("duty", PersonalityType.KRISHNA, 6)]
+        assert result.stage_counts == {"vector": 1, "lexical": 1}
+
+    @pytest.mark.asyncio
+    async def test_stage_over_budget_is_skipped(self):
+        retriever = HybridRetriever(
+            vector_db=_vector_db([(_doc("v", content="vector hit"), 0.8)], delay=0.5),
+            lexical_source=StaticLexicalSource([(_doc("l", content="lexical hit"), 0.5)]),
+            vector_budget_ms=50
+        )
+
+        result = await retriever.retrieve("duty", PersonalityType.KRISHNA, top_k=3)
+
+        assert result.skipped_stages == ["vector"]
+        assert [c.document.id for c in result.candidates] == ["l"]
+
+    @pytest.mark.asyncio
+    async def test_cross_personality_keeps_primary_first(self):
+        buddha = PersonalityType.BUDDHA
+        retriever = HybridRetriever(
+            vector_db=_vector_db([(_doc("b", content="b", personality=buddha), 0.9)]),
+            lexical_source=StaticLexicalSource([(_doc("k", content="k"), 0.3)])
+        )
+
+        result = await retriever.retrieve("duty", PersonalityType.KRISHNA, top_k=2, include_cross_personality=True)
+
+        assert [c.document.id for c in result.candidates] == ["k", "b"]
+        assert retriever.lexical_source.calls[0][1] is None
+        assert [r.personality_match for r in result.to_search_results(PersonalityType.KRISHNA)] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_low_lexical_scores_are_dropped(self):
+        retriever = HybridRetriever(vector_db=None, lexical_source=StaticLexicalSource([(_doc("l"), 0.05)]))
+
+        result = await retriever.retrieve("duty", PersonalityType.KRISHNA)
+
+        assert result.candidates == []
+
+
+@pytest.mark.asyncio
+async def test_rag_context_uses_hybrid_retriever():
+    service = RAGIntegrationService.__new__(RAGIntegrationService)
+    service.vector_db = _vector_db([(_doc("v1", content="Perform your duty", citation="Bhagavad Gita 2.47"), 0.8)])
+    service.hybrid_retriever = HybridRetriever(
+        vector_db=service.vector_db,
+        lexical_source=StaticLexicalSource([(_doc("l1", content="duty", citation="Bhagavad Gita 2.47"), 0.6),
+                                            (_doc("l2", content="Abandon attachment"), 0.4)])
+    )
+
+    with patch('services.rag_integration_service.PersonalityType', PersonalityType):
+        context = await service._retrieve_spiritual_context(
+            query="What is my duty?", personality_id="krishna", context_limit=3,
+            min_relevance=0.3, include_cross_personality=False
+        )
+
+    assert context.relevant_passages == ["Perform your duty", "Abandon attachment"]
+    assert context.citations == ["Bhagavad Gita 2.47", "Bhagavad Gita"]
+    service.vector_db.semantic_search.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_blocking_vector_search_does_not_stall_lexical_stage():
+    from services.vector_database_service import VectorDatabaseService
+
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        vector_db = VectorDatabaseService()
+    vector_db.container = Mock()
+    vector_db.container.query_items.side_effect = lambda *args, **kwargs: iter([])
+    vector_db.embedding_model = Mock()
+    vector_db.embedding_model.encode.side_effect = lambda query: time.sleep(0.5) or [0.1] * 8  # synchronous API call
+
+    retriever = HybridRetriever(
+        vector_db=vector_db,
+        lexical_source=StaticLexicalSource([(_doc("l", content="lexical hit"), 0.5)]),
+        vector_budget_ms=200
+    )
+
+    start = time.perf_counter()
+    result = await retriever.retrieve("duty", PersonalityType.KRISHNA, top_k=2)
+
+    assert time.perf_counter() - start < 0.45
+    assert result.skipped_stages == ["vector"]
+    assert [c.document.id for c in result.candidates] == ["l"]
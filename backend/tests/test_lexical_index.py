@@ -0,0 +1,89 @@
+"""
+Tests for the BM25 lexical index and its use in SimpleRAGService.search_content
+"""
+
+from services.lexical_index import LexicalIndex, stem, tokenize
+from services.rag_service import PersonalityCorpus, SimpleRAGService, SpiritualContent
+
+
+class TestTokenizer:
+
+    def test_sanskrit_romanizations_share_a_term(self):
+        assert tokenize("Kṛṣṇa") == tokenize("Krishna") == tokenize("krsna") == ["krishna"]
+        assert tokenize("Bhagwad Geeta") == tokenize("Bhagavad Gītā") == ["bhagavad", "gita"]
+        assert tokenize("the ātmā") == ["atman"]
+        assert tokenize("dharma karma yoga") == ["dharma", "karma", "yoga"]  # never stemmed
+
+    def test_stemming_and_stopwords(self):
+        assert tokenize("Acting without attachment to the fruits of actions") == \
+            ["act", "without", "attach", "fruit", "act"]
+        assert {stem(w) for w in ("meditation", "meditating", "meditate")} == {"meditat"}
+        assert {stem(w) for w in ("happiness", "happily", "happy")} == {"happy"}
+
+
+class TestLexicalIndex:
+
+    def test_bm25_prefers_rare_terms_and_shorter_documents(self):
+        index = LexicalIndex()
+        index.add_many([
+            "duty duty action",
+            "duty and devotion",
+            "devotion",
+            "duty " * 50 + "devotion",
+        ])
+
+        hits = index.search("devotion", k=4)
+        assert [doc for doc, _ in hits][:2] == [2, 1]
+        assert index.search("duty devotion", k=1)[0][0] == 1
+        assert all(score > 0 for _, score in hits)
+
+    def test_prefix_expansion_and_filter(self):
+        index = LexicalIndex()
+        index.add_many(["equanimity in success", "equanimous mind", "restless mind"])
+
+        assert {doc for doc, _ in index.search("equanim", k=5)} == {0, 1}
+        assert [doc for doc, _ in index.search("mind", k=5, doc_filter=lambda doc: doc != 1)] == [2]
+        assert index.search("the of and", k=5) == []
+
+
+def _service(items):
+    service = SimpleRAGService.__new__(SimpleRAGService)
+    service._corpora = {}
+    for i, (personality, text) in enumerate(items):
+        corpus = service._corpora.setdefault(personality, PersonalityCorpus(personality, [], LexicalIndex()))
+        corpus.contents.append(SpiritualContent(id=f"doc{i}", personality=personality, content=text, source="Test"))
+        corpus.lexical_index.add(text)
+    service.personality_sources = {personality: [] for personality in service._corpora}
+    service.is_loaded = True
+    return service
+
+
+class TestSimpleRAGSearch:
+
+    def test_search_ranks_and_filters_by_personality(self):
+        service = _service([
+            ("krishna", "You have a right to perform your prescribed duties, but not to the fruits of action."),
+            ("krishna", "Perform your duty with equanimity, abandoning attachment to success or failure."),
+            ("buddha", "Do your duty without attachment to results."),
+            ("krishna", "The soul is never born nor does it die."),
+        ])
+
+        results = service.search_content("fruits of action", personality="krishna")
+
+        assert results[0].content.id == "doc0"
+        assert results[0].match_type == "exact"
+        assert all(r.content.personality == "krishna" for r in results)
+        assert all(0 < r.relevance_score <= 1 for r in results)
+        assert [r.content.id for r in service.search_content("attachment", "buddha")] == ["doc2"]
+        assert service.search_content("zzzz qqqq") == []
+
+    def test_loaded_corpus_is_indexed(self):
+        service = SimpleRAGService()
+
+        service._load_content()
+
+        assert sum(len(c.lexical_index) for c in service._corpora.values()) == service.get_total_content_count()
+        if service.get_total_content_count():
+            first = service.all_content[0]
+            hits = service.search_content(first.content, first.personality, max_results=1)
+            assert hits[0].content.content == first.content
@@ -0,0 +1,126 @@
+"""
+Tests for the memory-mapped local embedding store and VectorDatabaseService local mode
+"""
+
+import os
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from services.local_embedding_store import LocalEmbeddingStore
+from services.vector_database_service import VectorDatabaseService, PersonalityType
+
+DIM = 8
+
+
+def _doc(doc_id, personality="krishna", content=None):
+    return {
+        'id': doc_id,
+        'personality': personality,
+        'content': content or f"content of {doc_id}",
+        'content_type': 'verse',
+        'source': 'Bhagavad Gita'
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalEmbeddingStore(str(tmp_path / "embeddings"), dimension=DIM)
+
+
+class TestLocalEmbeddingStore:
+    """Binary store layout, lazy content reads and compaction"""
+
+    def test_add_and_search_reads_only_hits(self, store):
+        vectors = np.eye(DIM, dtype=np.float32)
+        written = store.add_many("krishna", [(_doc(f"k{i}"), vectors[i]) for i in range(4)])
+
+        results = store.search(vectors[2], "krishna", k=1)
+
+        assert written == 4
+        assert [(doc['id'], round(score, 4)) for doc, score in results] == [("k2", 1.0)]
+        assert 'embedding' not in results[0][0]
+        assert isinstance(store._partitions["krishna"].matrix, np.memmap)
+
+    def test_upsert_supersedes_previous_row_and_rebuild_compacts(self, store):
+        vectors = np.eye(DIM, dtype=np.float32)
+        store.add("krishna", _doc("k0", content="old"), vectors[0])
+        store.add("krishna", _doc("k1"), vectors[1])
+        store.add("krishna", _doc("k0", content="new"), vectors[3])
+
+        assert store.count("krishna") == 2
+        assert store.search(vectors[0], "krishna", k=3, min_score=0.5) == []
+        assert store.get_document("krishna", "k0")['content'] == "new"
+
+        assert store.rebuild("krishna") == 2
+        reopened = LocalEmbeddingStore(store.root_path, dimension=DIM)
+        assert reopened._load_partition("krishna").rows == 2
+        assert reopened.search(vectors[3], "krishna", k=1)[0][0]['content'] == "new"
+
+    def test_invalid_embeddings_are_skipped(self, store):
+        assert store.add("buddha", _doc("b0", "buddha"), [0.0] * DIM) is False
+        assert store.add("buddha", _doc("b1", "buddha"), [1.0] * (DIM + 1)) is False
+        assert store.personalities() == []
+
+    def test_build_from_documents_uses_embed_fn(self, store):
+        embed_fn = Mock(return_value=[1.0] + [0.0] * (DIM - 1))
+        documents = [dict(_doc("j0", "jesus"), embedding=[0.0, 1.0] + [0.0] * (DIM - 2)), _doc("j1", "jesus")]
+
+        assert store.build_from_documents("jesus", documents, embed_fn) == 2
+        embed_fn.assert_called_once_with("content of j1")
+        assert store.get_stats()["personalities"]["jesus"]["embedding_bytes"] == 2 * DIM * 4
+
+    def test_crashed_append_is_truncated_to_sidecar(self, store):
+        vectors = np.eye(DIM, dtype=np.float32)
+        store.add_many("krishna", [(_doc("k0"), vectors[0]), (_doc("k1"), vectors[1])])
+        matrix_path, ids_path, docs_path = store._paths("krishna")
+        sizes = [os.path.getsize(path) for path in (matrix_path, ids_path, docs_path)]
+        # A writer died after its content and embedding writes, mid-way through the sidecar line
+        with open(docs_path, 'a', encoding='utf-8') as f:
+            f.write('{"id": "orphan", "content": "lost"}\n')
+        with open(matrix_path, 'ab') as f:
+            f.write(vectors[5].tobytes())
+        with open(ids_path, 'a', encoding='utf-8') as f:
+            f.write("orph")
+
+        reopened = LocalEmbeddingStore(store.root_path, dimension=DIM)
+        assert reopened.count("krishna") == 2
+        assert reopened.add("krishna", _doc("k2"), vectors[2]) is True
+
+        assert os.path.getsize(matrix_path) == sizes[0] + DIM * 4
+        assert os.path.getsize(ids_path) > sizes[1]
+        fresh = LocalEmbeddingStore(store.root_path, dimension=DIM)
+        assert fresh._load_partition("krishna").ids == ["k0", "k1", "k2"]
+        assert fresh.search(vectors[2], "krishna", k=1)[0][0]['content'] == "content of k2"
+        assert fresh.search(vectors[5], "krishna", k=3, min_score=0.5) == []
+
+    def test_writes_take_a_file_lock(self, store):
+        vectors = np.eye(DIM, dtype=np.float32)
+        with store._write_locked("krishna"):
+            store.add("krishna", _doc("k0"), vectors[0])  # re-entrant within one thread
+            assert os.path.exists(os.path.join(store.root_path, "krishna.lock"))
+        assert store._file_locks == {}
+
+
+class TestVectorDatabaseLocalMode:
+    """semantic_search and add_content without Cosmos DB"""
+
+    @pytest.mark.asyncio
+    async def test_add_content_and_search_use_local_store(self, tmp_path):
+        with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+             patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+            service = VectorDatabaseService()
+        service.local_store = LocalEmbeddingStore(str(tmp_path), dimension=768)
+        service.embedding_model = Mock()
+
+        vector = [0.0] * 768
+        vector[5] = 1.0
+        service.embedding_model.encode.return_value = vector
+
+        assert await service.add_content("Perform your duty", "krishna", {'content_type': 'verse'})
+
+        results = await service.semantic_search("duty", personality=PersonalityType.KRISHNA)
+        assert len(results) == 1
+        assert results[0].document.content == "Perform your duty"
+        assert results[0].relevance_score == pytest.approx(1.0, abs=1e-5)
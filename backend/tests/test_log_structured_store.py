@@ -0,0 +1,237 @@
+"""
+Tests for the log-structured local store behind DatabaseService
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.log_structured_store import LogStructuredStore
+from services.database_service import Conversation, DatabaseService, UsageRecord, UserStats
+
+
+def usage(record_id, user_id="user-1"):
+    return UsageRecord(
+        id=record_id, userId=user_id, userEmail=f"{user_id}@example.com", sessionId="s1",
+        timestamp="2025-07-10T10:00:00", model="gemini-2.5-flash", inputTokens=10,
+        outputTokens=20, totalTokens=30, costUsd=0.001, requestType="spiritual_guidance",
+        responseQuality="high"
+    )
+
+
+def conversation(conversation_id, user_id, timestamp, session_id="s1", personality="krishna"):
+    return Conversation(
+        id=conversation_id, userId=user_id, userEmail=f"{user_id}@example.com", sessionId=session_id,
+        timestamp=timestamp, question="What is dharma?", response="Beloved devotee...", citations=[],
+        personality=personality
+    )
+
+
+def stats(user_id, total_requests, total_cost=0.0):
+    return UserStats(
+        id=f"stats_{user_id}", userId=user_id, userEmail=f"{user_id}@example.com",
+        totalRequests=total_requests, totalTokens=0, totalCostUsd=total_cost, currentMonthTokens=0,
+        currentMonthCostUsd=0.0, lastRequest=None, avgTokensPerRequest=0.0,
+        favoriteModel="gemini-2.5-flash", personalityUsage={}, qualityBreakdown={}
+    )
+
+
+class TestLogStructuredStore:
+    """Appends, replay, compaction and crash recovery"""
+
+    def test_append_does_not_rewrite_snapshot(self, tmp_path):
+        path = str(tmp_path / "conversations.json")
+        with open(path, 'w') as f:
+            json.dump([{"id": "a"}], f)
+        snapshot_mtime = os.stat(path).st_mtime_ns
+
+        store = LogStructuredStore(path)
+        store.append({"id": "b"})
+        store.append({"id": "c"})
+
+        assert os.stat(path).st_mtime_ns == snapshot_mtime
+        assert [doc["id"] for doc in store.all()] == ["a", "b", "c"]
+        assert store.get("b") == {"id": "b"}
+        with open(store.log_path) as f:
+            assert len(f.readlines()) == 3  # header + two puts
+
+    def test_reopen_replays_log(self, tmp_path):
+        path = str(tmp_path / "conversations.json")
+        store = LogStructuredStore(path, fsync_batch=1)
+        store.append({"id": "a", "type": "user_stats", "userId": "u1"})
+        store.write([{"id": "b", "type": "user_stats", "userId": "u1"}],
+                    delete=lambda doc: doc.get("userId") == "u1")
+        store.append({"id": "c"})
+        store.close()
+
+        reopened = LogStructuredStore(path)
+        assert [doc["id"] for doc in reopened.all()] == ["b", "c"]
+        assert reopened.get("a") is None
+
+    def test_partial_batch_is_fsynced_after_interval_without_further_writes(self, tmp_path):
+        store = LogStructuredStore(str(tmp_path / "conversations.json"), fsync_batch=100, fsync_interval_ms=50)
+        store._last_sync = time.time()
+        store.append({"id": "a"})
+        assert store.get_stats()["fsyncs"] == 0
+
+        deadline = time.time() + 2
+        while store.get_stats()["fsyncs"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert store.get_stats()["fsyncs"] == 1
+        assert store._unsynced == 0
+        store.close()
+
+    def test_compaction_folds_log_into_snapshot(self, tmp_path):
+        path = str(tmp_path / "conversations.json")
+        store = LogStructuredStore(path, compact_min_entries=5)
+        for i in range(5):
+            store.append({"id": f"r{i}"})
+
+        assert store.get_stats()["compactions"] == 1
+        assert store.get_stats()["log_entries"] == 0
+        with open(path) as f:
+            assert [doc["id"] for doc in json.load(f)] == [f"r{i}" for i in range(5)]
+        assert [doc["id"] for doc in LogStructuredStore(path).all()] == [f"r{i}" for i in range(5)]
+
+    def test_interrupted_write_is_ignored(self, tmp_path):
+        path = str(tmp_path / "conversations.json")
+        store = LogStructuredStore(path)
+        store.append({"id": "a"})
+        store.close()
+        with open(store.log_path, 'ab') as f:
+            f.write(b'{"op":"put","rid":"x","doc":{"id":"partial"')
+
+        reopened = LogStructuredStore(path)
+        assert [doc["id"] for doc in reopened.all()] == ["a"]
+        reopened.append({"id": "b"})
+        assert [doc["id"] for doc in LogStructuredStore(path).all()] == ["a", "b"]
+
+    def test_stale_log_after_snapshot_swap_is_discarded(self, tmp_path):
+        path = str(tmp_path / "conversations.json")
+        store = LogStructuredStore(path)
+        store.append({"id": "a"})
+        store.close()
+        stale_log = open(store.log_path, 'rb').read()
+
+        # Crash between the snapshot rename and the log rename
+        store = LogStructuredStore(path)
+        store.compact()
+        store.close()
+        with open(store.log_path, 'wb') as f:
+            f.write(stale_log)
+
+        assert [doc["id"] for doc in LogStructuredStore(path).all()] == ["a"]
+
+    def test_second_instance_sees_appends(self, tmp_path):
+        path = str(tmp_path / "conversations.json")
+        writer = LogStructuredStore(path)
+        reader = LogStructuredStore(path)
+        assert reader.all() == []
+
+        writer.append({"id": "a"})
+        assert [doc["id"] for doc in reader.all()] == ["a"]
+
+
+class TestSecondaryIndexes:
+    """Indexed, paginated lookups stay correct across writes and reloads"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = LogStructuredStore(str(tmp_path / "conversations.json"))
+        store.create_index("by_user", ("type", "userId"), "timestamp")
+        for i in range(10):
+            store.append({"id": f"c{i}", "type": "conversation", "userId": f"u{i % 2}",
+                          "timestamp": f"2025-07-{10 + i:02d}T10:00:00"})
+        return store
+
+    def test_find_orders_and_paginates(self, store):
+        newest = store.find("by_user", ("conversation", "u0"), limit=2, descending=True)
+        assert [doc["id"] for doc in newest] == ["c8", "c6"]
+
+        page = store.find("by_user", ("conversation", "u0"), limit=2, offset=2, descending=True)
+        assert [doc["id"] for doc in page] == ["c4", "c2"]
+
+        oldest = store.find("by_user", ("conversation", "u1"), limit=2)
+        assert [doc["id"] for doc in oldest] == ["c1", "c3"]
+
+        recent = store.find("by_user", ("conversation", "u1"), since="2025-07-16")
+        assert [doc["id"] for doc in recent] == ["c7", "c9"]
+        assert store.count("by_user", ("conversation", "u1")) == 5
+
+    def test_index_follows_deletes_and_reloads(self, store):
+        store.delete_where(lambda doc: doc["id"] == "c8")
+        assert [doc["id"] for doc in store.find("by_user", ("conversation", "u0"), limit=1, descending=True)] == ["c6"]
+
+        reopened = LogStructuredStore(store.path)
+        reopened.create_index("by_user", ("type", "userId"), "timestamp")
+        assert reopened.count("by_user", ("conversation", "u0")) == 4
+
+
+class TestDatabaseServiceLocalStore:
+    """DatabaseService local methods keep their behaviour on the log store"""
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        service = DatabaseService()
+        service.spiritual_texts_path = str(tmp_path / "spiritual-texts.json")
+        service.conversations_path = str(tmp_path / "conversations.json")
+        return service
+
+    @pytest.mark.asyncio
+    async def test_usage_and_stats_round_trip(self, db):
+        assert await db.save_usage_record(usage("u-1"))
+        assert await db.save_usage_record(usage("u-2"))
+        assert await db.save_user_stats(stats("user-1", 1))
+        assert await db.save_user_stats(stats("user-1", 2))
+
+        records = await db.get_usage_records(days=100000)
+        assert {r.id for r in records} == {"u-1", "u-2"}
+        user_stats = await db.get_user_stats("user-1")
+        assert user_stats.totalRequests == 2
+        assert len(await db.get_top_users()) == 1
+
+    @pytest.mark.asyncio
+    async def test_usage_cutoff_compares_parsed_timestamps(self, db):
+        now = datetime.now()
+        for record_id, timestamp in [
+            ("naive", (now - timedelta(hours=1)).isoformat()),
+            ("aware", (now - timedelta(hours=2)).astimezone(timezone(timedelta(hours=-12))).isoformat()),
+            ("zulu", (now - timedelta(hours=3)).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")),
+            ("old", (now - timedelta(hours=30)).astimezone(timezone(timedelta(hours=14))).isoformat()),
+        ]:
+            record = usage(record_id)
+            record.timestamp = timestamp
+            await db.save_usage_record(record)
+
+        records = await db.get_usage_records(days=1)
+        assert [r.id for r in records] == ["naive", "aware", "zulu"]
+        assert [r.id for r in await db.get_usage_records(days=1, limit=1)] == ["naive"]
+
+    @pytest.mark.asyncio
+    async def test_indexed_queries_match_previous_ordering(self, db):
+        for i in range(6):
+            await db.save_conversation(conversation(
+                f"c{i}", f"user-{i % 2}", f"2025-07-{10 + i:02d}T10:00:00",
+                session_id=f"s{i % 3}", personality="buddha" if i < 3 else "krishna"
+            ))
+        await db.save_user_stats(stats("user-1", 1, total_cost=0.5))
+        await db.save_user_stats(stats("user-2", 1, total_cost=2.0))
+
+        assert [c.id for c in await db.get_user_conversations("user-0", limit=2, offset=1)] == ["c2", "c0"]
+        assert [c.id for c in await db.get_session_conversations("s0")] == ["c0", "c3"]
+        assert [c.id for c in await db.get_conversations_by_personality("buddha", limit=2)] == ["c2", "c1"]
+        assert [s.userId for s in await db.get_top_users()] == ["user-2", "user-1"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_whole_file_helpers_still_work(self, db):
+        await db.save_usage_record(usage("u-1"))
+
+        data = db._load_from_local_file(db.conversations_path)
+        data.append({"id": "kb-1", "type": "knowledge_chunk"})
+        db._save_to_local_file(db.conversations_path, data)
+
+        assert [item["id"] for item in db._load_from_local_file(db.conversations_path)] == ["u-1", "kb-1"]
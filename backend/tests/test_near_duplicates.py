@@ -0,0 +1,121 @@
+"""
+Tests for MinHash/LSH near-duplicate detection and duplicate cleanup
+"""
+
+import random
+
+import pytest
+from unittest.mock import patch
+
+from utils.near_duplicates import NearDuplicateIndex, find_near_duplicates
+from services.vector_database_service import VectorDatabaseService
+
+VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def _text(rng, words=60):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def _word_jaccard(a, b):
+    a, b = set(a.lower().split()), set(b.lower().split())
+    return len(a & b) / len(a | b)
+
+
+class TestNearDuplicateIndex:
+
+    def test_check_and_add(self):
+        rng = random.Random(3)
+        original = _text(rng)
+        index = NearDuplicateIndex()
+
+        assert index.check_and_add("a", original) is None
+        assert index.check_and_add("b", original.upper()).original_id == "a"
+        assert index.check_and_add("c", _text(rng)) is None
+        assert len(index) == 2  # duplicates are not indexed
+
+    def test_finds_what_pairwise_jaccard_finds(self):
+        rng = random.Random(7)
+        items = []
+        for i in range(150):
+            text = _text(rng)
+            items.append({"id": f"doc-{i}", "personality": "krishna", "content_type": "verse",
+                          "content": text, "created_at": f"2024-01-01T00:{i:04d}"})
+            if i % 5 == 0:  # a near copy with one word appended
+                items.append({"id": f"dup-{i}", "personality": "krishna", "content_type": "verse",
+                              "content": text + " extra", "created_at": f"2024-06-01T00:{i:04d}"})
+
+        matches = find_near_duplicates(items)
+
+        expected = {(b["id"], a["id"]) for a in items for b in items
+                    if a["created_at"] < b["created_at"] and _word_jaccard(a["content"], b["content"]) > 0.95}
+        assert {(m.duplicate_id, m.original_id) for m in matches} == expected
+        assert all(m.partition_key == "krishna" for m in matches)
+
+    def test_threshold_is_exclusive(self):
+        words = [f"w{i}" for i in range(19)]
+        index = NearDuplicateIndex(threshold=0.95)
+        index.add("a", ' '.join(words))
+
+        assert index.query(' '.join(words + ["extra"])) is None  # Jaccard exactly 0.95
+        assert index.query(' '.join(words)).original_id == "a"
+
+    def test_groups_are_compared_separately(self):
+        items = [
+            {"id": "k", "personality": "krishna", "content_type": "verse", "content": "the same words"},
+            {"id": "b", "personality": "buddha", "content_type": "verse", "content": "the same words"},
+        ]
+
+        assert find_near_duplicates(items) == []
+
+    def test_embedding_confirmation(self):
+        index = NearDuplicateIndex(embedding_threshold=0.9)
+        index.add("a", "one two three four", embedding=[1.0, 0.0])
+
+        assert index.query("one two three four", embedding=[0.0, 1.0]) is None
+        match = index.query("one two three four", embedding=[1.0, 0.05])
+        assert match.original_id == "a" and match.embedding_similarity > 0.99
+
+
+class DuplicateContainer:
+    def __init__(self, items):
+        self.items = {item["id"]: item for item in items}
+        self.deleted = []
+
+    def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+        assert "embedding" not in query
+        return iter(list(self.items.values()))
+
+    def delete_item(self, item, partition_key):
+        self.deleted.append((item, partition_key))
+        self.items.pop(item)
+
+
+@pytest.fixture
+def service():
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        service = VectorDatabaseService()
+    service.container = DuplicateContainer([
+        {"id": "old", "personality": "rumi", "content_type": "poetry", "content": "the wound is the place where the light enters you", "created_at": "2023"},
+        {"id": "new", "personality": "rumi", "content_type": "poetry", "content": "The wound is the place where the Light enters you", "created_at": "2024"},
+        {"id": "other", "personality": "rumi", "content_type": "poetry", "content": "out beyond ideas of wrongdoing", "created_at": "2024"},
+    ])
+    return service
+
+
+@pytest.mark.asyncio
+async def test_cleanup_dry_run_reports_without_deleting(service):
+    found = await service.cleanup_duplicates(dry_run=True)
+
+    assert found == 1
+    assert service.container.deleted == []
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_newer_copy(service):
+    removed = await service.cleanup_duplicates()
+
+    assert removed == 1
+    assert service.container.deleted == [("new", "rumi")]
+    assert sorted(service.container.items) == ["old", "other"]
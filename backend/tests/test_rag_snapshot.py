@@ -0,0 +1,83 @@
+"""
+Tests for lazy per-personality loading and the SimpleRAGService startup snapshot
+"""
+
+import json
+import os
+
+from services.rag_service import SimpleRAGService
+
+
+def _write_sources(data_dir):
+    teachings = {
+        "buddha_teachings.json": [
+            {"text": "Peace comes from within. Do not seek it without.", "source": "Dhammapada"},
+            {"text": "Hatred does not cease by hatred, but only by love.", "source": "Dhammapada", "verse": "1.5"},
+        ],
+        "rumi_teachings.json": [
+            {"text": "The wound is the place where the Light enters you.", "source": "Masnavi"},
+        ],
+    }
+    for filename, items in teachings.items():
+        with open(os.path.join(data_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(items, f)
+
+
+def _service(tmp_path):
+    data_dir = tmp_path / "sources"
+    data_dir.mkdir(exist_ok=True)
+    _write_sources(data_dir)
+    return SimpleRAGService(data_dir=str(data_dir), snapshot_dir=str(tmp_path / "snapshot"))
+
+
+def test_personalities_load_on_first_use(tmp_path):
+    service = _service(tmp_path)
+
+    assert service._corpora == {}
+    results = service.search_content("peace within", "buddha")
+
+    assert results[0].content.source == "Dhammapada"
+    assert list(service._corpora) == ["buddha"]
+
+
+def test_unknown_personality_searches_all_content(tmp_path):
+    service = _service(tmp_path)
+
+    results = service.search_content("light wound", "unknown")
+
+    assert results[0].content.personality == "rumi"
+    assert {"buddha", "rumi"} <= set(service._corpora)
+
+
+def test_snapshot_round_trip(tmp_path):
+    counts = _service(tmp_path).write_snapshot()
+    assert counts["buddha"] == 2 and counts["rumi"] == 1
+
+    service = _service(tmp_path)
+    assert service.get_personality_stats()["buddha"] == 2
+    assert service._corpora == {}  # counts come from the snapshot index
+
+    corpus = service._corpus("buddha")
+    fresh = service._load_from_sources("buddha")
+    assert corpus.contents == fresh.contents
+    assert [h.content.id for h in service.search_content("hatred love", "buddha")] == ["buddha_1"]
+    assert service.search_content("light wound")[0].content.personality == "rumi"
+
+
+def test_stale_snapshot_falls_back_to_sources(tmp_path):
+    _service(tmp_path).write_snapshot()
+    with open(tmp_path / "sources" / "rumi_teachings.json", "w", encoding="utf-8") as f:
+        json.dump([{"text": "Let silence be the art you practice."}], f)
+
+    service = SimpleRAGService(data_dir=str(tmp_path / "sources"), snapshot_dir=str(tmp_path / "snapshot"))
+
+    assert service.get_personality_stats()["rumi"] == 1
+    assert service.search_content("silence", "rumi")[0].content.content == "Let silence be the art you practice."
+
+
+def test_views_share_content_objects(tmp_path):
+    service = _service(tmp_path)
+
+    by_personality = service.content_by_personality
+    assert service.all_content[0] is by_personality["buddha"][0]
+    assert service.get_total_content_count() == 3
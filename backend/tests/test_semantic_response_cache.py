@@ -0,0 +1,153 @@
+"""
+Tests for the semantic response cache and its use in PersonalityService
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from services.llm_service import SpiritualResponse
+from services.personality_service import PersonalityService
+from services.semantic_response_cache import SemanticResponseCache, normalize_query
+
+RESPONSE = {"content": "Beloved devotee, do your duty. 🙏", "metadata": {"response_source": "llm_service"}}
+
+
+def _vector(*values):
+    return list(values) + [0.0] * (8 - len(values))
+
+
+class TestSemanticResponseCache:
+    """Exact and near-duplicate lookups, TTL, capacity and prompt versions"""
+
+    def test_exact_match_needs_no_embedding(self):
+        cache = SemanticResponseCache()
+        cache.store("krishna", "English", "What is Dharma?", RESPONSE, version="v1")
+
+        assert normalize_query("  what is   dharma ") == normalize_query("What is Dharma?")
+        assert cache.lookup("krishna", "english", "what is dharma", version="v1") == (RESPONSE, 1.0)
+        assert cache.lookup("buddha", "English", "What is Dharma?", version="v1") is None
+
+    def test_near_duplicate_above_threshold(self):
+        cache = SemanticResponseCache(similarity_threshold=0.9)
+        cache.store("krishna", "English", "What is dharma?", RESPONSE, _vector(1.0, 0.1), version="v1")
+
+        hit = cache.lookup("krishna", "English", "Explain dharma to me", _vector(1.0, 0.2), version="v1")
+        miss = cache.lookup("krishna", "English", "What is karma?", _vector(0.2, 1.0), version="v1")
+
+        assert hit[0] == RESPONSE and hit[1] > 0.9
+        assert miss is None
+        stats = cache.get_stats()
+        assert (stats["semantic_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_ttl_and_capacity(self):
+        cache = SemanticResponseCache(ttl_seconds=0, max_entries_per_personality=2)
+        cache.store("krishna", "English", "q1", RESPONSE, version="v1")
+        assert cache.lookup("krishna", "English", "q1", version="v1") is None
+
+        cache.ttl_seconds = 60
+        for query in ("q2", "q3", "q4"):
+            cache.store("krishna", "English", query, RESPONSE, _vector(1.0), version="v1")
+        assert cache.get_stats()["entries_by_personality"] == {"krishna": 2}
+        assert cache.lookup("krishna", "English", "q2", version="v1") is None
+
+    def test_prompt_change_and_explicit_invalidation(self):
+        cache = SemanticResponseCache()
+        cache.store("krishna", "English", "q1", RESPONSE, version="v1")
+        cache.store("buddha", "English", "q1", RESPONSE, version="v1")
+
+        assert cache.lookup("krishna", "English", "q1", version="v2") is None
+        assert cache.invalidate("buddha") == 1
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestPersonalityServiceResponseCache:
+    """Repeated questions skip the LLM call"""
+
+    @pytest.fixture
+    def service(self):
+        service = PersonalityService()
+        service._response_cache = SemanticResponseCache(similarity_threshold=0.9)
+        service._embedding_service = Mock()
+        service._embedding_service.generate_query_embedding.side_effect = (
+            lambda query: Mock(embedding=_vector(1.0, 0.1) if "dharma" in query else _vector(0.0, 1.0))
+        )
+        service._llm_service.generate_personality_response = AsyncMock(return_value=SpiritualResponse(
+            content="Beloved devotee, follow your dharma. 🙏",
+            personality_id="krishna",
+            source="gemini_api_krishna_optimized",
+            character_count=39,
+            max_allowed=500
+        ))
+        return service
+
+    @pytest.mark.asyncio
+    async def test_second_question_is_served_from_cache(self, service):
+        first = await service.generate_response("What is dharma?", "krishna")
+        second = await service.generate_response("Tell me about dharma", "krishna")
+        other = await service.generate_response("How do I meditate?", "krishna")
+
+        assert first["metadata"]["response_source"] == "llm_service"
+        assert second["metadata"]["response_source"] == "semantic_cache"
+        assert second["content"] == first["content"]
+        assert other["metadata"]["response_source"] == "llm_service"
+        assert service._llm_service.generate_personality_response.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_prompt_change_invalidates(self, service):
+        await service.generate_response("What is dharma?", "krishna")
+        service._llm_service.personalities["krishna"].prompt_template += "\nBe brief."
+
+        result = await service.generate_response("What is dharma?", "krishna")
+
+        assert result["metadata"]["response_source"] == "llm_service"
+
+    @pytest.mark.asyncio
+    async def test_fallback_responses_are_not_cached(self, service):
+        service._llm_service.generate_personality_response.return_value = SpiritualResponse(
+            content="Beloved devotee, I need more time.", personality_id="krishna",
+            source="fallback_timeout_error", character_count=0, max_allowed=500
+        )
+
+        await service.generate_response("What is dharma?", "krishna")
+
+        assert service._response_cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_serves_cached_response(self, service):
+        await service.generate_response("What is dharma?", "krishna")
+
+        events = [e async for e in service.stream_response("what is dharma", "krishna")]
+
+        assert events[0]["content"] == "Beloved devotee, follow your dharma. 🙏"
+        assert events[-1]["metadata"]["response_source"] == "semantic_cache"
+
+    @staticmethod
+    def _stream(chunks, source):
+        async def stream(query, personality_id, outcome=None):
+            for chunk in chunks:
+                yield chunk
+            outcome["source"] = source
+        return stream
+
+    @pytest.mark.asyncio
+    async def test_completed_stream_is_cached(self, service):
+        service._llm_service.stream_personality_response = self._stream(
+            ["Beloved devotee, ", "act without attachment."], "gemini_api_krishna_optimized")
+
+        [e async for e in service.stream_response("What is dharma?", "krishna")]
+        result = await service.generate_response("what is dharma", "krishna")
+
+        assert result["metadata"]["response_source"] == "semantic_cache"
+        assert result["content"] == "Beloved devotee, act without attachment."
+        service._llm_service.generate_personality_response.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_interrupted_stream_is_not_cached(self, service):
+        service._llm_service.stream_personality_response = self._stream(
+            ["Beloved devotee, "], "fallback_api_error")
+
+        events = [e async for e in service.stream_response("What is dharma?", "krishna")]
+
+        assert events[0]["content"] == "Beloved devotee, "
+        assert service._response_cache.get_stats()["entries"] == 0
+
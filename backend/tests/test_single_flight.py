@@ -0,0 +1,197 @@
+"""
+Tests for single-flight request coalescing and its use by the LLM, embedding
+and cache services
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import Mock, patch
+
+from services.single_flight import SingleFlight, get_single_flight, get_single_flight_metrics
+from services.llm_service import LLMService
+from services.gemini_embedding_service import GeminiEmbeddingService
+from services.cache_service import CacheService
+
+
+class CountingModel:
+    """Stands in for genai.GenerativeModel and counts generate_content calls"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return Mock(text="Beloved devotee, act without attachment. 🙏")
+
+
+class TestSingleFlight:
+    """Concurrent callers with the same key share one call"""
+
+    def test_fingerprint_is_stable(self):
+        assert SingleFlight.fingerprint("krishna", "What is dharma?") == SingleFlight.fingerprint("krishna", "What is dharma?")
+        assert SingleFlight.fingerprint("krishna", "What is dharma?") != SingleFlight.fingerprint("buddha", "What is dharma?")
+
+    @pytest.mark.asyncio
+    async def test_async_callers_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        results = await asyncio.gather(*[flight.do_async("key", compute) for _ in range(10)])
+
+        assert results == ["answer"] * 10
+        assert calls == 1
+        stats = flight.get_stats()
+        assert stats["upstream_calls"] == 1
+        assert stats["calls_saved"] == 9
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_finished_call_is_not_reused(self):
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.do_async("key", compute) == 1
+        assert await flight.do_async("key", compute) == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared(self):
+        flight = SingleFlight("test")
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("quota exceeded")
+
+        results = await asyncio.gather(*[flight.do_async("key", compute) for _ in range(3)], return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.get_stats()["upstream_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_caller_timeout_does_not_cancel_shared_call(self):
+        flight = SingleFlight("test")
+
+        async def compute():
+            await asyncio.sleep(0.1)
+            return "answer"
+
+        impatient = asyncio.wait_for(flight.do_async("key", compute), timeout=0.01)
+        patient = flight.do_async("key", compute)
+        results = await asyncio.gather(impatient, patient, return_exceptions=True)
+
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1] == "answer"
+        assert flight.get_stats()["upstream_calls"] == 1
+
+    def test_threads_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = 0
+        started = threading.Event()
+
+        def compute():
+            nonlocal calls
+            calls += 1
+            started.set()
+            time.sleep(0.1)
+            return [0.5, 0.5]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            first = pool.submit(flight.do, "key", compute)
+            started.wait()
+            others = [pool.submit(flight.do, "key", compute) for _ in range(7)]
+            results = [first.result()] + [f.result() for f in others]
+
+        assert results == [[0.5, 0.5]] * 8
+        assert calls == 1
+        assert flight.get_stats()["calls_saved"] == 7
+
+    def test_registry_reports_groups(self):
+        get_single_flight("registry-test").do("key", lambda: 1)
+
+        metrics = get_single_flight_metrics()
+        assert metrics["groups"]["registry-test"]["upstream_calls"] >= 1
+        assert "total_calls_saved" in metrics
+
+
+class TestServiceCoalescing:
+    """Identical concurrent requests reach the upstream API once"""
+
+    @pytest.mark.asyncio
+    async def test_identical_llm_requests_share_one_gemini_call(self):
+        service = LLMService()
+        service.is_configured = True
+        service.model = CountingModel()
+
+        results = await asyncio.gather(*[
+            service.generate_personality_response("What is dharma?", "krishna") for _ in range(10)
+        ])
+
+        assert service.model.calls == 1
+        assert all(r.content == results[0].content for r in results)
+
+        await service.generate_personality_response("What is karma?", "krishna")
+        assert service.model.calls == 2
+
+    def test_identical_embedding_requests_share_one_api_call(self):
+        with patch.dict('os.environ', {'EMBEDDING_CACHE_ENABLED': 'false'}, clear=False):
+            with patch.object(GeminiEmbeddingService, '_initialize_client'):
+                service = GeminiEmbeddingService(api_key="test-key")
+
+        calls = 0
+        lock = threading.Lock()
+        started = threading.Event()
+
+        def embed_content(**kwargs):
+            nonlocal calls
+            with lock:
+                calls += 1
+            started.set()
+            time.sleep(0.1)
+            return {'embedding': [0.5] * 768}
+
+        service.client = Mock()
+        service.client.embed_content.side_effect = embed_content
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            first = pool.submit(service.generate_query_embedding, "Who is Arjuna?")
+            started.wait()
+            others = [pool.submit(service.generate_query_embedding, "Who is Arjuna?") for _ in range(5)]
+            results = [first.result()] + [f.result() for f in others]
+
+        assert calls == 1
+        assert all(r.embedding == results[0].embedding for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cache_service_computes_missing_key_once(self):
+        cache = CacheService(max_size=10)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"users": 42}
+
+        results = await asyncio.gather(*[cache.get_or_compute_async("stats", compute) for _ in range(5)])
+
+        assert calls == 1
+        assert results == [{"users": 42}] * 5
+        assert cache.get_stats()["coalesced_computes"] == 4
@@ -0,0 +1,170 @@
+"""
+Tests for the embedded SQLite backend used by local-mode services
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from services import sqlite_store
+from services.sqlite_store import SQLiteDocumentStore
+from services.database_service import Conversation, DatabaseService, UsageRecord, UserStats
+from services.user_profile_service import UserProfileService
+from auth.models import create_authenticated_user
+from feedback.vimarsh_feedback_collector import FeedbackType, VimarshFeedbackCollector
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteDocumentStore(str(tmp_path / "local.sqlite"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    """Switch local mode to SQLite for the services created in the test"""
+    monkeypatch.setenv("LOCAL_STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("LOCAL_SQLITE_PATH", str(tmp_path / "vimarsh-local.sqlite"))
+    for name in ("AZURE_COSMOS_CONNECTION_STRING", "COSMOS_CONNECTION_STRING", "COSMOS_DB_ENDPOINT"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(sqlite_store, "_sqlite_store", None)
+    monkeypatch.setattr(sqlite_store, "_sqlite_store_initialized", False)
+    yield
+    if sqlite_store._sqlite_store is not None:
+        sqlite_store._sqlite_store.close()
+
+
+class TestSQLiteCollection:
+    """Same query semantics as the log-structured store"""
+
+    @pytest.fixture
+    def conversations(self, store):
+        collection = store.collection("conversations")
+        collection.create_index("by_user", ("type", "userId"), "timestamp")
+        for i in range(10):
+            collection.append({"id": f"c{i}", "type": "conversation", "userId": f"u{i % 2}",
+                               "timestamp": f"2025-07-{10 + i:02d}T10:00:00"})
+        return collection
+
+    def test_find_orders_and_paginates(self, conversations):
+        newest = conversations.find("by_user", ("conversation", "u0"), limit=2, descending=True)
+        assert [doc["id"] for doc in newest] == ["c8", "c6"]
+
+        page = conversations.find("by_user", ("conversation", "u0"), limit=2, offset=2, descending=True)
+        assert [doc["id"] for doc in page] == ["c4", "c2"]
+
+        recent = conversations.find("by_user", ("conversation", "u1"), since="2025-07-16")
+        assert [doc["id"] for doc in recent] == ["c7", "c9"]
+        assert conversations.count("by_user", ("conversation", "u1")) == 5
+
+    def test_queries_use_the_expression_index(self, store, conversations):
+        sql = conversations._find_sql("by_user", True, False)
+        plan = store.connection().execute(
+            "EXPLAIN QUERY PLAN " + sql, ("conversation", "u0", 2, 0)
+        ).fetchall()
+        assert any("conversations__by_user" in row[-1] for row in plan)
+
+    def test_write_replaces_matching_documents(self, conversations):
+        deleted = conversations.write([{"id": "c0", "type": "conversation", "userId": "u0",
+                                        "timestamp": "2025-08-01T10:00:00"}],
+                                      delete={"id": "c0"})
+        conversations.delete_where({"type": "conversation", "userId": "u1"})
+
+        assert deleted == 1
+        assert conversations.get("c0")["timestamp"] == "2025-08-01T10:00:00"
+        assert len(conversations) == 5
+        assert conversations.count("by_user", ("conversation", "u1")) == 0
+
+        conversations.replace_all([{"id": "x"}])
+        assert conversations.all() == [{"id": "x"}]
+
+    def test_new_collection_imports_legacy_json(self, store, tmp_path):
+        seed = tmp_path / "spiritual-texts.json"
+        seed.write_text(json.dumps([{"id": "bg_2_47"}, {"id": "bg_4_7"}]))
+
+        texts = store.collection("spiritual-texts", seed_path=str(seed))
+        assert [doc["id"] for doc in texts.all()] == ["bg_2_47", "bg_4_7"]
+
+    def test_database_uses_wal(self, store):
+        assert store.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def usage(record_id, user_id="user-0"):
+    return UsageRecord(
+        id=record_id, userId=user_id, userEmail=f"{user_id}@example.com", sessionId="s1",
+        timestamp="2025-07-10T10:00:00", model="gemini-2.5-flash", inputTokens=10,
+        outputTokens=20, totalTokens=30, costUsd=0.001, requestType="spiritual_guidance",
+        responseQuality="high"
+    )
+
+
+def conversation(conversation_id, user_id, timestamp):
+    return Conversation(
+        id=conversation_id, userId=user_id, userEmail=f"{user_id}@example.com", sessionId="s1",
+        timestamp=timestamp, question="What is dharma?", response="Beloved devotee...", citations=[],
+        personality="krishna"
+    )
+
+
+def stats(user_id, total_requests, total_cost=0.0):
+    return UserStats(
+        id=f"stats_{user_id}", userId=user_id, userEmail=f"{user_id}@example.com",
+        totalRequests=total_requests, totalTokens=0, totalCostUsd=total_cost, currentMonthTokens=0,
+        currentMonthCostUsd=0.0, lastRequest=None, avgTokensPerRequest=0.0,
+        favoriteModel="gemini-2.5-flash", personalityUsage={}, qualityBreakdown={}
+    )
+
+
+class TestLocalServicesOnSQLite:
+    """Local-mode services keep their behaviour with LOCAL_STORAGE_BACKEND=sqlite"""
+
+    @pytest.mark.asyncio
+    async def test_database_service_round_trip(self, sqlite_backend, tmp_path):
+        db = DatabaseService()
+        db.spiritual_texts_path = str(tmp_path / "spiritual-texts.json")
+        db.conversations_path = str(tmp_path / "conversations.json")
+
+        assert await db.save_usage_record(usage("u-1"))
+        for i in range(4):
+            await db.save_conversation(conversation(f"c{i}", "user-0", f"2025-07-{10 + i:02d}T10:00:00"))
+        await db.save_user_stats(stats("user-0", 1, total_cost=0.5))
+        await db.save_user_stats(stats("user-0", 2, total_cost=0.7))
+
+        assert [c.id for c in await db.get_user_conversations("user-0", limit=2, offset=1)] == ["c2", "c1"]
+        assert (await db.get_user_stats("user-0")).totalRequests == 2
+        assert [s.userId for s in await db.get_top_users(limit=1000)].count("user-0") == 1
+        assert not (tmp_path / "conversations.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_user_profile_round_trip(self, sqlite_backend):
+        service = UserProfileService()
+        service.cosmos_client = None
+        auth_user = create_authenticated_user({
+            "oid": "auth-sqlite-1", "email": "seeker@vimarsh.example.com", "name": "Seeker"
+        })
+
+        profile = await service.get_or_create_user_profile(auth_user)
+        again = await service.get_or_create_user_profile(auth_user)
+        await service.record_interaction(profile.id, "session-1", {"query": "What is dharma?"})
+        await service.record_interaction(profile.id, "session-1", {"query": "What is karma?"})
+
+        assert again.id == profile.id
+        assert (await service._get_user_by_id(profile.id)).email == "seeker@vimarsh.example.com"
+        assert service.sqlite_store.collection("user_sessions").count("by_session", (profile.id, "session-1")) == 1
+        assert len(service.sqlite_store.collection("user_interactions")) == 2
+
+    @pytest.mark.asyncio
+    async def test_feedback_round_trip(self, sqlite_backend, tmp_path):
+        collector = VimarshFeedbackCollector(feedback_storage_path=str(tmp_path / "feedback"),
+                                             analytics_enabled=False)
+        feedback_id = await collector.collect_feedback(
+            user_id="user-1", session_id="s1", feedback_type=FeedbackType.RATING,
+            rating=5, text_content="Beautiful guidance"
+        )
+
+        loaded = await collector._load_feedback_range(datetime.now(), datetime.now())
+        assert [fb.feedback_id for fb in loaded] == [feedback_id]
+        assert loaded[0].feedback_type is FeedbackType.RATING
+        assert list((tmp_path / "feedback").iterdir()) == []
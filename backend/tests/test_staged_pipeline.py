@@ -0,0 +1,133 @@
+"""
+Tests for the staged process-pool / async ingestion pipeline
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from utils.staged_pipeline import CPU_STAGE, IO_STAGE, PipelineStage, StagedPipeline
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'data_processing'))
+
+
+def _square(value):
+    if value == 3:
+        raise ValueError("bad item")
+    return value * value
+
+
+def _pid(value):
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class TestStagedPipeline:
+
+    @pytest.mark.asyncio
+    async def test_results_keep_input_order_and_failures(self):
+        async def shift(value):
+            await asyncio.sleep(0.01 * (5 - value))  # later items finish first
+            return value + 1
+
+        pipeline = StagedPipeline([
+            PipelineStage("square", _square, CPU_STAGE),
+            PipelineStage("shift", shift, IO_STAGE)
+        ], process_workers=2, queue_size=2)
+
+        result = await pipeline.run(range(6))
+
+        assert [r.value for r in result.items] == [1, 2, 5, None, 17, 26]
+        assert [(r.index, r.failed_stage) for r in result.failed] == [(3, "square")]
+        assert "bad item" in result.failed[0].error
+        assert set(result.stage_seconds) == {"square", "shift"}
+
+    def test_cpu_stage_uses_worker_processes(self):
+        result = StagedPipeline([PipelineStage("pid", _pid)], process_workers=2).run_sync(range(8))
+
+        pids = {r.value for r in result.items}
+        assert os.getpid() not in pids
+        assert len(pids) == 2
+
+    @pytest.mark.asyncio
+    async def test_bounded_queues_apply_backpressure(self):
+        fed = []
+        written = []
+
+        def items():
+            for i in range(20):
+                fed.append(i)
+                yield i
+
+        async def slow_write(value):
+            await asyncio.sleep(0.01)
+            written.append(value)
+            # Items admitted ahead of the sink are bounded by the queues and workers in between
+            assert len(fed) - len(written) <= 2 + 2 + 2 + 1 + 1
+            return value
+
+        pipeline = StagedPipeline([
+            PipelineStage("double", lambda v: v * 2, CPU_STAGE, concurrency=2),
+            PipelineStage("write", slow_write, IO_STAGE, concurrency=1)
+        ], process_workers=0, queue_size=2)
+
+        result = await pipeline.run(items())
+
+        assert len(result.succeeded) == 20
+        assert written == [i * 2 for i in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_intake_books_extracted_in_pool(tmp_path, monkeypatch):
+    from process_new_intake_books import NewIntakeBooksProcessor
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('INGEST_PROCESS_WORKERS', '2')
+    intake = tmp_path / "intake"
+    intake.mkdir()
+    paragraph = "The master said: learning without thought is labour lost. " * 3
+    (intake / "The Confucian Analects.txt").write_text("\n\n".join([paragraph] * 40), encoding="utf-8")
+
+    processor = NewIntakeBooksProcessor(intake)
+    stats = await processor.process_all_new_books()
+
+    assert stats["files_processed"] == 1
+    assert stats["processing_errors"] == []
+    assert stats["total_chunks"] > 1
+    # Repeated paragraphs chunk into identical text: all but the first are rejected in order
+    assert [e["chunk_index"] for e in processor.processed_entries] == [0]
+    assert stats["duplicates_rejected"] == stats["total_chunks"] - 1
+
+
+@pytest.mark.asyncio
+async def test_priority_sources_download_then_extract(tmp_path, monkeypatch):
+    from content_sourcing_pipeline import ContentSource, EnhancedContentSourcingPipeline
+
+    monkeypatch.setenv('INGEST_PROCESS_WORKERS', '0')
+    sources = [
+        ContentSource(personality=name, domain="philosophical", work_title=f"{name} Works", edition_translation="",
+                      repository="", download_url=f"https://example.org/{name}", format_type=fmt,
+                      authenticity_notes="", priority=priority)
+        for name, fmt, priority in [("Lao Tzu", "html", 2), ("Confucius", "text", 1), ("Buddha", "html", 1)]
+    ]
+    pages = {
+        "Lao Tzu": "<html><nav>menu</nav><main>" + "The Tao that can be told. " * 60 + "</main></html>",
+        "Confucius": "Learning without thought is labour lost. " * 20,
+        "Buddha": "<html><main>too short</main></html>",
+    }
+    pipeline = EnhancedContentSourcingPipeline(tmp_path, delay_between_requests=0)
+
+    async def fetch(source):
+        return pages[source.personality]
+
+    monkeypatch.setattr(pipeline, "get_priority_sources", lambda: list(sources))
+    monkeypatch.setattr(pipeline, "_fetch", fetch)
+
+    content = await pipeline.process_priority_sources()
+
+    assert [c["personality"] for c in content.values()] == ["Confucius", "Lao Tzu"]
+    assert "menu" not in content[sources[0].source_id]["content"]
+    assert pipeline.processing_stats == {'downloaded': 2, 'processed': 2, 'failed': 0, 'skipped': 1}
@@ -0,0 +1,95 @@
+"""
+Tests for the shared multi-pattern matcher and its callers
+"""
+
+import re
+
+from utils.text_matcher import PatternMatcher, TermMatcher, compile_patterns, compile_terms
+from services.safety_service import SafetyService
+from data_processing.chunking import SemanticChunker
+from data_processing.domain_processors import HistoricalProcessor, SpiritualProcessor
+
+
+class TestTermMatcher:
+
+    def test_reports_every_hit_in_one_pass(self):
+        matcher = TermMatcher(["om", "om namah", "Krishna", "rama"])
+
+        hits = matcher.findall("Om Namah Shivaya, sings Krishna's devotee of Rama")
+
+        assert [(h.key, h.start, h.end) for h in hits] == [
+            ("om", 0, 2), ("om namah", 0, 8), ("Krishna", 24, 31), ("rama", 45, 49)
+        ]
+        assert matcher.found("ramayana") == ["rama"]
+
+    def test_whole_words_match_word_boundary_search(self):
+        terms = ["ram", "rama", "holy spirit", "b_c", "x.y"]
+        text = "Rama ramayana the holy spirit, b_c x.y ram."
+        matcher = TermMatcher(terms, whole_words=True)
+
+        expected = [t for t in terms if re.search(r'\b' + re.escape(t) + r'\b', text.lower())]
+        assert matcher.found(text) == expected == ["ram", "rama", "holy spirit", "b_c", "x.y"]
+        assert TermMatcher(["ram"], whole_words=True).found("ramayana") == []
+
+    def test_by_key_matches_per_term_finditer(self):
+        matcher = TermMatcher(["aa", "a"], ignore_case=False)
+
+        grouped = matcher.by_key("aaaa A")
+
+        assert [h.start for h in grouped["aa"]] == [m.start() for m in re.finditer("aa", "aaaa A")]
+        assert [h.start for h in grouped["a"]] == [0, 1, 2, 3]
+
+    def test_grouped_vocabulary_and_cache(self):
+        groups = {"action": ["karma", "work"], "divine": ["god"]}
+
+        matcher = compile_terms(groups)
+
+        assert matcher.found_labels("the network of goddesses") == ["action", "divine"]
+        assert compile_terms({"action": ["karma", "work"], "divine": ["god"]}) is matcher
+        assert compile_terms([]).findall("anything") == []
+
+
+class TestPatternMatcher:
+
+    def test_overlapping_patterns_all_reported(self):
+        patterns = [r'\d+\.\d+', r'Verse \d+', r'\d+']
+        text = "See 2.47 and Verse 3"
+
+        grouped = PatternMatcher(patterns).by_key(text)
+
+        for pattern in patterns:
+            assert [h.text for h in grouped[pattern]] == re.findall(pattern, text)
+
+    def test_keys_and_flags(self):
+        matcher = compile_patterns({"prayer": r'prayer|mantra', "commentary": r'meaning'}, re.IGNORECASE)
+
+        assert matcher.found("The MEANING of this Mantra") == ["prayer", "commentary"]
+        assert matcher.contains("nothing here") is False
+
+
+class TestCallers:
+
+    def test_safety_patterns(self):
+        result = SafetyService().validate_content("Some investment advice and a medical diagnosis.")
+
+        assert result["blocked_patterns"] == ["medical diagnosis", "investment advice"]
+        assert not result["safety_passed"]
+
+    def test_chunker_themes_and_sanskrit_terms(self):
+        chunker = SemanticChunker()
+        text = "Krishna teaches dharma: act without attachment, with devotion."
+
+        assert chunker._extract_themes(text) == {
+            "duty_and_righteousness", "devotion_and_love", "suffering_and_attachment"
+        }
+        assert sorted(chunker._extract_sanskrit_terms(text)) == ["Krishna", "dharma"]
+
+    def test_domain_processors(self):
+        spiritual = SpiritualProcessor()
+        text = "The Holy Spirit and dharma; karmaless yoga. A prayer."
+
+        assert spiritual.extract_key_terms(text) == ["dharma", "yoga", "prayer", "holy spirit", "spirit"]
+        assert spiritual._detect_traditions(text) == ["hindu", "christian", "general"]
+        assert spiritual._determine_chunk_type(text) == "prayer"
+        assert HistoricalProcessor()._extract_dates("In 500 BCE and the 1800s, 19th century") == \
+            ["500 BCE", "1800s", "19th century"]
@@ -0,0 +1,146 @@
+"""
+Tests for streaming, resumable export and restore of Cosmos DB containers
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+from unittest.mock import patch
+
+from services.cosmos_query import CosmosQueryBuilder
+from services.vector_backup import export_container, iter_backup, restore_container
+from services.vector_database_service import VectorDatabaseService
+
+
+class PagedResults:
+    """query_items result with by_page(continuation_token) like the SDK's ItemPaged"""
+
+    def __init__(self, container, items, page_size):
+        self.container = container
+        self.items = items
+        self.page_size = page_size
+
+    def by_page(self, continuation_token=None):
+        return PageIterator(self, int(continuation_token or 0))
+
+
+class PageIterator:
+    """Iterates pages and exposes the continuation token after each one"""
+
+    def __init__(self, results, offset):
+        self.results = results
+        self.offset = offset
+        self.continuation_token = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        results, container = self.results, self.results.container
+        if self.offset >= len(results.items):
+            raise StopIteration
+        if self.offset in container.fail_at:
+            container.fail_at.discard(self.offset)
+            raise ConnectionError("connection reset")
+        page = results.items[self.offset:self.offset + results.page_size]
+        container.largest_page = max(container.largest_page, len(page))
+        self.offset += len(page)
+        self.continuation_token = str(self.offset) if self.offset < len(results.items) else None
+        return iter(page)
+
+
+class PagedContainer:
+    def __init__(self, items, fail_at=()):
+        self.items = {item["id"]: item for item in items}
+        self.fail_at = set(fail_at)
+        self.largest_page = 0
+        self.upserts = 0
+
+    def query_items(self, query, parameters=None, max_item_count=None, response_hook=None, **kwargs):
+        items = [i for i in self.items.values()
+                 if "partition_key" not in kwargs or i["personality"] == kwargs["partition_key"]]
+        return PagedResults(self, items, max_item_count)
+
+    def upsert_item(self, body):
+        self.upserts += 1
+        self.items[body["id"]] = body
+
+
+def _items(count):
+    return [{"id": f"doc-{i}", "personality": "krishna" if i % 2 else "rumi",
+             "content": f"text {i}", "embedding": [0.1 * i, 0.2], "_etag": "x", "_ts": 1}
+            for i in range(count)]
+
+
+def test_export_streams_pages_to_gzip_jsonl(tmp_path):
+    container = PagedContainer(_items(25))
+    path = str(tmp_path / "export.jsonl.gz")
+
+    result = export_container(container, path, page_size=10)
+
+    documents = list(iter_backup(path))
+    assert result.documents == 25 and result.pages == 3
+    assert [d["id"] for d in documents] == [f"doc-{i}" for i in range(25)]
+    assert "_etag" not in documents[0] and documents[3]["embedding"] == [0.30000000000000004, 0.2]
+    assert container.largest_page == 10
+    assert not os.path.exists(path + ".state.json")
+
+
+def test_interrupted_export_resumes_without_duplicates(tmp_path):
+    container = PagedContainer(_items(25), fail_at={20})
+    path = str(tmp_path / "export.jsonl.gz")
+
+    with pytest.raises(ConnectionError):
+        export_container(container, path, page_size=10)
+    with open(path, "ab") as f:
+        f.write(b"partial page")  # bytes past the last completed page
+    result = export_container(container, path, page_size=10)
+
+    assert result.resumed and result.documents == 25
+    assert len({d["id"] for d in iter_backup(path)}) == len(list(iter_backup(path))) == 25
+
+
+def test_filtered_export_query(tmp_path):
+    container = PagedContainer(_items(10))
+    path = str(tmp_path / "rumi.jsonl.gz")
+
+    export_container(container, path, CosmosQueryBuilder("export").where("personality", "rumi").build())
+
+    assert {d["personality"] for d in iter_backup(path)} == {"rumi"}
+
+
+@pytest.mark.asyncio
+async def test_restore_is_resumable(tmp_path):
+    path = str(tmp_path / "backup.jsonl.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for item in _items(30):
+            f.write(json.dumps(item) + "\n")
+    checkpoint = str(tmp_path / "restore.ckpt")
+    with open(checkpoint, "w") as f:
+        f.write("".join(f"doc-{i}\n" for i in range(12)))  # written before an interruption
+
+    target = PagedContainer([])
+    result = await restore_container(target, path, checkpoint_path=checkpoint, chunk_size=7)
+
+    assert (result.succeeded, result.skipped) == (18, 12)
+    assert sorted(result.written_ids) == sorted(f"doc-{i}" for i in range(12, 30))
+    assert target.upserts == 18
+
+
+@pytest.mark.asyncio
+async def test_export_database_writes_file_and_manifest(tmp_path):
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        service = VectorDatabaseService()
+    service.container = PagedContainer(_items(6))
+    path = str(tmp_path / "vectors.jsonl.gz")
+
+    with patch.object(VectorDatabaseService, 'get_database_stats', return_value=service._database_stats({})):
+        export = await service.export_database("Krishna", output_path=path)
+
+    assert export["export_metadata"]["total_documents"] == 3
+    assert "documents" not in export
+    with open(path + ".manifest.json") as f:
+        assert json.load(f)["export_metadata"]["path"] == path
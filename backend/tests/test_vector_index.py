@@ -0,0 +1,200 @@
+"""
+Tests for the in-process vector index and its use in VectorDatabaseService.semantic_search
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from services.vector_index import (
+    FlatVectorIndex,
+    IVFFlatIndex,
+    PersonalityVectorIndex,
+    create_vector_index
+)
+from services.vector_database_service import (
+    VectorDatabaseService,
+    VectorDocument,
+    PersonalityType,
+    ContentType
+)
+
+DIM = 16
+
+
+def _random_vectors(count, dim=DIM, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(count, dim)).astype(np.float32)
+
+
+class TestFlatVectorIndex:
+    """Exact search over the contiguous matrix"""
+
+    def test_search_matches_brute_force(self):
+        vectors = _random_vectors(200)
+        index = FlatVectorIndex(dimension=DIM, initial_capacity=4)
+        index.upsert_many((f"doc{i}", v) for i, v in enumerate(vectors))
+
+        query = vectors[17] + 0.01
+        hits = index.search(query, k=5)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+        assert [doc_id for doc_id, _ in hits] == [f"doc{i}" for i in expected]
+        assert hits[0][0] == "doc17"
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-3)
+
+    def test_upsert_replaces_and_remove_keeps_matrix_contiguous(self):
+        index = FlatVectorIndex(dimension=DIM)
+        vectors = _random_vectors(3)
+        for i, v in enumerate(vectors):
+            index.upsert(f"doc{i}", v)
+
+        index.upsert("doc0", vectors[2])
+        assert len(index) == 3
+        assert index.remove("doc1") is True
+        assert index.remove("doc1") is False
+        assert len(index) == 2
+        assert {doc_id for doc_id, _ in index.search(vectors[2], k=10)} == {"doc0", "doc2"}
+
+    def test_zero_vectors_and_wrong_dimension(self):
+        index = FlatVectorIndex(dimension=DIM)
+        index.upsert("zero", [0.0] * DIM)
+        assert len(index) == 0
+        with pytest.raises(ValueError):
+            index.upsert("bad", [1.0] * (DIM + 1))
+
+
+class TestIVFFlatIndex:
+    """Approximate search through inverted lists"""
+
+    def test_trains_after_threshold_and_finds_exact_match(self):
+        vectors = _random_vectors(300, seed=1)
+        index = IVFFlatIndex(dimension=DIM, nlist=8, nprobe=8, min_train_size=100)
+        index.upsert_many((f"doc{i}", v) for i, v in enumerate(vectors))
+
+        assert index.is_trained
+        hits = index.search(vectors[42], k=3)
+        assert hits[0][0] == "doc42"
+
+        index.remove("doc42")
+        assert "doc42" not in [doc_id for doc_id, _ in index.search(vectors[42], k=3)]
+
+    def test_factory_selects_type(self):
+        assert isinstance(create_vector_index("ivf", DIM), IVFFlatIndex)
+        assert isinstance(create_vector_index("flat", DIM), FlatVectorIndex)
+        assert isinstance(create_vector_index("unknown", DIM), FlatVectorIndex)
+
+
+class TestPersonalityVectorIndex:
+    """Partitioning and content-type filtering"""
+
+    def test_search_respects_partition_and_content_type(self):
+        vectors = _random_vectors(4, seed=2)
+        index = PersonalityVectorIndex(index_type="flat", dimension=DIM)
+        index.upsert("k1", "krishna", vectors[0], "verse")
+        index.upsert("k2", "krishna", vectors[1], "teaching")
+        index.upsert("b1", "buddha", vectors[0], "verse")
+
+        krishna_hits = index.search(vectors[0], k=5, personality="krishna")
+        assert {hit[0] for hit in krishna_hits} == {"k1", "k2"}
+
+        verse_hits = index.search(vectors[0], k=5, content_types=["verse"])
+        assert {hit[0] for hit in verse_hits} == {"b1", "k1"}
+
+        # Moving a document between personalities drops it from the old partition
+        index.upsert("k2", "buddha", vectors[1], "teaching")
+        assert "k2" not in {hit[0] for hit in index.search(vectors[1], k=5, personality="krishna")}
+        assert index.get_stats()["vectors_by_personality"] == {"krishna": 1, "buddha": 2}
+
+
+class FakeContainer:
+    """Minimal stand-in for a Cosmos DB container client"""
+
+    def __init__(self, items):
+        self.items = {item['id']: item for item in items}
+        self.queries = []
+
+    def query_items(self, query, parameters=None, partition_key=None, **kwargs):
+        self.queries.append(query)
+        params = {p['name']: p['value'] for p in (parameters or [])}
+        items = list(self.items.values())
+        if partition_key is not None:
+            items = [i for i in items if i['personality'] == partition_key]
+        if '@ids' in params:
+            items = [i for i in items if i['id'] in params['@ids']]
+        return iter(items)
+
+    def upsert_item(self, body):
+        self.items[body['id']] = body
+
+
+@pytest.fixture
+def vector_service():
+    vectors = _random_vectors(6, dim=768, seed=3)
+    items = [
+        {
+            'id': f"{personality}_{i}",
+            'content': f"{personality} passage {i}",
+            'personality': personality,
+            'content_type': 'verse',
+            'source': 'Test Source',
+            'embedding': vectors[i].tolist()
+        }
+        for i, personality in enumerate(['krishna', 'krishna', 'krishna', 'buddha', 'buddha', 'jesus'])
+    ]
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        service = VectorDatabaseService()
+    service.container = FakeContainer(items)
+    service.server_side_search = False  # exercise the in-process index path
+    service.embedding_model = Mock()
+    service.embedding_model.encode.return_value = vectors[1].tolist()
+    return service, vectors
+
+
+class TestSemanticSearchWithIndex:
+    """VectorDatabaseService.semantic_search backed by the in-process index"""
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_uses_index_and_fetches_only_hits(self, vector_service):
+        service, _ = vector_service
+
+        results = await service.semantic_search("dharma", personality=PersonalityType.KRISHNA, top_k=1)
+
+        assert [r.document.id for r in results] == ["krishna_1"]
+        assert results[0].relevance_score == pytest.approx(1.0, abs=1e-4)
+        assert not any(q.strip() == "SELECT * FROM c" for q in service.container.queries)
+        assert service.vector_index.is_loaded("krishna")
+        assert not service.vector_index.is_loaded("buddha")
+
+    @pytest.mark.asyncio
+    async def test_upsert_document_refreshes_index(self, vector_service):
+        service, vectors = vector_service
+        await service.semantic_search("warm", personality=PersonalityType.KRISHNA)
+
+        new_doc = VectorDocument(
+            id="krishna_new",
+            content="new passage",
+            personality=PersonalityType.KRISHNA,
+            content_type=ContentType.TEACHING,
+            source="Added via API",
+            embedding=(vectors[1] * 2).tolist()
+        )
+        assert await service.upsert_document(new_doc)
+
+        results = await service.semantic_search(
+            "dharma", personality=PersonalityType.KRISHNA,
+            content_types=[ContentType.TEACHING], top_k=3
+        )
+        assert [r.document.id for r in results] == ["krishna_new"]
+
+    @pytest.mark.asyncio
+    async def test_scan_fallback_when_index_disabled(self, vector_service):
+        service, _ = vector_service
+        service.vector_index_enabled = False
+
+        results = await service.semantic_search("dharma", top_k=2)
+
+        assert results[0].document.id == "krishna_1"
+        assert len(service.vector_index) == 0
@@ -0,0 +1,122 @@
+"""
+Tests for float16 / int8 embedding storage with exact float32 re-ranking
+"""
+
+import numpy as np
+import pytest
+
+from services.local_embedding_store import LocalEmbeddingStore
+from services.vector_index import FlatVectorIndex, IVFFlatIndex, PersonalityVectorIndex
+from services.vector_quantization import QuantizedMatrix, quantize_int8
+
+DIM = 64
+
+
+def _clustered_vectors(count, dim=DIM, clusters=10, seed=0):
+    """Near-duplicate-heavy vectors, where quantization error can swap neighbours"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, size=count)] + 0.05 * rng.normal(size=(count, dim))
+    return vectors.astype(np.float32)
+
+
+def _exact_top_k(vectors, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return [f"doc{i}" for i in np.argsort(-scores)[:k]]
+
+
+class TestQuantizedMatrix:
+
+    def test_int8_round_trip_and_scores(self):
+        vectors = _clustered_vectors(50)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        matrix = QuantizedMatrix(DIM, 50, 'int8')
+        matrix.store(0, vectors)
+
+        codes, scales = quantize_int8(vectors)
+        assert codes.dtype == np.int8 and np.abs(codes).max() == 127
+        assert np.abs(matrix.decode(slice(0, 50)) - vectors).max() <= scales.max() / 2 + 1e-6
+        np.testing.assert_allclose(matrix.scores(vectors[3], 50), vectors @ vectors[3], atol=0.01)
+        assert matrix.nbytes == 50 * DIM + 50 * 4
+
+    def test_float16_uses_half_the_memory(self):
+        assert QuantizedMatrix(DIM, 100, 'float16').nbytes == QuantizedMatrix(DIM, 100, 'float32').nbytes // 2
+        with pytest.raises(ValueError):
+            QuantizedMatrix(DIM, 1, 'int4')
+
+
+class TestQuantizedVectorIndex:
+
+    @pytest.mark.parametrize("precision", ["float16", "int8"])
+    def test_reranked_results_match_exact_search(self, precision):
+        vectors = _clustered_vectors(400, seed=3)
+        index = FlatVectorIndex(dimension=DIM, initial_capacity=8, precision=precision, rerank_factor=4)
+        index.upsert_many((f"doc{i}", v) for i, v in enumerate(vectors))
+
+        for q in (5, 123, 377):
+            query = vectors[q] + 0.01
+            hits = index.search(query, k=10)
+            assert [doc_id for doc_id, _ in hits] == _exact_top_k(vectors, query, 10)
+            exact = vectors[q] / np.linalg.norm(vectors[q])
+            assert index.get_vector(f"doc{q}") == pytest.approx(exact, abs=1e-6)
+
+        assert index.memory_bytes < FlatVectorIndex(DIM, initial_capacity=index._matrix.capacity).memory_bytes
+
+    def test_remove_keeps_quantized_and_exact_rows_aligned(self):
+        vectors = _clustered_vectors(20, seed=4)
+        index = FlatVectorIndex(dimension=DIM, precision='int8')
+        index.upsert_many((f"doc{i}", v) for i, v in enumerate(vectors))
+
+        index.remove("doc3")  # doc19 is swapped into row 3
+
+        assert index.search(vectors[19], k=1)[0][0] == "doc19"
+        assert index.search(vectors[19], k=1)[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_without_rerank_no_float32_copy_is_kept(self):
+        vectors = _clustered_vectors(50, seed=5)
+        index = FlatVectorIndex(dimension=DIM, precision='int8', rerank_factor=0)
+        index.upsert_many((f"doc{i}", v) for i, v in enumerate(vectors))
+
+        assert index._exact is None
+        assert index.search(vectors[7], k=1)[0][0] == "doc7"
+
+    def test_ivf_index_trains_on_quantized_storage(self):
+        vectors = _clustered_vectors(300, seed=6)
+        index = IVFFlatIndex(dimension=DIM, nlist=8, nprobe=8, min_train_size=100, precision='float16')
+        index.upsert_many((f"doc{i}", v) for i, v in enumerate(vectors))
+
+        assert index.is_trained
+        assert index.search(vectors[42], k=3)[0][0] == "doc42"
+
+    def test_personality_index_reports_quantized_memory(self, monkeypatch):
+        monkeypatch.setenv('VECTOR_INDEX_PRECISION', 'int8')
+        index = PersonalityVectorIndex(index_type='flat', dimension=DIM)
+        for i, v in enumerate(_clustered_vectors(10)):
+            index.upsert(f"doc{i}", "krishna", v, "verse")
+
+        stats = index.get_stats()
+        assert stats["precision"] == "int8"
+        assert index._partitions["krishna"].memory_bytes == 256 * DIM + 256 * 4
+
+
+class TestQuantizedLocalStore:
+
+    @pytest.mark.parametrize("precision", ["float16", "int8"])
+    def test_search_matches_float32_store(self, tmp_path, precision):
+        vectors = _clustered_vectors(200, seed=7)
+        records = [({'id': f"doc{i}", 'content': f"verse {i}"}, v) for i, v in enumerate(vectors)]
+        exact_store = LocalEmbeddingStore(str(tmp_path / "exact"), dimension=DIM, precision='float32')
+        compact_store = LocalEmbeddingStore(str(tmp_path / "compact"), dimension=DIM, precision=precision)
+        for store in (exact_store, compact_store):
+            store.add_many("krishna", records)
+            store.search(vectors[0], "krishna", k=1)  # map the matrix, then append to it
+            store.add("krishna", {'id': "doc9", 'content': "moved"}, vectors[150] + 0.05)
+
+        query = vectors[150] + 0.01
+        expected = exact_store.search(query, "krishna", k=5)
+        results = compact_store.search(query, "krishna", k=5)
+
+        assert [(d['id'], round(s, 5)) for d, s in results] == [(d['id'], round(s, 5)) for d, s in expected]
+        stats = compact_store.get_stats()["personalities"]["krishna"]
+        assert 0 < stats["resident_bytes"] < stats["embedding_bytes"]
@@ -0,0 +1,60 @@
+"""
+Tests for the shared vectorized cosine scoring engine
+"""
+
+import numpy as np
+import pytest
+
+from services.vector_scoring import (
+    EmbeddingMatrix,
+    cosine_similarity,
+    normalize_rows,
+    top_k_indices
+)
+
+
+def _loop_cosine(query, embeddings):
+    """Reference implementation matching the old per-document loops"""
+    q = np.array(query, dtype=np.float64)
+    return [float(np.dot(np.array(e), q) / (np.linalg.norm(e) * np.linalg.norm(q))) for e in embeddings]
+
+
+class TestVectorScoring:
+    """Vectorized scores must agree with the original loops"""
+
+    def test_matrix_scores_match_loop(self):
+        rng = np.random.default_rng(7)
+        embeddings = rng.normal(size=(50, 32)).tolist()
+        query = rng.normal(size=32).tolist()
+
+        matrix = EmbeddingMatrix(embeddings)
+
+        assert matrix.matrix.dtype == np.float32
+        np.testing.assert_allclose(matrix.score(query), _loop_cosine(query, embeddings), atol=1e-5)
+
+    def test_top_k_ordering_and_threshold(self):
+        scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3], dtype=np.float32)
+        assert top_k_indices(scores, 3).tolist() == [1, 3, 2]
+        assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 4, 0]
+        assert top_k_indices(scores, 0).tolist() == []
+
+        selected = EmbeddingMatrix.top_k_from_scores(scores, 3, min_score=0.6)
+        assert [index for index, _ in selected] == [1, 3]
+
+    def test_batch_scoring_matches_single(self):
+        rng = np.random.default_rng(11)
+        matrix = EmbeddingMatrix(rng.normal(size=(40, 16)))
+        queries = rng.normal(size=(4, 16))
+
+        batch = matrix.top_k_batch(queries, k=3)
+        single = [matrix.top_k(q, k=3) for q in queries]
+
+        assert [[i for i, _ in r] for r in batch] == [[i for i, _ in r] for r in single]
+
+    def test_zero_vectors_and_empty_matrix(self):
+        assert cosine_similarity([0.0, 0.0], [1.0, 0.0]) == 0.0
+        np.testing.assert_allclose(normalize_rows([[0.0, 0.0], [3.0, 4.0]]), [[0.0, 0.0], [0.6, 0.8]], atol=1e-6)
+
+        empty = EmbeddingMatrix([], dimension=8)
+        assert len(empty) == 0
+        assert empty.top_k([1.0] * 8, k=3) == []
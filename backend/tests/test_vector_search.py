@@ -0,0 +1,206 @@
+"""
+Tests for server-side vector top-k search, its local stand-in, and the
+cross-personality retrieval in semantic_search
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from services.local_embedding_store import LocalEmbeddingStore
+from services.vector_search import CosmosVectorSearch, LocalVectorSearch
+from services.vector_database_service import (
+    DOCUMENT_FIELDS, ContentType, PersonalityType, VectorDatabaseService
+)
+from services.rag_integration_service import RAGIntegrationService
+
+DIM = 8
+
+
+def _doc(doc_id, personality, content_type='verse'):
+    return {'id': doc_id, 'personality': personality, 'content': f"content of {doc_id}",
+            'content_type': content_type, 'source': 'Test Source'}
+
+
+def _unit(*weights):
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[:len(weights)] = weights
+    return vector / np.linalg.norm(vector)
+
+
+class VectorDistanceContainer:
+    """Answers VectorDistance top-k queries the way the service does (scores projected)"""
+
+    def __init__(self, documents):
+        self.documents = documents  # (item, embedding)
+        self.calls = []
+
+    def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+        self.calls.append({"query": query, "parameters": parameters, **kwargs})
+        params = {p["name"]: p["value"] for p in parameters}
+        vector = np.asarray(params["@query_vector"])
+        rows = []
+        for item, embedding in self.documents:
+            if "partition_key" in kwargs and item["personality"] != kwargs["partition_key"]:
+                continue
+            if "@content_types" in params and item["content_type"] not in params["@content_types"]:
+                continue
+            projected = {f: item[f] for f in DOCUMENT_FIELDS if f in item}
+            projected["similarity_score"] = float(np.dot(vector, embedding))
+            rows.append(projected)
+        rows.sort(key=lambda r: r["similarity_score"], reverse=True)
+        top = int(query.split("TOP ")[1].split()[0])
+        return iter(rows[:top])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalEmbeddingStore(str(tmp_path / "embeddings"), dimension=DIM)
+    store.add_many("krishna", [(_doc("k0", "krishna"), _unit(1, 0.2)), (_doc("k1", "krishna", "teaching"), _unit(0.3, 1))])
+    store.add_many("buddha", [(_doc("b0", "buddha"), _unit(1, 0.05)), (_doc("b1", "buddha"), _unit(0, 1))])
+    return store
+
+
+class TestVectorSearchBackends:
+    """Both backends return top-k hits with scores and no embeddings"""
+
+    def test_cosmos_query_is_server_side_top_k(self):
+        container = VectorDistanceContainer([(_doc("k0", "krishna"), _unit(1)), (_doc("k1", "krishna"), _unit(0, 1))])
+        backend = CosmosVectorSearch(container, DOCUMENT_FIELDS, ["krishna", "buddha"])
+
+        hits = backend.top_k(_unit(1).tolist(), 1, personality="krishna", content_types=["verse"])
+
+        call = container.calls[0]
+        assert call["query"].startswith("SELECT TOP 1 c.id")
+        assert call["query"].endswith("ORDER BY VectorDistance(c.embedding, @query_vector)")
+        assert ", c.embedding" not in call["query"]  # embeddings are not returned
+        assert call["partition_key"] == "krishna"
+        assert [(h.item["id"], round(h.score, 4)) for h in hits] == [("k0", 1.0)]
+        assert "similarity_score" not in hits[0].item
+
+    def test_cosmos_search_over_all_personalities_stays_single_partition(self):
+        container = VectorDistanceContainer([
+            (_doc("k0", "krishna"), _unit(1, 0.5)), (_doc("b0", "buddha"), _unit(1)), (_doc("b1", "buddha"), _unit(1, 0.2))
+        ])
+        backend = CosmosVectorSearch(container, DOCUMENT_FIELDS, ["krishna", "buddha"])
+
+        hits = backend.top_k(_unit(1).tolist(), 2)
+
+        assert [h.item["id"] for h in hits] == ["b0", "b1"]
+        assert sorted(c.get("partition_key") for c in container.calls) == ["buddha", "krishna"]
+        assert not any(c.get("enable_cross_partition_query") for c in container.calls)
+
+    def test_local_stand_in_merges_partitions(self, store):
+        backend = LocalVectorSearch(store)
+
+        hits = backend.top_k(_unit(1), 3)
+        assert [h.item["id"] for h in hits] == ["b0", "k0", "k1"]
+
+        teaching = backend.top_k(_unit(1), 3, content_types=["teaching"])
+        assert [h.item["id"] for h in teaching] == ["k1"]
+
+
+class TestCrossPersonalitySearch:
+    """semantic_search returns same- and cross-personality results from one search"""
+
+    @pytest.fixture
+    def service(self, store):
+        with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+             patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+            service = VectorDatabaseService()
+        service.local_store = store
+        service.embedding_model = Mock()
+        service.embedding_model.encode.return_value = _unit(1).tolist()
+        return service
+
+    @pytest.mark.asyncio
+    async def test_cross_personality_fills_remaining_slots(self, service):
+        with patch('services.vector_database_service.EmbeddingMatrix', side_effect=AssertionError("re-scored")):
+            results = await service.semantic_search(
+                "duty", personality=PersonalityType.KRISHNA, top_k=3, min_relevance=0.5,
+                include_cross_personality=True
+            )
+
+        assert [r.document.id for r in results] == ["k0", "b0"]
+        assert [r.personality_match for r in results] == [True, False]
+        service.embedding_model.encode.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_requested_personality_keeps_its_slots(self, service, store):
+        # Other personalities outscore krishna's passages
+        store.add_many("buddha", [(_doc(f"b{i}", "buddha"), _unit(1, 0.01 * i)) for i in range(2, 16)])
+
+        results = await service.semantic_search(
+            "duty", personality=PersonalityType.KRISHNA, top_k=3, min_relevance=0.2,
+            include_cross_personality=True
+        )
+
+        assert [r.document.id for r in results][:2] == ["k0", "k1"]
+        assert [r.personality_match for r in results] == [True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_full_primary_results_skip_cross_personality_search(self, service):
+        service.container = VectorDistanceContainer([
+            (_doc("k0", "krishna"), _unit(1)), (_doc("k1", "krishna"), _unit(1, 0.1)), (_doc("b0", "buddha"), _unit(1))
+        ])
+
+        results = await service.semantic_search(
+            "duty", personality=PersonalityType.KRISHNA, top_k=2, include_cross_personality=True
+        )
+
+        assert [r.document.id for r in results] == ["k0", "k1"]
+        assert [c.get("partition_key") for c in service.container.calls] == ["krishna"]
+
+    @pytest.mark.asyncio
+    async def test_backend_failure_falls_back_to_index(self, service):
+        class FailingContainer(VectorDistanceContainer):
+            def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+                if "VectorDistance" in query:
+                    raise RuntimeError("Cross partition query with TOP/ORDER BY is not supported")
+                return super().query_items(query, parameters, response_hook, **kwargs)
+
+        service.container = FailingContainer([])
+        service._semantic_search_index = Mock(return_value=["from index"])
+
+        results = await service.semantic_search("duty", personality=PersonalityType.KRISHNA, top_k=1)
+
+        assert results == ["from index"]
+
+    @pytest.mark.asyncio
+    async def test_same_personality_only_by_default(self, service):
+        results = await service.semantic_search("duty", personality=PersonalityType.KRISHNA, top_k=3)
+
+        assert {r.document.personality for r in results} == {PersonalityType.KRISHNA}
+
+    @pytest.mark.asyncio
+    async def test_server_side_search_on_cosmos(self, service):
+        service.container = VectorDistanceContainer([
+            (_doc("k0", "krishna"), _unit(1)), (_doc("b0", "buddha"), _unit(1, 0.1))
+        ])
+
+        results = await service.semantic_search(
+            "duty", personality=PersonalityType.KRISHNA, content_types=[ContentType.VERSE], top_k=1
+        )
+
+        assert [r.document.id for r in results] == ["k0"]
+        assert len(service.container.calls) == 1
+        assert results[0].document.embedding is None
+
+
+@pytest.mark.asyncio
+async def test_rag_context_uses_a_single_search():
+    service = RAGIntegrationService.__new__(RAGIntegrationService)
+    service.vector_db = Mock()
+    service.vector_db.semantic_search = AsyncMock(return_value=[])
+
+    # The module's own import of vector_database_service may be unavailable here
+    with patch('services.rag_integration_service.PersonalityType', PersonalityType):
+        await service._retrieve_spiritual_context(
+            query="What is dharma?", personality_id="krishna", context_limit=3,
+            min_relevance=0.3, include_cross_personality=True
+        )
+
+    service.vector_db.semantic_search.assert_awaited_once()
+    kwargs = service.vector_db.semantic_search.await_args.kwargs
+    assert kwargs["include_cross_personality"] is True
+    assert kwargs["cross_min_relevance"] == pytest.approx(0.24)
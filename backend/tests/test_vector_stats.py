@@ -0,0 +1,229 @@
+"""
+Tests for materialized vector database statistics: incremental deltas on
+writes, O(1) dashboard reads and reconciliation
+"""
+
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import patch
+
+from services.vector_stats import MAX_PATCH_OPERATIONS, DocumentSummary, VectorStatsStore, document_size
+from services.vector_database_service import (
+    ContentType, PersonalityType, VectorDatabaseService, VectorDocument
+)
+
+
+class CosmosError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class StatsContainer:
+    """Applies patch incr/set operations like Cosmos DB (creating missing keys)"""
+
+    def __init__(self):
+        self.items = {}
+        self.patch_sizes = []
+
+    def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+        return iter(copy.deepcopy(list(self.items.values())))
+
+    def create_item(self, body):
+        if body["id"] in self.items:
+            raise CosmosError(409)
+        self.items[body["id"]] = copy.deepcopy(body)
+
+    def upsert_item(self, body):
+        self.items[body["id"]] = copy.deepcopy(body)
+
+    def delete_item(self, item, partition_key):
+        self.items.pop(item)
+
+    def patch_item(self, item, partition_key, patch_operations):
+        if item not in self.items:
+            raise CosmosError(404)
+        self.patch_sizes.append(len(patch_operations))
+        for operation in patch_operations:
+            *parents, leaf = [p.replace('~1', '/').replace('~0', '~') for p in operation["path"].strip('/').split('/')]
+            target = self.items[item]
+            for parent in parents:
+                target = target[parent]
+            if operation["op"] == "incr":
+                target[leaf] = target.get(leaf, 0) + operation["value"]
+            else:
+                target[leaf] = operation["value"]
+
+
+class VectorsContainer:
+    """personality_vectors double: upserts, projected id lookups and GROUP BY rows"""
+
+    def __init__(self):
+        self.items = {}
+        self.queries = []
+        self.point_reads = 0
+
+    def upsert_item(self, body):
+        self.items[body["id"]] = copy.deepcopy(body)
+
+    def read_item(self, item, partition_key):
+        self.point_reads += 1
+        found = self.items.get(item)
+        if found is None or found["personality"] != partition_key:
+            raise CosmosError(404)
+        return copy.deepcopy(found)
+
+    def query_items(self, query, parameters=None, response_hook=None, **kwargs):
+        self.queries.append(query)
+        params = {p["name"]: p["value"] for p in parameters or []}
+        if "@ids" in params:
+            rows = []
+            for doc_id in params["@ids"]:
+                item = self.items.get(doc_id)
+                if item and item["personality"] == params["@personality"]:
+                    row = {k: item[k] for k in ("id", "content_type", "source", "language", "size_bytes") if k in item}
+                    row["has_embedding"] = bool(item.get("embedding"))
+                    row["content_length"] = len(item["content"])
+                    rows.append(row)
+            return iter(rows)
+        if "DISTINCT VALUE" in query:
+            return iter(sorted({i["personality"] for i in self.items.values()}))
+        if "GROUP BY" in query:
+            groups = {}
+            for item in self.items.values():
+                if item["personality"] != kwargs["partition_key"]:
+                    continue
+                key = (item["content_type"], item["source"], item["language"])
+                group = groups.setdefault(key, {"content_type": key[0], "source": key[1], "language": key[2],
+                                                "documents": 0, "with_embeddings": 0,
+                                                "content_length": 0, "size_bytes": 0})
+                group["documents"] += 1
+                group["with_embeddings"] += int(bool(item.get("embedding")))
+                group["content_length"] += len(item["content"])
+                group["size_bytes"] += item.get("size_bytes", 0)
+            return iter(list(groups.values()))
+        return iter([])
+
+
+def _document(doc_id, embedding=(0.1, 0.2), source="Bhagavad Gita", content="You have a right to action"):
+    return VectorDocument(
+        id=doc_id, content=content, personality=PersonalityType.KRISHNA, content_type=ContentType.VERSE,
+        source=source, embedding=list(embedding) if embedding else None
+    )
+
+
+@pytest.fixture
+def service():
+    with patch.object(VectorDatabaseService, '_initialize_cosmos_db'), \
+         patch.object(VectorDatabaseService, '_initialize_embedding_model'):
+        service = VectorDatabaseService()
+    service.container = VectorsContainer()
+    service.stats_store = VectorStatsStore(StatsContainer())
+    return service
+
+
+def _stats_doc(service, personality="krishna"):
+    return service.stats_store.container.items[personality]
+
+
+class TestIncrementalStatistics:
+
+    @pytest.mark.asyncio
+    async def test_inserts_and_overwrites_apply_deltas(self, service):
+        await service.upsert_document(_document("a", embedding=None))
+        await service.upsert_document(_document("b", source="Gita / Commentary"))
+        await service.upsert_document(_document("a"))  # overwrite: now has an embedding
+
+        stats = _stats_doc(service)
+        assert stats["documents"] == 2
+        assert stats["with_embeddings"] == 2
+        assert stats["by_source"] == {"Bhagavad Gita": 1, "Gita / Commentary": 1}
+        assert stats["size_bytes"] == sum(item["size_bytes"] for item in service.container.items.values())
+        assert stats["size_bytes"] == sum(document_size(item) for item in service.container.items.values())
+        # Previous summaries come from point reads, not queries
+        assert service.container.point_reads == 3
+        assert service.container.queries == []
+
+    @pytest.mark.asyncio
+    async def test_bulk_upserts_are_counted(self, service):
+        await service.upsert_document(_document("doc-0", source="Old source"))
+        service.container.queries.clear()
+
+        result = await service.upsert_documents([_document(f"doc-{i}") for i in range(12)])
+
+        assert result.succeeded == 12
+        assert service.container.queries == []  # no lookups of overwritten documents
+        assert _stats_doc(service)["reconciled_at"] is None
+        stats = await service.get_database_stats()
+        assert stats.total_documents == 12
+        assert stats.documents_by_source == {"Bhagavad Gita": 12}
+
+    def test_legacy_documents_count_as_reconciled(self):
+        legacy = {"id": "old", "content": "You have a right to action", "content_type": "verse"}
+
+        assert DocumentSummary.from_stored(legacy).size_bytes == 0  # as the GROUP BY counted it
+        assert DocumentSummary.from_item(legacy).size_bytes == document_size(legacy)
+        assert DocumentSummary.from_stored({**legacy, "size_bytes": 42}).size_bytes == 42
+        assert "size_bytes" not in legacy
+
+    def test_each_document_delta_stays_in_one_patch(self):
+        store = VectorStatsStore(StatsContainer())
+        old = [DocumentSummary(content_type=f"t{i}", source=f"s{i}", language=f"l{i}", has_embedding=False,
+                               content_length=i, size_bytes=10 * i) for i in range(6)]
+        new = [DocumentSummary(content_type=f"T{i}", source=f"S{i}", language=f"L{i}", has_embedding=True,
+                               content_length=i + 1, size_bytes=10 * i + 1) for i in range(6)]
+
+        store.record("krishna", [(None, summary) for summary in old])
+        store.record("krishna", list(zip(old, new)))
+
+        stats = store.container.items["krishna"]
+        sizes = store.container.patch_sizes
+        assert max(sizes) <= MAX_PATCH_OPERATIONS
+        # A whole overwrite delta (9 increments) plus updated_at per request
+        assert sizes[-6:] == [MAX_PATCH_OPERATIONS] * 6
+        assert stats["documents"] == 6 and stats["with_embeddings"] == 6
+        assert stats["by_source"] == {**{f"s{i}": 0 for i in range(6)}, **{f"S{i}": 1 for i in range(6)}}
+
+
+class TestDashboardReads:
+
+    @pytest.mark.asyncio
+    async def test_fresh_statistics_are_read_without_aggregating(self, service):
+        await service.upsert_documents([_document("a"), _document("b", embedding=None)])
+        service.reconcile_stats()
+        service.container.queries.clear()
+
+        stats = await service.get_database_stats()
+
+        assert stats.total_documents == 2
+        assert stats.failed_embeddings == 1
+        assert stats.storage_size_mb == round(_stats_doc(service)["size_bytes"] / (1024 * 1024), 3)
+        assert stats.reconciled_at is not None
+        assert service.container.queries == []
+
+    @pytest.mark.asyncio
+    async def test_stale_statistics_are_reconciled(self, service):
+        service.container.upsert_item({"id": "loaded", "personality": "krishna", "content_type": "verse",
+                                       "source": "Loader", "language": "English", "content": "abc",
+                                       "embedding": [0.1], "size_bytes": 50})  # bypassed the service
+        await service.upsert_document(_document("a"))
+        _stats_doc(service)["reconciled_at"] = (datetime.utcnow() - timedelta(days=2)).isoformat()
+
+        stats = await service.get_database_stats()
+
+        assert stats.total_documents == 2
+        assert stats.documents_by_source == {"Bhagavad Gita": 1, "Loader": 1}
+        assert any("GROUP BY" in q for q in service.container.queries)
+
+    @pytest.mark.asyncio
+    async def test_personality_stats_from_materialized_document(self, service):
+        await service.upsert_document(_document("a", content="x" * 40))
+        await service.upsert_document(_document("b", content="y" * 60, embedding=None))
+
+        stats = await service.get_personality_stats("Krishna")
+
+        assert stats["total_documents"] == 2
+        assert stats["missing_embeddings"] == 1
+        assert stats["avg_content_length"] == 50
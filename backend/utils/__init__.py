@@ -0,0 +1,6 @@
+"""
+Dependency-free helpers for Vimarsh backend modules
+
+Kept apart from the services package so that importing them does not import
+(and initialize) the services.
+"""
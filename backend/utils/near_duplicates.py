@@ -0,0 +1,224 @@
+"""
+Near-Duplicate Detection for Vimarsh
+
+MinHash signatures with LSH banding, so finding near-duplicate texts is close
+to linear in corpus size instead of comparing every pair:
+
+- each text is reduced to a set of word shingles (shingle_size=1 is the plain
+  word set, i.e. the word Jaccard cleanup_duplicates always used)
+- a MinHash signature of ``num_perm`` values estimates Jaccard similarity
+- signatures are cut into bands; texts sharing any band bucket become
+  candidates, and the band/row split is chosen so that pairs at the
+  threshold are found with >= 99% probability
+- candidates are confirmed with the exact Jaccard of their shingle sets and,
+  when embeddings are supplied and embedding_threshold is set, their cosine
+
+NearDuplicateIndex is incremental: check_and_add() answers "is this a
+near-duplicate of something already seen?" and is used both by
+VectorDatabaseService.cleanup_duplicates and by intake pipelines in
+data_processing to reject duplicates at ingest time.
+"""
+
+import re
+import zlib
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_TOKEN = re.compile(r'\S+')
+
+# Required probability that a pair exactly at the threshold becomes a candidate
+LSH_TARGET_RECALL = 0.99
+
+
+@dataclass
+class DuplicateMatch:
+    """A document judged a near-duplicate of an earlier one"""
+    duplicate_id: str
+    original_id: str
+    similarity: float
+    embedding_similarity: Optional[float] = None
+    group: str = ""
+    partition_key: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class MinHasher:
+    """Word-shingle MinHash signatures (stable across processes)"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 1, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = max(1, shingle_size)
+        rng = np.random.RandomState(seed)
+        # a * h + b stays below 2**64 for 32-bit shingle hashes
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        words = _TOKEN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return {' '.join(words)}
+        return {' '.join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, shingles: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+def _lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with the most rows per band that still reaches the target recall"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        recall = 1.0 - (1.0 - threshold ** rows) ** bands
+        if recall >= LSH_TARGET_RECALL:
+            best = (bands, rows)
+    return best
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 1.0
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash/LSH index of texts (optionally with embeddings)"""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        num_perm: int = 128,
+        shingle_size: int = 1,
+        embedding_threshold: Optional[float] = None,
+        seed: int = 1
+    ):
+        """
+        Args:
+            threshold: near-duplicates have a shingle Jaccard above this
+            num_perm: MinHash signature length
+            shingle_size: words per shingle (1 = word sets)
+            embedding_threshold: if set, candidates that both have embeddings
+                must also reach this cosine similarity
+        """
+        self.threshold = threshold
+        self.embedding_threshold = embedding_threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+        self.bands, self.rows = _lsh_bands(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._shingles: Dict[str, Set[str]] = {}
+        self._embeddings: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shingles
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    @staticmethod
+    def _unit(embedding: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+        if embedding is None or len(embedding) == 0:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _best_match(self, shingles: Set[str], band_keys: List[bytes],
+                    embedding: Optional[np.ndarray]) -> Optional[Tuple[str, float, Optional[float]]]:
+        candidates = set()
+        for band, band_key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        best = None
+        for candidate in candidates:
+            similarity = _jaccard(shingles, self._shingles[candidate])
+            if similarity <= self.threshold:
+                continue
+            cosine = None
+            other = self._embeddings.get(candidate)
+            if embedding is not None and other is not None:
+                cosine = float(np.dot(embedding, other))
+                if self.embedding_threshold is not None and cosine < self.embedding_threshold:
+                    continue
+            if best is None or similarity > best[1]:
+                best = (candidate, similarity, cosine)
+        return best
+
+    def _insert(self, key: str, shingles: Set[str], band_keys: List[bytes], embedding: Optional[np.ndarray]) -> None:
+        self._shingles[key] = shingles
+        if embedding is not None:
+            self._embeddings[key] = embedding
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, text: str, embedding: Optional[Sequence[float]] = None) -> Optional[DuplicateMatch]:
+        """Most similar indexed near-duplicate of ``text``, if any"""
+        shingles = self.hasher.shingles(text)
+        best = self._best_match(shingles, self._band_keys(self.hasher.signature(shingles)), self._unit(embedding))
+        if best is None:
+            return None
+        return DuplicateMatch(duplicate_id="", original_id=best[0], similarity=best[1], embedding_similarity=best[2])
+
+    def add(self, key: str, text: str, embedding: Optional[Sequence[float]] = None) -> None:
+        """Index ``text`` under ``key`` without checking it"""
+        shingles = self.hasher.shingles(text)
+        self._insert(key, shingles, self._band_keys(self.hasher.signature(shingles)), self._unit(embedding))
+
+    def check_and_add(self, key: str, text: str, embedding: Optional[Sequence[float]] = None) -> Optional[DuplicateMatch]:
+        """
+        Return the match if ``text`` near-duplicates an indexed text;
+        otherwise index it and return None
+        """
+        shingles = self.hasher.shingles(text)
+        band_keys = self._band_keys(self.hasher.signature(shingles))
+        unit = self._unit(embedding)
+        best = self._best_match(shingles, band_keys, unit)
+        if best is not None:
+            return DuplicateMatch(duplicate_id=key, original_id=best[0], similarity=best[1], embedding_similarity=best[2])
+        self._insert(key, shingles, band_keys, unit)
+        return None
+
+
+def find_near_duplicates(
+    items: Iterable[Dict[str, Any]],
+    group_fields: Sequence[str] = ('personality', 'content_type'),
+    text_field: str = 'content',
+    order_field: Optional[str] = 'created_at',
+    partition_field: str = 'personality',
+    **index_options
+) -> List[DuplicateMatch]:
+    """
+    Near-duplicates within each group of items
+
+    Items are visited oldest first (by ``order_field``), so each match names the
+    earliest document as the original and the later one as the duplicate.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        group = '_'.join(str(item.get(f, 'unknown')) for f in group_fields)
+        groups.setdefault(group, []).append(item)
+
+    matches = []
+    for group, group_items in groups.items():
+        if len(group_items) < 2:
+            continue
+        if order_field:
+            group_items = sorted(group_items, key=lambda item: str(item.get(order_field) or ''))
+        index = NearDuplicateIndex(**index_options)
+        for item in group_items:
+            match = index.check_and_add(item['id'], item.get(text_field) or '', item.get('embedding'))
+            if match is not None:
+                match.group = group
+                match.partition_key = item.get(partition_field)
+                matches.append(match)
+    return matches
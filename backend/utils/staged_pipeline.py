@@ -0,0 +1,193 @@
+"""
+Staged Ingestion Pipeline for Vimarsh
+
+Shared runner for the data_processing intake pipelines, which used to take
+one file (or source) at a time through extract -> clean -> chunk -> validate
+-> embed / save. Work is split into stages instead:
+
+- CPU stages (PDF/HTML text extraction, cleaning, chunking, validation) run
+  in a process pool, so several books are parsed on separate cores
+- I/O stages (downloads, embedding calls, upserts, file writes) are
+  coroutines on the event loop, each with its own concurrency limit
+- consecutive stages are connected by bounded asyncio queues: a stage that
+  falls behind fills its inbox and the stages feeding it wait (backpressure),
+  so a large intake never holds more than a few items per stage in memory
+
+Items keep their input order in the result. An item that raises in any stage
+is recorded as failed (with the stage name) and the other items carry on.
+
+CPU stage functions and the items passed to them must be picklable, i.e.
+module-level functions (or functools.partial of them) taking plain data.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CPU_STAGE = "cpu"
+IO_STAGE = "io"
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStage:
+    """One step of the pipeline"""
+    name: str
+    func: Callable[[Any], Any]
+    kind: str = CPU_STAGE  # cpu: picklable function run in the process pool; io: coroutine function
+    concurrency: Optional[int] = None  # items in flight in this stage (default: pool size / io_concurrency)
+
+
+@dataclass
+class PipelineItemResult:
+    """Outcome for one input item"""
+    index: int
+    item: Any
+    value: Any = None
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class StagedPipelineResult:
+    """Per-item outcomes (in input order) plus busy time per stage"""
+    items: List[PipelineItemResult] = field(default_factory=list)
+    duration_seconds: float = 0.0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> List[PipelineItemResult]:
+        return [r for r in self.items if r.ok]
+
+    @property
+    def failed(self) -> List[PipelineItemResult]:
+        return [r for r in self.items if not r.ok]
+
+
+class StagedPipeline:
+    """Process-pool CPU stages and async I/O stages joined by bounded queues"""
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        process_workers: Optional[int] = None,
+        queue_size: int = 8,
+        io_concurrency: int = 4
+    ):
+        """
+        Args:
+            stages: Stages in order; each one's output is the next one's input
+            process_workers: Process pool size for CPU stages (default: CPU count;
+                0 runs CPU stages in threads, e.g. where processes cannot be spawned)
+            queue_size: Capacity of each queue between stages
+            io_concurrency: Default concurrency of I/O stages
+        """
+        if not stages:
+            raise ValueError("StagedPipeline needs at least one stage")
+        for stage in stages:
+            if stage.kind not in (CPU_STAGE, IO_STAGE):
+                raise ValueError(f"Unknown stage kind for {stage.name}: {stage.kind}")
+        self.stages = stages
+        self.process_workers = (os.cpu_count() or 1) if process_workers is None else max(0, process_workers)
+        self.queue_size = max(1, queue_size)
+        self.io_concurrency = max(1, io_concurrency)
+
+    @classmethod
+    def from_env(cls, stages: List[PipelineStage]) -> "StagedPipeline":
+        workers = os.getenv('INGEST_PROCESS_WORKERS')
+        return cls(
+            stages,
+            process_workers=int(workers) if workers else None,
+            queue_size=int(os.getenv('INGEST_QUEUE_SIZE', '8')),
+            io_concurrency=int(os.getenv('INGEST_IO_CONCURRENCY', '4'))
+        )
+
+    def _concurrency(self, stage: PipelineStage) -> int:
+        if stage.concurrency:
+            return stage.concurrency
+        if stage.kind == CPU_STAGE:
+            return max(1, self.process_workers)
+        return self.io_concurrency
+
+    async def _call(self, stage: PipelineStage, value: Any, executor: Optional[Executor]) -> Any:
+        if stage.kind == IO_STAGE:
+            return await stage.func(value)
+        if executor is None:
+            return await asyncio.to_thread(stage.func, value)
+        return await asyncio.get_running_loop().run_in_executor(executor, stage.func, value)
+
+    async def run(self, items: Iterable[Any]) -> StagedPipelineResult:
+        """Push every item through all stages"""
+        start = time.perf_counter()
+        result = StagedPipelineResult(stage_seconds={stage.name: 0.0 for stage in self.stages})
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        concurrency = [self._concurrency(stage) for stage in self.stages]
+
+        needs_pool = self.process_workers > 0 and any(stage.kind == CPU_STAGE for stage in self.stages)
+        executor = ProcessPoolExecutor(max_workers=self.process_workers) if needs_pool else None
+
+        async def feed():
+            for index, item in enumerate(items):
+                record = PipelineItemResult(index=index, item=item)
+                result.items.append(record)
+                await queues[0].put((record, item))  # waits while the first stage is saturated
+            for _ in range(concurrency[0]):
+                await queues[0].put(_DONE)
+
+        async def run_stage(position: int):
+            stage = self.stages[position]
+            inbox = queues[position]
+            outbox = queues[position + 1] if position + 1 < len(self.stages) else None
+
+            async def worker():
+                while True:
+                    entry = await inbox.get()
+                    if entry is _DONE:
+                        return
+                    record, value = entry
+                    began = time.perf_counter()
+                    try:
+                        value = await self._call(stage, value, executor)
+                    except Exception as e:
+                        record.error = f"{type(e).__name__}: {e}"
+                        record.failed_stage = stage.name
+                        logger.warning(f"⚠️ {stage.name} failed for item {record.index}: {e}")
+                        continue
+                    finally:
+                        result.stage_seconds[stage.name] += time.perf_counter() - began
+                    if outbox is None:
+                        record.value = value
+                    else:
+                        await outbox.put((record, value))
+
+            await asyncio.gather(*(worker() for _ in range(concurrency[position])))
+            if outbox is not None:
+                for _ in range(concurrency[position + 1]):
+                    await outbox.put(_DONE)
+
+        try:
+            await asyncio.gather(feed(), *(run_stage(i) for i in range(len(self.stages))))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        result.duration_seconds = time.perf_counter() - start
+        logger.info(f"🏭 Staged pipeline: {len(result.succeeded)}/{len(result.items)} items in "
+                    f"{result.duration_seconds:.2f}s "
+                    f"({', '.join(f'{name} {s:.2f}s' for name, s in result.stage_seconds.items())})")
+        return result
+
+    def run_sync(self, items: Iterable[Any]) -> StagedPipelineResult:
+        """run() for synchronous callers (no event loop running)"""
+        return asyncio.run(self.run(items))
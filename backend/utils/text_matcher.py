@@ -0,0 +1,300 @@
+"""
+Multi-pattern Text Matching for Vimarsh
+
+Shared single-pass matching for the term and pattern scans in safety
+validation and the domain processors, which used to call re.search / `in`
+once per term per text. Scans over a handful of short keywords (chunk themes,
+Sanskrit terms, TTS vocabularies) stay plain loops: they are not faster here.
+
+- TermMatcher: a literal vocabulary (optionally grouped under labels, e.g.
+  theme -> keywords). Whole-word and large vocabularies are compiled once
+  into a trie-shaped regex, so all terms are matched together in one pass of
+  the C regex engine; small substring vocabularies (SCAN_MAX_TERMS) are
+  scanned with str.find, which is faster there. whole_words behaves like
+  r'\\b' + re.escape(term) + r'\\b'
+- PatternMatcher: a set of regexes combined into one alternation; wherever one
+  pattern matches, the remaining patterns are tried at that position too, so
+  every (pattern, position) hit is reported. Sets of plain phrases skip the
+  regex engine and go through TermMatcher
+- compile_terms() / compile_patterns() cache matchers by vocabulary, so callers
+  can pass their (possibly mutated) term lists and dicts on every call
+
+Every hit comes back with its position. With ignore_case, terms are matched
+against text.lower() and positions refer to that string.
+
+There is no Aho-Corasick state machine in Python: a per-character Python
+loop is slower than re over the trie (or str.find) for these vocabularies
+(tests/performance/benchmark_text_matcher.py).
+"""
+
+import re
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_NEVER = '(?!)'
+_REGEX_SYNTAX = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# Substring vocabularies up to this size are scanned term by term with str.find
+SCAN_MAX_TERMS = 64
+
+TermVocabulary = Union[Iterable[str], Mapping[str, Iterable[str]]]
+PatternSet = Union[Iterable[str], Mapping[Hashable, str]]
+
+
+class TextMatch(NamedTuple):
+    """One hit: the term or pattern key, its span and the matched text"""
+    key: Hashable
+    start: int
+    end: int
+    text: str
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _at_boundary(text: str, position: int) -> bool:
+    """Same rule as re's \\b: a word character on exactly one side"""
+    before = position > 0 and _is_word(text[position - 1])
+    after = position < len(text) and _is_word(text[position])
+    return before != after
+
+
+def _trie_pattern(keys: Iterable[str]) -> str:
+    """Regex matching exactly the given strings, shaped as their trie (longest first)"""
+    trie: Dict[str, dict] = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie) if trie else _NEVER
+
+
+class _MultiMatcher(ABC):
+    """Result helpers shared by the term and pattern matchers"""
+
+    keys: List[Hashable]
+
+    @abstractmethod
+    def finditer(self, text: str) -> Iterator[TextMatch]:
+        """Every hit, by start position"""
+
+    def _found_keys(self, text: str) -> Set[Hashable]:
+        return {match.key for match in self.finditer(text)}
+
+    def findall(self, text: str) -> List[TextMatch]:
+        """All hits, by start position (overlapping hits included)"""
+        return list(self.finditer(text))
+
+    def found(self, text: str) -> List[Hashable]:
+        """Distinct keys present in the text, in declaration order"""
+        hit = self._found_keys(text)
+        return [key for key in self.keys if key in hit]
+
+    def contains(self, text: str) -> bool:
+        """Whether any term or pattern occurs in the text"""
+        return bool(self._found_keys(text))
+
+    def by_key(self, text: str) -> Dict[Hashable, List[TextMatch]]:
+        """
+        Hits grouped per key in declaration order; each key's hits do not
+        overlap, as if that term or pattern had been scanned with re.finditer
+        """
+        grouped: Dict[Hashable, List[TextMatch]] = {}
+        for match in self.finditer(text):
+            hits = grouped.setdefault(match.key, [])
+            if hits and (match.start < hits[-1].end or match.start == hits[-1].start):
+                continue
+            hits.append(match)
+        return {key: grouped[key] for key in self.keys if key in grouped}
+
+
+class TermMatcher(_MultiMatcher):
+    """All occurrences of a literal vocabulary in one pass"""
+
+    def __init__(self, terms: TermVocabulary, ignore_case: bool = True, whole_words: bool = False):
+        """
+        Args:
+            terms: Terms, or a mapping of label -> terms (see found_labels)
+            ignore_case: Match against text.lower() (terms are lowercased too)
+            whole_words: Only match terms delimited by word boundaries
+        """
+        if isinstance(terms, Mapping):
+            self.groups: List[Tuple[str, Tuple[str, ...]]] = [(label, tuple(group)) for label, group in terms.items()]
+            terms = [term for _, group in self.groups for term in group]
+        else:
+            self.groups = []
+        self.keys = list(dict.fromkeys(term for term in terms if term))
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+
+        # normalized form -> original terms with that form
+        self._originals: Dict[str, List[str]] = {}
+        for term in self.keys:
+            self._originals.setdefault(term.lower() if ignore_case else term, []).append(term)
+        # shorter terms that a longer match also contains at the same start
+        self._prefixes: Dict[str, List[str]] = {
+            key: [key[:i] for i in range(1, len(key)) if key[:i] in self._originals]
+            for key in self._originals
+        }
+
+        # Small substring vocabularies: per-term str.find beats the regex engine's per-position cost
+        self._scan = not whole_words and len(self._originals) <= SCAN_MAX_TERMS
+        self._normalized_groups = [
+            (label, [term.lower() if ignore_case else term for term in group if term]) for label, group in self.groups
+        ]
+        body = _trie_pattern(self._originals)
+        self._regex = re.compile(r'\b(?:' + body + r')\b' if whole_words else body)
+
+    def _hits(self, subject: str) -> Iterator[Tuple[int, str]]:
+        """(start, normalized term) for every occurrence, by start then length"""
+        if self._scan:
+            hits = []
+            for key in self._originals:
+                position = subject.find(key)
+                while position >= 0:
+                    hits.append((position, len(key), key))
+                    position = subject.find(key, position + 1)
+            hits.sort()
+            for start, _, key in hits:
+                yield start, key
+            return
+
+        search = self._regex.search
+        match = search(subject)
+        while match:
+            start = match.start()
+            longest = match.group()
+            for key in self._prefixes[longest]:
+                if not self.whole_words or _at_boundary(subject, start + len(key)):
+                    yield start, key
+            yield start, longest
+            match = search(subject, start + 1)
+
+    def _subject(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def finditer(self, text: str) -> Iterator[TextMatch]:
+        for start, key in self._hits(self._subject(text)):
+            for term in self._originals[key]:
+                yield TextMatch(term, start, start + len(key), key)
+
+    def _found_keys(self, text: str) -> Set[str]:
+        subject = self._subject(text)
+        if self._scan:
+            present = [key for key in self._originals if key in subject]
+        else:
+            present = {key for _, key in self._hits(subject)}
+        return {term for key in present for term in self._originals[key]}
+
+    def by_key(self, text: str) -> Dict[Hashable, List[TextMatch]]:
+        if not self._scan:
+            return super().by_key(text)
+        subject = self._subject(text)
+        grouped: Dict[Hashable, List[TextMatch]] = {}
+        for key, terms in self._originals.items():
+            position = subject.find(key)
+            while position >= 0:
+                for term in terms:
+                    grouped.setdefault(term, []).append(TextMatch(term, position, position + len(key), key))
+                position = subject.find(key, position + len(key))
+        return {key: grouped[key] for key in self.keys if key in grouped}
+
+    def found_labels(self, text: str) -> List[str]:
+        """Labels with at least one of their terms present, in declaration order"""
+        if self._scan:
+            subject = self._subject(text)
+            return [label for label, group in self._normalized_groups if any(key in subject for key in group)]
+        hit = self._found_keys(text)
+        return [label for label, group in self.groups if any(term in hit for term in group)]
+
+
+class PatternMatcher(_MultiMatcher):
+    """All matches of a set of regexes in one pass"""
+
+    def __init__(self, patterns: PatternSet, flags: int = 0):
+        """
+        Args:
+            patterns: Regexes, or a mapping of key -> regex (hits report the key).
+                Patterns must not use numbered backreferences.
+            flags: re flags applied to every pattern
+        """
+        items = list(patterns.items()) if isinstance(patterns, Mapping) else [(p, p) for p in patterns]
+        self.keys = [key for key, _ in items]
+
+        # Plain phrases need no regex engine at all
+        self._literals: Optional[TermMatcher] = None
+        if not flags and all(not _REGEX_SYNTAX.search(pattern) for _, pattern in items):
+            self._literals = TermMatcher([pattern for _, pattern in items], ignore_case=False)
+            self._literal_keys: Dict[str, List[Hashable]] = {}
+            for key, pattern in items:
+                self._literal_keys.setdefault(pattern, []).append(key)
+            return
+
+        self._compiled = [re.compile(pattern, flags) for _, pattern in items]
+        self._group_index = {f'_p{i}': i for i in range(len(items))}
+        alternatives = '|'.join(f'(?P<_p{i}>{pattern})' for i, (_, pattern) in enumerate(items))
+        self._regex = re.compile(alternatives if items else _NEVER, flags)
+
+    def finditer(self, text: str) -> Iterator[TextMatch]:
+        if self._literals is not None:
+            for match in self._literals.finditer(text):
+                for key in self._literal_keys[match.key]:
+                    yield match._replace(key=key)
+            return
+
+        search = self._regex.search
+        match = search(text)
+        while match:
+            group = match.lastgroup
+            first = self._group_index[group]
+            yield TextMatch(self.keys[first], match.start(group), match.end(group), match.group(group))
+            # Later patterns may match at the same position too
+            position = match.start()
+            for index in range(first + 1, len(self._compiled)):
+                other = self._compiled[index].match(text, position)
+                if other:
+                    yield TextMatch(self.keys[index], other.start(), other.end(), other.group())
+            match = search(text, position + 1)
+
+    def contains(self, text: str) -> bool:
+        if self._literals is not None:
+            return self._literals.contains(text)
+        return self._regex.search(text) is not None
+
+
+@lru_cache(maxsize=256)
+def _cached_terms(vocabulary: Tuple, grouped: bool, ignore_case: bool, whole_words: bool) -> TermMatcher:
+    return TermMatcher(dict(vocabulary) if grouped else vocabulary, ignore_case, whole_words)
+
+
+@lru_cache(maxsize=256)
+def _cached_patterns(patterns: Tuple[Tuple[Hashable, str], ...], flags: int) -> PatternMatcher:
+    return PatternMatcher(dict(patterns), flags)
+
+
+def compile_terms(terms: TermVocabulary, ignore_case: bool = True, whole_words: bool = False) -> TermMatcher:
+    """Cached TermMatcher for a vocabulary (rebuilt only when the terms change)"""
+    if isinstance(terms, Mapping):
+        vocabulary = tuple((label, tuple(group)) for label, group in terms.items())
+        return _cached_terms(vocabulary, True, ignore_case, whole_words)
+    return _cached_terms(tuple(terms), False, ignore_case, whole_words)
+
+
+def compile_patterns(patterns: PatternSet, flags: int = 0) -> PatternMatcher:
+    """Cached PatternMatcher for a set of regexes (rebuilt only when they change)"""
+    items = patterns.items() if isinstance(patterns, Mapping) else ((p, p) for p in patterns)
+    return _cached_patterns(tuple(items), flags)